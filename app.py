@@ -1,158 +1,249 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
+import importlib
+import logging
 import os
+import threading
+import time
+
+_inicio_importacion = time.perf_counter()
+from flask import Flask  # noqa: E402
+from flask_sqlalchemy import SQLAlchemy  # noqa: E402
 
 # Extensión SQLAlchemy (instancia sin app para soportar app factory)
 db = SQLAlchemy()
 
 
 from models import *
+
+# Importar Flask, SQLAlchemy y los modelos: lo que paga cada proceso antes de create_app
+IMPORTACION_MS = (time.perf_counter() - _inicio_importacion) * 1000
+
+log_arranque = logging.getLogger('reservas.arranque')
+
+# (módulo, url_prefix) de los blueprints de la API; None = el prefijo del blueprint
+BLUEPRINTS = [
+    ('routes_cliente', '/api/clientes'),
+    ('routes_cancha', '/api/canchas'),
+    ('routes_deporte', '/api/deportes'),
+    ('routes_reserva', '/api/reservas'),
+    ('routes_pago', None),
+    ('routes_servicio', '/api'),
+    ('routes_reportes', '/api'),
+    ('routes_disponibilidad', '/api'),
+    ('routes_campeonato', None),
+    ('routes_tareas', '/api'),  # tareas en segundo plano (borrado por lotes)
+]
+
+
+class ErrorDeArranque(RuntimeError):
+    """La app no puede arrancar: un blueprint que no importa o un esquema incompleto."""
+
+
+def url_base_de_datos(ruta_por_defecto):
+    """URI de la base: RESERVAS_DATABASE_URL o DATABASE_URL, si no el archivo SQLite local.
+
+    Acepta el esquema 'postgres://' que usan algunos proveedores y lo traduce al
+    nombre que espera SQLAlchemy ('postgresql://').
+    """
+    url = os.environ.get('RESERVAS_DATABASE_URL') or os.environ.get('DATABASE_URL')
+    if not url:
+        return f"sqlite:///{ruta_por_defecto}"
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def _flag_entorno(nombre, defecto):
+    return os.environ.get(nombre, defecto).strip().lower() in ('1', 'true', 'si', 'sí', 'yes')
+
+
+def registrar_blueprint(app, modulo, prefijo):
+    """Importa `modulo` y registra su `bp`. Devuelve los ms que tardó.
+
+    Un módulo que no importa o no registra detiene el arranque con
+    ErrorDeArranque (antes el error se ignoraba y sus rutas desaparecían).
+    """
+    t0 = time.perf_counter()
+    try:
+        bp = importlib.import_module(modulo).bp
+        app.register_blueprint(bp, url_prefix=prefijo)
+    except Exception as e:
+        raise ErrorDeArranque(f'No se pudo registrar el blueprint de {modulo}: {e!r}') from e
+    ms = (time.perf_counter() - t0) * 1000
+    app.extensions['arranque']['blueprints'][modulo] = round(ms, 2)
+    return ms
+
+
+class _BlueprintsDiferidos:
+    """Middleware WSGI que importa y registra los blueprints antes del primer pedido.
+
+    Flask no admite registrar blueprints después de atender un pedido, así que
+    se hace acá, antes de entregarle el primero. Si un blueprint falla, ese
+    pedido (y los siguientes) terminan con el error en lugar de servir la app a
+    medias. Una vez registrados todos, el middleware se quita.
+    """
+
+    def __init__(self, app, pendientes):
+        self.app = app
+        self.siguiente = app.wsgi_app
+        self.pendientes = list(pendientes)
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if self.pendientes:
+            with self._lock:
+                if self.pendientes:
+                    self.registrar()
+        return self.siguiente(environ, start_response)
+
+    def registrar(self):
+        with self.app.app_context():
+            total = 0.0
+            while self.pendientes:
+                total += registrar_blueprint(self.app, *self.pendientes[0])
+                self.pendientes.pop(0)
+        self.app.extensions['arranque']['blueprints_ms'] = round(total, 2)
+        self.app.wsgi_app = self.siguiente
+        log_arranque.info('Blueprints registrados en el primer pedido: %.1f ms', total)
+
+
+def verificar_esquema(app):
+    """Falla si faltan tablas de los modelos (una sola consulta al catálogo del motor)."""
+    existentes = set(db.inspect(db.engine).get_table_names())
+    faltan = sorted(set(db.metadata.tables) - existentes)
+    if faltan:
+        raise ErrorDeArranque(
+            f"Faltan tablas en la base ({', '.join(faltan)}): ejecutar `python db_crear_esquema.py` antes de arrancar"
+        )
+
+
 def create_app(test_config=None):
     """Crea y configura la app Flask.
 
-    Configura SQLAlchemy con una base de datos SQLite llamada 'reservas.db'
-    ubicada en la misma carpeta que este archivo.
+    Por defecto usa una base SQLite llamada 'reservas.db' ubicada en la misma
+    carpeta que este archivo; RESERVAS_DATABASE_URL (o DATABASE_URL) permite
+    apuntar a otro motor, por ejemplo PostgreSQL. El perfil del motor SQLite
+    (pragmas y pool) se elige con RESERVAS_SQLITE_PERFIL.
+
+    Arranque (claves de configuración, con su variable de entorno):
+
+    - CREAR_TABLAS (RESERVAS_CREAR_TABLAS, sí por defecto): db.create_all() en
+      cada arranque, cómodo en desarrollo y tests. En producción (wsgi.py) se
+      desactiva: el esquema lo crea `python db_crear_esquema.py` y al arrancar
+      sólo se verifica que no falten tablas.
+    - BLUEPRINTS_DIFERIDOS (RESERVAS_BLUEPRINTS_DIFERIDOS, no por defecto):
+      importar los módulos de rutas recién en el primer pedido. Los scripts
+      que crean la app sin atender pedidos (seed, resumen, archivo...) no
+      los importan nunca.
+
+    Un blueprint que no se puede registrar detiene el arranque (ErrorDeArranque).
+    Los tiempos quedan en app.extensions['arranque'], en el log
+    'reservas.arranque' y en /metrics.
     """
+    t0 = time.perf_counter()
     app = Flask(__name__, instance_relative_config=False)
 
     base_dir = os.path.abspath(os.path.dirname(__file__))
     db_path = os.path.join(base_dir, 'reservas.db')
 
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_path}"
+    app.config['SQLALCHEMY_DATABASE_URI'] = url_base_de_datos(db_path)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SECRET_KEY'] = app.config.get('SECRET_KEY', 'dev')
+    app.config['CREAR_TABLAS'] = _flag_entorno('RESERVAS_CREAR_TABLAS', '1')
+    app.config['BLUEPRINTS_DIFERIDOS'] = _flag_entorno('RESERVAS_BLUEPRINTS_DIFERIDOS', '0')
+    # Permite a los tests (u otros entornos) sobreescribir la configuración
+    if test_config:
+        app.config.update(test_config)
+    arranque = app.extensions['arranque'] = {
+        'importacion_ms': round(IMPORTACION_MS, 2), 'esquema_ms': 0.0, 'blueprints_ms': 0.0, 'blueprints': {},
+    }
+
+    # Perfil del motor SQLite (RESERVAS_SQLITE_PERFIL, ver motor_sqlite.py)
+    import motor_sqlite
+    motor_sqlite.configurar(app)
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        # motores cliente/servidor: descartar conexiones cortadas por el servidor
+        opciones = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+        opciones.setdefault('pool_pre_ping', True)
+        opciones.setdefault('pool_recycle', 1800)
 
     # Inicializar extensiones
     db.init_app(app)
+    with app.app_context():
+        motor_sqlite.instalar_pragmas(db.engine, app.config['SQLITE_PERFIL'])
+        # Tiempos y SQL por pedido, Server-Timing y /metrics (ver metricas.py)
+        if app.config.get('METRICAS', True):
+            import metricas
+            metricas.instalar(app, db.engine)
 
     # Registro de rutas simples
     @app.route('/')
     def index():
         return 'API de Reservas funcionando'
 
-    # Importar modelos dentro del contexto de la app para que SQLAlchemy los
-    # registre antes de crear las tablas. Importo explícitamente las clases
-    # usadas en la aplicación para asegurar el registro de todos los metadatos.
     with app.app_context():
-        try:
-            # importar todos los modelos (si faltan, el import lanzará y lo ignoramos)
-            from models import (
-                Cliente,
-                Cancha,
-                HorarioDisponible,
-                EstadoReserva,
-                Reserva,
-                ServicioAdicional,
-                ReservaServicio,
-                MetodoPago,
-                Pago,
-                Campeonato,
-                Equipo,
-                Partido,
-            )  # noqa: F401
-        except Exception:
-            # si no existe models aún o hay un error, no rompemos la creación de la app
-            pass
-
-        # Crear todas las tablas declaradas por los modelos
-        db.create_all()
-        # Registrar Blueprints si existen
-        try:
-            from routes_cliente import bp as clientes_bp
-            # Registrar bajo /api/clientes
-            app.register_blueprint(clientes_bp, url_prefix='/api/clientes')
-        except Exception:
-            pass
-
-        try:
-            from routes_cancha import bp as canchas_bp
-            # Registrar bajo /api/canchas
-            app.register_blueprint(canchas_bp, url_prefix='/api/canchas')
-        except Exception:
-            pass
-
-        try:
-            from routes_deporte import bp as deportes_bp
-            app.register_blueprint(deportes_bp, url_prefix='/api/deportes')
-        except Exception:
-            pass
-
-        try:
-            from routes_reserva import bp as reservas_bp
-            app.register_blueprint(reservas_bp, url_prefix='/api/reservas')
-        except Exception:
-            pass
-
-        try:
-            from routes_pago import bp as pagos_bp
-            app.register_blueprint(pagos_bp)
-        except Exception:
-            pass
-
-        try:
-            from routes_servicio import bp as servicios_bp
-            app.register_blueprint(servicios_bp, url_prefix='/api')
-        except Exception:
-            pass
-
-        try:
-            from routes_reportes import bp as reportes_bp
-            app.register_blueprint(reportes_bp, url_prefix='/api')
-        except Exception:
-            pass
-
-        # campeonato blueprint
-        try:
-            from routes_campeonato import bp as campeonatos_bp
-            app.register_blueprint(campeonatos_bp)
-        except Exception:
-            # blueprint optional until routes_campeonato is available
-            pass
-
-        # Rutas para servir las plantillas (UI)
-        try:
-            from flask import render_template
-
-            @app.route('/ui')
-            @app.route('/ui/')
-            def ui_root():
-                # Página principal del panel de administración
-                return render_template('dashboard.html')
-
-            @app.route('/ui/dashboard')
-            def ui_dashboard():
-                return render_template('dashboard.html')
-
-            @app.route('/ui/clientes')
-            def ui_clientes():
-                return render_template('clientes.html')
-
-            @app.route('/ui/canchas')
-            def ui_canchas():
-                return render_template('canchas.html')
-
-            @app.route('/ui/deportes')
-            def ui_deportes():
-                return render_template('deportes.html')
-
-            @app.route('/ui/reservar')
-            def ui_reservar():
-                return render_template('reservar.html')
-
-            @app.route('/ui/reportes')
-            def ui_reportes():
-                return render_template('reportes.html')
-
-            @app.route('/ui/pagos')
-            def ui_pagos():
-                # Página de pagos (lista / gestión). Plantilla básica si no está implementada aún.
-                return render_template('pagos.html')
-        except Exception:
-            pass
-
+        # Esquema: crear las tablas que falten (desarrollo) o sólo verificarlo
+        t = time.perf_counter()
+        if app.config['CREAR_TABLAS']:
+            db.create_all()
+        elif app.config.get('VERIFICAR_ESQUEMA', True):
+            verificar_esquema(app)
+        arranque['esquema_ms'] = round((time.perf_counter() - t) * 1000, 2)
+
+        # Blueprints de la API
+        if app.config['BLUEPRINTS_DIFERIDOS']:
+            app.wsgi_app = _BlueprintsDiferidos(app, BLUEPRINTS)
+        else:
+            total = sum(registrar_blueprint(app, modulo, prefijo) for modulo, prefijo in BLUEPRINTS)
+            arranque['blueprints_ms'] = round(total, 2)
+
+    # Rutas para servir las plantillas (UI)
+    from flask import render_template
+
+    @app.route('/ui')
+    @app.route('/ui/')
+    def ui_root():
+        # Página principal del panel de administración
+        return render_template('dashboard.html')
+
+    @app.route('/ui/dashboard')
+    def ui_dashboard():
+        return render_template('dashboard.html')
+
+    @app.route('/ui/clientes')
+    def ui_clientes():
+        return render_template('clientes.html')
+
+    @app.route('/ui/canchas')
+    def ui_canchas():
+        return render_template('canchas.html')
+
+    @app.route('/ui/deportes')
+    def ui_deportes():
+        return render_template('deportes.html')
+
+    @app.route('/ui/reservar')
+    def ui_reservar():
+        return render_template('reservar.html')
+
+    @app.route('/ui/reportes')
+    def ui_reportes():
+        return render_template('reportes.html')
+
+    @app.route('/ui/pagos')
+    def ui_pagos():
+        # Página de pagos (lista / gestión). Plantilla básica si no está implementada aún.
+        return render_template('pagos.html')
+
+    arranque['create_app_ms'] = round((time.perf_counter() - t0) * 1000, 2)
+    log_arranque.info(
+        'Arranque: importación %.1f ms, create_app %.1f ms (esquema %.1f ms, blueprints %s)',
+        IMPORTACION_MS, arranque['create_app_ms'], arranque['esquema_ms'],
+        'diferidos' if app.config['BLUEPRINTS_DIFERIDOS'] else f"{arranque['blueprints_ms']:.1f} ms",
+    )
     return app
 
 
 if __name__ == '__main__':
+    # Servidor de desarrollo (un proceso, depurador activo). En producción: wsgi.py
     app = create_app()
     app.run(debug=True)
@@ -0,0 +1,121 @@
+"""Archivo de reservas históricas (tablas reservas_archivo, pagos_archivo, reserva_servicio_archivo).
+
+Las reservas con fecha anterior al horizonte (hoy - HORIZONTE_DIAS) se mueven,
+junto con sus pagos y servicios, a tablas de archivo con las mismas columnas e
+ids. Así `reservas` y `pagos` quedan acotadas a lo reciente y lo futuro, que es
+lo único que miran las verificaciones de disponibilidad y solapamiento.
+
+- El movimiento es por lotes de TAM_LOTE reservas: INSERT ... SELECT al archivo
+  y DELETE por conjunto de las tablas activas, un commit por lote.
+- El resumen de uso (uso_diario) no cambia: las reservas siguen contando.
+  resumen.reconstruir() suma activas y archivadas.
+- Los reportes por cliente/cancha usan reservas_para(desde), que une el archivo
+  (UNION ALL) sólo si el rango pedido empieza antes del límite archivado.
+- También se descartan las filas de bloqueo (bloqueos_cancha_fecha) de fechas
+  archivadas: nadie vuelve a reservar en esas fechas.
+
+Para archivar desde la línea de comandos::
+    python archivo.py [dias_horizonte]
+"""
+import sys
+from datetime import date, timedelta
+from sqlalchemy import select, delete, func, union_all
+from sqlalchemy.orm import aliased
+from flask import current_app
+from app import db
+from models import (
+    Reserva, Pago, ReservaServicio, ReservaArchivada, PagoArchivado, ReservaServicioArchivada, BloqueoCanchaFecha,
+)
+from borrado import borrar_reservas
+
+HORIZONTE_DIAS = 180
+TAM_LOTE = 5000
+
+# (tabla activa, tabla de archivo) en orden de inserción
+PARES = (
+    (Reserva, ReservaArchivada),
+    (Pago, PagoArchivado),
+    (ReservaServicio, ReservaServicioArchivada),
+)
+
+
+def _columnas(modelo):
+    return [c.name for c in modelo.__table__.columns]
+
+
+def fecha_corte(horizonte_dias=None, hoy=None):
+    """Primera fecha que queda en las tablas activas."""
+    if horizonte_dias is None:
+        horizonte_dias = current_app.config.get('ARCHIVO_HORIZONTE_DIAS', HORIZONTE_DIAS)
+    return (hoy or date.today()) - timedelta(days=horizonte_dias)
+
+
+def _mover_lote(ids):
+    filtro_reserva = Reserva.id_reserva.in_(ids)
+    for activa, archivada in PARES:
+        nombres = _columnas(archivada)
+        origen = select(*[getattr(activa, n) for n in nombres]).where(activa.id_reserva.in_(ids))
+        db.session.execute(archivada.__table__.insert().from_select(nombres, origen))
+    borrar_reservas(filtro_reserva)
+
+
+def archivar(corte, tam_lote=TAM_LOTE):
+    """Mueve al archivo las reservas con fecha_reserva < corte. Commit por lote. Devuelve la cantidad."""
+    total = 0
+    while True:
+        ids = db.session.scalars(
+            select(Reserva.id_reserva).where(Reserva.fecha_reserva < corte).order_by(Reserva.id_reserva).limit(tam_lote)
+        ).all()
+        if not ids:
+            break
+        _mover_lote(ids)
+        db.session.commit()
+        total += len(ids)
+    # las filas de bloqueo sólo sirven para fechas en las que todavía se reserva
+    db.session.execute(
+        delete(BloqueoCanchaFecha).where(BloqueoCanchaFecha.fecha < corte - timedelta(days=1))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return total
+
+
+def limite():
+    """Fecha de la reserva archivada más reciente (None si el archivo está vacío)."""
+    return db.session.scalar(select(func.max(ReservaArchivada.fecha_reserva)))
+
+
+def necesita_archivo(desde=None):
+    """True si un rango que empieza en `desde` (None = sin límite) incluye fechas archivadas."""
+    ultima = limite()
+    return ultima is not None and (desde is None or desde <= ultima)
+
+
+def reservas_para(desde=None):
+    """Entidad para consultar reservas desde `desde`: Reserva, o un alias de Reserva sobre
+    activas UNION ALL archivadas si el rango lo necesita.
+
+    Se usa como Reserva en las consultas ORM (columnas, filtros, joins)::
+
+        R = reservas_para(desde)
+        db.session.query(R).filter(R.id_cancha == 1, R.fecha_reserva >= desde)
+    """
+    if not necesita_archivo(desde):
+        return Reserva
+    nombres = _columnas(Reserva)
+    todas = union_all(
+        select(*[getattr(Reserva, n) for n in nombres]),
+        select(*[getattr(ReservaArchivada, n) for n in nombres]),
+    ).subquery('reservas_todas')
+    return aliased(Reserva, todas)
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        dias = int(sys.argv[1]) if len(sys.argv) > 1 else None
+        corte = fecha_corte(dias)
+        n = archivar(corte)
+        print(f'Reservas archivadas (anteriores a {corte.isoformat()}): {n}')
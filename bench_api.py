@@ -0,0 +1,335 @@
+"""Benchmark de carga de la API de reservas, con comparación contra una línea base.
+
+1. Genera una base SQLite temporal con seed.generar() (miles de clientes,
+   decenas de canchas de fútbol/tenis/pádel, un año de reservas con más
+   ocupación a la tarde, pagos, servicios y un campeonato con partidos los
+   domingos). Se genera una vez y se copia para cada modo.
+2. Reproduce una carga mixta con una secuencia aleatoria fija (semilla):
+   verificación de turnos, grilla de disponibilidad, altas de reservas, pagos
+   y reportes (ver OPERACIONES), con H hilos y dos transportes:
+   - cliente: el test client de Flask, en el mismo proceso;
+   - wsgi: un servidor WSGI real (werkzeug, un hilo por conexión) en un puerto
+     local, con conexiones HTTP/1.1 persistentes por hilo.
+3. Informa por operación: pedidos, throughput, p50/p95/p99 (ms) y errores
+   (respuestas con un código no esperado).
+4. Compara con la línea base (BASE, JSON): falla (código de salida 1) si el
+   p95 de una operación empeora más que la tolerancia (y más de PISO_MS) o si
+   el throughput total cae más que la tolerancia. --guardar-base la reescribe
+   con la corrida actual. La línea base depende de la máquina: regenerarla al
+   cambiar de equipo, y sólo comparar corridas con los mismos parámetros.
+
+Ejecutar::
+    python bench_api.py [--modo cliente|wsgi|ambos] [--operaciones 3000] [--hilos 4]
+                        [--clientes 3000] [--canchas 24] [--dias 365]
+                        [--base bench_api_base.json] [--guardar-base] [--tolerancia 0.5]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import select, exists
+from werkzeug.serving import make_server, WSGIRequestHandler
+
+from app import create_app, db
+from models import Cliente, Cancha, Reserva, Pago
+from reglas import duracion_cancha
+import seed
+
+BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_api_base.json')
+DESDE = date(2025, 1, 1)
+SEMILLA = 2025
+OCUPACION = 0.6
+TOLERANCIA = 0.5
+PISO_MS = 2.0          # diferencias de p95 menores a esto se consideran ruido
+CALENTAMIENTO = 0.05   # fracción inicial de operaciones de cada hilo que no se mide
+
+# (nombre, peso) de la carga mixta
+OPERACIONES = [
+    ('check', 30),
+    ('grilla', 20),
+    ('reservar', 20),
+    ('pagar', 10),
+    ('reporte_cancha', 8),
+    ('uso_mensual', 6),
+    ('ranking', 6),
+]
+
+class Escenario:
+    """Datos que necesitan las operaciones: canchas, clientes, rango de fechas y reservas por pagar."""
+
+    def __init__(self, hoy, n_dias):
+        self.hoy = hoy
+        self.n_dias = n_dias
+        self.canchas = [(c.id_cancha, duracion_cancha(c)) for c in Cancha.query.order_by(Cancha.id_cancha)]
+        self.clientes = db.session.scalars(select(Cliente.id_cliente)).all()
+        sin_pago = ~exists().where(Pago.id_reserva == Reserva.id_reserva)
+        self.por_pagar = [
+            (r.id_reserva, str(r.precio_total))
+            for r in db.session.execute(
+                select(Reserva.id_reserva, Reserva.precio_total).where(Reserva.fecha_reserva >= hoy, sin_pago)
+            )
+        ]
+        random.Random(SEMILLA).shuffle(self.por_pagar)
+        self._lock = threading.Lock()
+
+    def proxima_a_pagar(self):
+        with self._lock:
+            return self.por_pagar.pop() if self.por_pagar else None
+
+
+def _hora(m):
+    return f'{m // 60 % 24:02d}:{m % 60:02d}'
+
+
+def armar_pedido(op, rnd, esc):
+    """(método, ruta, cuerpo, códigos esperados) de una operación."""
+    id_cancha, duracion = rnd.choice(esc.canchas)
+    fecha = esc.hoy + timedelta(days=rnd.randrange(esc.n_dias - (esc.hoy - DESDE).days))
+    s = rnd.randrange(600, 1381, 30)
+    if s + duracion > 1500:
+        s = 1500 - duracion
+    if op == 'check':
+        return ('GET', f'/api/reservas/check?id_cancha={id_cancha}&fecha_reserva={fecha}'
+                       f'&hora_inicio={_hora(s)}&hora_fin={_hora(s + duracion)}', None, (200,))
+    if op == 'grilla':
+        return 'GET', f'/api/canchas/{id_cancha}/disponibilidad?fecha={fecha}', None, (200,)
+    if op == 'reservar':
+        return ('POST', '/api/reservas/', {
+            'id_cliente': rnd.choice(esc.clientes), 'id_cancha': id_cancha, 'fecha_reserva': fecha.isoformat(),
+            'hora_inicio': _hora(s), 'hora_fin': _hora(s + duracion),
+        }, (201, 409))
+    if op == 'pagar':
+        reserva = esc.proxima_a_pagar()
+        if reserva:
+            return 'POST', f'/api/reservas/{reserva[0]}/pagar', {'id_metodo': 2, 'monto': reserva[1]}, (201,)
+        return armar_pedido('check', rnd, esc)
+    if op == 'reporte_cancha':
+        desde = DESDE + timedelta(days=rnd.randrange(esc.n_dias - 30))
+        return ('GET', f'/api/reportes/reservas_por_cancha?id_cancha={id_cancha}&desde={desde}'
+                       f'&hasta={desde + timedelta(days=30)}', None, (200,))
+    if op == 'uso_mensual':
+        return 'GET', f'/api/reportes/uso_mensual?year={DESDE.year}', None, (200,)
+    return 'GET', '/api/reportes/ranking_canchas', None, (200,)
+
+
+class TransporteCliente:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def pedir(self, metodo, ruta, cuerpo):
+        r = self.client.open(ruta, method=metodo, json=cuerpo)
+        r.close()
+        return r.status_code
+
+    def cerrar(self):
+        pass
+
+
+class TransporteHTTP:
+    def __init__(self, puerto):
+        self.puerto = puerto
+        self.conn = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+
+    def pedir(self, metodo, ruta, cuerpo):
+        datos = json.dumps(cuerpo).encode() if cuerpo is not None else None
+        cabeceras = {'Content-Type': 'application/json'} if datos else {}
+        try:
+            self.conn.request(metodo, ruta, body=datos, headers=cabeceras)
+            r = self.conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # el servidor cerró la conexión persistente: reabrir y reintentar una vez
+            self.conn.close()
+            self.conn = http.client.HTTPConnection('127.0.0.1', self.puerto, timeout=30)
+            self.conn.request(metodo, ruta, body=datos, headers=cabeceras)
+            r = self.conn.getresponse()
+        r.read()
+        return r.status
+
+    def cerrar(self):
+        self.conn.close()
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def correr(app, esc, nuevo_transporte, n_operaciones, hilos):
+    """Ejecuta la carga mixta. Devuelve {'total_rps', 'operaciones': {op: {...}}}."""
+    nombres = [n for n, _ in OPERACIONES]
+    pesos = [p for _, p in OPERACIONES]
+    muestras = {n: [] for n in nombres}
+    errores = {n: 0 for n in nombres}
+    lock = threading.Lock()
+    barrera = threading.Barrier(hilos + 1)
+    por_hilo = n_operaciones // hilos
+
+    def trabajador(i):
+        rnd = random.Random(SEMILLA + i)
+        transporte = nuevo_transporte()
+        plan = rnd.choices(nombres, pesos, k=por_hilo)
+        calentamiento = int(por_hilo * CALENTAMIENTO)
+        locales = {n: [] for n in nombres}
+        errs = {n: 0 for n in nombres}
+        barrera.wait()
+        for k, op in enumerate(plan):
+            metodo, ruta, cuerpo, esperados = armar_pedido(op, rnd, esc)
+            t0 = time.perf_counter()
+            codigo = transporte.pedir(metodo, ruta, cuerpo)
+            ms = (time.perf_counter() - t0) * 1000
+            if k >= calentamiento:
+                locales[op].append(ms)
+                errs[op] += codigo not in esperados
+        transporte.cerrar()
+        with lock:
+            for n in nombres:
+                muestras[n] += locales[n]
+                errores[n] += errs[n]
+
+    ts = [threading.Thread(target=trabajador, args=(i,)) for i in range(hilos)]
+    for t in ts:
+        t.start()
+    barrera.wait()
+    t0 = time.perf_counter()
+    for t in ts:
+        t.join()
+    total = time.perf_counter() - t0
+
+    medidas = sum(len(v) for v in muestras.values())
+    return {
+        'total_rps': round(medidas / total, 1),
+        'operaciones': {
+            n: {
+                'pedidos': len(v),
+                'rps': round(len(v) / total, 1),
+                'p50': round(percentil(v, .50), 2),
+                'p95': round(percentil(v, .95), 2),
+                'p99': round(percentil(v, .99), 2),
+                'errores': errores[n],
+            }
+            for n, v in muestras.items()
+        },
+    }
+
+
+class _ManejadorSinLog(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def correr_modo(modo, plantilla, tmp, hoy, args):
+    ruta = os.path.join(tmp, f'{modo}.db')
+    shutil.copyfile(plantilla, ruta)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{ruta}', 'SQLITE_PERFIL': 'produccion'})
+    with app.app_context():
+        esc = Escenario(hoy, args.dias)
+    servidor = None
+    if modo == 'wsgi':
+        servidor = make_server('127.0.0.1', 0, app, threaded=True, request_handler=_ManejadorSinLog)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        puerto = servidor.server_port
+        nuevo = lambda: TransporteHTTP(puerto)  # noqa: E731
+    else:
+        nuevo = lambda: TransporteCliente(app)  # noqa: E731
+    try:
+        with app.app_context():
+            return correr(app, esc, nuevo, args.operaciones, args.hilos)
+    finally:
+        if servidor:
+            servidor.shutdown()
+        with app.app_context():
+            db.engine.dispose()
+
+
+def imprimir(modo, res):
+    print(f'\n[{modo}] {res["total_rps"]:.1f} pedidos/s')
+    print(f'  {"operación":<15} {"pedidos":>7} {"rps":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"errores":>7}')
+    for op, m in res['operaciones'].items():
+        print(f'  {op:<15} {m["pedidos"]:>7} {m["rps"]:>8.1f} {m["p50"]:>8.2f} {m["p95"]:>8.2f} {m["p99"]:>8.2f} {m["errores"]:>7}')
+
+
+def comparar(actual, base, tolerancia):
+    """Lista de regresiones (textos) de `actual` respecto de `base`."""
+    regresiones = []
+    for modo, res in actual['modos'].items():
+        ref = base.get('modos', {}).get(modo)
+        if not ref:
+            continue
+        if res['total_rps'] < ref['total_rps'] * (1 - tolerancia):
+            regresiones.append(f'{modo}: throughput {res["total_rps"]} < {ref["total_rps"]} pedidos/s')
+        for op, m in res['operaciones'].items():
+            r = ref['operaciones'].get(op)
+            if r and m['p95'] > r['p95'] * (1 + tolerancia) and m['p95'] - r['p95'] > PISO_MS:
+                regresiones.append(f'{modo}/{op}: p95 {m["p95"]} ms > {r["p95"]} ms')
+    return regresiones
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Benchmark de carga de la API de reservas')
+    p.add_argument('--modo', choices=('cliente', 'wsgi', 'ambos'), default='ambos')
+    p.add_argument('--operaciones', type=int, default=3000)
+    p.add_argument('--hilos', type=int, default=4)
+    p.add_argument('--clientes', type=int, default=3000)
+    p.add_argument('--canchas', type=int, default=24)
+    p.add_argument('--dias', type=int, default=365)
+    p.add_argument('--base', default=BASE)
+    p.add_argument('--guardar-base', action='store_true')
+    p.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    args = p.parse_args(argv)
+    parametros = {k: getattr(args, k) for k in ('operaciones', 'hilos', 'clientes', 'canchas', 'dias')}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plantilla = os.path.join(tmp, 'plantilla.db')
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{plantilla}', 'METRICAS': False})
+        hoy = DESDE + timedelta(days=int(args.dias * seed.PASADO))
+        with app.app_context():
+            seed.catalogo(mostrar=False)
+            datos = seed.generar(args.clientes, args.canchas, args.dias, OCUPACION, hoy=hoy, semilla=SEMILLA)
+            db.engine.dispose()
+        print(f'Datos: {args.clientes} clientes, {args.canchas} canchas, {args.dias} días, '
+              f'{datos["reservas"]} reservas, {datos["partidos"]} partidos ({datos["segundos"]:.1f} s)')
+        print(f'Carga: {args.operaciones} operaciones, {args.hilos} hilos')
+
+        modos = ('cliente', 'wsgi') if args.modo == 'ambos' else (args.modo,)
+        actual = {'parametros': parametros, 'modos': {}}
+        for modo in modos:
+            actual['modos'][modo] = correr_modo(modo, plantilla, tmp, hoy, args)
+            imprimir(modo, actual['modos'][modo])
+
+    errores = sum(m['errores'] for res in actual['modos'].values() for m in res['operaciones'].values())
+    if args.guardar_base:
+        with open(args.base, 'w', encoding='utf-8') as f:
+            json.dump(actual, f, indent=2, ensure_ascii=False)
+        print(f'\nLínea base guardada en {args.base}')
+        return 1 if errores else 0
+
+    if not os.path.exists(args.base):
+        print(f'\nSin línea base ({args.base}); usar --guardar-base para crearla')
+        return 1 if errores else 0
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    if base.get('parametros') != parametros:
+        print(f'\nLa línea base se generó con otros parámetros ({base.get("parametros")}); no se compara')
+        return 1 if errores else 0
+    regresiones = comparar(actual, base, args.tolerancia)
+    for r in regresiones:
+        print(f'REGRESIÓN {r}')
+    if errores:
+        print(f'{errores} respuestas con código inesperado')
+    if not regresiones and not errores:
+        print(f'\nSin regresiones respecto de la línea base (tolerancia {args.tolerancia:.0%})')
+    return 1 if regresiones or errores else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
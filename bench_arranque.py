@@ -0,0 +1,93 @@
+"""Tiempo de arranque de la app: importación, create_app y primer pedido.
+
+Cada medición es un proceso nuevo (como un worker de gunicorn o un script)
+contra una base temporal ya migrada con db_crear_esquema.py. Variantes:
+
+- desarrollo: la configuración por defecto (create_all en cada arranque,
+  blueprints al crear la app).
+- produccion: CREAR_TABLAS desactivado, sólo se verifica el esquema (wsgi.py).
+- diferidos: además, blueprints importados en el primer pedido.
+
+Informa la mediana de: importar app.py (Flask, SQLAlchemy y modelos),
+create_app (esquema + blueprints), el primer pedido (GET /api/canchas/, que
+en la variante diferida incluye registrar los blueprints) y el total del
+proceso hasta responder.
+
+Ejecutar::
+    python bench_arranque.py [--repeticiones 7]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+VARIANTES = [
+    ('desarrollo', {}),
+    ('produccion', {'RESERVAS_CREAR_TABLAS': '0'}),
+    ('diferidos', {'RESERVAS_CREAR_TABLAS': '0', 'RESERVAS_BLUEPRINTS_DIFERIDOS': '1'}),
+]
+COLUMNAS = ('importacion_ms', 'create_app_ms', 'esquema_ms', 'primer_pedido_ms', 'total_ms')
+
+
+def hijo(inicio):
+    """Mide un arranque en este proceso; `inicio` es el time.time() del padre al lanzarlo."""
+    import app as app_modulo
+    t0 = time.perf_counter()
+    app = app_modulo.create_app({'METRICAS': False})
+    t1 = time.perf_counter()
+    r = app.test_client().get('/api/canchas/')
+    t2 = time.perf_counter()
+    assert r.status_code == 200, r.status_code
+    print(json.dumps({
+        'importacion_ms': app_modulo.IMPORTACION_MS,
+        'create_app_ms': (t1 - t0) * 1000,
+        'esquema_ms': app.extensions['arranque']['esquema_ms'],
+        'primer_pedido_ms': (t2 - t1) * 1000,
+        'total_ms': (time.time() - inicio) * 1000,
+    }))
+
+
+def medir(entorno):
+    salida = subprocess.run(
+        [sys.executable, __file__, '--hijo', repr(time.time())],
+        cwd=DIRECTORIO, env=entorno, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Tiempo de arranque de la app')
+    p.add_argument('--repeticiones', type=int, default=7)
+    p.add_argument('--hijo', default=None, help=argparse.SUPPRESS)
+    args = p.parse_args(argv)
+    if args.hijo is not None:
+        hijo(float(args.hijo))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'arranque.db')}"
+        base = dict(os.environ, RESERVAS_DATABASE_URL=url)
+        for nombre in ('RESERVAS_CREAR_TABLAS', 'RESERVAS_BLUEPRINTS_DIFERIDOS'):
+            base.pop(nombre, None)
+        subprocess.run([sys.executable, 'db_crear_esquema.py'], cwd=DIRECTORIO, env=base,
+                       check=True, stdout=subprocess.DEVNULL)
+        medir(base)   # calentar la caché de bytecode y la del sistema de archivos
+
+        print(f'Mediana de {args.repeticiones} procesos (ms)\n')
+        print(f'{"variante":<12}' + ''.join(f'{c.removesuffix("_ms"):>16}' for c in COLUMNAS))
+        for nombre, extra in VARIANTES:
+            entorno = dict(base, **extra)
+            muestras = [medir(entorno) for _ in range(args.repeticiones)]
+            print(f'{nombre:<12}' + ''.join(
+                f'{statistics.median(m[c] for m in muestras):>16.1f}' for c in COLUMNAS))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
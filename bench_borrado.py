@@ -0,0 +1,119 @@
+"""Benchmark del borrado físico en cascada de una cancha con muchas reservas.
+
+Compara, sobre una base temporal nueva para cada variante:
+
+- anterior: el recorrido original (por cada reserva, un DELETE de servicios y
+  otro de pagos). Sin índice en pagos/reservas_servicios por id_reserva es
+  cuadrático, así que por encima de MAX_ANTERIOR reservas no se corre;
+- conjunto: borrado.borrar_cancha (un DELETE por tabla);
+- lotes: borrado por lotes en segundo plano (?lotes=true); se mide lo que
+  tarda la respuesta y lo que tarda la tarea completa.
+
+Ejecutar::
+    python bench_borrado.py [reservas]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+
+from app import create_app, db
+from models import (
+    Cliente, Cancha, Deporte, EstadoReserva, MetodoPago, ServicioAdicional, Reserva, ReservaServicio, Pago,
+    Partido, HorarioDisponible,
+)
+import borrado
+import resumen
+
+MAX_ANTERIOR = 20_000
+
+
+def poblar(n_reservas):
+    padel = Deporte(nombre='Pádel', duracion_minutos=60)
+    estado = EstadoReserva(nombre='Pendiente')
+    metodo = MetodoPago(nombre='Efectivo')
+    cliente = Cliente(dni='1', nombre='Bench', apellido='Bench')
+    db.session.add_all([padel, estado, metodo, cliente])
+    db.session.flush()
+    servicio = ServicioAdicional(nombre='Paleta', precio_adicional=10, id_deporte=padel.id_deporte)
+    cancha = Cancha(nombre='Cancha 1', id_deporte=padel.id_deporte, precio_hora=100)
+    db.session.add_all([servicio, cancha])
+    db.session.flush()
+
+    desde = date(2000, 1, 1)
+    filas = []
+    for i in range(n_reservas):
+        h = 10 + i % 14
+        filas.append({
+            'id_cliente': cliente.id_cliente, 'id_cancha': cancha.id_cancha, 'id_estado': estado.id_estado,
+            'fecha_reserva': desde + timedelta(days=i // 14), 'hora_inicio': dtime(h, 0),
+            'hora_fin': dtime((h + 1) % 24, 0), 'precio_total': 100, 'usa_iluminacion': False,
+        })
+    db.session.execute(Reserva.__table__.insert(), filas)
+    ids = db.session.scalars(db.select(Reserva.id_reserva)).all()
+    # la mitad pagadas, un cuarto con un servicio adicional
+    db.session.execute(Pago.__table__.insert(), [
+        {'id_reserva': r, 'id_metodo': metodo.id_metodo, 'monto': 100} for r in ids[::2]
+    ])
+    db.session.execute(ReservaServicio.__table__.insert(), [
+        {'id_reserva': r, 'id_servicio': servicio.id_servicio, 'cantidad': 1} for r in ids[::4]
+    ])
+    db.session.commit()
+    resumen.reconstruir()
+    return cancha.id_cancha
+
+
+def borrar_anterior(id_cancha):
+    """Cascada tal como estaba en DELETE /api/canchas/<id> antes de borrado.py."""
+    for r in Reserva.query.filter_by(id_cancha=id_cancha).all():
+        ReservaServicio.query.filter_by(id_reserva=r.id_reserva).delete()
+        Pago.query.filter_by(id_reserva=r.id_reserva).delete()
+    Reserva.query.filter_by(id_cancha=id_cancha).delete()
+    Partido.query.filter_by(id_cancha=id_cancha).delete()
+    HorarioDisponible.query.filter_by(id_cancha=id_cancha).delete()
+    resumen.quitar_cancha(id_cancha)
+    db.session.delete(db.session.get(Cancha, id_cancha))
+    db.session.commit()
+
+
+def borrar_conjunto(id_cancha):
+    borrado.borrar_cancha(id_cancha)
+    db.session.commit()
+
+
+def correr(nombre, n_reservas, fn):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            id_cancha = poblar(n_reservas)
+            t0 = time.perf_counter()
+            extra = fn(app, id_cancha)
+            total = time.perf_counter() - t0
+            assert Reserva.query.count() == 0
+            db.engine.dispose()
+        print(f'{nombre:<10} {total:8.2f} s{extra or ""}')
+
+
+def main():
+    n_reservas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f'Borrado de una cancha con {n_reservas} reservas (1/2 pagadas, 1/4 con servicios)')
+    if n_reservas <= MAX_ANTERIOR:
+        correr('anterior', n_reservas, lambda app, id_cancha: borrar_anterior(id_cancha))
+    else:
+        print(f'anterior   (omitido: más de {MAX_ANTERIOR} reservas)')
+    correr('conjunto', n_reservas, lambda app, id_cancha: borrar_conjunto(id_cancha))
+
+    def lotes(app, id_cancha):
+        client = app.test_client()
+        t0 = time.perf_counter()
+        r = client.delete(f'/api/canchas/{id_cancha}?lotes=true')
+        respuesta = time.perf_counter() - t0
+        borrado.esperar(r.get_json()['id_tarea'])
+        return f'  (respuesta en {respuesta * 1000:.1f} ms, lotes de {borrado.TAM_LOTE})'
+
+    correr('lotes', n_reservas, lotes)
+
+
+if __name__ == '__main__':
+    main()
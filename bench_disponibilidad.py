@@ -0,0 +1,74 @@
+"""Benchmark de GET /api/disponibilidad (matriz canchas × días).
+
+Crea una base temporal con N canchas y D días de reservas (aprox. 60% de
+ocupación) y mide el tiempo de respuesta del endpoint.
+
+Ejecutar::
+    python bench_disponibilidad.py [canchas] [dias]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+
+from app import create_app, db
+from models import Cliente, Cancha, Deporte, EstadoReserva, Reserva
+
+
+def poblar(n_canchas, n_dias, desde):
+    padel = Deporte(nombre='Pádel', duracion_minutos=60)
+    estado = EstadoReserva(nombre='Pendiente')
+    cliente = Cliente(dni='1', nombre='Bench', apellido='Bench')
+    db.session.add_all([padel, estado, cliente])
+    db.session.flush()
+    canchas = [Cancha(nombre=f'Cancha {i}', id_deporte=padel.id_deporte, precio_hora=100) for i in range(n_canchas)]
+    db.session.add_all(canchas)
+    db.session.flush()
+
+    rnd = random.Random(42)
+    filas = []
+    for c in canchas:
+        for d in range(n_dias):
+            for h in range(10, 24):
+                if rnd.random() < 0.6:
+                    filas.append({
+                        'id_cliente': cliente.id_cliente, 'id_cancha': c.id_cancha, 'id_estado': estado.id_estado,
+                        'fecha_reserva': desde + timedelta(days=d), 'hora_inicio': dtime(h, 0),
+                        'hora_fin': dtime((h + 1) % 24, 0), 'precio_total': 100, 'usa_iluminacion': False,
+                    })
+    db.session.execute(Reserva.__table__.insert(), filas)
+    db.session.commit()
+    return len(filas)
+
+
+def main():
+    n_canchas = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    n_dias = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    desde = date(2025, 11, 1)
+    hasta = desde + timedelta(days=n_dias - 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            filas = poblar(n_canchas, n_dias, desde)
+        print(f'{n_canchas} canchas × {n_dias} días, {filas} reservas')
+
+        url = f'/api/disponibilidad?desde={desde.isoformat()}&hasta={hasta.isoformat()}'
+        client = app.test_client()
+        client.get(url)  # calentamiento
+        tiempos = []
+        for _ in range(20):
+            t0 = time.perf_counter()
+            r = client.get(url)
+            tiempos.append((time.perf_counter() - t0) * 1000)
+            assert r.status_code == 200
+        tiempos.sort()
+        print(f'GET /api/disponibilidad  p50={tiempos[len(tiempos) // 2]:.1f} ms  max={tiempos[-1]:.1f} ms')
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
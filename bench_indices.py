@@ -0,0 +1,116 @@
+"""Benchmark del chequeo de solapamientos con y sin índices compuestos.
+
+Crea una base temporal con ~200k reservas, muestra el plan de consulta
+(EXPLAIN QUERY PLAN) del chequeo de solapamiento y mide su tiempo antes y
+después de crear los índices con db_add_indices.crear_indices().
+
+Ejecutar::
+    python bench_indices.py [canchas] [dias]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+
+from sqlalchemy import event, text
+from app import create_app, db
+from models import Cliente, Cancha, EstadoReserva, Reserva
+from disponibilidad import hay_solapamiento
+from db_add_indices import crear_indices, MODELOS_CON_INDICES
+
+
+def poblar(n_canchas, n_dias, desde):
+    estado = EstadoReserva(nombre='Pendiente')
+    cliente = Cliente(dni='1', nombre='Bench', apellido='Bench')
+    db.session.add_all([estado, cliente])
+    db.session.flush()
+    canchas = [Cancha(nombre=f'Cancha {i}', tipo_deporte='Pádel', precio_hora=100) for i in range(n_canchas)]
+    db.session.add_all(canchas)
+    db.session.flush()
+    filas = []
+    for d in range(n_dias):
+        for c in canchas:
+            for h in range(10, 24):
+                filas.append({
+                    'id_cliente': cliente.id_cliente, 'id_cancha': c.id_cancha, 'id_estado': estado.id_estado,
+                    'fecha_reserva': desde + timedelta(days=d), 'hora_inicio': dtime(h, 0),
+                    'hora_fin': dtime((h + 1) % 24, 0), 'precio_total': 100, 'usa_iluminacion': False,
+                })
+        if len(filas) > 50000:
+            db.session.execute(Reserva.__table__.insert(), filas)
+            filas = []
+    if filas:
+        db.session.execute(Reserva.__table__.insert(), filas)
+    db.session.commit()
+    return Reserva.query.count(), [c.id_cancha for c in canchas]
+
+
+def capturar_sql(fn):
+    capturadas = []
+
+    def oyente(conn, cursor, statement, parameters, context, executemany):
+        capturadas.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', oyente)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', oyente)
+    return capturadas[-1]
+
+
+def medir(ids, desde, n_dias, repeticiones=500):
+    rnd = random.Random(1)
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        fecha = desde + timedelta(days=rnd.randrange(n_dias))
+        h = rnd.randrange(10, 23)
+        hay_solapamiento(Reserva, rnd.choice(ids), fecha, dtime(h, 30), dtime(h + 1, 30))
+    return (time.perf_counter() - t0) * 1000 / repeticiones
+
+
+def plan(statement, parameters):
+    conn = db.session.connection().connection.dbapi_connection
+    filas = conn.execute('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    return '\n'.join('    ' + f[-1] for f in filas)
+
+
+def main():
+    n_canchas = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    n_dias = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    desde = date(2025, 1, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            total, ids = poblar(n_canchas, n_dias, desde)
+            print(f'{total} reservas en {n_canchas} canchas × {n_dias} días\n')
+
+            # quitar los índices que create_all creó para medir el caso anterior
+            for modelo in MODELOS_CON_INDICES:
+                for idx in modelo.__table__.indexes:
+                    db.session.execute(text(f'DROP INDEX IF EXISTS {idx.name}'))
+            db.session.commit()
+
+            muestra = lambda: hay_solapamiento(Reserva, ids[0], desde + timedelta(days=10), dtime(18, 30), dtime(19, 30))
+            stmt, params = capturar_sql(muestra)
+            print('Sin índices:')
+            print(plan(stmt, params))
+            print(f'    {medir(ids, desde, n_dias):.3f} ms por chequeo\n')
+
+            creados = crear_indices()
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+            print('Índices creados:', ', '.join(creados))
+            print('Con índices:')
+            print(plan(stmt, params))
+            print(f'    {medir(ids, desde, n_dias):.3f} ms por chequeo')
+            assert crear_indices() == []  # idempotente
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark de las consultas de disponibilidad: base de datos vs índice en memoria.
+
+Sobre una base temporal con una cancha y muchas reservas (y algunos partidos)
+mide, para la misma serie aleatoria de consultas:
+
+- check: verificación de un turno (conflicto con reservas/partidos);
+- grilla: franjas libres de un día (GET /api/canchas/<id>/disponibilidad);
+
+con la ocupación leída de la base en cada consulta (disponibilidad.ocupacion)
+y con el índice en memoria (indice_ocupacion.py, ya cargado). Las consultas
+caen dentro de la ventana de fechas del índice (DIAS_VENTANA). También informa
+lo que tarda la carga inicial del índice y verifica que ambos caminos
+respondan lo mismo.
+
+Ejecutar::
+    python bench_ocupacion.py [reservas] [consultas]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+
+from app import create_app, db
+from models import Cliente, Cancha, Deporte, EstadoReserva, Reserva, Partido, Campeonato, Equipo
+from disponibilidad import ocupacion
+from indice_ocupacion import indice
+
+DESDE = date(2025, 1, 1)
+
+
+def poblar(n_reservas):
+    padel = Deporte(nombre='Pádel', duracion_minutos=60)
+    estado = EstadoReserva(nombre='Pendiente')
+    cliente = Cliente(dni='1', nombre='Bench', apellido='Bench')
+    camp = Campeonato(nombre='Bench')
+    db.session.add_all([padel, estado, cliente, camp])
+    db.session.flush()
+    cancha = Cancha(nombre='Cancha 1', id_deporte=padel.id_deporte, precio_hora=100, activa=True)
+    equipos = [Equipo(nombre=n, id_campeonato=camp.id_campeonato) for n in ('A', 'B')]
+    db.session.add_all([cancha, *equipos])
+    db.session.flush()
+
+    filas = []
+    for i in range(n_reservas):
+        h = 10 + i % 14
+        filas.append({
+            'id_cliente': cliente.id_cliente, 'id_cancha': cancha.id_cancha, 'id_estado': estado.id_estado,
+            'fecha_reserva': DESDE + timedelta(days=i // 14), 'hora_inicio': dtime(h, 0),
+            'hora_fin': dtime((h + 1) % 24, 0), 'precio_total': 100, 'usa_iluminacion': False,
+        })
+    db.session.execute(Reserva.__table__.insert(), filas)
+    db.session.execute(Partido.__table__.insert(), [{
+        'id_campeonato': camp.id_campeonato, 'id_cancha': cancha.id_cancha,
+        'equipo_local': equipos[0].id_equipo, 'equipo_visitante': equipos[1].id_equipo,
+        'fecha_partido': DESDE + timedelta(days=d), 'hora_inicio': dtime(8, 0), 'hora_fin': dtime(10, 30),
+        'jugado': False,
+    } for d in range(0, n_reservas // 14 + 1, 7)])
+    db.session.commit()
+    return cancha.id_cancha, n_reservas // 14 + 1
+
+
+def consultas(n, dias):
+    rnd = random.Random(22)
+    return [
+        (DESDE + timedelta(days=1 + rnd.randrange(dias)), rnd.randrange(600, 1381, 30))
+        for _ in range(n)
+    ]
+
+
+def medir(nombre, fn, serie):
+    t0 = time.perf_counter()
+    resultados = [fn(f, s) for f, s in serie]
+    total = time.perf_counter() - t0
+    print(f'{nombre:<18} {total:8.3f} s  {total / len(serie) * 1e6:9.1f} µs/consulta')
+    return resultados
+
+
+def main():
+    n_reservas = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n_consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}"})
+        with app.app_context():
+            id_cancha, dias = poblar(n_reservas)
+            ind = indice()
+            serie = consultas(n_consultas, min(dias, ind.dias) - 1)
+            print(f'{n_reservas} reservas en {dias} días, {n_consultas} consultas en {ind.dias} días')
+
+            t0 = time.perf_counter()
+            ind.cancha(id_cancha, DESDE + timedelta(days=1))
+            print(f'{"carga del índice":<18} {time.perf_counter() - t0:8.3f} s')
+
+            def check_base(f, s):
+                return ocupacion(id_cancha, f).conflicto(s, s + 60)
+
+            def check_indice(f, s):
+                return ind.ocupacion(id_cancha, f).conflicto(s, s + 60)
+
+            def grilla(fuente):
+                def fn(f, _s):
+                    occ = fuente(id_cancha, f)
+                    return tuple(occ.conflicto(x, x + 60) for x in range(600, 1381, 30))
+                return fn
+
+            a = medir('check base', check_base, serie)
+            b = medir('check índice', check_indice, serie)
+            assert a == b
+            a = medir('grilla base', grilla(ocupacion), serie)
+            b = medir('grilla índice', grilla(ind.ocupacion), serie)
+            assert a == b
+            assert ind.verificar() == {}
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark de los perfiles SQLite (motor_sqlite.py) con carga mixta multihilo.
+
+Para cada perfil crea una base temporal con reservas de ejemplo y lanza H hilos
+que alternan lecturas (grilla de disponibilidad de una cancha) y escrituras
+(alta de reservas en turnos al azar; 201 o 409 son respuestas válidas). Reporta
+throughput, latencias p50/p95 y errores (500 / 'database is locked').
+
+Ejecutar::
+    python bench_sqlite.py [hilos] [operaciones_por_hilo] [porcentaje_escrituras]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from app import create_app, db
+from bench_disponibilidad import poblar
+from models import Cancha, Cliente
+from motor_sqlite import PERFILES
+
+N_CANCHAS = 10
+N_DIAS = 14
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))]
+
+
+def correr_perfil(perfil, hilos, ops, pct_escrituras):
+    desde = date(2025, 11, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            'SQLITE_PERFIL': perfil,
+        })
+        with app.app_context():
+            poblar(N_CANCHAS, N_DIAS, desde)
+            canchas = [c.id_cancha for c in Cancha.query.all()]
+            id_cliente = Cliente.query.first().id_cliente
+
+        lecturas, escrituras, errores = [], [], []
+        lock = threading.Lock()
+        barrera = threading.Barrier(hilos)
+
+        def trabajador(semilla):
+            rnd = random.Random(semilla)
+            client = app.test_client()
+            l_loc, e_loc, err = [], [], 0
+            barrera.wait()
+            for _ in range(ops):
+                cancha = rnd.choice(canchas)
+                fecha = (desde + timedelta(days=rnd.randrange(N_DIAS))).isoformat()
+                t0 = time.perf_counter()
+                if rnd.random() * 100 < pct_escrituras:
+                    h = rnd.randrange(10, 23)
+                    r = client.post('/api/reservas/', json={
+                        'id_cliente': id_cliente, 'id_cancha': cancha, 'fecha_reserva': fecha,
+                        'hora_inicio': f'{h:02d}:00', 'hora_fin': f'{h + 1:02d}:00',
+                    })
+                    e_loc.append((time.perf_counter() - t0) * 1000)
+                    err += r.status_code not in (201, 409)
+                else:
+                    r = client.get(f'/api/canchas/{cancha}/disponibilidad?fecha={fecha}')
+                    l_loc.append((time.perf_counter() - t0) * 1000)
+                    err += r.status_code != 200
+            with lock:
+                lecturas.extend(l_loc)
+                escrituras.extend(e_loc)
+                errores.append(err)
+
+        ts = [threading.Thread(target=trabajador, args=(i,)) for i in range(hilos)]
+        t0 = time.perf_counter()
+        for t in ts:
+            t.start()
+        for t in ts:
+            t.join()
+        total = time.perf_counter() - t0
+
+        with app.app_context():
+            db.engine.dispose()
+
+    n = len(lecturas) + len(escrituras)
+    print(f'{perfil:<11} {n / total:8.0f} ops/s  '
+          f'lectura p50={percentil(lecturas, .5):6.1f} p95={percentil(lecturas, .95):6.1f} ms  '
+          f'escritura p50={percentil(escrituras, .5):6.1f} p95={percentil(escrituras, .95):6.1f} ms  '
+          f'errores={sum(errores)}')
+
+
+def main():
+    hilos = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    pct = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    print(f'{hilos} hilos × {ops} operaciones, {pct}% escrituras')
+    for perfil in PERFILES:
+        correr_perfil(perfil, hilos, ops, pct)
+
+
+if __name__ == '__main__':
+    main()
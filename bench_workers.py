@@ -0,0 +1,207 @@
+"""Escalado de los endpoints de lectura con la cantidad de workers de gunicorn.
+
+1. Genera una base SQLite temporal con seed.generar().
+2. Para cada cantidad de workers levanta `gunicorn -c gunicorn.conf.py wsgi:app`
+   (la configuración de producción, perfil SQLite 'produccion') en un puerto
+   local y espera a que responda.
+3. Reparte la carga en procesos cliente (por defecto dos por worker), cada uno
+   con una conexión HTTP/1.1 persistente, durante --segundos después de un
+   calentamiento: verificación de turnos, grilla de disponibilidad, listado de
+   canchas y reporte por cancha (sólo lecturas).
+4. Informa pedidos/s, p50/p95 (ms), la aceleración respecto de un worker y la
+   eficiencia (aceleración / workers; 100% es escalado lineal).
+
+Los clientes corren en la misma máquina: para que la medición tenga sentido
+hacen falta al menos workers + procesos cliente núcleos libres (se avisa si
+no los hay). Requiere gunicorn (requirements.txt; no corre en Windows).
+
+Ejecutar::
+    python bench_workers.py [--workers 1,2,4] [--segundos 10] [--clientes-por-worker 2]
+                            [--hilos 1] [--clientes 2000] [--canchas 16] [--dias 120]
+"""
+import argparse
+import http.client
+import importlib.util
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from app import create_app, db
+from models import Cancha
+from reglas import duracion_cancha
+import seed
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+PUERTO = 8765
+CALENTAMIENTO_SEGUNDOS = 2.0
+
+# (operación, peso) de la carga de lectura
+OPERACIONES = [('check', 40), ('grilla', 30), ('canchas', 20), ('reporte_cancha', 10)]
+
+
+def _hora(m):
+    return f'{m // 60 % 24:02d}:{m % 60:02d}'
+
+
+def ruta_aleatoria(rnd, canchas, hoy, dias):
+    op = rnd.choices([o for o, _ in OPERACIONES], weights=[p for _, p in OPERACIONES])[0]
+    id_cancha, duracion = rnd.choice(canchas)
+    fecha = hoy + timedelta(days=rnd.randrange(-dias // 2, dias // 10))
+    if op == 'check':
+        s = min(rnd.randrange(600, 1381, 30), 1500 - duracion)
+        return op, (f'/api/reservas/check?id_cancha={id_cancha}&fecha_reserva={fecha}'
+                    f'&hora_inicio={_hora(s)}&hora_fin={_hora(s + duracion)}')
+    if op == 'grilla':
+        return op, f'/api/canchas/{id_cancha}/disponibilidad?fecha={fecha}'
+    if op == 'canchas':
+        return op, '/api/canchas/'
+    return op, f'/api/reportes/reservas_por_cancha?id_cancha={id_cancha}&desde={fecha}&hasta={fecha + timedelta(days=7)}'
+
+
+def cliente(n, puerto, canchas, hoy, dias, inicio, fin, resultados):
+    """Proceso de carga: pide rutas de lectura hasta `fin` y devuelve las latencias medidas desde `inicio`."""
+    rnd = random.Random(n)
+    conn = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+    latencias, errores = [], 0
+    while True:
+        ahora = time.time()
+        if ahora >= fin:
+            break
+        _, ruta = ruta_aleatoria(rnd, canchas, hoy, dias)
+        t0 = time.perf_counter()
+        try:
+            conn.request('GET', ruta)
+            r = conn.getresponse()
+            r.read()
+            ok = r.status == 200
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+            ok = False
+        ms = (time.perf_counter() - t0) * 1000
+        if ahora >= inicio:
+            latencias.append(ms)
+            errores += not ok
+    conn.close()
+    resultados.put((latencias, errores))
+
+
+def esperar(puerto, proceso, limite=30.0):
+    fin = time.time() + limite
+    while time.time() < fin:
+        if proceso.poll() is not None:
+            raise RuntimeError('gunicorn terminó al iniciar (ver su salida)')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', puerto, timeout=1)
+            conn.request('GET', '/')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'gunicorn no respondió en {limite} s')
+
+
+def medir(n_workers, args, base, canchas, hoy):
+    entorno = dict(
+        os.environ,
+        RESERVAS_DATABASE_URL=f'sqlite:///{base}',
+        RESERVAS_WORKERS=str(n_workers),
+        RESERVAS_THREADS=str(args.hilos),
+        RESERVAS_BIND=f'127.0.0.1:{args.puerto}',
+        RESERVAS_LOG_LEVEL='warning',
+    )
+    servidor = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=DIRECTORIO, env=entorno,
+    )
+    try:
+        esperar(args.puerto, servidor)
+        n_clientes = n_workers * args.clientes_por_worker
+        inicio = time.time() + CALENTAMIENTO_SEGUNDOS
+        fin = inicio + args.segundos
+        resultados = multiprocessing.Queue()
+        procesos = [
+            multiprocessing.Process(target=cliente, args=(i, args.puerto, canchas, hoy, args.dias, inicio, fin, resultados))
+            for i in range(n_clientes)
+        ]
+        for p in procesos:
+            p.start()
+        latencias, errores = [], 0
+        for _ in procesos:
+            lat, err = resultados.get()
+            latencias.extend(lat)
+            errores += err
+        for p in procesos:
+            p.join()
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=30)
+    latencias.sort()
+    return {
+        'workers': n_workers,
+        'clientes': n_clientes,
+        'rps': len(latencias) / args.segundos,
+        'p50': latencias[len(latencias) // 2] if latencias else 0.0,
+        'p95': latencias[int(len(latencias) * 0.95)] if latencias else 0.0,
+        'errores': errores,
+    }
+
+
+def main(argv=None):
+    nucleos = os.cpu_count() or 1
+    p = argparse.ArgumentParser(description='Escalado de lecturas con la cantidad de workers')
+    p.add_argument('--workers', default=None, help='lista separada por comas (por defecto 1, 2, 4… hasta la mitad de los núcleos)')
+    p.add_argument('--segundos', type=float, default=10.0)
+    p.add_argument('--clientes-por-worker', type=int, default=2)
+    p.add_argument('--hilos', type=int, default=1, help='hilos por worker (RESERVAS_THREADS)')
+    p.add_argument('--clientes', type=int, default=2000)
+    p.add_argument('--canchas', type=int, default=16)
+    p.add_argument('--dias', type=int, default=120)
+    p.add_argument('--puerto', type=int, default=PUERTO)
+    args = p.parse_args(argv)
+
+    if importlib.util.find_spec('gunicorn') is None:
+        print('Falta gunicorn: python -m pip install -r requirements.txt')
+        return 1
+    if args.workers:
+        lista = [int(w) for w in args.workers.split(',')]
+    else:
+        lista, w = [], 1
+        while w <= max(1, nucleos // 2):
+            lista.append(w)
+            w *= 2
+    necesarios = max(lista) * (1 + args.clientes_por_worker)
+    if necesarios > nucleos:
+        print(f'Aviso: {nucleos} núcleos para {necesarios} procesos (workers + clientes); '
+              'el escalado medido queda limitado por la máquina, no por la app.')
+
+    hoy = date.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, 'bench.db')
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{base}', 'METRICAS': False})
+        with app.app_context():
+            seed.catalogo(mostrar=False)
+            datos = seed.generar(args.clientes, args.canchas, args.dias, hoy=hoy)
+            canchas = [(c.id_cancha, duracion_cancha(c)) for c in Cancha.query.order_by(Cancha.id_cancha)]
+            db.engine.dispose()
+        print(f'Datos: {datos["reservas"]} reservas en {args.canchas} canchas ({datos["segundos"]} s); '
+              f'{nucleos} núcleos, {args.hilos} hilo(s) por worker')
+
+        print(f'\n{"workers":>7} {"clientes":>8} {"rps":>9} {"p50":>7} {"p95":>7} {"acel.":>6} {"efic.":>6} {"errores":>7}')
+        base_rps = None
+        for n in lista:
+            r = medir(n, args, base, canchas, hoy)
+            base_rps = base_rps or r['rps'] or 1.0
+            aceleracion = r['rps'] / base_rps
+            print(f'{r["workers"]:>7} {r["clientes"]:>8} {r["rps"]:>9.1f} {r["p50"]:>7.2f} {r["p95"]:>7.2f} '
+                  f'{aceleracion:>5.2f}x {aceleracion / n:>6.0%} {r["errores"]:>7}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Bloqueo de escritura por (cancha, fecha) para que las altas de turnos sean atómicas.
+
+El chequeo de solapamiento y el INSERT de una reserva/partido no son atómicos
+por sí solos: dos pedidos concurrentes pueden verificar que el turno está libre
+y luego insertar ambos. Para evitarlo, cada alta toma primero el bloqueo de los
+días que ocupa (tabla bloqueos_cancha_fecha) y recién después verifica e inserta,
+todo en la misma transacción.
+
+- Debe llamarse antes de cualquier otra consulta de la transacción: en SQLite el
+  UPDATE toma el lock de escritura de la base y las lecturas posteriores ya ven
+  lo confirmado por el pedido anterior.
+- Todas las fechas se bloquean con un solo UPDATE; en Postgres el recorrido por
+  la clave primaria (id_cancha, fecha) las toma en orden ascendente, lo que
+  evita deadlocks entre altas (o lotes) que comparten días.
+- El bloqueo se libera con el commit o rollback de la sesión.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError
+from app import db
+from models import BloqueoCanchaFecha
+
+
+def fechas_ocupadas(fecha, hora_inicio, hora_fin):
+    """Días calendario que toca un turno (dos si cruza medianoche y termina después de 00:00)."""
+    fechas = [fecha]
+    if hora_fin <= hora_inicio and hora_fin > datetime.min.time():
+        fechas.append(fecha + timedelta(days=1))
+    return fechas
+
+
+def _tomar(id_cancha, fechas):
+    # Un UPDATE para todas las fechas (toma el lock); las filas que todavía no
+    # existen se crean con un único INSERT (executemany).
+    res = db.session.execute(
+        update(BloqueoCanchaFecha)
+        .where(BloqueoCanchaFecha.id_cancha == id_cancha, BloqueoCanchaFecha.fecha.in_(fechas))
+        .values(version=BloqueoCanchaFecha.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if res.rowcount < len(fechas):
+        existentes = set(db.session.scalars(
+            select(BloqueoCanchaFecha.fecha)
+            .where(BloqueoCanchaFecha.id_cancha == id_cancha, BloqueoCanchaFecha.fecha.in_(fechas))
+        ))
+        db.session.execute(insert(BloqueoCanchaFecha), [
+            {'id_cancha': id_cancha, 'fecha': f, 'version': 1} for f in fechas if f not in existentes
+        ])
+
+
+def bloquear_varias(fechas_por_cancha):
+    """Toma el bloqueo de escritura de cada (id_cancha, fecha) de {id_cancha: fechas} hasta el fin de la transacción.
+
+    Las canchas se toman en orden ascendente (mismo orden en todas las altas,
+    sin deadlocks). Si otro pedido crea la misma fila de bloqueo a la vez
+    (primer alta del día en motores con bloqueo por fila), el INSERT falla por
+    clave duplicada: se hace rollback y se reintenta todo, ahora con las filas
+    ya existentes. Como el rollback suelta también los bloqueos ya tomados,
+    todos los de una transacción se toman con una sola llamada.
+    """
+    pedidos = [(id_cancha, sorted(set(fechas))) for id_cancha, fechas in sorted(fechas_por_cancha.items()) if fechas]
+    try:
+        for id_cancha, fechas in pedidos:
+            _tomar(id_cancha, fechas)
+    except IntegrityError:
+        db.session.rollback()
+        for id_cancha, fechas in pedidos:
+            _tomar(id_cancha, fechas)
+
+
+def bloquear(id_cancha, fechas):
+    """Toma el bloqueo de escritura de cada (id_cancha, fecha) hasta el fin de la transacción (ver bloquear_varias)."""
+    bloquear_varias({id_cancha: fechas})
+
+
+def bloquear_turno(id_cancha, fecha, hora_inicio, hora_fin):
+    bloquear(id_cancha, fechas_ocupadas(fecha, hora_inicio, hora_fin))
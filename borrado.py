@@ -0,0 +1,289 @@
+"""Borrado físico en cascada de canchas y clientes con sentencias por conjunto.
+
+En lugar de recorrer las reservas y borrar servicios y pagos de a una, cada
+nivel de la cascada es un único DELETE ... WHERE id_reserva IN (SELECT ...),
+así el costo no depende de la cantidad de reservas en cantidad de sentencias.
+El resumen de uso (resumen.py) y la tabla de posiciones (posiciones.py) se
+ajustan en la misma transacción.
+
+Para historiales muy grandes hay un modo por lotes en segundo plano
+(iniciar_en_segundo_plano): se desactiva la cancha/cliente, y un hilo borra
+de a TAM_LOTE reservas por transacción, con una pausa entre lotes para que
+otras escrituras no esperen el lock durante todo el borrado. El avance se
+consulta en GET /api/tareas/<id>.
+
+La tarea se registra en la tabla tareas_borrado, en la misma transacción que
+la desactivación, y cada lote actualiza su avance en la transacción que lo
+borra. Cada lote es idempotente (borra las reservas que todavía cumplen la
+condición), así que la tarea se puede retomar desde donde quedó: si el proceso
+que la corría muere (reciclado o recarga de gunicorn, apagado), su latido deja
+de avanzar y, pasados VENCIMIENTO_SEGUNDOS, la retoma el primer worker que
+consulte la tarea, un nuevo DELETE ?lotes=true del mismo objetivo o
+`python borrado.py`. Sólo la corre quien figura como dueño: si otro la
+retomó, el anterior deshace su lote y se detiene.
+"""
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, delete, update
+from app import db
+from models import (
+    Reserva, ReservaServicio, Pago, Partido, HorarioDisponible, Cancha, Cliente, BloqueoCanchaFecha,
+    ReservaArchivada, ReservaServicioArchivada, PagoArchivado, TareaBorrado,
+)
+from resumen import quitar_reservas, quitar_cancha
+import posiciones
+
+TAM_LOTE = 5000
+PAUSA_LOTE = 0.05  # segundos entre lotes
+VENCIMIENTO_SEGUNDOS = 60  # sin avance en este tiempo, la tarea se considera abandonada
+SIN_TERMINAR = ('pendiente', 'en_curso')
+
+# (reservas, servicios, pagos) activas y archivadas (ver archivo.py)
+TABLAS = {
+    False: (Reserva, ReservaServicio, Pago),
+    True: (ReservaArchivada, ReservaServicioArchivada, PagoArchivado),
+}
+
+
+def _delete(stmt):
+    return db.session.execute(stmt.execution_options(synchronize_session=False)).rowcount
+
+
+def borrar_reservas(*condiciones, archivadas=False):
+    """Borra servicios, pagos y reservas que cumplen las condiciones (3 sentencias). No hace commit.
+
+    Con archivadas=True las condiciones son sobre ReservaArchivada y se borra del archivo.
+    No toca el resumen de uso: quien llama decide si descontarlas (quitar_reservas).
+    Devuelve la cantidad de reservas borradas.
+    """
+    R, RS, P = TABLAS[archivadas]
+    ids = select(R.id_reserva).where(*condiciones)
+    _delete(delete(RS).where(RS.id_reserva.in_(ids)))
+    _delete(delete(P).where(P.id_reserva.in_(ids)))
+    return _delete(delete(R).where(*condiciones))
+
+
+def _quitar_archivadas(tipo, id_objetivo):
+    """Descuenta (sólo para clientes) y borra las reservas archivadas de una cancha o cliente."""
+    if tipo == 'cancha':
+        return borrar_reservas(ReservaArchivada.id_cancha == id_objetivo, archivadas=True)
+    condicion = ReservaArchivada.id_cliente == id_objetivo
+    quitar_reservas(condicion, reservas=ReservaArchivada, pagos=PagoArchivado)
+    return borrar_reservas(condicion, archivadas=True)
+
+
+def _borrar_resto_cancha(id_cancha):
+    # partidos: recalcular la tabla de los campeonatos que tenían partidos jugados en la cancha
+    campeonatos = db.session.scalars(
+        select(Partido.id_campeonato).where(Partido.id_cancha == id_cancha, Partido.jugado == True).distinct()  # noqa: E712
+    ).all()
+    _delete(delete(Partido).where(Partido.id_cancha == id_cancha))
+    for id_campeonato in campeonatos:
+        posiciones.recalcular(id_campeonato)
+    _delete(delete(HorarioDisponible).where(HorarioDisponible.id_cancha == id_cancha))
+    _delete(delete(BloqueoCanchaFecha).where(BloqueoCanchaFecha.id_cancha == id_cancha))
+    quitar_cancha(id_cancha)
+    _delete(delete(Cancha).where(Cancha.id_cancha == id_cancha))
+
+
+def borrar_cancha(id_cancha):
+    """Borra la cancha con sus reservas (servicios, pagos; también archivadas), partidos, horarios y resumen. No hace commit."""
+    n = borrar_reservas(Reserva.id_cancha == id_cancha) + _quitar_archivadas('cancha', id_cancha)
+    _borrar_resto_cancha(id_cancha)
+    return n
+
+
+def borrar_cliente(id_cliente):
+    """Borra el cliente con sus reservas (servicios, pagos; también archivadas), descontándolas del resumen. No hace commit."""
+    quitar_reservas(Reserva.id_cliente == id_cliente)
+    n = borrar_reservas(Reserva.id_cliente == id_cliente) + _quitar_archivadas('cliente', id_cliente)
+    _delete(delete(Cliente).where(Cliente.id_cliente == id_cliente))
+    return n
+
+
+class TareaTomada(Exception):
+    """Otro proceso retomó la tarea: quien la corría debe detenerse."""
+
+
+def tarea_dict(tarea):
+    return {
+        'id_tarea': tarea.id_tarea,
+        'tipo': tarea.tipo,
+        'id_objetivo': tarea.id_objetivo,
+        'estado': tarea.estado,
+        'reservas_borradas': tarea.reservas_borradas,
+        'error': tarea.error,
+        'inicio': tarea.inicio.isoformat(timespec='seconds'),
+        'fin': tarea.fin.isoformat(timespec='seconds') if tarea.fin else None,
+    }
+
+
+def _condicion(tipo, id_objetivo):
+    return Reserva.id_cancha == id_objetivo if tipo == 'cancha' else Reserva.id_cliente == id_objetivo
+
+
+def _nuevo_dueno():
+    return f'{os.getpid()}-{uuid.uuid4().hex[:12]}'
+
+
+def _avanzar(id_tarea, dueno, borradas=0, **valores):
+    """Suma el avance y renueva el latido, en la transacción en curso, si la tarea sigue siendo de `dueno`."""
+    res = db.session.execute(
+        update(TareaBorrado)
+        .where(TareaBorrado.id_tarea == id_tarea, TareaBorrado.dueno == dueno)
+        .values(reservas_borradas=TareaBorrado.reservas_borradas + borradas, latido=datetime.now(), **valores)
+        .execution_options(synchronize_session=False)
+    )
+    if res.rowcount != 1:
+        raise TareaTomada(id_tarea)
+
+
+def _correr(app, id_tarea, dueno, tam_lote, pausa):
+    with app.app_context():
+        try:
+            tarea = db.session.get(TareaBorrado, id_tarea)
+            tipo, id_objetivo = tarea.tipo, tarea.id_objetivo
+            condicion = _condicion(tipo, id_objetivo)
+            _avanzar(id_tarea, dueno, estado='en_curso')
+            db.session.commit()
+            while True:
+                ids = db.session.scalars(select(Reserva.id_reserva).where(condicion).limit(tam_lote)).all()
+                if not ids:
+                    break
+                lote = Reserva.id_reserva.in_(ids)
+                if tipo == 'cliente':
+                    quitar_reservas(lote)
+                borrar_reservas(lote)
+                _avanzar(id_tarea, dueno, len(ids))
+                db.session.commit()
+                time.sleep(pausa)
+            n = _quitar_archivadas(tipo, id_objetivo)
+            if tipo == 'cancha':
+                _borrar_resto_cancha(id_objetivo)
+            else:
+                _delete(delete(Cliente).where(Cliente.id_cliente == id_objetivo))
+            _avanzar(id_tarea, dueno, n, estado='terminada', fin=datetime.now())
+            db.session.commit()
+        except TareaTomada:
+            db.session.rollback()
+        except Exception as e:
+            db.session.rollback()
+            try:
+                _avanzar(id_tarea, dueno, estado='error', error=str(e), fin=datetime.now())
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+        finally:
+            db.session.remove()
+
+
+def _lanzar(id_tarea, dueno):
+    app = current_app._get_current_object()
+    hilo = threading.Thread(
+        target=_correr,
+        args=(app, id_tarea, dueno, app.config.get('BORRADO_TAM_LOTE', TAM_LOTE), app.config.get('BORRADO_PAUSA', PAUSA_LOTE)),
+        daemon=True,
+    )
+    hilo.start()
+    return hilo
+
+
+def _limite_latido():
+    vencimiento = current_app.config.get('BORRADO_VENCIMIENTO', VENCIMIENTO_SEGUNDOS)
+    return datetime.now() - timedelta(seconds=vencimiento)
+
+
+def reanudar(id_tarea):
+    """Retoma en este proceso una tarea abandonada (sin latido en VENCIMIENTO_SEGUNDOS). Devuelve el hilo o None.
+
+    Un UPDATE condicional la asigna: entre varios procesos que lo intenten a la
+    vez, sólo a uno le afecta la fila.
+    """
+    ahora = datetime.now()
+    dueno = _nuevo_dueno()
+    res = db.session.execute(
+        update(TareaBorrado)
+        .where(TareaBorrado.id_tarea == id_tarea, TareaBorrado.estado.in_(SIN_TERMINAR),
+               TareaBorrado.latido <= _limite_latido())
+        .values(dueno=dueno, latido=ahora)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    if res.rowcount != 1:
+        return None
+    return _lanzar(id_tarea, dueno)
+
+
+def obtener(id_tarea):
+    """La tarea (o None); si quedó abandonada, la retoma antes de devolverla."""
+    tarea = db.session.get(TareaBorrado, id_tarea)
+    # sólo se intenta tomarla (una escritura) si el latido ya venció
+    if tarea is not None and tarea.estado in SIN_TERMINAR and tarea.latido <= _limite_latido():
+        if reanudar(id_tarea):
+            db.session.refresh(tarea)
+    return tarea
+
+
+def esperar(id_tarea, timeout=None, intervalo=0.02):
+    """Espera a que la tarea termine (bien o con error) y devuelve su estado, o None si vence el timeout."""
+    fin = None if timeout is None else time.monotonic() + timeout
+    while True:
+        db.session.expire_all()
+        tarea = db.session.get(TareaBorrado, id_tarea)
+        if tarea.estado not in SIN_TERMINAR:
+            return tarea.estado
+        if fin is not None and time.monotonic() >= fin:
+            return None
+        time.sleep(intervalo)
+
+
+def iniciar_en_segundo_plano(tipo, id_objetivo):
+    """Desactiva la cancha/cliente, registra la tarea (un commit) y lanza el borrado por lotes en un hilo.
+
+    Para una cancha, el resumen de uso se elimina al inicio (la cancha deja de
+    existir); para un cliente, cada lote se descuenta del resumen al borrarse.
+    Si ya hay una tarea sin terminar para el mismo objetivo se devuelve esa (y
+    se retoma si quedó abandonada). Devuelve la TareaBorrado.
+    """
+    existente = TareaBorrado.query.filter(
+        TareaBorrado.tipo == tipo, TareaBorrado.id_objetivo == id_objetivo, TareaBorrado.estado.in_(SIN_TERMINAR),
+    ).first()
+    if existente is not None:
+        return obtener(existente.id_tarea)
+
+    if tipo == 'cancha':
+        db.session.get(Cancha, id_objetivo).activa = False
+        quitar_cancha(id_objetivo)
+    else:
+        db.session.get(Cliente, id_objetivo).activo = False
+    ahora = datetime.now()
+    dueno = _nuevo_dueno()
+    tarea = TareaBorrado(tipo=tipo, id_objetivo=id_objetivo, estado='pendiente', inicio=ahora, latido=ahora, dueno=dueno)
+    db.session.add(tarea)
+    db.session.commit()
+    _lanzar(tarea.id_tarea, dueno)
+    return tarea
+
+
+def reanudar_abandonadas():
+    """Retoma todas las tareas abandonadas y espera a que terminen. Devuelve {id_tarea: estado}."""
+    ids = db.session.scalars(
+        select(TareaBorrado.id_tarea).where(TareaBorrado.estado.in_(SIN_TERMINAR)).order_by(TareaBorrado.id_tarea)
+    ).all()
+    tomadas = [i for i in ids if reanudar(i)]
+    return {i: esperar(i) for i in tomadas}
+
+
+if __name__ == '__main__':
+    # Retoma los borrados por lotes que quedaron a medias (ver docstring del módulo)
+    from app import create_app
+    with create_app().app_context():
+        resultado = reanudar_abandonadas()
+    for id_tarea, estado in resultado.items():
+        print(f'Tarea {id_tarea}: {estado}')
+    if not resultado:
+        print('No hay tareas abandonadas.')
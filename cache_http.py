@@ -0,0 +1,122 @@
+"""Caché HTTP con ETag y GET condicional para los listados de solo lectura.
+
+Cada tabla tiene un contador de versión en memoria que se incrementa cuando
+se confirma (commit) una transacción que la modificó. Las tablas modificadas
+se detectan con eventos de la sesión:
+
+- after_flush: objetos ORM nuevos, modificados o borrados;
+- do_orm_execute: INSERT/UPDATE/DELETE ejecutados con session.execute (altas
+  por lote, borrados por conjunto, Query.delete()).
+
+Al hacer rollback se descartan sin incrementar nada.
+
+El ETag de una respuesta (fuerte) se arma con las versiones de las tablas que
+lee el endpoint, más:
+
+- la época del proceso, para que un ETag emitido por otro proceso/worker nunca
+  coincida con uno de este;
+- el período actual de VIGENCIA_SEGUNDOS: los contadores sólo ven las
+  escrituras de este proceso, así que cada tanto el ETag cambia igual. Eso
+  acota lo desactualizado cuando escribe otro worker o un script.
+
+Si el If-None-Match del pedido coincide se responde 304 sin ejecutar la vista
+ni consultar la base. Uso::
+
+    @bp.route('/', methods=['GET'])
+    @condicional('canchas', 'deportes')
+    def get_canchas(): ...
+
+Los contadores viven en app.extensions['cache_http'], uno por app.
+"""
+import functools
+import hashlib
+import os
+import threading
+import time
+from flask import current_app, request, make_response
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+VIGENCIA_SEGUNDOS = 60
+CACHE_CONTROL = 'no-cache'  # el navegador guarda la respuesta pero revalida siempre
+
+_CLAVE_SESION = 'tablas_modificadas'
+
+
+class Versiones:
+    def __init__(self):
+        self.epoca = os.urandom(4).hex()
+        self._versiones = {}
+        self._lock = threading.Lock()
+        self.respuestas_304 = 0
+
+    def version(self, tabla):
+        return self._versiones.get(tabla, 0)
+
+    def incrementar(self, tablas):
+        with self._lock:
+            for tabla in tablas:
+                self._versiones[tabla] = self._versiones.get(tabla, 0) + 1
+
+    def etag(self, tablas, vigencia):
+        periodo = int(time.time() // vigencia) if vigencia else 0
+        clave = ';'.join(f'{t}={self.version(t)}' for t in tablas)
+        return hashlib.sha1(f'{self.epoca}|{periodo}|{clave}'.encode()).hexdigest()[:20]
+
+
+def versiones():
+    return current_app.extensions.setdefault('cache_http', Versiones())
+
+
+def _marcar(session, tablas):
+    session.info.setdefault(_CLAVE_SESION, set()).update(tablas)
+
+
+@event.listens_for(Session, 'after_flush')
+def _despues_de_flush(session, _contexto):
+    _marcar(session, {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, '__table__')
+    })
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _al_ejecutar(estado):
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        tabla = getattr(estado.statement, 'table', None)
+        if tabla is not None and getattr(tabla, 'name', None):
+            _marcar(estado.session, {tabla.name})
+
+
+@event.listens_for(Session, 'after_commit')
+def _despues_de_commit(session):
+    tablas = session.info.pop(_CLAVE_SESION, None)
+    if tablas:
+        versiones().incrementar(tablas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _despues_de_rollback(session):
+    session.info.pop(_CLAVE_SESION, None)
+
+
+def condicional(*tablas, cache_control=CACHE_CONTROL):
+    """Decorador para vistas GET: ETag por versión de `tablas`, 304 si If-None-Match coincide."""
+    def decorador(vista):
+        @functools.wraps(vista)
+        def envoltura(*args, **kwargs):
+            vers = versiones()
+            etag = vers.etag(tablas, current_app.config.get('CACHE_HTTP_VIGENCIA', VIGENCIA_SEGUNDOS))
+            if request.if_none_match.contains(etag):
+                vers.respuestas_304 += 1
+                resp = make_response('', 304)
+            else:
+                resp = make_response(vista(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(etag)
+            resp.headers['Cache-Control'] = cache_control
+            return resp
+        return envoltura
+    return decorador
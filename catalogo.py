@@ -0,0 +1,173 @@
+"""Caché en memoria de los catálogos: deportes, estados de reserva, métodos de pago y servicios.
+
+Son tablas chicas que casi no cambian pero se consultan en cada reserva y cada
+pago. Cada catálogo se guarda completo como una instantánea inmutable
+(namedtuples, no objetos ORM, para poder compartirlas entre sesiones e hilos).
+
+- TTL: una instantánea se recarga pasados TTL_SEGUNDOS aunque nadie la
+  invalide (acota lo desactualizado entre procesos/workers distintos).
+- Un id que no está en la instantánea (creado en otro worker después de
+  cargarla) recarga el catálogo antes de darlo por inexistente.
+- Versionado: invalidar() incrementa la versión del catálogo. Una carga que
+  empezó antes de la invalidación queda guardada con la versión vieja y se
+  descarta en la siguiente lectura.
+- Las rutas que escriben catálogos llaman a invalidar() después del commit.
+
+La caché vive en app.extensions['catalogo'], una por app (los tests crean
+varias apps con bases distintas en el mismo proceso).
+"""
+import threading
+import time
+from collections import namedtuple
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import select
+from app import db
+from models import Deporte, EstadoReserva, MetodoPago, ServicioAdicional
+
+TTL_SEGUNDOS = 300
+
+DEPORTES = 'deportes'
+ESTADOS = 'estados'
+METODOS = 'metodos'
+SERVICIOS = 'servicios'
+
+DeporteCat = namedtuple('DeporteCat', 'id_deporte nombre duracion_minutos')
+EstadoCat = namedtuple('EstadoCat', 'id_estado nombre')
+MetodoCat = namedtuple('MetodoCat', 'id_metodo nombre')
+ServicioCat = namedtuple('ServicioCat', 'id_servicio nombre precio_adicional activo id_deporte')
+
+
+class CacheCatalogos:
+    def __init__(self, ttl=TTL_SEGUNDOS):
+        self.ttl = ttl
+        self._datos = {}   # clave -> (version, vence, valor)
+        self._versiones = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def obtener(self, clave, cargar):
+        ahora = time.monotonic()
+        with self._lock:
+            version = self._versiones.get(clave, 0)
+            entrada = self._datos.get(clave)
+            if entrada and entrada[0] == version and entrada[1] > ahora:
+                self.aciertos += 1
+                return entrada[2]
+            self.fallos += 1
+        # la carga se hace fuera del lock: otro hilo puede cargar lo mismo en paralelo
+        valor = cargar()
+        with self._lock:
+            self._datos[clave] = (version, ahora + self.ttl, valor)
+        return valor
+
+    def invalidar(self, *claves):
+        with self._lock:
+            for clave in claves:
+                self._versiones[clave] = self._versiones.get(clave, 0) + 1
+                self._datos.pop(clave, None)
+            self.invalidaciones += 1
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'invalidaciones': self.invalidaciones,
+                'entradas': len(self._datos),
+            }
+
+
+def cache():
+    ext = current_app.extensions
+    if 'catalogo' not in ext:
+        ext['catalogo'] = CacheCatalogos(ttl=current_app.config.get('CATALOGO_TTL', TTL_SEGUNDOS))
+    return ext['catalogo']
+
+
+def _cargar_deportes():
+    filas = db.session.execute(select(Deporte.id_deporte, Deporte.nombre, Deporte.duracion_minutos)).all()
+    return {f.id_deporte: DeporteCat(*f) for f in filas}
+
+
+def _cargar_estados():
+    filas = db.session.execute(select(EstadoReserva.id_estado, EstadoReserva.nombre).order_by(EstadoReserva.id_estado)).all()
+    return {f.id_estado: EstadoCat(*f) for f in filas}
+
+
+def _cargar_metodos():
+    filas = db.session.execute(select(MetodoPago.id_metodo, MetodoPago.nombre).order_by(MetodoPago.id_metodo)).all()
+    return {f.id_metodo: MetodoCat(*f) for f in filas}
+
+
+def _cargar_servicios():
+    filas = db.session.execute(select(
+        ServicioAdicional.id_servicio, ServicioAdicional.nombre, ServicioAdicional.precio_adicional,
+        ServicioAdicional.activo, ServicioAdicional.id_deporte,
+    ).order_by(ServicioAdicional.id_servicio)).all()
+    return {
+        f.id_servicio: ServicioCat(f.id_servicio, f.nombre, Decimal(str(f.precio_adicional or 0)), bool(f.activo), f.id_deporte)
+        for f in filas
+    }
+
+
+def deportes():
+    return cache().obtener(DEPORTES, _cargar_deportes)
+
+
+def estados():
+    return cache().obtener(ESTADOS, _cargar_estados)
+
+
+def metodos():
+    return cache().obtener(METODOS, _cargar_metodos)
+
+
+def servicios():
+    return cache().obtener(SERVICIOS, _cargar_servicios)
+
+
+def _buscar(clave, leer, id_):
+    # si falta, la instantánea puede ser anterior al alta (otro worker): se recarga una vez
+    if id_ is None:
+        return None
+    valor = leer().get(id_)
+    if valor is None:
+        cache().invalidar(clave)
+        valor = leer().get(id_)
+    return valor
+
+
+def deporte(id_deporte):
+    return _buscar(DEPORTES, deportes, id_deporte)
+
+
+def estado(nombre):
+    return next((e for e in estados().values() if e.nombre == nombre), None)
+
+
+def estado_por_defecto():
+    """'Pendiente' o, si no existe, el primer estado definido."""
+    return estado('Pendiente') or next(iter(estados().values()), None)
+
+
+def metodo(id_metodo):
+    return _buscar(METODOS, metodos, id_metodo)
+
+
+def servicio(id_servicio):
+    try:
+        return _buscar(SERVICIOS, servicios, int(id_servicio))
+    except (TypeError, ValueError):
+        return None
+
+
+def invalidar(*catalogos):
+    """Descarta las instantáneas indicadas (todas si no se pasa ninguna)."""
+    cache().invalidar(*(catalogos or (DEPORTES, ESTADOS, METODOS, SERVICIOS)))
+
+
+def estadisticas():
+    return cache().estadisticas()
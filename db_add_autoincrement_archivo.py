@@ -0,0 +1,91 @@
+"""Reconstruye `pagos` y `reserva_servicio` con AUTOINCREMENT en una base SQLite existente.
+
+El archivo (archivo.py) mueve las filas conservando sus ids. Sin AUTOINCREMENT
+SQLite vuelve a entregar los ids liberados al archivar y el siguiente
+archivar() falla por clave duplicada en `pagos_archivo` /
+`reserva_servicio_archivo`. Las tablas activas que no lo tienen se recrean
+(mismas columnas e índices, datos copiados) y después sqlite_sequence se fija
+en el mayor id entre la tabla activa y su archivo. Es idempotente.
+
+Ejecutar una vez::
+    python db_add_autoincrement_archivo.py
+"""
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app import create_app, db
+from archivo import PARES
+
+
+def _sql_tabla(cur, tabla):
+    fila = cur.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,)).fetchone()
+    return fila[0] if fila else None
+
+
+def _reconstruir(cur, modelo):
+    tabla = modelo.__table__
+    nueva = f'{tabla.name}_new'
+    ddl = str(CreateTable(tabla).compile(dialect=db.engine.dialect))
+    cur.execute(ddl.replace(f'CREATE TABLE {tabla.name} (', f'CREATE TABLE {nueva} (', 1))
+    existentes = {r[1] for r in cur.execute(f"PRAGMA table_info('{tabla.name}')")}
+    columnas = ', '.join(c.name for c in tabla.columns if c.name in existentes)
+    cur.execute(f'INSERT INTO {nueva} ({columnas}) SELECT {columnas} FROM {tabla.name}')
+    cur.execute(f'DROP TABLE {tabla.name}')
+    cur.execute(f'ALTER TABLE {nueva} RENAME TO {tabla.name}')
+    for idx in tabla.indexes:
+        cur.execute(str(CreateIndex(idx).compile(dialect=db.engine.dialect)))
+
+
+def _fijar_secuencia(cur, activa, archivada):
+    tabla = activa.__tablename__
+    pk = activa.__table__.primary_key.columns[0].name
+    maximo = max(
+        cur.execute(f'SELECT coalesce(max({pk}), 0) FROM {t}').fetchone()[0]
+        for t in (tabla, archivada.__tablename__) if _sql_tabla(cur, t)
+    )
+    actual = cur.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (tabla,)).fetchone()
+    if actual is None:
+        cur.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)', (tabla, maximo))
+    elif actual[0] < maximo:
+        cur.execute('UPDATE sqlite_sequence SET seq = ? WHERE name = ?', (maximo, tabla))
+    return maximo
+
+
+def migrar():
+    """Recrea las tablas activas del archivo que no tienen AUTOINCREMENT y ajusta sus secuencias.
+
+    Devuelve (tablas reconstruidas, {tabla: secuencia}). Hace commit.
+    """
+    db.session.remove()
+    reconstruidas, secuencias = [], {}
+    raw = db.engine.raw_connection()
+    nivel = raw.isolation_level
+    try:
+        raw.isolation_level = None   # BEGIN/COMMIT explícitos: toda la migración es una transacción
+        cur = raw.cursor()
+        claves_foraneas = cur.execute('PRAGMA foreign_keys').fetchone()[0]
+        cur.execute('PRAGMA foreign_keys=OFF')
+        cur.execute('BEGIN')
+        try:
+            for activa, archivada in PARES:
+                if 'AUTOINCREMENT' not in (_sql_tabla(cur, activa.__tablename__) or '').upper():
+                    _reconstruir(cur, activa)
+                    reconstruidas.append(activa.__tablename__)
+                secuencias[activa.__tablename__] = _fijar_secuencia(cur, activa, archivada)
+            cur.execute('COMMIT')
+        except Exception:
+            cur.execute('ROLLBACK')
+            raise
+        finally:
+            cur.execute(f'PRAGMA foreign_keys={claves_foraneas}')
+    finally:
+        raw.isolation_level = nivel
+        raw.close()
+    return reconstruidas, secuencias
+
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        reconstruidas, secuencias = migrar()
+        print('Tablas reconstruidas con AUTOINCREMENT:', ', '.join(reconstruidas) if reconstruidas else 'ninguna')
+        for tabla, seq in secuencias.items():
+            print(f'  {tabla}: próximos ids desde {seq + 1}')
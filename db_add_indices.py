@@ -0,0 +1,46 @@
+"""Crea los índices compuestos declarados en models.py sobre una base existente.
+
+`db.create_all()` sólo crea índices junto con tablas nuevas, por lo que una
+base creada antes de declararlos necesita este paso. Es idempotente: los
+índices que ya existen se omiten.
+
+Ejecutar::
+    python db_add_indices.py
+"""
+from sqlalchemy import text
+from app import create_app, db
+from models import Reserva, Partido, HorarioDisponible, Pago, UsoDiario
+
+MODELOS_CON_INDICES = (Reserva, Partido, HorarioDisponible, Pago, UsoDiario)
+
+
+def _indices_existentes(conn, tabla):
+    # en SQLite el inspector omite los índices sobre expresiones (uq_uso_diario_clave)
+    if conn.dialect.name == 'sqlite':
+        return set(conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :tabla"), {'tabla': tabla}
+        ).scalars())
+    return {i['name'] for i in db.inspect(conn).get_indexes(tabla)}
+
+
+def crear_indices():
+    creados = []
+    with db.engine.begin() as conn:
+        for modelo in MODELOS_CON_INDICES:
+            existentes = _indices_existentes(conn, modelo.__tablename__)
+            for idx in modelo.__table__.indexes:
+                if idx.name in existentes:
+                    continue
+                idx.create(bind=conn)
+                creados.append(idx.name)
+    return creados
+
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        creados = crear_indices()
+        if creados:
+            print('Índices creados:', ', '.join(creados))
+        else:
+            print('Todos los índices ya existían.')
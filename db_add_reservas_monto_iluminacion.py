@@ -0,0 +1,55 @@
+"""Agrega `monto_iluminacion` a `reservas` y `reservas_archivo` en una base existente.
+
+Las reservas existentes con iluminación toman el recargo según el precio de
+iluminación actual de su cancha (el cobrado originalmente no se guardaba) y
+después se reconstruye el resumen `uso_diario`. Crea también los índices
+declarados que falten (la clave única de `uso_diario` sobre coalesce(id_deporte, 0)).
+
+Ejecutar una vez::
+    python db_add_reservas_monto_iluminacion.py
+"""
+from sqlalchemy import select, update, bindparam, text
+from app import create_app, db
+from db_add_indices import crear_indices
+from models import Cancha, Reserva, ReservaArchivada
+import reservas_lote
+import resumen
+
+
+def agregar_columna(conn, tabla):
+    cols = [r[1] for r in conn.execute(text(f"PRAGMA table_info('{tabla}')")).fetchall()]
+    if 'monto_iluminacion' in cols:
+        print(f"Columna 'monto_iluminacion' ya existe en '{tabla}'.")
+        return False
+    print(f"Agregando columna 'monto_iluminacion' a la tabla '{tabla}'...")
+    conn.execute(text(f"ALTER TABLE {tabla} ADD COLUMN monto_iluminacion NUMERIC(10, 2) NOT NULL DEFAULT 0"))
+    return True
+
+
+def completar(modelo):
+    filas = db.session.execute(
+        select(modelo.id_reserva, modelo.fecha_reserva, modelo.hora_inicio, modelo.hora_fin, Cancha.precio_iluminacion)
+        .join(Cancha, Cancha.id_cancha == modelo.id_cancha)
+        .where(modelo.usa_iluminacion.is_(True))
+    ).all()
+    if filas:
+        db.session.execute(
+            update(modelo.__table__).where(modelo.__table__.c.id_reserva == bindparam('b_id')),
+            [{'b_id': f.id_reserva,
+              'monto_iluminacion': reservas_lote.iluminacion(f, resumen._minutos(f), True)} for f in filas],
+        )
+    return len(filas)
+
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        conn = db.session.connection()
+        nuevas = [m for m in (Reserva, ReservaArchivada) if agregar_columna(conn, m.__tablename__)]
+        for modelo in nuevas:
+            print(f'{modelo.__tablename__}: {completar(modelo)} reservas con iluminación completadas.')
+        db.session.commit()
+        creados = crear_indices()
+        print('Índices creados:', ', '.join(creados) if creados else 'ninguno')
+        if nuevas:
+            print(f'Resumen uso_diario reconstruido: {resumen.reconstruir()} filas')
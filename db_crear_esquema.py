@@ -0,0 +1,29 @@
+"""Crea el esquema completo (tablas e índices) en la base configurada.
+
+Es el paso de despliegue que reemplaza al `db.create_all()` de cada arranque:
+wsgi.py crea la app con CREAR_TABLAS desactivado y sólo verifica que las
+tablas existan, así que hay que ejecutarlo una vez antes del primer arranque
+y después de cada cambio de modelos que agregue tablas o índices. Es
+idempotente.
+
+Ejecutar::
+    python db_crear_esquema.py
+"""
+from app import create_app, db
+from db_add_indices import crear_indices
+
+
+def crear_esquema():
+    """Crea las tablas que falten y los índices declarados; devuelve (tablas, índices) nuevos."""
+    existentes = set(db.inspect(db.engine).get_table_names())
+    db.create_all()
+    tablas = sorted(set(db.metadata.tables) - existentes)
+    return tablas, crear_indices()
+
+
+if __name__ == '__main__':
+    app = create_app({'CREAR_TABLAS': False, 'VERIFICAR_ESQUEMA': False, 'METRICAS': False})
+    with app.app_context():
+        tablas, indices = crear_esquema()
+        print('Tablas creadas:', ', '.join(tablas) if tablas else 'ninguna')
+        print('Índices creados:', ', '.join(indices) if indices else 'ninguno')
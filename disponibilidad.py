@@ -0,0 +1,269 @@
+"""Cálculo de la grilla de disponibilidad de una cancha para un día.
+
+Las reservas y partidos se normalizan a minutos relativos a las 00:00 de la
+fecha consultada (un turno del día anterior que cruza medianoche queda con
+inicio negativo) y se cargan con una sola consulta; cada inicio candidato se
+evalúa en memoria con las reglas de reglas.py, en lugar de consultar la base
+una vez por franja.
+"""
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import select, literal, union_all, and_, or_
+from app import db
+import indice_ocupacion
+from models import Reserva, Partido, HorarioDisponible, Cancha
+from reglas import (  # noqa: F401 (constantes y ayudas re-exportadas para los demás módulos)
+    VENTANA_INICIO_MIN, VENTANA_FIN_MIN, ULTIMO_INICIO_MIN, PASO_MIN,
+    DIAS_SEMANA_ES, DURACIONES_MIN, dia_semana_es, duracion_cancha, hora_a_min,
+    minutos_intervalo, ReglasCancha, Ocupacion, FUERA_DE_RANGO,
+)
+
+
+def fmt_min(m):
+    m = m % 1440
+    return f"{m // 60:02d}:{m % 60:02d}"
+
+
+def filtro_solapamiento(modelo, id_cancha, fecha, hora_inicio, hora_fin):
+    """Condición SQL acotada para turnos de `modelo` (Reserva o Partido) que se
+    solapan con [hora_inicio, hora_fin) del día `fecha` en la cancha.
+
+    Si hora_fin <= hora_inicio el intervalo termina al día siguiente, igual que
+    los turnos existentes. Se restringe a (id_cancha, fecha IN (fecha-1, fecha,
+    fecha+1)) para que el motor use el índice compuesto por cancha y fecha.
+    """
+    col_fecha = modelo.fecha_reserva if modelo is Reserva else modelo.fecha_partido
+    cruza = hora_fin <= hora_inicio
+    existente_cruza = modelo.hora_fin <= modelo.hora_inicio
+
+    # mismo día: el existente termina después del inicio (o pasa medianoche)
+    # y empieza antes del fin del candidato (o el candidato pasa medianoche)
+    mismo_dia = [col_fecha == fecha, or_(existente_cruza, modelo.hora_fin > hora_inicio)]
+    if not cruza:
+        mismo_dia.append(modelo.hora_inicio < hora_fin)
+    ramas = [
+        and_(*mismo_dia),
+        # turno del día anterior que sigue ocupando la cancha pasada la medianoche
+        and_(col_fecha == fecha - timedelta(days=1), existente_cruza, modelo.hora_fin > hora_inicio),
+    ]
+    fechas = [fecha - timedelta(days=1), fecha]
+    if cruza:
+        # el candidato sigue al día siguiente: turnos que empiezan antes de su fin
+        ramas.append(and_(col_fecha == fecha + timedelta(days=1), modelo.hora_inicio < hora_fin))
+        fechas.append(fecha + timedelta(days=1))
+
+    return and_(modelo.id_cancha == id_cancha, col_fecha.in_(fechas), or_(*ramas))
+
+
+def hay_solapamiento(modelo, id_cancha, fecha, hora_inicio, hora_fin):
+    pk = modelo.id_reserva if modelo is Reserva else modelo.id_partido
+    return db.session.query(pk).filter(
+        filtro_solapamiento(modelo, id_cancha, fecha, hora_inicio, hora_fin)
+    ).limit(1).first() is not None
+
+
+def _union_ocupacion(cond_reserva, cond_partido):
+    """SELECT ... UNION ALL con (motivo, id_cancha, fecha, hora_inicio, hora_fin)."""
+    q_res = select(
+        literal('RESERVA_EXISTENTE').label('motivo'),
+        Reserva.id_cancha.label('id_cancha'),
+        Reserva.fecha_reserva.label('fecha'),
+        Reserva.hora_inicio.label('hora_inicio'),
+        Reserva.hora_fin.label('hora_fin'),
+    ).where(*cond_reserva)
+    q_par = select(
+        literal('PARTIDO_EXISTENTE').label('motivo'),
+        Partido.id_cancha.label('id_cancha'),
+        Partido.fecha_partido.label('fecha'),
+        Partido.hora_inicio.label('hora_inicio'),
+        Partido.hora_fin.label('hora_fin'),
+    ).where(*cond_partido)
+    return union_all(q_res, q_par)
+
+
+def cargar_ocupacion(id_cancha, fecha):
+    """Intervalos ocupados (inicio, fin, motivo) de reservas y partidos.
+
+    Incluye el día anterior y el siguiente para contemplar turnos que cruzan
+    medianoche. Se resuelve con una única consulta UNION ALL.
+    """
+    fechas = [fecha - timedelta(days=1), fecha, fecha + timedelta(days=1)]
+    consulta = _union_ocupacion(
+        [Reserva.id_cancha == id_cancha, Reserva.fecha_reserva.in_(fechas)],
+        [Partido.id_cancha == id_cancha, Partido.fecha_partido.in_(fechas)],
+    )
+    ocupados = []
+    for motivo, _, f, hi, hf in db.session.execute(consulta):
+        s, e = minutos_intervalo(fecha, f, hi, hf)
+        ocupados.append((s, e, motivo))
+    ocupados.sort()
+    return ocupados
+
+
+def ocupacion(id_cancha, fecha):
+    """Ocupacion (ver reglas.py) de la cancha en la fecha, con una consulta."""
+    return Ocupacion(cargar_ocupacion(id_cancha, fecha))
+
+
+def ocupacion_turno(id_cancha, fecha, hora_inicio, hora_fin):
+    """Ocupacion con sólo los turnos que se solapan con [hora_inicio, hora_fin) de `fecha`.
+
+    Para las altas, que evalúan un único turno: una consulta UNION ALL con
+    filtro_solapamiento (acotada por el índice de cancha y fecha) en lugar de
+    cargar los tres días enteros como ocupacion().
+    """
+    consulta = _union_ocupacion(
+        [filtro_solapamiento(Reserva, id_cancha, fecha, hora_inicio, hora_fin)],
+        [filtro_solapamiento(Partido, id_cancha, fecha, hora_inicio, hora_fin)],
+    )
+    return Ocupacion(
+        (*minutos_intervalo(fecha, f, hi, hf), motivo) for motivo, _, f, hi, hf in db.session.execute(consulta)
+    )
+
+
+def ocupacion_lectura(id_cancha, fecha):
+    """Ocupación para consultas de sólo lectura: del índice en memoria (ver
+    indice_ocupacion.py) salvo que la config INDICE_OCUPACION lo desactive.
+    Las altas usan ocupacion_turno(), contra la base y con el bloqueo tomado."""
+    if current_app.config.get('INDICE_OCUPACION', True):
+        return indice_ocupacion.ocupacion(id_cancha, fecha)
+    return ocupacion(id_cancha, fecha)
+
+
+def grilla_disponibilidad(cancha, fecha):
+    """Devuelve todas las franjas de inicio (cada 30 minutos) de la cancha para la fecha.
+
+    Cada franja indica si está disponible o, si no, el motivo:
+    FUERA_DE_RANGO, HORARIO_NO_DISPONIBLE, RESERVA_EXISTENTE o PARTIDO_EXISTENTE.
+    """
+    reglas = ReglasCancha.de_cancha(cancha)
+    duracion = reglas.duracion
+    ocupados = ocupacion_lectura(cancha.id_cancha, fecha)
+
+    slots = []
+    for s in range(VENTANA_INICIO_MIN, ULTIMO_INICIO_MIN + 1, PASO_MIN):
+        e = s + duracion
+        if e > VENTANA_FIN_MIN:
+            motivo = FUERA_DE_RANGO
+        else:
+            motivo = reglas.evaluar(fecha, s, e, ocupados)
+
+        slot = {'hora_inicio': fmt_min(s), 'hora_fin': fmt_min(e), 'disponible': motivo is None}
+        if motivo:
+            slot['motivo'] = motivo
+        slots.append(slot)
+
+    return {
+        'id_cancha': cancha.id_cancha,
+        'fecha': fecha.isoformat(),
+        'duracion_minutos': duracion,
+        'slots': slots,
+    }
+
+
+# --- Matriz de disponibilidad para varias canchas y días ---
+#
+# Cada día de cada cancha se representa con un entero de 30 bits: el bit i
+# corresponde a la media hora que empieza en VENTANA_INICIO_MIN + 30*i
+# (10:00, 10:30, ..., 00:30). Un bit en 1 significa ocupado.
+
+FRANJAS_DIA = (VENTANA_FIN_MIN - VENTANA_INICIO_MIN) // PASO_MIN
+INICIOS_DIA = (ULTIMO_INICIO_MIN - VENTANA_INICIO_MIN) // PASO_MIN + 1
+
+
+def _mascara_intervalo(s, e):
+    """Bits de las medias horas de la ventana que se solapan con [s, e)."""
+    s = max(s, VENTANA_INICIO_MIN)
+    e = min(e, VENTANA_FIN_MIN)
+    if e <= s:
+        return 0
+    lo = (s - VENTANA_INICIO_MIN) // PASO_MIN
+    hi = (e - VENTANA_INICIO_MIN + PASO_MIN - 1) // PASO_MIN
+    return ((1 << (hi - lo)) - 1) << lo
+
+
+def _mascara_inicios(ocupacion, reglas, fecha):
+    """Bits de los inicios reservables (10:00..23:00) con la duración de la cancha."""
+    duracion = reglas.duracion
+    n = (duracion + PASO_MIN - 1) // PASO_MIN
+    bloque = (1 << n) - 1
+    mascara = 0
+    for k in range(INICIOS_DIA):
+        s = VENTANA_INICIO_MIN + k * PASO_MIN
+        e = s + duracion
+        if e > VENTANA_FIN_MIN or (ocupacion >> k) & bloque:
+            continue
+        if not reglas.en_horario(fecha, s, e):
+            continue
+        mascara |= 1 << k
+    return mascara
+
+
+def _bits_a_str(mascara, largo):
+    return ''.join('1' if (mascara >> i) & 1 else '0' for i in range(largo))
+
+
+def matriz_disponibilidad(desde, hasta, id_deporte=None):
+    """Ocupación e inicios reservables de todas las canchas activas entre dos fechas.
+
+    Carga canchas, reservas/partidos y horarios con una consulta por tipo y
+    calcula el resto en memoria. Devuelve, por cancha y por fecha, dos cadenas:
+    'ocupacion' (una posición por media hora, '1' = ocupado) e 'inicios'
+    (una posición por inicio 10:00..23:00, '1' = se puede reservar).
+    """
+    q = Cancha.query.filter(Cancha.activa == True)  # noqa: E712
+    if id_deporte is not None:
+        q = q.filter(Cancha.id_deporte == id_deporte)
+    canchas = q.order_by(Cancha.id_cancha).all()
+    ids = [c.id_cancha for c in canchas]
+    dias = (hasta - desde).days + 1
+    fechas = [desde + timedelta(days=i) for i in range(dias)]
+
+    ocupacion = {i: [0] * dias for i in ids}
+    horarios = {i: [] for i in ids}
+    if ids:
+        # Se cargan también el día anterior y el posterior: un turno puede
+        # cruzar medianoche hacia adelante y la ventana de un día llega a la 01:00.
+        f_ini = desde - timedelta(days=1)
+        f_fin = hasta + timedelta(days=1)
+        consulta = _union_ocupacion(
+            [Reserva.id_cancha.in_(ids), Reserva.fecha_reserva.between(f_ini, f_fin)],
+            [Partido.id_cancha.in_(ids), Partido.fecha_partido.between(f_ini, f_fin)],
+        )
+        for _, id_cancha, f, hi, hf in db.session.execute(consulta):
+            s, e = minutos_intervalo(f, f, hi, hf)
+            base = (f - desde).days
+            dias_cancha = ocupacion[id_cancha]
+            for k in (-1, 0, 1):
+                idx = base + k
+                if 0 <= idx < dias:
+                    dias_cancha[idx] |= _mascara_intervalo(s - 1440 * k, e - 1440 * k)
+
+        for h in HorarioDisponible.query.filter(HorarioDisponible.id_cancha.in_(ids)):
+            horarios[h.id_cancha].append(h)
+
+    resultado = []
+    for c in canchas:
+        reglas = ReglasCancha.de_cancha(c, horarios[c.id_cancha])
+        fila_ocupacion = []
+        fila_inicios = []
+        for idx, f in enumerate(fechas):
+            occ = ocupacion[c.id_cancha][idx]
+            fila_ocupacion.append(_bits_a_str(occ, FRANJAS_DIA))
+            fila_inicios.append(_bits_a_str(_mascara_inicios(occ, reglas, f), INICIOS_DIA))
+        resultado.append({
+            'id_cancha': c.id_cancha,
+            'nombre': c.nombre,
+            'id_deporte': c.id_deporte,
+            'duracion_minutos': reglas.duracion,
+            'ocupacion': fila_ocupacion,
+            'inicios': fila_inicios,
+        })
+
+    return {
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'fechas': [f.isoformat() for f in fechas],
+        'franjas': [fmt_min(VENTANA_INICIO_MIN + i * PASO_MIN) for i in range(FRANJAS_DIA)],
+        'canchas': resultado,
+    }
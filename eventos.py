@@ -0,0 +1,306 @@
+"""Difusión de cambios de ocupación por Server-Sent Events (GET /api/canchas/<id>/eventos?fecha=).
+
+Las rutas que cambian la ocupación registran el evento con publicar_turno()
+antes del commit, en la tabla eventos_ocupacion y en la misma transacción: si
+hay rollback no queda evento, y lo que se confirma lo ven todos los procesos.
+
+- 'ocupado': alta de reserva (individual o por lote) o de partido;
+- 'liberado': baja de reserva;
+- 'confirmado': pago de una reserva (pasa a Confirmada; el turno sigue ocupado).
+
+Un turno que cruza medianoche se publica también en la fecha siguiente.
+
+Cada proceso (worker de gunicorn) tiene un Broker en memoria
+(app.extensions['eventos']) con un hilo que, desde la primera conexión, lee
+cada INTERVALO_SEGUNDOS los eventos nuevos por id (una consulta por clave
+primaria) y los entrega a sus suscripciones. Así un oyente conectado a un
+worker se entera de los cambios hechos en cualquier otro, con a lo sumo
+INTERVALO_SEGUNDOS de demora. El id del evento es el de la tabla, igual en
+todos los procesos: al reconectar, EventSource envía Last-Event-ID y se
+reenvían los eventos de la clave posteriores a ese id que sigan guardados.
+La tabla conserva los últimos RETENCION_EVENTOS.
+
+Límites, para que cientos de oyentes inactivos sean baratos:
+- MAX_SUSCRIPTORES conexiones por proceso; al superarlo se responde 503 con
+  Retry-After y el navegador reintenta solo.
+- Cada suscripción guarda como máximo TAM_COLA eventos pendientes; si se
+  desborda se descartan y se envía 'resync' para que el cliente recargue la grilla.
+- Un oyente inactivo sólo espera en su threading.Event; cada LATIDO_SEGUNDOS
+  se envía un comentario para detectar conexiones cerradas.
+- Cada conexión dura como máximo DURACION_MAX_SEGUNDOS; después el navegador
+  reconecta (EventSource lo hace solo) y se libera lo que hubiera quedado colgado.
+
+Con un servidor de un hilo por conexión (gthread, el servidor de desarrollo)
+cada oyente ocupa un hilo mientras está conectado. En producción los flujos se
+sirven desde un pool aparte de workers gevent (gunicorn_eventos.conf.py), donde
+un oyente inactivo cuesta sólo la memoria de su greenlet.
+"""
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import select, insert, delete, func
+from app import db
+from models import EventoOcupacion
+
+MAX_SUSCRIPTORES = 500
+TAM_COLA = 64
+LATIDO_SEGUNDOS = 15
+DURACION_MAX_SEGUNDOS = 300
+REINTENTO_MS = 3000
+INTERVALO_SEGUNDOS = 0.5
+LOTE_LECTURA = 1000
+# En Postgres los ids se asignan al insertar y pueden confirmarse fuera de
+# orden: cada lectura vuelve a mirar los últimos REVISION_IDS ids.
+REVISION_IDS = 100
+RETENCION_EVENTOS = 10000
+PURGA_CADA = 1000   # cada cuántas publicaciones (por proceso) se purga la tabla
+
+log_eventos = logging.getLogger('reservas.eventos')
+_publicados = itertools.count(1)
+
+
+class Suscripcion:
+    __slots__ = ('clave', 'cola', 'aviso', 'desbordada')
+
+    def __init__(self, clave, tam_cola):
+        self.clave = clave
+        self.cola = deque()
+        self.aviso = threading.Event()
+        self.desbordada = False
+
+    def entregar(self, evento, tam_cola):
+        if len(self.cola) >= tam_cola:
+            self.cola.clear()
+            self.desbordada = True
+        else:
+            self.cola.append(evento)
+        self.aviso.set()
+
+    def esperar(self, timeout):
+        """Eventos pendientes (lista) tras esperar como máximo `timeout` segundos."""
+        self.aviso.wait(timeout)
+        self.aviso.clear()
+        eventos = []
+        while self.cola:
+            eventos.append(self.cola.popleft())
+        return eventos
+
+
+class Broker:
+    """Suscripciones del proceso por (cancha, fecha).
+
+    Con `engine`, un hilo del proceso lee la tabla eventos_ocupacion y
+    reparte lo nuevo (ver leer_nuevos); sin él sólo entrega lo que se le pase
+    a publicar() (tests, uso en memoria).
+    """
+
+    def __init__(self, max_suscriptores=MAX_SUSCRIPTORES, tam_cola=TAM_COLA, engine=None,
+                 intervalo=INTERVALO_SEGUNDOS):
+        self.max_suscriptores = max_suscriptores
+        self.tam_cola = tam_cola
+        self._por_clave = {}   # (id_cancha, fecha) -> set de Suscripcion
+        self._total = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.publicados = 0
+        self.lecturas = 0
+        self.errores = 0
+        self._engine = engine
+        self._intervalo = intervalo
+        self._piso = 0             # eventos anteriores a la creación del broker: no se entregan
+        self._ultimo = 0           # mayor id_evento leído
+        self._vistos = set()       # ids ya entregados dentro de la ventana de revisión
+        self._hilo = None
+        self._detener = threading.Event()
+
+    def suscribir(self, id_cancha, fecha):
+        """Nueva Suscripcion, o None si se alcanzó el máximo de conexiones."""
+        clave = (id_cancha, fecha)
+        with self._lock:
+            if self._total >= self.max_suscriptores:
+                return None
+            sub = Suscripcion(clave, self.tam_cola)
+            self._por_clave.setdefault(clave, set()).add(sub)
+            self._total += 1
+            if self._engine is not None and self._hilo is None:
+                self._hilo = threading.Thread(target=self._leer, name='eventos-ocupacion', daemon=True)
+                self._hilo.start()
+            return sub
+
+    def desuscribir(self, sub):
+        with self._lock:
+            subs = self._por_clave.get(sub.clave)
+            if subs and sub in subs:
+                subs.discard(sub)
+                self._total -= 1
+                if not subs:
+                    del self._por_clave[sub.clave]
+
+    def publicar(self, id_cancha, fecha, tipo, datos, id_evento=None):
+        """Entrega un evento a las suscripciones de (cancha, fecha) de este proceso."""
+        with self._lock:
+            subs = list(self._por_clave.get((id_cancha, fecha), ()))
+            evento = (id_evento or next(self._ids), tipo, datos)
+            self.publicados += 1
+            for sub in subs:
+                sub.entregar(evento, self.tam_cola)
+        return len(subs)
+
+    def estadisticas(self):
+        with self._lock:
+            return {'suscriptores': self._total, 'claves': len(self._por_clave), 'publicados': self.publicados,
+                    'lecturas': self.lecturas, 'errores': self.errores, 'ultimo_evento': self._ultimo}
+
+    def iniciar_desde(self, ultimo):
+        """Primer id a leer: sólo interesan los eventos posteriores a la creación del broker."""
+        self._piso = self._ultimo = ultimo or 0
+
+    def leer_nuevos(self):
+        """Lee de la tabla los eventos posteriores al último visto y los entrega. Devuelve cuántos."""
+        desde = max(0, self._ultimo - REVISION_IDS)
+        with self._engine.connect() as conn:
+            filas = conn.execute(
+                select(EventoOcupacion.id_evento, EventoOcupacion.id_cancha, EventoOcupacion.fecha,
+                       EventoOcupacion.tipo, EventoOcupacion.datos)
+                .where(EventoOcupacion.id_evento > desde)
+                .order_by(EventoOcupacion.id_evento)
+                .limit(LOTE_LECTURA)
+            ).all()
+        self.lecturas += 1
+        nuevos = 0
+        for id_evento, id_cancha, fecha, tipo, datos in filas:
+            if id_evento <= self._piso or id_evento in self._vistos:
+                continue
+            self._vistos.add(id_evento)
+            self._ultimo = max(self._ultimo, id_evento)
+            self.publicar(id_cancha, fecha, tipo, json.loads(datos), id_evento)
+            nuevos += 1
+        if len(self._vistos) > 2 * REVISION_IDS:
+            limite = self._ultimo - REVISION_IDS
+            self._vistos = {i for i in self._vistos if i > limite}
+        return nuevos
+
+    def _leer(self):
+        espera = self._intervalo
+        while not self._detener.wait(espera):
+            try:
+                # con un lote completo puede haber más: leer de nuevo sin esperar
+                espera = 0 if self.leer_nuevos() >= LOTE_LECTURA - REVISION_IDS else self._intervalo
+            except Exception:
+                self.errores += 1
+                log_eventos.warning('No se pudieron leer los eventos de ocupación', exc_info=True)
+                espera = min(self._intervalo * 20, 10)
+
+    def detener(self):
+        """Termina el hilo de lectura (al cerrar la app o en tests)."""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=5)
+
+
+def broker():
+    ext = current_app.extensions
+    if 'eventos' not in ext:
+        b = Broker(
+            max_suscriptores=current_app.config.get('EVENTOS_MAX_SUSCRIPTORES', MAX_SUSCRIPTORES),
+            tam_cola=current_app.config.get('EVENTOS_TAM_COLA', TAM_COLA),
+            engine=db.engine,
+            intervalo=current_app.config.get('EVENTOS_INTERVALO', INTERVALO_SEGUNDOS),
+        )
+        b.iniciar_desde(db.session.scalar(select(func.max(EventoOcupacion.id_evento))))
+        ext['eventos'] = b
+    return ext['eventos']
+
+
+def _hora(h):
+    return h.strftime('%H:%M') if hasattr(h, 'strftime') else h
+
+
+def publicar_turnos(tipo, turnos, origen):
+    """Registra en la transacción en curso un evento por turno (id_cancha, fecha, hora_inicio, hora_fin, id).
+
+    Se llama antes del commit de la ruta: el evento se confirma o se descarta
+    junto con el cambio. Un INSERT (executemany) para todos los turnos.
+    """
+    filas = []
+    for id_cancha, fecha, hora_inicio, hora_fin, id_origen in turnos:
+        datos = json.dumps({
+            'tipo': tipo,
+            'id_cancha': id_cancha,
+            'fecha': fecha.isoformat(),
+            'hora_inicio': _hora(hora_inicio),
+            'hora_fin': _hora(hora_fin),
+            'origen': origen,
+            'id': id_origen,
+        }, ensure_ascii=False)
+        filas.append({'id_cancha': id_cancha, 'fecha': fecha, 'tipo': tipo, 'datos': datos})
+        if hora_fin <= hora_inicio:
+            filas.append({'id_cancha': id_cancha, 'fecha': fecha + timedelta(days=1), 'tipo': tipo, 'datos': datos})
+    if not filas:
+        return
+    db.session.execute(insert(EventoOcupacion), filas)
+    if next(_publicados) % PURGA_CADA == 0:
+        purgar()
+
+
+def publicar_turno(tipo, id_cancha, fecha, hora_inicio, hora_fin, origen, id_origen=None):
+    """Registra el cambio de ocupación de un turno (ver publicar_turnos)."""
+    publicar_turnos(tipo, [(id_cancha, fecha, hora_inicio, hora_fin, id_origen)], origen)
+
+
+def purgar(retencion=RETENCION_EVENTOS):
+    """Borra los eventos salvo los últimos `retencion` (en la transacción en curso)."""
+    ultimo = db.session.scalar(select(func.max(EventoOcupacion.id_evento)))
+    if ultimo and ultimo > retencion:
+        db.session.execute(delete(EventoOcupacion).where(EventoOcupacion.id_evento <= ultimo - retencion))
+
+
+def anteriores(id_cancha, fecha, ultimo_id):
+    """Eventos guardados de (cancha, fecha) posteriores a `ultimo_id` (Last-Event-ID), como (id, tipo, datos)."""
+    filas = db.session.execute(
+        select(EventoOcupacion.id_evento, EventoOcupacion.tipo, EventoOcupacion.datos)
+        .where(EventoOcupacion.id_cancha == id_cancha, EventoOcupacion.fecha == fecha,
+               EventoOcupacion.id_evento > ultimo_id)
+        .order_by(EventoOcupacion.id_evento)
+        .limit(TAM_COLA)
+    )
+    return [(i, tipo, json.loads(datos)) for i, tipo, datos in filas]
+
+
+def _mensaje(id_evento, tipo, datos):
+    return f'id: {id_evento}\nevent: {tipo}\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n'
+
+
+def flujo(b, sub, latido=LATIDO_SEGUNDOS, duracion_max=DURACION_MAX_SEGUNDOS, previos=()):
+    """Generador SSE de una suscripción. Se desuscribe al terminar o al cerrarse la conexión.
+
+    `previos` son los eventos a reenviar al reconectar (ver anteriores); lo que
+    luego llegue con un id ya reenviado se omite.
+    """
+    fin = time.monotonic() + duracion_max
+    reenviado = 0
+    try:
+        yield f'retry: {REINTENTO_MS}\n: conectado\n\n'
+        for id_evento, tipo, datos in previos:
+            reenviado = id_evento
+            yield _mensaje(id_evento, tipo, datos)
+        while True:
+            restante = fin - time.monotonic()
+            if restante <= 0:
+                break
+            eventos = sub.esperar(min(latido, restante))
+            if sub.desbordada:
+                sub.desbordada = False
+                yield 'event: resync\ndata: {}\n\n'
+            for id_evento, tipo, datos in eventos:
+                if id_evento > reenviado:
+                    yield _mensaje(id_evento, tipo, datos)
+            if not eventos:
+                yield ': latido\n\n'
+    finally:
+        b.desuscribir(sub)
@@ -0,0 +1,61 @@
+"""Exportación en streaming (NDJSON / CSV) de listados grandes.
+
+Las filas se leen de a lotes con yield_per y se escriben a medida que se
+generan, de modo que la memoria del worker no crece con el tamaño del
+reporte y el primer byte sale sin esperar a que termine la consulta.
+"""
+import csv
+import io
+import json
+from flask import Response, stream_with_context
+from paginacion import fila_a_item
+
+FORMATOS = ('json', 'ndjson', 'csv')
+TAM_LOTE = 1000
+
+
+def leer_formato(args):
+    formato = (args.get('format') or 'json').lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"format inválido. Use: {', '.join(FORMATOS)}")
+    return formato
+
+
+def _ndjson(query, nombres, compuestos):
+    for f in query.yield_per(TAM_LOTE):
+        yield json.dumps(fila_a_item(f, nombres, compuestos), ensure_ascii=False) + '\n'
+
+
+def _csv(query, nombres, compuestos):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def volcar():
+        data = buf.getvalue()
+        buf.seek(0)
+        buf.truncate(0)
+        return data
+
+    # el encabezado sale antes de ejecutar la consulta
+    writer.writerow(nombres)
+    yield volcar()
+    for f in query.yield_per(TAM_LOTE):
+        item = fila_a_item(f, nombres, compuestos)
+        # los campos compuestos (dict) se serializan como JSON dentro de la celda
+        writer.writerow([json.dumps(v, ensure_ascii=False) if isinstance(v, dict) else v for v in item.values()])
+        yield volcar()
+
+
+def exportar(query, nombres, compuestos, formato, nombre_archivo):
+    """Respuesta en streaming para una query de columnas ya proyectada."""
+    if formato == 'csv':
+        gen = _csv(query, nombres, compuestos)
+        mimetype = 'text/csv'
+        extension = 'csv'
+    else:
+        gen = _ndjson(query, nombres, compuestos)
+        mimetype = 'application/x-ndjson'
+        extension = 'ndjson'
+    resp = Response(stream_with_context(gen), mimetype=mimetype)
+    resp.headers['Content-Disposition'] = f'attachment; filename="{nombre_archivo}.{extension}"'
+    return resp
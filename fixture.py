@@ -0,0 +1,166 @@
+"""Generación del fixture de un campeonato: todos contra todos y asignación de cancha/horario.
+
+1. round_robin() arma las fechas (rondas) con el método del círculo: con n
+   equipos son n-1 rondas de n/2 partidos (si n es impar, un equipo libre por
+   ronda). Con ida_y_vuelta se agrega la segunda rueda con la localía invertida.
+2. Agenda asigna a cada partido, ronda por ronda, el primer turno libre
+   (fecha, hora, cancha) respetando:
+   - la ocupación existente (reservas y partidos, incluidos los turnos del día
+     anterior que cruzan medianoche) y los horarios disponibles de cada cancha;
+   - la franja horaria pedida (hora_desde..hora_hasta) y los días de la semana;
+   - que un equipo juegue como máximo un partido por día y en orden de rondas.
+   La ocupación se carga en bloques de BLOQUE_DIAS días con una consulta por
+   bloque; el resto es en memoria (greedy por intervalos).
+3. La ruta inserta todos los partidos con un único executemany.
+"""
+from bisect import bisect_left
+from collections import deque
+from datetime import timedelta
+from app import db
+from models import Reserva, Partido, HorarioDisponible
+from disponibilidad import PASO_MIN, _union_ocupacion, dia_semana_es, hora_a_min, minutos_intervalo
+from reglas import ReglasCancha
+
+BLOQUE_DIAS = 31
+MAX_DIAS_FIXTURE = 730
+
+
+def round_robin(equipos, ida_y_vuelta=False):
+    """Lista de rondas; cada ronda es una lista de (local, visitante)."""
+    equipos = list(equipos)
+    if len(equipos) % 2:
+        equipos.append(None)  # equipo libre
+    n = len(equipos)
+    rondas = []
+    for r in range(n - 1):
+        ronda = []
+        for i in range(n // 2):
+            a, b = equipos[i], equipos[n - 1 - i]
+            if a is None or b is None:
+                continue
+            # alternar la localía para que nadie sea siempre local o visitante
+            ronda.append((a, b) if (r + i) % 2 == 0 else (b, a))
+        rondas.append(ronda)
+        # rotar todos menos el primero
+        equipos = [equipos[0], equipos[-1]] + equipos[1:-1]
+    if ida_y_vuelta:
+        rondas += [[(b, a) for a, b in ronda] for ronda in rondas]
+    return rondas
+
+
+class Agenda:
+    """Turnos libres por fecha para un conjunto de canchas, cargados por bloques."""
+
+    def __init__(self, canchas, fecha_inicio, fecha_fin, hora_desde, hora_hasta, dias_semana=None, duracion=None):
+        self.canchas = sorted(canchas, key=lambda c: c.id_cancha)
+        self.fecha_inicio = fecha_inicio
+        self.fecha_fin = fecha_fin
+        self.desde = hora_a_min(hora_desde)
+        self.hasta = hora_a_min(hora_hasta) or 1440
+        self.dias_semana = {d.lower() for d in dias_semana} if dias_semana else None
+        ids = [c.id_cancha for c in self.canchas]
+        horarios = {i: [] for i in ids}
+        for h in HorarioDisponible.query.filter(HorarioDisponible.id_cancha.in_(ids)):
+            horarios[h.id_cancha].append(h)
+        self.reglas = {c.id_cancha: ReglasCancha.de_cancha(c, horarios[c.id_cancha]) for c in self.canchas}
+        self.duracion = {i: duracion or r.duracion for i, r in self.reglas.items()}
+        self.libres = {}          # fecha -> deque de (inicio, id_cancha)
+        self.cargado_hasta = fecha_inicio - timedelta(days=1)
+
+    def _cargar_bloque(self):
+        desde = self.cargado_hasta + timedelta(days=1)
+        hasta = min(desde + timedelta(days=BLOQUE_DIAS - 1), self.fecha_fin)
+        ids = [c.id_cancha for c in self.canchas]
+        consulta = _union_ocupacion(
+            [Reserva.id_cancha.in_(ids), Reserva.fecha_reserva.between(desde - timedelta(days=1), hasta)],
+            [Partido.id_cancha.in_(ids), Partido.fecha_partido.between(desde - timedelta(days=1), hasta)],
+        )
+        ocupacion = {}
+        for _, id_cancha, f, hi, hf in db.session.execute(consulta):
+            for fecha in (f, f + timedelta(days=1)):
+                if desde <= fecha <= hasta:
+                    ocupacion.setdefault((fecha, id_cancha), []).append(minutos_intervalo(fecha, f, hi, hf))
+
+        fecha = desde
+        while fecha <= hasta:
+            self.libres[fecha] = self._turnos_del_dia(fecha, ocupacion)
+            fecha += timedelta(days=1)
+        self.cargado_hasta = hasta
+
+    def _turnos_del_dia(self, fecha, ocupacion):
+        dia = dia_semana_es(fecha).lower()
+        if self.dias_semana and dia not in self.dias_semana:
+            return deque()
+        turnos = []
+        for c in self.canchas:
+            dur = self.duracion[c.id_cancha]
+            ocupados = sorted(ocupacion.get((fecha, c.id_cancha), []))
+            reglas_cancha = self.reglas[c.id_cancha]
+            # turnos disjuntos por cancha: asignar uno nunca invalida otro
+            s = self.desde
+            while s + dur <= self.hasta:
+                e = s + dur
+                libre = not any(o_s < e and s < o_e for o_s, o_e in ocupados[:bisect_left(ocupados, (e,))])
+                if libre and reglas_cancha.en_horario(fecha, s, e):
+                    turnos.append((s, c.id_cancha))
+                    s = e
+                else:
+                    s += PASO_MIN
+        turnos.sort()
+        return deque(turnos)
+
+    def asignar(self, desde_fecha):
+        """Primer turno libre (fecha, inicio, fin, id_cancha) a partir de desde_fecha, o None."""
+        fecha = max(desde_fecha, self.fecha_inicio)
+        while fecha <= self.fecha_fin:
+            if fecha > self.cargado_hasta:
+                self._cargar_bloque()
+            libres = self.libres[fecha]
+            if libres:
+                s, id_cancha = libres.popleft()
+                return fecha, s, s + self.duracion[id_cancha], id_cancha
+            fecha += timedelta(days=1)
+        return None
+
+
+def programar(rondas, agenda):
+    """Asigna turno a cada partido. Devuelve (asignados, sin_lugar).
+
+    asignados: lista de (ronda, local, visitante, fecha, inicio, fin, id_cancha).
+    """
+    ultimo_dia = {}
+    asignados, sin_lugar = [], []
+    for n_ronda, ronda in enumerate(rondas, start=1):
+        for local, visitante in ronda:
+            # un partido por día por equipo, y siempre después de su partido anterior
+            previos = [ultimo_dia[e] for e in (local, visitante) if e in ultimo_dia]
+            desde = max(previos) + timedelta(days=1) if previos else agenda.fecha_inicio
+            turno = agenda.asignar(desde)
+            if turno is None:
+                sin_lugar.append((n_ronda, local, visitante))
+                continue
+            fecha, s, e, id_cancha = turno
+            ultimo_dia[local] = ultimo_dia[visitante] = fecha
+            asignados.append((n_ronda, local, visitante, fecha, s, e, id_cancha))
+    return asignados, sin_lugar
+
+
+def conflictos(asignados):
+    """Partidos asignados que ahora se solapan con la ocupación en la base (re-verificación bajo bloqueo)."""
+    if not asignados:
+        return []
+    ids = sorted({a[6] for a in asignados})
+    # el día anterior (turnos que cruzan medianoche hacia la fecha) y el siguiente (partidos que la cruzan)
+    fechas = sorted({a[3] + timedelta(days=d) for a in asignados for d in (-1, 0, 1)})
+    consulta = _union_ocupacion(
+        [Reserva.id_cancha.in_(ids), Reserva.fecha_reserva.in_(fechas)],
+        [Partido.id_cancha.in_(ids), Partido.fecha_partido.in_(fechas)],
+    )
+    ocupacion = {}
+    for _, id_cancha, f, hi, hf in db.session.execute(consulta):
+        for fecha in (f - timedelta(days=1), f, f + timedelta(days=1)):
+            ocupacion.setdefault((fecha, id_cancha), []).append(minutos_intervalo(fecha, f, hi, hf))
+    return [
+        a for a in asignados
+        if any(o_s < a[5] and a[4] < o_e for o_s, o_e in ocupacion.get((a[3], a[6]), []))
+    ]
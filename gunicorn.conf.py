@@ -0,0 +1,68 @@
+"""Configuración de gunicorn para servir la API en producción (Linux/macOS).
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Variables de entorno (además de RESERVAS_DATABASE_URL y las de la app):
+
+- RESERVAS_BIND: dirección (por defecto 0.0.0.0:8000).
+- RESERVAS_WORKERS: procesos (por defecto uno por núcleo). Cada worker tiene
+  su propio intérprete: los pedidos que usan CPU escalan con los núcleos.
+- RESERVAS_THREADS: hilos por worker (gthread, por defecto 4). Cubren la
+  espera de la base: cada pedido en curso ocupa un hilo.
+- RESERVAS_EVENTOS_MAX_SUSCRIPTORES: flujos SSE abiertos por worker en este
+  pool (por defecto un cuarto de los hilos, al menos uno). Un flujo ocupa un
+  hilo mientras está conectado, así que sin este límite unos pocos oyentes
+  dejarían a un worker sin hilos para el resto de la API; al superarlo se
+  responde 503 con Retry-After. Los flujos van al pool gevent de
+  gunicorn_eventos.conf.py, que atiende cientos por worker: el proxy envía ahí
+  `/api/canchas/<id>/eventos` y lo de acá queda para desarrollo o despliegues
+  sin proxy.
+- RESERVAS_PRELOAD: 1 para crear la app una vez en el master y heredarla por
+  fork (arranque más rápido, memoria compartida). Sin preload (por defecto)
+  cada worker la crea al iniciar.
+
+Recarga sin cortar pedidos: `kill -HUP <pid del master>` levanta workers nuevos
+con la configuración y el código actuales y cierra los viejos cuando terminan
+lo que tienen en curso (graceful_timeout). Con RESERVAS_PRELOAD=1 el código lo
+carga el master, así que para publicar código nuevo hay que reemplazar el
+master: `kill -USR2` (arranca uno nuevo) y luego `kill -QUIT` al viejo.
+
+Cualquier otra opción de gunicorn se puede pasar en la línea de comandos o en
+GUNICORN_CMD_ARGS.
+"""
+import multiprocessing
+import os
+import sys
+
+bind = os.environ.get('RESERVAS_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('RESERVAS_WORKERS') or multiprocessing.cpu_count())
+worker_class = 'gthread'
+threads = int(os.environ.get('RESERVAS_THREADS') or 4)
+preload_app = os.environ.get('RESERVAS_PRELOAD', '0') == '1'
+# Cada flujo SSE retiene un hilo: dejar siempre la mayoría para la API
+os.environ.setdefault('RESERVAS_EVENTOS_MAX_SUSCRIPTORES', str(max(1, threads // 4)))
+
+# Conexiones persistentes detrás de un proxy/balanceador (debe ser menor que
+# el timeout de inactividad del proxy para que no corte conexiones en uso).
+keepalive = 5
+# Un worker que no responde en `timeout` segundos se reinicia; en una recarga o
+# un apagado, los pedidos en curso tienen `graceful_timeout` para terminar.
+timeout = 30
+graceful_timeout = 30
+# Reciclar workers cada tanto acota el crecimiento de memoria; el jitter evita
+# que se reinicien todos a la vez.
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = os.environ.get('RESERVAS_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.environ.get('RESERVAS_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Con preload_app la app ya existe en el master y llega al worker por fork:
+    # descartar las conexiones y el estado en memoria heredados (ver wsgi.py).
+    # Sin preload todavía no se importó y no hay nada que descartar.
+    wsgi = sys.modules.get('wsgi')
+    if wsgi is not None:
+        wsgi.despues_de_fork(wsgi.app)
@@ -0,0 +1,51 @@
+"""Pool de gunicorn para los flujos de eventos SSE (GET /api/canchas/<id>/eventos).
+
+    gunicorn -c gunicorn_eventos.conf.py wsgi:app
+
+Un flujo SSE queda abierto minutos: en el pool de la API (gthread, ver
+gunicorn.conf.py) cada oyente ocuparía un hilo. Este pool usa workers gevent,
+donde cada conexión es un greenlet y un oyente inactivo cuesta sólo su memoria,
+así que un worker atiende cientos. El proxy debe enviar acá sólo las rutas
+`/api/canchas/<id>/eventos` y el resto al pool de la API. Los eventos llegan de
+cualquier worker de cualquiera de los dos pools por la tabla eventos_ocupacion
+(ver eventos.py).
+
+Variables de entorno:
+
+- RESERVAS_EVENTOS_BIND: dirección (por defecto 0.0.0.0:8001).
+- RESERVAS_EVENTOS_WORKERS: procesos (por defecto 1; con más núcleos y miles
+  de oyentes, alguno más).
+- RESERVAS_EVENTOS_CONEXIONES: conexiones simultáneas por worker (por defecto
+  1000). El límite de oyentes por worker (EVENTOS_MAX_SUSCRIPTORES) es el 90%,
+  el resto queda para los pedidos que no son flujos; al superarlo se responde
+  503 con Retry-After.
+
+Requiere gevent (requirements.txt; no corre en Windows).
+"""
+import os
+import sys
+
+bind = os.environ.get('RESERVAS_EVENTOS_BIND', '0.0.0.0:8001')
+workers = int(os.environ.get('RESERVAS_EVENTOS_WORKERS') or 1)
+worker_class = 'gevent'
+worker_connections = int(os.environ.get('RESERVAS_EVENTOS_CONEXIONES') or 1000)
+os.environ.setdefault('RESERVAS_EVENTOS_MAX_SUSCRIPTORES', str(worker_connections * 9 // 10))
+
+keepalive = 5
+timeout = 30
+# En una recarga los flujos abiertos se cortan al vencer graceful_timeout: el
+# navegador reconecta solo y recupera lo perdido con Last-Event-ID.
+graceful_timeout = 10
+# Sin reciclado por cantidad de pedidos: cada flujo es un pedido largo.
+max_requests = 0
+
+accesslog = os.environ.get('RESERVAS_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.environ.get('RESERVAS_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Igual que en gunicorn.conf.py: sólo hay algo que descartar con preload_app
+    wsgi = sys.modules.get('wsgi')
+    if wsgi is not None:
+        wsgi.despues_de_fork(wsgi.app)
@@ -0,0 +1,339 @@
+"""Índice en memoria de la ocupación (reservas y partidos) de cada cancha.
+
+Las consultas de disponibilidad de sólo lectura (/api/reservas/check y la
+grilla de una cancha) lo usan para responder sin ir a la base:
+
+- Por cancha se guardan dos listas ordenadas de intervalos (inicio, fin) en
+  minutos absolutos (días desde date.min * 1440 + minutos), una de reservas y
+  otra de partidos. Un turno dura como máximo un día, así que los que pueden
+  solaparse con [s, e) son los que empiezan en [s - 1440, e): dos bisect.
+- Se carga perezosamente la primera vez que se consulta una cancha (una
+  consulta UNION ALL) y se vuelve a cargar al vencer TTL_SEGUNDOS, que acota
+  lo desactualizado frente a escrituras de otro proceso o de un script.
+- Ventana de fechas: de cada cancha se cargan sólo los turnos que empiezan
+  entre el día anterior a la fecha consultada y DIAS_VENTANA días después
+  (las consultas se concentran en hoy y los próximos días), no toda la
+  historia. Una consulta fuera de la ventana recarga la cancha alrededor de
+  la nueva fecha, lo que descarta los días viejos; las canchas vencidas se
+  desalojan en la próxima carga.
+- Las escrituras de este proceso lo actualizan al confirmarse la transacción
+  (eventos de la sesión, igual que cache_http.py): altas y bajas ORM se
+  aplican en el lugar; altas por lote (executemany) también; modificaciones
+  y UPDATE/DELETE por conjunto invalidan la cancha (o todo el índice) y se
+  recarga en la próxima consulta. Un rollback descarta los cambios.
+
+Las altas (reserva, lote, partido, fixture) NO consultan el índice: validan
+contra la base con el bloqueo del turno tomado (ver bloqueos.py), que es lo
+único que garantiza que dos pedidos no tomen el mismo turno.
+
+Una carga que se superpone con un commit (el commit empezó antes de que
+termine la lectura) no sabe si lo vio: la cancha queda vencida y se recarga
+en la próxima consulta.
+
+verificar() compara el índice con la base; GET /api/disponibilidad/indice lo
+corre sobre las canchas cargadas y devuelve también las estadísticas.
+"""
+import threading
+import time
+from datetime import date, timedelta
+from bisect import bisect_left, insort
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect
+from app import db
+from models import Reserva, Partido
+import reglas
+
+TTL_SEGUNDOS = 30
+DIAS_VENTANA = 14
+DURACION_MAX_MIN = 1440
+
+_CLAVE_SESION = 'cambios_ocupacion'
+_CLAVE_INICIO = 'inicio_commit_ocupacion'
+_TODAS = None  # invalidar todas las canchas
+
+
+def minutos_absolutos(fecha, hora_inicio, hora_fin):
+    """(inicio, fin) en minutos desde el origen del calendario; cruza medianoche si fin <= inicio."""
+    return reglas.minutos_intervalo(fecha.min, fecha, hora_inicio, hora_fin)
+
+
+class _Lista:
+    __slots__ = ('intervalos',)
+
+    def __init__(self, intervalos=()):
+        self.intervalos = sorted(intervalos)
+
+    def agregar(self, intervalo):
+        insort(self.intervalos, intervalo)
+
+    def quitar(self, intervalo):
+        i = bisect_left(self.intervalos, intervalo)
+        if i < len(self.intervalos) and self.intervalos[i] == intervalo:
+            del self.intervalos[i]
+            return True
+        return False
+
+    def solapa(self, s, e):
+        desde = bisect_left(self.intervalos, (s - DURACION_MAX_MIN,))
+        hasta = bisect_left(self.intervalos, (e,))
+        return any(fin > s for _, fin in self.intervalos[desde:hasta])
+
+
+def _dia(minutos):
+    # fecha en la que empieza un intervalo en minutos absolutos
+    return date.min + timedelta(days=minutos // 1440)
+
+
+class IndiceCancha:
+    def __init__(self, filas, cargado, desde, hasta):
+        por_motivo = {reglas.RESERVA_EXISTENTE: [], reglas.PARTIDO_EXISTENTE: []}
+        for motivo, s, e in filas:
+            por_motivo[motivo].append((s, e))
+        self.listas = {m: _Lista(i) for m, i in por_motivo.items()}
+        self.cargado = cargado
+        self.desde = desde   # turnos cargados: los que empiezan entre desde y hasta
+        self.hasta = hasta
+
+    def cubre(self, fecha):
+        # una consulta vista desde `fecha` mira los turnos que empiezan entre fecha-1 y fecha+1
+        return self.desde < fecha < self.hasta
+
+    def incluye(self, intervalo):
+        return self.desde <= _dia(intervalo[0]) <= self.hasta
+
+    def conflicto(self, s, e):
+        if self.listas[reglas.RESERVA_EXISTENTE].solapa(s, e):
+            return reglas.RESERVA_EXISTENTE
+        if self.listas[reglas.PARTIDO_EXISTENTE].solapa(s, e):
+            return reglas.PARTIDO_EXISTENTE
+        return None
+
+    def contenido(self):
+        return {m: list(l.intervalos) for m, l in self.listas.items()}
+
+
+class VistaFecha:
+    """Ocupación de una cancha vista desde una fecha: misma interfaz que reglas.Ocupacion."""
+    __slots__ = ('_cancha', '_base')
+
+    def __init__(self, cancha, fecha):
+        self._cancha = cancha
+        self._base = (fecha - fecha.min).days * 1440
+
+    def conflicto(self, s, e):
+        return self._cancha.conflicto(self._base + s, self._base + e)
+
+
+def _cargar(ids, desde, hasta):
+    """{id_cancha: [(motivo, inicio, fin)]} de los turnos que empiezan entre desde y hasta, leído de la base."""
+    from disponibilidad import _union_ocupacion
+    cond_r = [Reserva.id_cancha.in_(ids), Reserva.fecha_reserva.between(desde, hasta)]
+    cond_p = [Partido.id_cancha.in_(ids), Partido.fecha_partido.between(desde, hasta)]
+    filas = {i: [] for i in ids}
+    for motivo, id_cancha, f, hi, hf in db.session.execute(_union_ocupacion(cond_r, cond_p)):
+        filas.setdefault(id_cancha, []).append((motivo, *minutos_absolutos(f, hi, hf)))
+    return filas
+
+
+class IndiceOcupacion:
+    def __init__(self, ttl=TTL_SEGUNDOS, dias=DIAS_VENTANA):
+        self.ttl = ttl
+        self.dias = dias
+        self._canchas = {}
+        self._modificada = {}        # id_cancha -> último momento en que se aplicó un cambio
+        self._modificadas_todas = float('-inf')
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.cargas = 0
+        self.invalidaciones = 0
+        self.desalojos = 0
+
+    def cancha(self, id_cancha, fecha=None):
+        """Índice de la cancha con la ventana que cubre `fecha` (hoy si no se indica)."""
+        fecha = fecha or date.today()
+        ahora = time.monotonic()
+        with self._lock:
+            indice = self._canchas.get(id_cancha)
+            if indice is not None and ahora - indice.cargado < self.ttl and indice.cubre(fecha):
+                self.aciertos += 1
+                return indice
+        desde, hasta = fecha - timedelta(days=1), fecha + timedelta(days=self.dias)
+        indice = IndiceCancha(_cargar([id_cancha], desde, hasta)[id_cancha], ahora, desde, hasta)
+        with self._lock:
+            if max(self._modificada.get(id_cancha, float('-inf')), self._modificadas_todas) >= ahora:
+                # se confirmó un cambio mientras se leía: sirve para esta consulta, no se reutiliza
+                indice.cargado = float('-inf')
+            vencidas = [i for i, c in self._canchas.items() if ahora - c.cargado >= self.ttl and i != id_cancha]
+            for i in vencidas:
+                del self._canchas[i]
+            self.desalojos += len(vencidas)
+            self._canchas[id_cancha] = indice
+            self.cargas += 1
+        return indice
+
+    def ocupacion(self, id_cancha, fecha):
+        return VistaFecha(self.cancha(id_cancha, fecha), fecha)
+
+    def aplicar(self, cambios, inicio_commit):
+        """Aplica los cambios confirmados de una transacción cuyo commit empezó en `inicio_commit`.
+
+        Cada cambio es ('alta'|'baja', id_cancha, motivo, (s, e)) o ('invalidar', id_cancha|None).
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            for cambio in cambios:
+                if cambio[0] == 'invalidar':
+                    self.invalidaciones += 1
+                    if cambio[1] is _TODAS:
+                        self._canchas.clear()
+                        self._modificadas_todas = ahora
+                    else:
+                        self._canchas.pop(cambio[1], None)
+                        self._modificada[cambio[1]] = ahora
+                    continue
+                tipo, id_cancha, motivo, intervalo = cambio
+                self._modificada[id_cancha] = ahora
+                indice = self._canchas.get(id_cancha)
+                if indice is None:
+                    continue  # se cargará en la próxima consulta
+                if indice.cargado >= inicio_commit:
+                    # cargada durante el commit: no se sabe si ya lo incluye
+                    self._canchas.pop(id_cancha, None)
+                    continue
+                if not indice.incluye(intervalo):
+                    continue  # fuera de la ventana cargada
+                lista = indice.listas[motivo]
+                if tipo == 'alta':
+                    lista.agregar(intervalo)
+                elif not lista.quitar(intervalo):
+                    self._canchas.pop(id_cancha, None)
+
+    def verificar(self, ids=None):
+        """Diferencias entre el índice (las canchas cargadas, o `ids`) y la base.
+
+        Devuelve {id_cancha: {'faltan': [...], 'sobran': [...]}} sólo para las
+        canchas con diferencias; vacío si el índice está al día.
+        """
+        with self._lock:
+            cargadas = {i: (c.contenido(), c.desde, c.hasta) for i, c in self._canchas.items()}
+        ids = list(cargadas) if ids is None else [i for i in ids if i in cargadas]
+        diferencias = {}
+        for i in ids:
+            contenido, desde, hasta = cargadas[i]
+            esperado = IndiceCancha(_cargar([i], desde, hasta)[i], 0, desde, hasta).contenido()
+            faltan, sobran = [], []
+            for motivo, intervalos in esperado.items():
+                faltan += [(motivo, *x) for x in _resta(intervalos, contenido[motivo])]
+                sobran += [(motivo, *x) for x in _resta(contenido[motivo], intervalos)]
+            if faltan or sobran:
+                diferencias[i] = {'faltan': faltan, 'sobran': sobran}
+        return diferencias
+
+    def estadisticas(self):
+        with self._lock:
+            return {'canchas': len(self._canchas), 'aciertos': self.aciertos, 'cargas': self.cargas,
+                    'invalidaciones': self.invalidaciones, 'desalojos': self.desalojos}
+
+
+def _resta(a, b):
+    """Elementos de la lista ordenada a que no están en b (como multiconjuntos)."""
+    restantes = list(b)
+    out = []
+    for x in a:
+        i = bisect_left(restantes, x)
+        if i < len(restantes) and restantes[i] == x:
+            del restantes[i]
+        else:
+            out.append(x)
+    return out
+
+
+def indice():
+    ext = current_app.extensions
+    if 'indice_ocupacion' not in ext:
+        ext['indice_ocupacion'] = IndiceOcupacion(
+            ttl=current_app.config.get('INDICE_OCUPACION_TTL', TTL_SEGUNDOS),
+            dias=current_app.config.get('INDICE_OCUPACION_DIAS', DIAS_VENTANA),
+        )
+    return ext['indice_ocupacion']
+
+
+def ocupacion(id_cancha, fecha):
+    """Ocupación de la cancha vista desde la fecha, servida desde el índice."""
+    return indice().ocupacion(id_cancha, fecha)
+
+
+# --- Seguimiento de escrituras ---
+
+_MODELOS = {Reserva: (reglas.RESERVA_EXISTENTE, 'fecha_reserva'), Partido: (reglas.PARTIDO_EXISTENTE, 'fecha_partido')}
+_TABLAS = {m.__table__.name: v for m, v in _MODELOS.items()}
+
+
+def _anotar(session, cambios):
+    session.info.setdefault(_CLAVE_SESION, []).extend(cambios)
+
+
+def _cambio(tipo, id_cancha, motivo, fecha, hi, hf):
+    if None in (id_cancha, fecha, hi, hf) or isinstance(fecha, str):
+        return ('invalidar', id_cancha if id_cancha is not None else _TODAS)
+    return (tipo, id_cancha, motivo, minutos_absolutos(fecha, hi, hf))
+
+
+@event.listens_for(Session, 'after_flush')
+def _despues_de_flush(session, _contexto):
+    cambios = []
+    for tipo, objetos in (('alta', session.new), ('baja', session.deleted)):
+        for obj in objetos:
+            if type(obj) in _MODELOS:
+                motivo, col_fecha = _MODELOS[type(obj)]
+                cambios.append(_cambio(tipo, obj.id_cancha, motivo, getattr(obj, col_fecha), obj.hora_inicio, obj.hora_fin))
+    for obj in session.dirty:
+        if type(obj) not in _MODELOS:
+            continue
+        attrs = inspect(obj).attrs
+        # sólo importan los cambios de turno (no de estado, precio, resultado...)
+        if any(attrs[c].history.has_changes() for c in ('id_cancha', _MODELOS[type(obj)][1], 'hora_inicio', 'hora_fin')):
+            for id_cancha in {obj.id_cancha, *attrs.id_cancha.history.deleted}:
+                cambios.append(('invalidar', id_cancha))
+    if cambios:
+        _anotar(session, cambios)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _al_ejecutar(estado):
+    if not (estado.is_insert or estado.is_update or estado.is_delete):
+        return
+    tabla = getattr(estado.statement, 'table', None)
+    datos = _TABLAS.get(getattr(tabla, 'name', None))
+    if datos is None:
+        return
+    motivo, col_fecha = datos
+    filas = estado.parameters
+    if estado.is_insert and isinstance(filas, list) and filas:
+        # alta por lote (executemany): cada fila trae los valores
+        _anotar(estado.session, [
+            _cambio('alta', f.get('id_cancha'), motivo, f.get(col_fecha), f.get('hora_inicio'), f.get('hora_fin'))
+            for f in filas
+        ])
+    else:
+        _anotar(estado.session, [('invalidar', _TODAS)])
+
+
+@event.listens_for(Session, 'before_commit')
+def _antes_de_commit(session):
+    session.info[_CLAVE_INICIO] = time.monotonic()
+
+
+@event.listens_for(Session, 'after_commit')
+def _despues_de_commit(session):
+    inicio = session.info.pop(_CLAVE_INICIO, float('-inf'))
+    cambios = session.info.pop(_CLAVE_SESION, None)
+    if cambios and 'indice_ocupacion' in current_app.extensions:
+        indice().aplicar(cambios, inicio)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _despues_de_rollback(session):
+    session.info.pop(_CLAVE_SESION, None)
+    session.info.pop(_CLAVE_INICIO, None)
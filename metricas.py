@@ -0,0 +1,220 @@
+"""Métricas por pedido: tiempo total, cantidad y tiempo de SQL, expuestas en /metrics.
+
+Se instala en create_app (metricas.instalar) salvo que la config METRICAS sea False:
+
+- before_request/after_request miden el tiempo de cada pedido; los eventos
+  before_cursor_execute/after_cursor_execute del engine cuentan las
+  sentencias SQL y su tiempo dentro del pedido (en flask.g).
+- Cada respuesta lleva un encabezado Server-Timing con 'app' (total) y 'sql'
+  (tiempo y cantidad de sentencias), visible en las herramientas del navegador.
+- Por ruta (la regla de URL, no la URL concreta) y método se acumulan un
+  histograma de duración con BUCKETS fijos y una ventana con las últimas
+  VENTANA duraciones, de la que salen p50/p95/p99 recientes.
+- Una sentencia que tarda más de METRICAS_SQL_LENTA_MS se registra en el log
+  'reservas.sql' (nivel WARNING) con la ruta, la sentencia y los parámetros.
+
+GET /metrics devuelve todo en el formato de texto de Prometheus, junto con las
+estadísticas de las cachés en memoria del proceso (catálogos, ETag, índice de
+ocupación, eventos). Los valores son del proceso: con varios workers cada uno
+expone los suyos.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from flask import current_app, g, has_request_context, request, Response
+from sqlalchemy import event
+
+VENTANA = 1000
+SQL_LENTA_MS = 200
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CUANTILES = (0.5, 0.95, 0.99)
+MAX_PARAMETROS = 500  # caracteres de los parámetros en el log de sentencias lentas
+
+log_sql = logging.getLogger('reservas.sql')
+
+
+class Serie:
+    __slots__ = ('recientes', 'cantidad', 'suma', 'buckets', 'sql_sentencias', 'sql_segundos', 'por_estado')
+
+    def __init__(self, ventana):
+        self.recientes = deque(maxlen=ventana)
+        self.cantidad = 0
+        self.suma = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.sql_sentencias = 0
+        self.sql_segundos = 0.0
+        self.por_estado = {}
+
+    def registrar(self, segundos, estado, sql_n, sql_t):
+        self.recientes.append(segundos)
+        self.cantidad += 1
+        self.suma += segundos
+        for i, limite in enumerate(BUCKETS):
+            if segundos <= limite:
+                self.buckets[i] += 1
+        self.sql_sentencias += sql_n
+        self.sql_segundos += sql_t
+        self.por_estado[estado] = self.por_estado.get(estado, 0) + 1
+
+    def cuantiles(self):
+        orden = sorted(self.recientes)
+        if not orden:
+            return {}
+        return {q: orden[min(len(orden) - 1, int(q * len(orden)))] for q in CUANTILES}
+
+
+class Metricas:
+    def __init__(self, ventana=VENTANA):
+        self.ventana = ventana
+        self._series = {}   # (metodo, ruta) -> Serie
+        self._lock = threading.Lock()
+        self.sql_lentas = 0
+
+    def registrar(self, metodo, ruta, segundos, estado, sql_n, sql_t):
+        with self._lock:
+            serie = self._series.get((metodo, ruta))
+            if serie is None:
+                serie = self._series[(metodo, ruta)] = Serie(self.ventana)
+            serie.registrar(segundos, estado, sql_n, sql_t)
+
+    def resumen(self):
+        """{(metodo, ruta): {'cantidad', 'p50', 'p95', 'p99', 'sql_sentencias', ...}} (para tests y scripts)."""
+        with self._lock:
+            out = {}
+            for clave, s in self._series.items():
+                q = s.cuantiles()
+                out[clave] = {
+                    'cantidad': s.cantidad, 'suma': s.suma,
+                    'p50': q.get(0.5), 'p95': q.get(0.95), 'p99': q.get(0.99),
+                    'sql_sentencias': s.sql_sentencias, 'sql_segundos': s.sql_segundos,
+                }
+            return out
+
+    def prometheus(self):
+        lineas = []
+
+        def tipo(nombre, t, ayuda):
+            lineas.append(f'# HELP {nombre} {ayuda}')
+            lineas.append(f'# TYPE {nombre} {t}')
+
+        with self._lock:
+            series = sorted(self._series.items())
+            tipo('reservas_http_duracion_segundos', 'histogram', 'Duración de los pedidos por ruta.')
+            for (metodo, ruta), s in series:
+                base = _etiquetas(metodo=metodo, ruta=ruta)
+                for limite, n in zip(BUCKETS, s.buckets):
+                    lineas.append(f'reservas_http_duracion_segundos_bucket{_etiquetas(metodo=metodo, ruta=ruta, le=limite)} {n}')
+                lineas.append(f'reservas_http_duracion_segundos_bucket{_etiquetas(metodo=metodo, ruta=ruta, le="+Inf")} {s.cantidad}')
+                lineas.append(f'reservas_http_duracion_segundos_sum{base} {s.suma:.6f}')
+                lineas.append(f'reservas_http_duracion_segundos_count{base} {s.cantidad}')
+
+            tipo('reservas_http_duracion_reciente_segundos', 'gauge',
+                 f'Cuantiles de duración de los últimos {self.ventana} pedidos por ruta.')
+            for (metodo, ruta), s in series:
+                for q, v in s.cuantiles().items():
+                    lineas.append(f'reservas_http_duracion_reciente_segundos{_etiquetas(metodo=metodo, ruta=ruta, quantile=q)} {v:.6f}')
+
+            tipo('reservas_http_peticiones_total', 'counter', 'Pedidos por ruta y código de respuesta.')
+            for (metodo, ruta), s in series:
+                for estado, n in sorted(s.por_estado.items()):
+                    lineas.append(f'reservas_http_peticiones_total{_etiquetas(metodo=metodo, ruta=ruta, estado=estado)} {n}')
+
+            tipo('reservas_http_sql_sentencias_total', 'counter', 'Sentencias SQL ejecutadas por los pedidos de cada ruta.')
+            for (metodo, ruta), s in series:
+                lineas.append(f'reservas_http_sql_sentencias_total{_etiquetas(metodo=metodo, ruta=ruta)} {s.sql_sentencias}')
+
+            tipo('reservas_http_sql_segundos_total', 'counter', 'Tiempo en SQL de los pedidos de cada ruta.')
+            for (metodo, ruta), s in series:
+                lineas.append(f'reservas_http_sql_segundos_total{_etiquetas(metodo=metodo, ruta=ruta)} {s.sql_segundos:.6f}')
+
+            tipo('reservas_sql_lentas_total', 'counter', 'Sentencias SQL por encima de METRICAS_SQL_LENTA_MS.')
+            lineas.append(f'reservas_sql_lentas_total {self.sql_lentas}')
+
+        for nombre, datos in _estadisticas_extensiones():
+            tipo(f'reservas_{nombre}', 'gauge', f'Estadísticas de {nombre} en este proceso.')
+            for clave, valor in sorted(datos.items()):
+                lineas.append(f'reservas_{nombre}{_etiquetas(dato=clave)} {valor}')
+        return '\n'.join(lineas) + '\n'
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(**etiquetas):
+    return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in etiquetas.items()) + '}'
+
+
+def _estadisticas_extensiones():
+    """Estadísticas de las cachés del proceso que ya estén creadas (no las crea)."""
+    ext = current_app.extensions
+    if 'catalogo' in ext:
+        yield 'catalogo', ext['catalogo'].estadisticas()
+    if 'cache_http' in ext:
+        yield 'cache_http', {'respuestas_304': ext['cache_http'].respuestas_304}
+    if 'indice_ocupacion' in ext:
+        yield 'indice_ocupacion', ext['indice_ocupacion'].estadisticas()
+    if 'eventos' in ext:
+        yield 'eventos', ext['eventos'].estadisticas()
+    if 'arranque' in ext:
+        # sólo los tiempos numéricos (no el detalle por blueprint)
+        yield 'arranque', {k: v for k, v in ext['arranque'].items() if isinstance(v, (int, float))}
+
+
+def metricas():
+    return current_app.extensions['metricas']
+
+
+def _ruta():
+    return request.url_rule.rule if request.url_rule is not None else 'sin_ruta'
+
+
+def instalar(app, engine):
+    """Registra los hooks del pedido, los eventos del engine y la ruta /metrics."""
+    app.extensions['metricas'] = Metricas(app.config.get('METRICAS_VENTANA', VENTANA))
+    umbral = app.config.get('METRICAS_SQL_LENTA_MS', SQL_LENTA_MS) / 1000.0
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metricas_inicio', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        inicios = conn.info.get('metricas_inicio')
+        if not inicios:
+            return
+        segundos = time.perf_counter() - inicios.pop()
+        en_pedido = has_request_context() and 'metricas_inicio' in g
+        if en_pedido:
+            g.metricas_sql_n += 1
+            g.metricas_sql_t += segundos
+        if segundos >= umbral:
+            app.extensions['metricas'].sql_lentas += 1
+            log_sql.warning(
+                'SQL lenta (%.1f ms) en %s: %s | parámetros: %.*s',
+                segundos * 1000, f'{request.method} {_ruta()}' if en_pedido else '(fuera de un pedido)',
+                statement, MAX_PARAMETROS, repr(parameters),
+            )
+
+    @app.before_request
+    def _inicio_pedido():
+        g.metricas_inicio = time.perf_counter()
+        g.metricas_sql_n = 0
+        g.metricas_sql_t = 0.0
+
+    @app.after_request
+    def _fin_pedido(resp):
+        if 'metricas_inicio' not in g:
+            return resp
+        segundos = time.perf_counter() - g.metricas_inicio
+        resp.headers.add(
+            'Server-Timing',
+            f'app;dur={segundos * 1000:.2f}, sql;dur={g.metricas_sql_t * 1000:.2f};desc="{g.metricas_sql_n} sentencias"',
+        )
+        metricas().registrar(request.method, _ruta(), segundos, resp.status_code, g.metricas_sql_n, g.metricas_sql_t)
+        return resp
+
+    @app.route('/metrics')
+    def ver_metricas():
+        return Response(metricas().prometheus(), mimetype='text/plain; version=0.0.4')
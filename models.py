@@ -31,6 +31,18 @@ class Reserva(db.Model):
     hora_fin = db.Column(db.Time, nullable=False)
     precio_total = db.Column(db.Numeric(10, 2), nullable=False, default=0)
     usa_iluminacion = db.Column(db.Boolean, nullable=False, default=False)
+    # recargo por iluminación cobrado al reservar (el resumen lo descuenta tal cual)
+    monto_iluminacion = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+
+    # Índices para la detección de solapamientos (cancha + fecha + rango horario)
+    # y para los listados por cliente. Incluyen hora_fin para resolver el chequeo
+    # sólo con el índice.
+    __table_args__ = (
+        db.Index('ix_reservas_cancha_fecha_hora', 'id_cancha', 'fecha_reserva', 'hora_inicio', 'hora_fin'),
+        db.Index('ix_reservas_cliente_fecha', 'id_cliente', 'fecha_reserva'),
+        # sin reutilizar ids en SQLite: el archivo conserva el id_reserva original
+        {'sqlite_autoincrement': True},
+    )
 
     def __repr__(self):
         return f"<Reserva {self.id_reserva} cliente={self.id_cliente} cancha={self.id_cancha} {self.fecha_reserva} {self.hora_inicio}-{self.hora_fin}>"
@@ -166,6 +178,10 @@ class HorarioDisponible(db.Model):
     disponible = db.Column(db.Boolean, nullable=False, default=True)
     requiere_iluminacion = db.Column(db.Boolean, nullable=False, default=False)
 
+    __table_args__ = (
+        db.Index('ix_horarios_cancha_dia', 'id_cancha', 'dia_semana'),
+    )
+
     def __repr__(self):
         return f"<HorarioDisponible {self.id_horario} cancha={self.id_cancha} {self.dia_semana} {self.hora_inicio}-{self.hora_fin}>"
 
@@ -205,6 +221,9 @@ class ReservaServicio(db.Model):
     id_servicio = db.Column(db.Integer, db.ForeignKey('servicios_adicionales.id_servicio'), nullable=False)
     cantidad = db.Column(db.Integer, nullable=False, default=1)
 
+    # sin reutilizar ids en SQLite: el archivo conserva el id_reserva_servicio original
+    __table_args__ = {'sqlite_autoincrement': True}
+
     def __repr__(self):
         return f"<ReservaServicio {self.id_reserva_servicio} reserva={self.id_reserva} servicio={self.id_servicio} x{self.cantidad}>"
 
@@ -239,6 +258,13 @@ class Pago(db.Model):
     fecha_pago = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     estado = db.Column(db.String(50), nullable=True)
 
+    # Último pago de una reserva: id_reserva + fecha_pago
+    __table_args__ = (
+        db.Index('ix_pagos_reserva_fecha', 'id_reserva', 'fecha_pago'),
+        # sin reutilizar ids en SQLite: el archivo conserva el id_pago original
+        {'sqlite_autoincrement': True},
+    )
+
     def __repr__(self):
         return f"<Pago {self.id_pago} reserva={self.id_reserva} {self.monto} {self.fecha_pago} [{self.estado}]>"
 
@@ -301,9 +327,204 @@ class Partido(db.Model):
     goles_visitante = db.Column(db.Integer, nullable=True)
     jugado = db.Column(db.Boolean, nullable=False, default=False)
 
+    __table_args__ = (
+        db.Index('ix_partidos_cancha_fecha_hora', 'id_cancha', 'fecha_partido', 'hora_inicio', 'hora_fin'),
+    )
+
     # Relaciones convenientes a equipos (no crean columnas adicionales)
     equipo_local_rel = db.relationship('Equipo', foreign_keys=[equipo_local], backref='partidos_local', lazy=True)
     equipo_visitante_rel = db.relationship('Equipo', foreign_keys=[equipo_visitante], backref='partidos_visitante', lazy=True)
 
     def __repr__(self):
         return f"<Partido {self.id_partido} {self.fecha_partido} {self.hora_inicio} {self.equipo_local} vs {self.equipo_visitante}>"
+
+
+class PosicionEquipo(db.Model):
+    """Tabla de posiciones: acumulado por equipo dentro de un campeonato.
+
+    Se actualiza incrementalmente al cargar o corregir resultados (ver
+    posiciones.py) y puede reconstruirse con `python posiciones.py`.
+    """
+    __tablename__ = 'tabla_posiciones'
+
+    id_campeonato = db.Column(db.Integer, db.ForeignKey('campeonatos.id_campeonato'), primary_key=True, autoincrement=False)
+    id_equipo = db.Column(db.Integer, db.ForeignKey('equipos.id_equipo'), primary_key=True, autoincrement=False)
+    jugados = db.Column(db.Integer, nullable=False, default=0)
+    ganados = db.Column(db.Integer, nullable=False, default=0)
+    empatados = db.Column(db.Integer, nullable=False, default=0)
+    perdidos = db.Column(db.Integer, nullable=False, default=0)
+    goles_favor = db.Column(db.Integer, nullable=False, default=0)
+    goles_contra = db.Column(db.Integer, nullable=False, default=0)
+    puntos = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<PosicionEquipo camp={self.id_campeonato} equipo={self.id_equipo} pts={self.puntos}>"
+
+
+class UsoDiario(db.Model):
+    """Resumen diario de uso por cancha y deporte para los reportes.
+
+    Se mantiene incrementalmente al crear/eliminar reservas y pagos (ver resumen.py)
+    y puede reconstruirse desde cero con `python resumen.py`.
+
+    Campos:
+    - fecha / mes ('YYYY-MM', para agrupar sin funciones de fecha del motor)
+    - id_cancha, id_deporte (deporte de la cancha al momento de reservar)
+    - reservas_count, minutos_reservados
+    - ingresos: suma de pagos registrados
+    - ingresos_iluminacion: recargo por iluminación de las reservas que lo usan
+      (Reserva.monto_iluminacion, el importe cobrado al reservar)
+    """
+    __tablename__ = 'uso_diario'
+
+    id_uso = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    fecha = db.Column(db.Date, nullable=False)
+    mes = db.Column(db.String(7), nullable=False, index=True)
+    id_cancha = db.Column(db.Integer, db.ForeignKey('canchas.id_cancha'), nullable=False)
+    id_deporte = db.Column(db.Integer, db.ForeignKey('deportes.id_deporte'), nullable=True)
+    reservas_count = db.Column(db.Integer, nullable=False, default=0)
+    minutos_reservados = db.Column(db.Integer, nullable=False, default=0)
+    ingresos = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    ingresos_iluminacion = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+    # id_deporte puede ser NULL (cancha sin deporte): la clave única usa
+    # coalesce(id_deporte, 0) para que esas filas también sean únicas y sirva
+    # de destino del INSERT ... ON CONFLICT de resumen.py
+    __table_args__ = (
+        db.Index('uq_uso_diario_clave', 'fecha', 'id_cancha', db.func.coalesce(id_deporte, 0), unique=True),
+    )
+
+    def __repr__(self):
+        return f"<UsoDiario {self.fecha} cancha={self.id_cancha} reservas={self.reservas_count}>"
+
+
+class BloqueoCanchaFecha(db.Model):
+    """Fila de bloqueo por (cancha, fecha) para serializar las altas que compiten por un turno.
+
+    Antes de verificar solapamientos, quien va a insertar una reserva o un partido
+    actualiza (o crea) la fila de cada día que ocupa. Eso toma el bloqueo de
+    escritura (fila en Postgres/MySQL, base completa en SQLite) hasta el commit,
+    de modo que dos altas sobre la misma cancha y día no pueden verificar y
+    escribir a la vez. Ver bloqueos.py.
+    """
+    __tablename__ = 'bloqueos_cancha_fecha'
+
+    # Sin FK: se bloquea antes de validar que la cancha exista
+    id_cancha = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    fecha = db.Column(db.Date, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<BloqueoCanchaFecha cancha={self.id_cancha} {self.fecha} v{self.version}>"
+
+
+class TareaBorrado(db.Model):
+    """Borrado por lotes en segundo plano de una cancha o un cliente (ver borrado.py).
+
+    El estado vive en la base para que cualquier worker lo informe y, si el
+    proceso que la corría muere, otro la retome: `dueno` es quien la está
+    corriendo y `latido` la hora de su último avance.
+    """
+    __tablename__ = 'tareas_borrado'
+
+    id_tarea = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    tipo = db.Column(db.String(20), nullable=False)   # 'cancha' o 'cliente'
+    id_objetivo = db.Column(db.Integer, nullable=False)
+    estado = db.Column(db.String(20), nullable=False, default='pendiente')
+    reservas_borradas = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    inicio = db.Column(db.DateTime, nullable=False)
+    fin = db.Column(db.DateTime, nullable=True)
+    latido = db.Column(db.DateTime, nullable=False)
+    dueno = db.Column(db.String(64), nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_tareas_borrado_objetivo', 'tipo', 'id_objetivo'),
+    )
+
+    def __repr__(self):
+        return f"<TareaBorrado {self.id_tarea} {self.tipo}={self.id_objetivo} {self.estado}>"
+
+
+class EventoOcupacion(db.Model):
+    """Cambio de ocupación de una (cancha, fecha) para los flujos SSE de todos los procesos.
+
+    Se inserta en la misma transacción que la reserva/partido/pago que lo
+    produce (si hay rollback, no hay evento). Cada proceso lee los nuevos por
+    id y los reparte a sus oyentes; sólo se conservan los últimos. Ver eventos.py.
+    """
+    __tablename__ = 'eventos_ocupacion'
+
+    # AUTOINCREMENT en SQLite: los ids nunca se reutilizan al purgar los viejos
+    id_evento = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    # Sin FK: el evento de una baja sobrevive a la cancha borrada
+    id_cancha = db.Column(db.Integer, nullable=False)
+    fecha = db.Column(db.Date, nullable=False)
+    tipo = db.Column(db.String(20), nullable=False)
+    datos = db.Column(db.Text, nullable=False)  # JSON del turno
+
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    def __repr__(self):
+        return f"<EventoOcupacion {self.id_evento} {self.tipo} cancha={self.id_cancha} {self.fecha}>"
+
+
+class ReservaArchivada(db.Model):
+    """Reserva histórica movida fuera de `reservas` (ver archivo.py).
+
+    Mismas columnas (y mismo id_reserva) que Reserva, para poder unir ambas
+    tablas en los reportes. Las verificaciones de disponibilidad sólo miran
+    `reservas`, que queda acotada a las fechas recientes y futuras.
+    """
+    __tablename__ = 'reservas_archivo'
+
+    id_reserva = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id_cliente = db.Column(db.Integer, db.ForeignKey('clientes.id_cliente'), nullable=False)
+    id_cancha = db.Column(db.Integer, db.ForeignKey('canchas.id_cancha'), nullable=False)
+    id_estado = db.Column(db.Integer, db.ForeignKey('estado_reserva.id_estado'), nullable=False)
+    fecha_reserva = db.Column(db.Date, nullable=False, index=True)
+    hora_inicio = db.Column(db.Time, nullable=False)
+    hora_fin = db.Column(db.Time, nullable=False)
+    precio_total = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    usa_iluminacion = db.Column(db.Boolean, nullable=False, default=False)
+    # recargo por iluminación cobrado al reservar (el resumen lo descuenta tal cual)
+    monto_iluminacion = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_reservas_archivo_cancha_fecha', 'id_cancha', 'fecha_reserva'),
+        db.Index('ix_reservas_archivo_cliente_fecha', 'id_cliente', 'fecha_reserva'),
+    )
+
+    def __repr__(self):
+        return f"<ReservaArchivada {self.id_reserva} cancha={self.id_cancha} {self.fecha_reserva}>"
+
+
+class PagoArchivado(db.Model):
+    """Pago de una reserva archivada (mismas columnas e id que Pago)."""
+    __tablename__ = 'pagos_archivo'
+
+    id_pago = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id_reserva = db.Column(db.Integer, db.ForeignKey('reservas_archivo.id_reserva'), nullable=False, index=True)
+    id_metodo = db.Column(db.Integer, db.ForeignKey('metodos_pago.id_metodo'), nullable=False)
+    monto = db.Column(db.Numeric(10, 2), nullable=False)
+    fecha_pago = db.Column(db.DateTime, nullable=False)
+    estado = db.Column(db.String(50), nullable=True)
+
+    def __repr__(self):
+        return f"<PagoArchivado {self.id_pago} reserva={self.id_reserva} {self.monto}>"
+
+
+class ReservaServicioArchivada(db.Model):
+    """Servicio adicional de una reserva archivada (mismas columnas e id que ReservaServicio)."""
+    __tablename__ = 'reserva_servicio_archivo'
+
+    id_reserva_servicio = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id_reserva = db.Column(db.Integer, db.ForeignKey('reservas_archivo.id_reserva'), nullable=False, index=True)
+    id_servicio = db.Column(db.Integer, db.ForeignKey('servicios_adicionales.id_servicio'), nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False, default=1)
+
+    # sin reutilizar ids en SQLite: el archivo conserva el id_reserva_servicio original
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    def __repr__(self):
+        return f"<ReservaServicioArchivada {self.id_reserva_servicio} reserva={self.id_reserva} servicio={self.id_servicio}>"
@@ -0,0 +1,88 @@
+"""Perfiles de configuración del motor SQLite.
+
+El perfil se elige con la variable de entorno RESERVAS_SQLITE_PERFIL (o la
+clave de configuración SQLITE_PERFIL):
+
+- 'defecto': comportamiento original (journal DELETE, synchronous FULL, sin
+  ajustes). Es el valor por defecto.
+- 'produccion': WAL para que las lecturas no esperen a las escrituras,
+  synchronous=NORMAL (seguro con WAL), busy_timeout para esperar el lock de
+  escritura en lugar de fallar con 'database is locked', caché de páginas y
+  mmap más grandes, y un pool de conexiones acorde a varios hilos/workers.
+
+Los PRAGMA se aplican en el evento 'connect' del engine, es decir una vez por
+cada conexión nueva del pool. Con otros motores (URI que no es sqlite) no se
+hace nada.
+"""
+import os
+from sqlalchemy import event
+
+VARIABLE_ENTORNO = 'RESERVAS_SQLITE_PERFIL'
+
+PERFILES = {
+    'defecto': {
+        'pragmas': {},
+        'engine': {},
+    },
+    'produccion': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 10000,      # ms
+            'cache_size': -32000,       # negativo = KiB (~32 MB por conexión)
+            'mmap_size': 268435456,     # 256 MB
+            'temp_store': 'MEMORY',
+        },
+        'engine': {
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_timeout': 30,
+            'pool_pre_ping': False,
+            # espera del driver al lock (segundos); coincide con busy_timeout
+            'connect_args': {'timeout': 10, 'check_same_thread': False},
+        },
+    },
+}
+
+
+def nombre_perfil(app):
+    perfil = app.config.get('SQLITE_PERFIL') or os.environ.get(VARIABLE_ENTORNO) or 'defecto'
+    if perfil not in PERFILES:
+        raise ValueError(f"Perfil SQLite desconocido: {perfil}. Opciones: {', '.join(PERFILES)}")
+    return perfil
+
+
+def es_sqlite_archivo(uri):
+    return uri.startswith('sqlite') and ':memory:' not in uri and uri.rstrip('/') != 'sqlite:'
+
+
+def configurar(app):
+    """Completa SQLALCHEMY_ENGINE_OPTIONS según el perfil. Llamar antes de db.init_app."""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+    perfil = nombre_perfil(app)
+    app.config['SQLITE_PERFIL'] = perfil
+    if not es_sqlite_archivo(uri):
+        return
+    opciones = dict(PERFILES[perfil]['engine'])
+    # lo que venga explícito en la configuración tiene prioridad
+    opciones.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opciones
+
+
+def instalar_pragmas(engine, perfil):
+    """Registra el hook que aplica los PRAGMA del perfil a cada conexión nueva."""
+    pragmas = PERFILES[perfil]['pragmas']
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _aplicar(dbapi_conn, _registro):
+        cur = dbapi_conn.cursor()
+        for nombre, valor in pragmas.items():
+            cur.execute(f'PRAGMA {nombre}={valor}')
+        cur.close()
+
+
+def pragmas_actuales(conn, nombres=('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size')):
+    """Lee los PRAGMA de una conexión SQLAlchemy (para diagnóstico y tests)."""
+    return {n: conn.exec_driver_sql(f'PRAGMA {n}').scalar() for n in nombres}
@@ -0,0 +1,124 @@
+"""Paginación por cursor (keyset) y proyección de campos para los listados.
+
+Query params comunes:
+- limit: cantidad máxima de elementos por página (1..MAX_LIMIT)
+- after: cursor de la página anterior (valor de next_cursor, último id visto)
+- fields: lista separada por comas de los campos a devolver
+
+Si no se envía limit ni after el listado conserva su formato anterior (lista
+JSON) para no romper a los clientes existentes. Con limit/after la respuesta
+es {'items': [...], 'next_cursor': <id o null>}.
+"""
+from datetime import date, time
+from decimal import Decimal
+from flask import jsonify
+
+MAX_LIMIT = 1000
+
+
+def leer_parametros(args, campos_validos):
+    """Valida limit/after/fields. Lanza ValueError con un mensaje para el cliente."""
+    limit = args.get('limit')
+    after = args.get('after')
+    fields = args.get('fields')
+
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except Exception:
+            raise ValueError('limit debe ser un entero')
+        if limit < 1 or limit > MAX_LIMIT:
+            raise ValueError(f'limit debe estar entre 1 y {MAX_LIMIT}')
+    if after is not None:
+        try:
+            after = int(after)
+        except Exception:
+            raise ValueError('after inválido')
+    if fields is not None:
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+        invalidos = [f for f in fields if f not in campos_validos]
+        if invalidos or not fields:
+            raise ValueError(f"fields inválidos: {', '.join(invalidos) or '(vacío)'}. Permitidos: {', '.join(campos_validos)}")
+
+    return {
+        'limit': limit,
+        'after': after,
+        'fields': fields,
+        'paginado': limit is not None or after is not None,
+    }
+
+
+def campos_pedidos(params, campos_validos):
+    return params['fields'] or list(campos_validos)
+
+
+def valor_json(v):
+    if isinstance(v, Decimal):
+        return str(v)
+    if isinstance(v, time):
+        return v.strftime('%H:%M')
+    if isinstance(v, date):
+        return v.isoformat()
+    return v
+
+
+def construir_consulta(query, columnas, compuestos, pk, params, orden=None):
+    """Aplica proyección, cursor (after) y orden a una query ORM.
+
+    - columnas: {nombre: columna} de campos simples.
+    - compuestos: {nombre: (lista de columnas etiquetadas, fn(fila) -> valor)}
+      para campos armados a partir de varias columnas (ej. objetos anidados).
+      Las joins que necesiten las agrega quien llama, sólo si el campo se pidió.
+    - pk: nombre del campo (en columnas) usado como cursor.
+    - orden: orden a usar cuando no se pagina (por defecto, pk).
+
+    No aplica limit. Devuelve (query, nombres de los campos pedidos).
+    """
+    nombres = campos_pedidos(params, list(columnas) + list(compuestos))
+    entidades = [columnas[n].label(n) for n in nombres if n in columnas]
+    if pk not in nombres:
+        entidades.append(columnas[pk].label(pk))
+    for n in nombres:
+        if n in compuestos:
+            entidades.extend(compuestos[n][0])
+
+    q = query.with_entities(*entidades)
+    pk_col = columnas[pk]
+    if params['after'] is not None:
+        q = q.filter(pk_col > params['after'])
+    if params['paginado'] or orden is None:
+        q = q.order_by(pk_col)
+    else:
+        q = q.order_by(*orden)
+    return q, nombres
+
+
+def fila_a_item(f, nombres, compuestos):
+    item = {}
+    for n in nombres:
+        if n in compuestos:
+            item[n] = compuestos[n][1](f)
+        else:
+            item[n] = valor_json(getattr(f, n))
+    return item
+
+
+def seleccionar(query, columnas, compuestos, pk, params, orden=None):
+    """Proyección + paginación keyset (ver construir_consulta). Devuelve (items, next_cursor)."""
+    q, nombres = construir_consulta(query, columnas, compuestos, pk, params, orden)
+    if params['limit']:
+        q = q.limit(params['limit'] + 1)
+
+    filas = q.all()
+    next_cursor = None
+    if params['limit'] and len(filas) > params['limit']:
+        filas = filas[:params['limit']]
+        next_cursor = getattr(filas[-1], pk)
+
+    return [fila_a_item(f, nombres, compuestos) for f in filas], next_cursor
+
+
+def respuesta(items, next_cursor, params):
+    if params['paginado']:
+        return jsonify({'items': items, 'next_cursor': next_cursor})
+    return jsonify(items)
@@ -0,0 +1,158 @@
+"""Mantenimiento de la tabla de posiciones (tabla tabla_posiciones).
+
+GET /api/campeonatos/<id>/tabla lee de esta tabla en lugar de recorrer todos
+los partidos. Al cargar un resultado se suma su aporte a los dos equipos; al
+corregirlo se resta el resultado anterior y se suma el nuevo, dentro de la
+misma transacción.
+
+Para reconstruir la tabla desde cero (backfill o verificación)::
+    python posiciones.py [id_campeonato]
+"""
+import sys
+from collections import defaultdict
+from sqlalchemy import update
+from app import db
+from models import PosicionEquipo, Partido, Equipo
+from resumen import insertar_o_sumar
+
+PUNTOS_VICTORIA = 3
+PUNTOS_EMPATE = 1
+
+CAMPOS = ('jugados', 'ganados', 'empatados', 'perdidos', 'goles_favor', 'goles_contra', 'puntos')
+
+
+def aporte(goles_propios, goles_rival):
+    """Aporte de un partido jugado a la fila de un equipo, en el orden de CAMPOS."""
+    gano = goles_propios > goles_rival
+    empato = goles_propios == goles_rival
+    return (
+        1,
+        int(gano),
+        int(empato),
+        int(goles_propios < goles_rival),
+        goles_propios,
+        goles_rival,
+        PUNTOS_VICTORIA if gano else (PUNTOS_EMPATE if empato else 0),
+    )
+
+
+def bloquear_partido(id_partido):
+    """Bloquea el partido hasta el fin de la transacción. Llamar antes de leerlo.
+
+    Un UPDATE sin cambios sobre la fila: en Postgres toma el lock de la fila y
+    en SQLite el de escritura de la base (donde SELECT ... FOR UPDATE no
+    existe). Dos cargas del mismo resultado quedan en serie y la segunda lee
+    el resultado que dejó la primera antes de descontarlo.
+    """
+    db.session.execute(
+        update(Partido).where(Partido.id_partido == id_partido).values(jugado=Partido.jugado)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def aplicar_resultado(partido, goles_local, goles_visitante, signo=1):
+    """Suma (signo=1) o resta (signo=-1) un resultado a los dos equipos. No hace commit.
+
+    Los incrementos se aplican en el motor (ver resumen.insertar_o_sumar).
+    """
+    tabla = PosicionEquipo.__table__
+    insertar_o_sumar(tabla, [tabla.c.id_campeonato, tabla.c.id_equipo], CAMPOS, [
+        {'id_campeonato': partido.id_campeonato, 'id_equipo': equipo,
+         **{c: signo * v for c, v in zip(CAMPOS, valores)}}
+        for equipo, valores in ((partido.equipo_local, aporte(goles_local, goles_visitante)),
+                                (partido.equipo_visitante, aporte(goles_visitante, goles_local)))
+    ])
+
+
+def registrar_resultado(partido, goles_local, goles_visitante):
+    """Carga o corrige el resultado de un partido y ajusta la tabla por diferencia. No hace commit.
+
+    El partido debe leerse después de bloquear_partido(). Si ya estaba jugado
+    se descuenta primero el resultado anterior.
+    """
+    if partido.jugado and partido.goles_local is not None and partido.goles_visitante is not None:
+        aplicar_resultado(partido, partido.goles_local, partido.goles_visitante, signo=-1)
+    partido.goles_local = goles_local
+    partido.goles_visitante = goles_visitante
+    partido.jugado = True
+    aplicar_resultado(partido, goles_local, goles_visitante)
+
+
+def calcular(id_campeonato=None):
+    """Tabla calculada desde cero: {(id_campeonato, id_equipo): [valores en orden de CAMPOS]}."""
+    acumulado = defaultdict(lambda: [0] * len(CAMPOS))
+    q = db.session.query(
+        Partido.id_campeonato, Partido.equipo_local, Partido.equipo_visitante, Partido.goles_local, Partido.goles_visitante,
+    ).filter(Partido.jugado == True, Partido.goles_local.isnot(None), Partido.goles_visitante.isnot(None))  # noqa: E712
+    if id_campeonato is not None:
+        q = q.filter(Partido.id_campeonato == id_campeonato)
+    for camp, local, visitante, gl, gv in q.yield_per(1000):
+        for equipo, valores in ((local, aporte(gl, gv)), (visitante, aporte(gv, gl))):
+            a = acumulado[(camp, equipo)]
+            for i, v in enumerate(valores):
+                a[i] += v
+    return acumulado
+
+
+def recalcular(id_campeonato=None):
+    """Reemplaza la tabla (de un campeonato o de todos) por el cálculo desde cero. No hace commit."""
+    acumulado = calcular(id_campeonato)
+    q = PosicionEquipo.query
+    if id_campeonato is not None:
+        q = q.filter_by(id_campeonato=id_campeonato)
+    q.delete(synchronize_session=False)
+    filas = [
+        {'id_campeonato': camp, 'id_equipo': equipo, **dict(zip(CAMPOS, valores))}
+        for (camp, equipo), valores in acumulado.items()
+    ]
+    if filas:
+        db.session.execute(PosicionEquipo.__table__.insert(), filas)
+    return len(filas)
+
+
+def reconstruir(id_campeonato=None):
+    """Igual que recalcular(), pero hace commit."""
+    n = recalcular(id_campeonato)
+    db.session.commit()
+    return n
+
+
+def quitar_equipo(id_equipo):
+    PosicionEquipo.query.filter_by(id_equipo=id_equipo).delete(synchronize_session=False)
+
+
+def quitar_campeonato(id_campeonato):
+    PosicionEquipo.query.filter_by(id_campeonato=id_campeonato).delete(synchronize_session=False)
+
+
+def tabla(id_campeonato):
+    """Posiciones ordenadas por puntos, diferencia de gol, goles a favor y nombre.
+
+    Incluye los equipos que todavía no jugaron (con todo en cero).
+    """
+    filas = (
+        db.session.query(Equipo.id_equipo, Equipo.nombre, *[getattr(PosicionEquipo, c) for c in CAMPOS])
+        .outerjoin(PosicionEquipo, (PosicionEquipo.id_equipo == Equipo.id_equipo)
+                   & (PosicionEquipo.id_campeonato == id_campeonato))
+        .filter(Equipo.id_campeonato == id_campeonato)
+        .all()
+    )
+    out = []
+    for f in filas:
+        item = {'id_equipo': f.id_equipo, 'nombre': f.nombre, **{c: getattr(f, c) or 0 for c in CAMPOS}}
+        item['diferencia'] = item['goles_favor'] - item['goles_contra']
+        out.append(item)
+    out.sort(key=lambda i: (-i['puntos'], -i['diferencia'], -i['goles_favor'], i['nombre']))
+    for pos, item in enumerate(out, start=1):
+        item['posicion'] = pos
+    return out
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    app = create_app()
+    id_camp = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    with app.app_context():
+        n = reconstruir(id_camp)
+        print(f'Tabla de posiciones reconstruida: {n} filas')
@@ -0,0 +1,205 @@
+"""Reglas de reserva de turnos, compiladas a intervalos enteros de minutos.
+
+Todas las validaciones de un turno candidato viven acá y las usan el alta de
+reservas (individual y por lote), la verificación /api/reservas/check, el alta
+de partidos, la grilla y la matriz de disponibilidad y el fixture:
+
+1. validar_horas: minutos 00/30, ventana 10:00..01:00 del día siguiente y
+   último inicio 23:00 (sólo turnos de reserva; no depende de la cancha).
+2. ReglasCancha: duración según el deporte y horarios disponibles de la
+   cancha. Se compila una vez (por pedido) y evalúa cada candidato en O(log n).
+3. Ocupacion: reservas y partidos existentes de la fecha y sus vecinas, en
+   minutos relativos a la fecha; conflicto() en O(log n).
+
+Los minutos son relativos a las 00:00 de la fecha del turno; un turno con
+hora_fin <= hora_inicio termina al día siguiente (fin > 1440).
+"""
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+import catalogo
+
+# Ventana global de reservas: desde las 10:00 hasta la 01:00 del día siguiente.
+# No se permite iniciar después de las 23:00 y las horas van cada 30 minutos.
+VENTANA_INICIO_MIN = 10 * 60
+VENTANA_FIN_MIN = 25 * 60
+ULTIMO_INICIO_MIN = 23 * 60
+PASO_MIN = 30
+
+DIAS_SEMANA_ES = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+# Fallback por texto para canchas que no referencian el catálogo de deportes
+DURACIONES_MIN = {
+    'padel': 60,
+    'pádel': 60,
+    'tenis': 120,
+    'futbol': 90,
+    'fútbol': 90,
+    'basket': 60,
+    'basquet': 60,
+    'baloncesto': 60,
+}
+
+# Motivos (en orden de evaluación)
+HORA_INVALIDA = 'HORA_INVALIDA'
+FUERA_DE_RANGO = 'FUERA_DE_RANGO'
+INICIO_TARDIO = 'INICIO_TARDIO'
+DURACION_INVALIDA = 'DURACION_INVALIDA'
+HORARIO_NO_DISPONIBLE = 'HORARIO_NO_DISPONIBLE'
+RESERVA_EXISTENTE = 'RESERVA_EXISTENTE'
+PARTIDO_EXISTENTE = 'PARTIDO_EXISTENTE'
+
+
+def dia_semana_es(fecha):
+    return DIAS_SEMANA_ES[fecha.weekday()]
+
+
+def hora_a_min(t):
+    return t.hour * 60 + t.minute
+
+
+def minutos_intervalo(fecha_base, fecha, hora_inicio, hora_fin):
+    """Convierte un turno a (inicio, fin) en minutos relativos a fecha_base.
+
+    Si hora_fin <= hora_inicio el turno termina al día siguiente.
+    """
+    offset = (fecha - fecha_base).days * 1440
+    s = offset + hora_a_min(hora_inicio)
+    e = offset + hora_a_min(hora_fin)
+    if e <= s:
+        e += 1440
+    return s, e
+
+
+def duracion_cancha(cancha):
+    """Duración esperada de un turno según el deporte de la cancha (en minutos).
+
+    El deporte se lee del catálogo en caché, sin cargar la relación cancha.deporte
+    (un id que falta en la instantánea la recarga). El texto tipo_deporte queda
+    para canchas sin deporte del catálogo.
+    """
+    deporte_cat = catalogo.deporte(cancha.id_deporte)
+    if deporte_cat:
+        try:
+            return int(deporte_cat.duracion_minutos or 60)
+        except Exception:
+            return 60
+    deporte = (cancha.tipo_deporte or '').strip().lower()
+    return DURACIONES_MIN.get(deporte, 60)
+
+
+def validar_horas(hora_inicio, hora_fin):
+    """Reglas de un turno de reserva que no dependen de la cancha. Devuelve un motivo o None."""
+    if hora_inicio.minute not in (0, 30) or hora_fin.minute not in (0, 30):
+        return HORA_INVALIDA
+    s = hora_a_min(hora_inicio)
+    e = hora_a_min(hora_fin)
+    if e <= s:
+        e += 1440
+    if s < VENTANA_INICIO_MIN or e > VENTANA_FIN_MIN:
+        return FUERA_DE_RANGO
+    if s > ULTIMO_INICIO_MIN:
+        return INICIO_TARDIO
+    return None
+
+
+class Cobertura:
+    """Horarios disponibles de un día: ¿algún (inicio, fin) cumple inicio <= a y fin >= b?
+
+    a y b son horas del día en minutos (un turno que cruza medianoche se compara
+    con su hora de fin del día siguiente, como siempre se hizo). Ordenados por
+    inicio con el máximo acumulado de fin, la consulta es una búsqueda binaria.
+    """
+    __slots__ = ('_inicios', '_max_fin')
+
+    def __init__(self, intervalos):
+        intervalos = sorted(intervalos)
+        self._inicios = [i for i, _ in intervalos]
+        self._max_fin = list(accumulate((f for _, f in intervalos), max))
+
+    def cubre(self, a, b):
+        k = bisect_right(self._inicios, a)
+        return k > 0 and self._max_fin[k - 1] >= b
+
+
+class ReglasCancha:
+    """Duración y horarios disponibles de una cancha, compilados por día de la semana."""
+
+    def __init__(self, duracion, horarios):
+        """horarios: iterable de objetos con dia_semana, hora_inicio, hora_fin y disponible
+        (HorarioDisponible). Sin horarios definidos la cancha está disponible siempre."""
+        horarios = list(horarios)
+        self.duracion = duracion
+        self.hay_horarios = bool(horarios)
+        por_dia = [[] for _ in DIAS_SEMANA_ES]
+        nombres = [d.lower() for d in DIAS_SEMANA_ES]
+        for h in horarios:
+            if not h.disponible:
+                continue
+            intervalo = (hora_a_min(h.hora_inicio), hora_a_min(h.hora_fin))
+            dia = (h.dia_semana or '').lower()
+            for d, nombre in enumerate(nombres):
+                if not dia or dia == nombre:
+                    por_dia[d].append(intervalo)
+        self._por_dia = [Cobertura(i) for i in por_dia]
+
+    @classmethod
+    def de_cancha(cls, cancha, horarios=None):
+        """Compila las reglas de la cancha (una consulta de horarios si no se pasan)."""
+        if horarios is None:
+            from models import HorarioDisponible
+            horarios = HorarioDisponible.query.filter_by(id_cancha=cancha.id_cancha).all()
+        return cls(duracion_cancha(cancha), horarios)
+
+    def en_horario(self, fecha, s, e):
+        """True si [s, e) (minutos relativos a fecha) está dentro de un horario disponible del día."""
+        if not self.hay_horarios:
+            return True
+        return self._por_dia[fecha.weekday()].cubre(s % 1440, e % 1440)
+
+    def evaluar(self, fecha, s, e, ocupacion=None, turno=True):
+        """Motivo por el que [s, e) no se puede tomar, o None.
+
+        turno=True aplica la duración del deporte (reservas); los partidos sólo
+        validan horarios y ocupación. La ventana y los minutos se validan antes
+        con validar_horas.
+        """
+        if turno and e - s != self.duracion:
+            return DURACION_INVALIDA
+        if not self.en_horario(fecha, s, e):
+            return HORARIO_NO_DISPONIBLE
+        if ocupacion is not None:
+            return ocupacion.conflicto(s, e)
+        return None
+
+
+class _Intervalos:
+    __slots__ = ('_inicios', '_max_fin')
+
+    def __init__(self, intervalos):
+        intervalos = sorted(intervalos)
+        self._inicios = [s for s, _ in intervalos]
+        self._max_fin = list(accumulate((e for _, e in intervalos), max))
+
+    def solapa(self, s, e):
+        # alguno de los que empiezan antes de e termina después de s
+        k = bisect_left(self._inicios, e)
+        return k > 0 and self._max_fin[k - 1] > s
+
+
+class Ocupacion:
+    """Reservas y partidos existentes en minutos relativos a una fecha."""
+
+    def __init__(self, filas):
+        """filas: iterable de (inicio, fin, motivo) con motivo RESERVA_EXISTENTE o PARTIDO_EXISTENTE."""
+        por_motivo = {RESERVA_EXISTENTE: [], PARTIDO_EXISTENTE: []}
+        for s, e, motivo in filas:
+            por_motivo[motivo].append((s, e))
+        self._reservas = _Intervalos(por_motivo[RESERVA_EXISTENTE])
+        self._partidos = _Intervalos(por_motivo[PARTIDO_EXISTENTE])
+
+    def conflicto(self, s, e):
+        if self._reservas.solapa(s, e):
+            return RESERVA_EXISTENTE
+        if self._partidos.solapa(s, e):
+            return PARTIDO_EXISTENTE
+        return None
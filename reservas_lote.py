@@ -0,0 +1,160 @@
+"""Alta de reservas en lote: lista explícita de ocurrencias o recurrencia semanal/quincenal.
+
+Todas las ocurrencias se validan contra reservas y partidos existentes con una
+sola consulta de ocupación (UNION ALL acotada a las fechas del lote y sus días
+anterior y siguiente) y un barrido en memoria; las aceptadas se insertan con un único
+executemany en la misma transacción.
+
+Formato del pedido (POST /api/reservas/bulk)::
+
+    {
+      "id_cliente": 1, "id_cancha": 2,
+      "hora_inicio": "18:00", "hora_fin": "19:00",      # por defecto para cada ocurrencia
+      "usa_iluminacion": false, "servicios_adicionales": [...],
+      "modo": "todo_o_nada" | "parcial",
+      "ocurrencias": [{"fecha_reserva": "2025-11-11", "hora_inicio": "20:00", "hora_fin": "21:00"}, ...]
+      # o bien
+      "recurrencia": {"frecuencia": "semanal" | "quincenal", "desde": "2025-08-05", "hasta": "2025-12-02"}
+    }
+"""
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from decimal import Decimal
+from app import db
+from models import Reserva, Partido
+from disponibilidad import _union_ocupacion
+import reglas
+from reglas import minutos_intervalo
+
+MAX_OCURRENCIAS = 200
+FRECUENCIAS = {'semanal': 7, 'quincenal': 14}
+MODOS = ('todo_o_nada', 'parcial')
+
+
+def _fecha(s):
+    return datetime.strptime(s, '%Y-%m-%d').date()
+
+
+def _hora(s):
+    return datetime.strptime(s, '%H:%M').time()
+
+
+def expandir_ocurrencias(data):
+    """Lista de (fecha, hora_inicio, hora_fin). Lanza ValueError con un mensaje para el cliente."""
+    hi_defecto = data.get('hora_inicio')
+    hf_defecto = data.get('hora_fin')
+    ocurrencias = data.get('ocurrencias')
+    recurrencia = data.get('recurrencia')
+    if (ocurrencias is None) == (recurrencia is None):
+        raise ValueError('Enviar "ocurrencias" (lista) o "recurrencia" (sólo uno de los dos)')
+
+    paso = None
+    if recurrencia is not None:
+        paso = FRECUENCIAS.get(recurrencia.get('frecuencia')) if isinstance(recurrencia, dict) else None
+        if not paso:
+            raise ValueError(f"recurrencia.frecuencia debe ser una de: {', '.join(FRECUENCIAS)}")
+
+    try:
+        if ocurrencias is not None:
+            out = [
+                (_fecha(o['fecha_reserva']), _hora(o.get('hora_inicio') or hi_defecto), _hora(o.get('hora_fin') or hf_defecto))
+                for o in ocurrencias
+            ]
+        else:
+            desde = _fecha(recurrencia['desde'])
+            hasta = _fecha(recurrencia['hasta'])
+            hi, hf = _hora(hi_defecto), _hora(hf_defecto)
+            out = []
+            f = desde
+            while f <= hasta and len(out) <= MAX_OCURRENCIAS:
+                out.append((f, hi, hf))
+                f += timedelta(days=paso)
+    except Exception:
+        raise ValueError('Ocurrencias inválidas. fecha: YYYY-MM-DD, horas: HH:MM')
+
+    if not out:
+        raise ValueError('El lote no tiene ocurrencias')
+    if len(out) > MAX_OCURRENCIAS:
+        raise ValueError(f'Como máximo {MAX_OCURRENCIAS} ocurrencias por lote')
+    return out
+
+
+def _ocupacion(id_cancha, base, fechas):
+    """Intervalos ocupados (inicio, fin, motivo) en minutos relativos a `base`, ordenados."""
+    # el día anterior (turnos que cruzan medianoche hacia la fecha) y el siguiente
+    # (ocurrencias que cruzan medianoche sobre turnos de ese día)
+    consulta_fechas = sorted({f + timedelta(days=d) for f in fechas for d in (-1, 0, 1)})
+    consulta = _union_ocupacion(
+        [Reserva.id_cancha == id_cancha, Reserva.fecha_reserva.in_(consulta_fechas)],
+        [Partido.id_cancha == id_cancha, Partido.fecha_partido.in_(consulta_fechas)],
+    )
+    ocupados = []
+    for motivo, _, f, hi, hf in db.session.execute(consulta):
+        s, e = minutos_intervalo(base, f, hi, hf)
+        ocupados.append((s, e, motivo))
+    ocupados.sort()
+    return ocupados
+
+
+def _conflicto(ocupados, s, e):
+    # Un turno dura como máximo un día: sólo pueden solaparse los que empiezan en [s - 1440, e)
+    desde = bisect_left(ocupados, (s - 1440,))
+    hasta = bisect_left(ocupados, (e,))
+    motivos = {o[2] for o in ocupados[desde:hasta] if o[1] > s}
+    for motivo in ('RESERVA_EXISTENTE', 'PARTIDO_EXISTENTE', 'DUPLICADA_EN_LOTE'):
+        if motivo in motivos:
+            return motivo
+    return None
+
+
+def evaluar(cancha, reglas_cancha, ocurrencias):
+    """Valida cada ocurrencia con las mismas reglas que el alta individual (ver reglas.py).
+
+    Devuelve una lista de dicts {fecha_reserva, hora_inicio, hora_fin, minutos, motivo}
+    con motivo None para las ocurrencias válidas. Las ocurrencias válidas se suman
+    a la ocupación, así dos ocurrencias del mismo lote no se pisan entre sí.
+    """
+    fechas = [f for f, _, _ in ocurrencias]
+    base = min(fechas) - timedelta(days=1)
+    ocupados = _ocupacion(cancha.id_cancha, base, fechas)
+
+    resultados = []
+    for f, hi, hf in ocurrencias:
+        s, e = minutos_intervalo(base, f, hi, hf)
+        offset = (f - base).days * 1440
+        motivo = reglas.validar_horas(hi, hf)
+        if motivo == reglas.INICIO_TARDIO:
+            motivo = reglas.FUERA_DE_RANGO  # el lote siempre lo informó así
+        if motivo is None:
+            motivo = reglas_cancha.evaluar(f, s - offset, e - offset)
+        if motivo is None:
+            motivo = _conflicto(ocupados, s, e)
+        if motivo is None:
+            insort(ocupados, (s, e, 'DUPLICADA_EN_LOTE'))
+
+        resultados.append({
+            'fecha_reserva': f,
+            'hora_inicio': hi,
+            'hora_fin': hf,
+            'minutos': e - s,
+            'motivo': motivo,
+        })
+    return resultados
+
+
+def iluminacion(cancha, minutos, usa_iluminacion):
+    """Recargo por iluminación de un turno (precio_iluminacion × horas), 0 si no la usa."""
+    if not usa_iluminacion:
+        return Decimal('0.00')
+    return (Decimal(cancha.precio_iluminacion or 0) * Decimal(minutos) / Decimal(60)).quantize(Decimal('0.01'))
+
+
+def precio(cancha, minutos, usa_iluminacion, servicios):
+    """Precio de un turno: precio_hora × horas + iluminación + servicios (lista de (ServicioCat, cantidad))."""
+    horas = Decimal(minutos) / Decimal(60)
+    total = Decimal(cancha.precio_hora or 0) * horas
+    if usa_iluminacion:
+        total += Decimal(cancha.precio_iluminacion or 0) * horas
+    for svc, cantidad in servicios:
+        total += Decimal(svc.precio_adicional) * Decimal(cantidad)
+    return total.quantize(Decimal('0.01'))
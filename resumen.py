@@ -0,0 +1,211 @@
+"""Mantenimiento del resumen diario de uso (tabla uso_diario).
+
+Los reportes de uso y ranking leen de esta tabla en lugar de recorrer
+`reservas`. Cada alta/baja de reserva o pago ajusta la fila de
+(fecha, cancha, deporte) dentro de la misma transacción.
+
+Para reconstruir el resumen desde cero (backfill o verificación)::
+    python resumen.py
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import delete, func, literal_column, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from models import UsoDiario, Reserva, Cancha, Pago, ReservaArchivada, PagoArchivado
+
+CENTAVOS = Decimal('0.01')
+CONTADORES = ('reservas_count', 'minutos_reservados', 'ingresos', 'ingresos_iluminacion')
+# INSERT ... ON CONFLICT DO UPDATE de cada motor soportado
+_INSERT = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def _minutos(reserva):
+    s = datetime.combine(reserva.fecha_reserva, reserva.hora_inicio)
+    e = datetime.combine(reserva.fecha_reserva, reserva.hora_fin)
+    if e <= s:
+        e = e + timedelta(days=1)
+    return int((e - s).total_seconds() // 60)
+
+
+def _iluminacion(reserva):
+    # importe guardado al reservar: no depende del precio actual de la cancha
+    return Decimal(reserva.monto_iluminacion or 0) if reserva.usa_iluminacion else Decimal('0')
+
+
+def insertar_o_sumar(tabla, clave, columnas, filas):
+    """INSERT ... ON CONFLICT (clave) DO UPDATE SET col = col + excluded.col para cada columna. No hace commit.
+
+    Una sola sentencia (executemany) para todas las filas: el motor aplica cada
+    incremento sobre el valor vigente, sin leer la fila antes, así que dos
+    transacciones concurrentes no pierden sumas ni chocan al crear la misma
+    fila. `clave` debe coincidir con la clave primaria o un índice único.
+    """
+    if not filas:
+        return
+    sentencia = _INSERT[db.session.get_bind().dialect.name](tabla)
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=clave,
+        set_={c: tabla.c[c] + getattr(sentencia.excluded, c) for c in columnas},
+    )
+    db.session.execute(sentencia, filas)
+
+
+def _sumar(deltas):
+    """Suma {(fecha, id_cancha, id_deporte): [reservas, minutos, ingresos, iluminación]} al resumen. No hace commit.
+
+    Los descuentos son deltas negativos.
+    """
+    tabla = UsoDiario.__table__
+    # la misma expresión que el índice único uq_uso_diario_clave (0 literal, no parámetro)
+    clave = [tabla.c.fecha, tabla.c.id_cancha, func.coalesce(tabla.c.id_deporte, literal_column('0'))]
+    insertar_o_sumar(tabla, clave, CONTADORES, [
+        {'fecha': fecha, 'mes': fecha.strftime('%Y-%m'), 'id_cancha': id_cancha, 'id_deporte': id_deporte,
+         **dict(zip(CONTADORES, a))}
+        for (fecha, id_cancha, id_deporte), a in deltas.items()
+    ])
+
+
+def registrar_reserva(reserva, cancha, signo=1):
+    """Suma (signo=1) o resta (signo=-1) una reserva al resumen. No hace commit."""
+    minutos = _minutos(reserva)
+    _sumar({
+        (reserva.fecha_reserva, reserva.id_cancha, cancha.id_deporte if cancha else None):
+            [signo, signo * minutos, Decimal('0'), signo * _iluminacion(reserva)],
+    })
+
+
+def registrar_reservas(reservas, cancha):
+    """Suma un lote de reservas de una misma cancha, con una fila de resumen por fecha. No hace commit."""
+    deltas = defaultdict(lambda: [0, 0, Decimal('0'), Decimal('0')])
+    for r in reservas:
+        a = deltas[(r.fecha_reserva, cancha.id_cancha, cancha.id_deporte)]
+        a[0] += 1
+        a[1] += _minutos(r)
+        a[3] += _iluminacion(r)
+    _sumar(deltas)
+
+
+def registrar_pago(reserva, monto, signo=1):
+    """Suma (o resta) un pago a los ingresos del día de la reserva. No hace commit."""
+    cancha = Cancha.query.get(reserva.id_cancha)
+    _sumar({
+        (reserva.fecha_reserva, reserva.id_cancha, cancha.id_deporte if cancha else None):
+            [0, 0, signo * Decimal(monto), Decimal('0')],
+    })
+
+
+def quitar_reserva(reserva):
+    """Descuenta una reserva que se va a eliminar, junto con sus pagos. No hace commit."""
+    cancha = Cancha.query.get(reserva.id_cancha)
+    registrar_reserva(reserva, cancha, signo=-1)
+    pagado = db.session.query(func.coalesce(func.sum(Pago.monto), 0)).filter(Pago.id_reserva == reserva.id_reserva).scalar()
+    if pagado:
+        registrar_pago(reserva, pagado, signo=-1)
+
+
+def quitar_reservas(*condiciones, reservas=Reserva, pagos=Pago):
+    """Descuenta de una vez todas las reservas (y sus pagos) que cumplen las condiciones.
+
+    Agrega por (fecha, cancha, deporte) y descuenta cada total con un solo
+    upsert. Llamar antes de borrarlas. No hace commit.
+    Con reservas=ReservaArchivada, pagos=PagoArchivado descuenta reservas archivadas.
+    """
+    _sumar({clave: [-x for x in a] for clave, a in calcular(*condiciones, reservas=reservas, pagos=pagos).items()})
+
+
+def cambiar_deporte(id_cancha, id_deporte):
+    """Pasa al deporte nuevo las filas de resumen de una cancha cuyo id_deporte cambia. No hace commit.
+
+    Las altas, pagos y bajas usan el deporte actual de la cancha: sin mover las
+    filas, descontar una reserva anterior dejaría +1 en la fila vieja y -1 en la
+    nueva. Un DELETE ... RETURNING quita las filas de otros deportes y sus totales
+    se suman por fecha a las del deporte nuevo con el mismo upsert.
+    """
+    tabla = UsoDiario.__table__
+    movidas = db.session.execute(
+        delete(tabla)
+        .where(tabla.c.id_cancha == id_cancha, tabla.c.id_deporte.is_distinct_from(id_deporte))
+        .returning(tabla.c.fecha, *[tabla.c[c] for c in CONTADORES])
+    ).all()
+    deltas = defaultdict(lambda: [0, 0, Decimal('0'), Decimal('0')])
+    for fecha, *valores in movidas:
+        a = deltas[(fecha, id_cancha, id_deporte)]
+        for i, v in enumerate(valores):
+            a[i] += v or 0
+    _sumar(deltas)
+
+
+def quitar_reservas_de_cliente(id_cliente):
+    """Descuenta todas las reservas (y pagos) de un cliente antes de borrarlas."""
+    quitar_reservas(Reserva.id_cliente == id_cliente)
+
+
+def quitar_cancha(id_cancha):
+    """Elimina el resumen de una cancha que se borra físicamente."""
+    UsoDiario.query.filter_by(id_cancha=id_cancha).delete(synchronize_session=False)
+
+
+def calcular(*condiciones, reservas=Reserva, pagos=Pago):
+    """Calcula el resumen a partir de reservas y pagos (sin escribirlo).
+
+    Sin condiciones es el resumen completo; con condiciones sobre `reservas`, el
+    aporte de esas reservas solamente. Por defecto lee las tablas activas; con
+    reservas=ReservaArchivada, pagos=PagoArchivado lee el archivo.
+    """
+    canchas = {c.id_cancha: c for c in Cancha.query.all()}
+    acumulado = defaultdict(lambda: [0, 0, Decimal('0'), Decimal('0')])
+
+    R, P = reservas, pagos
+    filas = select(
+        R.fecha_reserva, R.id_cancha, R.hora_inicio, R.hora_fin, R.usa_iluminacion, R.monto_iluminacion,
+    ).where(*condiciones).execution_options(yield_per=1000)
+    for r in db.session.execute(filas):
+        cancha = canchas.get(r.id_cancha)
+        minutos = _minutos(r)
+        a = acumulado[(r.fecha_reserva, r.id_cancha, cancha.id_deporte if cancha else None)]
+        a[0] += 1
+        a[1] += minutos
+        a[3] += _iluminacion(r)
+
+    totales = (
+        db.session.query(R.fecha_reserva, R.id_cancha, func.sum(P.monto))
+        .join(P, P.id_reserva == R.id_reserva)
+        .filter(*condiciones)
+        .group_by(R.fecha_reserva, R.id_cancha)
+    )
+    for fecha, id_cancha, total in totales:
+        cancha = canchas.get(id_cancha)
+        acumulado[(fecha, id_cancha, cancha.id_deporte if cancha else None)][2] += Decimal(total or 0)
+
+    return acumulado
+
+
+def reconstruir():
+    """Reemplaza el contenido de uso_diario por el cálculo desde cero (activas + archivo). Hace commit."""
+    acumulado = calcular()
+    for clave, a in calcular(reservas=ReservaArchivada, pagos=PagoArchivado).items():
+        acumulado[clave] = [x + y for x, y in zip(acumulado[clave], a)]
+    UsoDiario.query.delete(synchronize_session=False)
+    filas = [
+        {
+            'fecha': fecha, 'mes': fecha.strftime('%Y-%m'), 'id_cancha': id_cancha, 'id_deporte': id_deporte,
+            'reservas_count': a[0], 'minutos_reservados': a[1],
+            'ingresos': a[2].quantize(CENTAVOS), 'ingresos_iluminacion': a[3].quantize(CENTAVOS),
+        }
+        for (fecha, id_cancha, id_deporte), a in acumulado.items()
+    ]
+    if filas:
+        db.session.execute(UsoDiario.__table__.insert(), filas)
+    db.session.commit()
+    return len(filas)
+
+
+if __name__ == '__main__':
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        n = reconstruir()
+        print(f'Resumen uso_diario reconstruido: {n} filas')
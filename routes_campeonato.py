@@ -1,23 +1,47 @@
 from flask import Blueprint, request, jsonify
 from app import db
-from models import Campeonato, Equipo, Partido, Cancha, Reserva, HorarioDisponible
-from datetime import datetime
+from models import Campeonato, Equipo, Partido, Cancha
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from sqlalchemy import insert
 from decimal import Decimal
+from paginacion import leer_parametros, seleccionar, respuesta
+from disponibilidad import ocupacion_turno
+import reglas
+from reglas import ReglasCancha, minutos_intervalo
+from bloqueos import bloquear_turno, bloquear_varias, fechas_ocupadas
+import fixture
+import posiciones
+from eventos import publicar_turno, publicar_turnos
 
 bp = Blueprint('campeonatos', __name__, url_prefix='/api')
 
+# Mensaje del alta de partido (409) por cada motivo de reglas.py
+ERRORES_PARTIDO = {
+    reglas.HORARIO_NO_DISPONIBLE: 'HORARIO_DISPONIBLE: La cancha no tiene horario disponible para el rango solicitado',
+    reglas.RESERVA_EXISTENTE: 'RESERVAS: Existe una reserva superpuesta en la cancha',
+    reglas.PARTIDO_EXISTENTE: 'PARTIDOS: Existe otro partido superpuesto en la cancha',
+}
+
 
 ### Campeonatos CRUD
+CAMPOS_CAMPEONATO = {
+    'id_campeonato': Campeonato.id_campeonato,
+    'nombre': Campeonato.nombre,
+    'fecha_inicio': Campeonato.fecha_inicio,
+    'fecha_fin': Campeonato.fecha_fin,
+    'estado': Campeonato.estado,
+}
+
+
 @bp.route('/campeonatos', methods=['GET'])
 def list_campeonatos():
-    items = Campeonato.query.all()
-    return jsonify([{
-        'id_campeonato': c.id_campeonato,
-        'nombre': c.nombre,
-        'fecha_inicio': c.fecha_inicio.isoformat() if c.fecha_inicio else None,
-        'fecha_fin': c.fecha_fin.isoformat() if c.fecha_fin else None,
-        'estado': c.estado,
-    } for c in items])
+    try:
+        params = leer_parametros(request.args, CAMPOS_CAMPEONATO)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    items, next_cursor = seleccionar(Campeonato.query, CAMPOS_CAMPEONATO, {}, 'id_campeonato', params)
+    return respuesta(items, next_cursor, params)
 
 
 @bp.route('/campeonatos/<int:id_campeonato>', methods=['GET'])
@@ -52,16 +76,37 @@ def update_campeonato(id_campeonato):
 @bp.route('/campeonatos/<int:id_campeonato>', methods=['DELETE'])
 def delete_campeonato(id_campeonato):
     c = Campeonato.query.get_or_404(id_campeonato)
+    posiciones.quitar_campeonato(id_campeonato)
     db.session.delete(c)
     db.session.commit()
     return jsonify({'message':'eliminado'})
 
 
+@bp.route('/campeonatos/<int:id_campeonato>/tabla', methods=['GET'])
+def tabla_posiciones(id_campeonato):
+    """Tabla de posiciones del campeonato (ver posiciones.py)."""
+    Campeonato.query.get_or_404(id_campeonato)
+    return jsonify({'id_campeonato': id_campeonato, 'tabla': posiciones.tabla(id_campeonato)})
+
+
 ### Equipos CRUD
+CAMPOS_EQUIPO = {
+    'id_equipo': Equipo.id_equipo,
+    'nombre': Equipo.nombre,
+    'id_campeonato': Equipo.id_campeonato,
+    'representante': Equipo.representante,
+    'telefono': Equipo.telefono,
+}
+
+
 @bp.route('/equipos', methods=['GET'])
 def list_equipos():
-    items = Equipo.query.all()
-    return jsonify([{'id_equipo': e.id_equipo, 'nombre': e.nombre, 'id_campeonato': e.id_campeonato, 'representante': e.representante, 'telefono': e.telefono} for e in items])
+    try:
+        params = leer_parametros(request.args, CAMPOS_EQUIPO)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    items, next_cursor = seleccionar(Equipo.query, CAMPOS_EQUIPO, {}, 'id_equipo', params)
+    return respuesta(items, next_cursor, params)
 
 
 @bp.route('/equipos/<int:id_equipo>', methods=['GET'])
@@ -97,6 +142,7 @@ def update_equipo(id_equipo):
 @bp.route('/equipos/<int:id_equipo>', methods=['DELETE'])
 def delete_equipo(id_equipo):
     e = Equipo.query.get_or_404(id_equipo)
+    posiciones.quitar_equipo(id_equipo)
     db.session.delete(e)
     db.session.commit()
     return jsonify({'message':'eliminado'})
@@ -128,6 +174,9 @@ def create_partido():
     if hora_inicio >= hora_fin:
         return jsonify({'error':'hora_inicio debe ser anterior a hora_fin'}), 400
 
+    # Bloqueo de la cancha/fecha antes de verificar conflictos (ver bloqueos.py)
+    bloquear_turno(id_cancha, fecha_partido, hora_inicio, hora_fin)
+
     # existencia
     if not Campeonato.query.get(id_campeonato):
         return jsonify({'error':'Campeonato no encontrado'}), 400
@@ -137,39 +186,13 @@ def create_partido():
     if not cancha or not cancha.activa:
         return jsonify({'error':'Cancha no existe o no está activa'}), 400
 
-    # Validar horarios disponibles (HORARIO_DISPONIBLE)
-    horarios = HorarioDisponible.query.filter_by(id_cancha=id_cancha).all()
-    if horarios:
-        weekday_es = ['Lunes','Martes','Miércoles','Jueves','Viernes','Sábado','Domingo'][fecha_partido.weekday()]
-        ok = False
-        for h in horarios:
-            if h.dia_semana and h.dia_semana.lower() != weekday_es.lower():
-                continue
-            if (h.hora_inicio <= hora_inicio) and (h.hora_fin >= hora_fin) and h.disponible:
-                ok = True
-                break
-        if not ok:
-            return jsonify({'error':'HORARIO_DISPONIBLE: La cancha no tiene horario disponible para el rango solicitado'}), 409
-
-    # Verificar conflictos con reservas
-    overlapping_res = Reserva.query.filter(
-        Reserva.id_cancha == id_cancha,
-        Reserva.fecha_reserva == fecha_partido,
-        Reserva.hora_fin > hora_inicio,
-        Reserva.hora_inicio < hora_fin,
-    ).first()
-    if overlapping_res:
-        return jsonify({'error':'RESERVAS: Existe una reserva superpuesta en la cancha'}), 409
-
-    # Verificar conflictos con otros partidos
-    overlapping_partido = Partido.query.filter(
-        Partido.id_cancha == id_cancha,
-        Partido.fecha_partido == fecha_partido,
-        Partido.hora_fin > hora_inicio,
-        Partido.hora_inicio < hora_fin,
-    ).first()
-    if overlapping_partido:
-        return jsonify({'error':'PARTIDOS: Existe otro partido superpuesto en la cancha'}), 409
+    # Horarios disponibles y conflictos con reservas y partidos (incluye los del
+    # día anterior que cruzan medianoche); un partido no exige la duración del deporte
+    s, e = minutos_intervalo(fecha_partido, fecha_partido, hora_inicio, hora_fin)
+    ocupados = ocupacion_turno(id_cancha, fecha_partido, hora_inicio, hora_fin)
+    motivo = ReglasCancha.de_cancha(cancha).evaluar(fecha_partido, s, e, ocupados, turno=False)
+    if motivo:
+        return jsonify({'error': ERRORES_PARTIDO[motivo]}), 409
 
     partido = Partido(
         id_campeonato=id_campeonato,
@@ -182,21 +205,129 @@ def create_partido():
         jugado=False,
     )
     db.session.add(partido)
+    db.session.flush()
+    publicar_turno('ocupado', id_cancha, fecha_partido, hora_inicio, hora_fin, 'partido', partido.id_partido)
     db.session.commit()
     return jsonify({'id_partido': partido.id_partido}), 201
 
 
+
+@bp.route('/campeonatos/<int:id_campeonato>/fixture', methods=['POST'])
+def generar_fixture(id_campeonato):
+    """Genera y programa todos los partidos del campeonato (todos contra todos). Ver fixture.py.
+
+    Body (todo opcional salvo fecha_inicio si el campeonato no la tiene):
+    - fecha_inicio / fecha_fin: YYYY-MM-DD (por defecto las del campeonato)
+    - ida_y_vuelta: bool
+    - canchas: lista de id_cancha (por defecto todas las activas, o las de id_deporte)
+    - id_deporte: filtra las canchas por deporte
+    - hora_desde / hora_hasta: HH:MM (por defecto 10:00 a 23:00)
+    - dias_semana: lista de días en español (ej. ["Sábado", "Domingo"])
+    - duracion_minutos: por defecto la del deporte de cada cancha
+    """
+    campeonato = Campeonato.query.get_or_404(id_campeonato)
+    data = request.get_json() or {}
+    try:
+        fecha_inicio = date_from_str(data['fecha_inicio']) if data.get('fecha_inicio') else campeonato.fecha_inicio
+        fecha_fin = date_from_str(data['fecha_fin']) if data.get('fecha_fin') else campeonato.fecha_fin
+        hora_desde = time_from_str(data.get('hora_desde') or '10:00')
+        hora_hasta = time_from_str(data.get('hora_hasta') or '23:00')
+        duracion = int(data['duracion_minutos']) if data.get('duracion_minutos') else None
+        ids_canchas = [int(i) for i in data.get('canchas') or []]
+        id_deporte = int(data['id_deporte']) if data.get('id_deporte') else None
+    except Exception:
+        return jsonify({'error': 'Campos inválidos o formato incorrecto. fechas: YYYY-MM-DD, horas: HH:MM'}), 400
+    if not fecha_inicio:
+        return jsonify({'error': 'fecha_inicio es obligatoria (el campeonato no tiene una)'}), 400
+    fecha_fin = fecha_fin or fecha_inicio + timedelta(days=fixture.MAX_DIAS_FIXTURE)
+    if fecha_fin < fecha_inicio:
+        return jsonify({'error': 'fecha_fin debe ser posterior a fecha_inicio'}), 400
+    if duracion is not None and (duracion <= 0 or duracion % 30):
+        return jsonify({'error': 'duracion_minutos debe ser múltiplo de 30'}), 400
+
+    if Partido.query.filter_by(id_campeonato=id_campeonato).first():
+        return jsonify({'error': 'El campeonato ya tiene partidos cargados'}), 409
+
+    equipos = [e.id_equipo for e in Equipo.query.filter_by(id_campeonato=id_campeonato).order_by(Equipo.id_equipo)]
+    if len(equipos) < 2:
+        return jsonify({'error': 'Se necesitan al menos 2 equipos'}), 400
+
+    q = Cancha.query.filter(Cancha.activa == True)  # noqa: E712
+    if ids_canchas:
+        q = q.filter(Cancha.id_cancha.in_(ids_canchas))
+    if id_deporte is not None:
+        q = q.filter(Cancha.id_deporte == id_deporte)
+    canchas = q.all()
+    if not canchas:
+        return jsonify({'error': 'No hay canchas activas para programar'}), 400
+
+    rondas = fixture.round_robin(equipos, bool(data.get('ida_y_vuelta')))
+    agenda = fixture.Agenda(canchas, fecha_inicio, fecha_fin, hora_desde, hora_hasta, data.get('dias_semana'), duracion)
+    asignados, sin_lugar = fixture.programar(rondas, agenda)
+    if sin_lugar:
+        return jsonify({
+            'error': 'No hay turnos suficientes para programar todos los partidos en el rango pedido',
+            'programables': len(asignados),
+            'sin_lugar': len(sin_lugar),
+        }), 409
+
+    def hora(m):
+        m %= 1440
+        return time(m // 60, m % 60)
+
+    # Bloquear (cancha, fecha) de lo asignado, incluido el día siguiente de los
+    # partidos que cruzan medianoche, todo en una llamada, y re-verificar: la
+    # ocupación se leyó sin bloqueo
+    fechas_por_cancha = defaultdict(set)
+    for _, _, _, fecha, s, e, id_cancha in asignados:
+        fechas_por_cancha[id_cancha].update(fechas_ocupadas(fecha, hora(s), hora(e)))
+    bloquear_varias(fechas_por_cancha)
+    if fixture.conflictos(asignados):
+        db.session.rollback()
+        return jsonify({'error': 'La ocupación de las canchas cambió durante la generación. Reintente.'}), 409
+
+    filas = [{
+        'id_campeonato': id_campeonato,
+        'id_cancha': id_cancha,
+        'equipo_local': local,
+        'equipo_visitante': visitante,
+        'fecha_partido': fecha,
+        'hora_inicio': hora(s),
+        'hora_fin': hora(e),
+        'jugado': False,
+    } for _, local, visitante, fecha, s, e, id_cancha in asignados]
+    db.session.execute(insert(Partido), filas)  # executemany
+    publicar_turnos('ocupado', [
+        (f['id_cancha'], f['fecha_partido'], f['hora_inicio'], f['hora_fin'], None) for f in filas
+    ], 'partido')
+    db.session.commit()
+
+    return jsonify({
+        'id_campeonato': id_campeonato,
+        'equipos': len(equipos),
+        'rondas': len(rondas),
+        'partidos_creados': len(filas),
+        'fecha_inicio': fecha_inicio.isoformat(),
+        'fecha_fin': max(a[3] for a in asignados).isoformat(),
+        'canchas': sorted(fechas_por_cancha),
+    }), 201
+
 @bp.route('/partidos/<int:id_partido>/resultado', methods=['PUT'])
 def set_resultado(id_partido):
     data = request.get_json() or {}
-    partido = Partido.query.get_or_404(id_partido)
     goles_local = data.get('goles_local')
     goles_visitante = data.get('goles_visitante')
     try:
-        partido.goles_local = int(goles_local)
-        partido.goles_visitante = int(goles_visitante)
+        goles_local = int(goles_local)
+        goles_visitante = int(goles_visitante)
     except Exception:
         return jsonify({'error':'goles_local y goles_visitante deben ser enteros'}), 400
-    partido.jugado = True
+    if goles_local < 0 or goles_visitante < 0:
+        return jsonify({'error':'goles_local y goles_visitante no pueden ser negativos'}), 400
+    # Bloquea el partido (cargas concurrentes en serie), guarda el resultado y
+    # ajusta la tabla de posiciones (resta el anterior si se corrige)
+    posiciones.bloquear_partido(id_partido)
+    partido = Partido.query.get_or_404(id_partido)
+    posiciones.registrar_resultado(partido, goles_local, goles_visitante)
     db.session.commit()
     return jsonify({'message':'resultado guardado'})
@@ -1,7 +1,13 @@
-from flask import Blueprint, request, jsonify
-from models import Cancha, HorarioDisponible, Reserva, Partido, ReservaServicio, Pago
+from flask import Blueprint, request, jsonify, Response, current_app
+from models import Cancha, Deporte, HorarioDisponible, Reserva, Partido
 from datetime import datetime
 from app import db
+from disponibilidad import grilla_disponibilidad, hay_solapamiento
+from paginacion import leer_parametros, seleccionar, respuesta
+from borrado import borrar_cancha, iniciar_en_segundo_plano
+from cache_http import condicional
+import eventos
+import resumen
 
 bp = Blueprint('canchas', __name__)
 
@@ -24,15 +30,54 @@ def cancha_to_dict(c: Cancha):
     }
 
 
+CAMPOS_CANCHA = {
+    'id_cancha': Cancha.id_cancha,
+    'nombre': Cancha.nombre,
+    'tipo_deporte': Cancha.tipo_deporte,
+    'id_deporte': Cancha.id_deporte,
+    'superficie': Cancha.superficie,
+    'precio_hora': Cancha.precio_hora,
+    'iluminacion': Cancha.iluminacion,
+    'activa': Cancha.activa,
+}
+
+
+def _deporte_desde_fila(f):
+    if f.dep_id_deporte is None:
+        return None
+    return {'id_deporte': f.dep_id_deporte, 'nombre': f.dep_nombre, 'duracion_minutos': f.dep_duracion_minutos}
+
+
+COMPUESTOS_CANCHA = {
+    'deporte': (
+        [Deporte.id_deporte.label('dep_id_deporte'), Deporte.nombre.label('dep_nombre'), Deporte.duracion_minutos.label('dep_duracion_minutos')],
+        _deporte_desde_fila,
+    ),
+}
+
+# Orden de las claves igual al de cancha_to_dict
+ORDEN_CAMPOS_CANCHA = ['id_cancha', 'nombre', 'tipo_deporte', 'id_deporte', 'deporte', 'superficie', 'precio_hora', 'iluminacion', 'activa']
+
+
 @bp.route('/', methods=['GET'])
+@condicional('canchas', 'deportes')
 def get_canchas():
+    """Listar canchas. Admite paginación keyset (limit, after) y fields= (ver paginacion.py)."""
+    try:
+        params = leer_parametros(request.args, ORDEN_CAMPOS_CANCHA)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not params['fields']:
+        params['fields'] = ORDEN_CAMPOS_CANCHA
     # Por defecto devolver solo canchas activas. Pasar ?all=true para incluir inactivas.
     include_all = request.args.get('all', 'false').lower() == 'true'
-    if include_all:
-        canchas = Cancha.query.order_by(Cancha.id_cancha).all()
-    else:
-        canchas = Cancha.query.filter_by(activa=True).order_by(Cancha.id_cancha).all()
-    return jsonify([cancha_to_dict(c) for c in canchas])
+    q = Cancha.query
+    if not include_all:
+        q = q.filter_by(activa=True)
+    if 'deporte' in params['fields']:
+        q = q.outerjoin(Deporte, Deporte.id_deporte == Cancha.id_deporte)
+    items, next_cursor = seleccionar(q, CAMPOS_CANCHA, COMPUESTOS_CANCHA, 'id_cancha', params)
+    return respuesta(items, next_cursor, params)
 
 
 @bp.route('/<int:id_cancha>', methods=['GET'])
@@ -90,26 +135,14 @@ def get_horarios_cancha(id_cancha):
                 result.append(hd)
                 continue
 
-            # buscar reservas que solapen
-            reservas_ov = Reserva.query.filter(
-                Reserva.id_cancha == id_cancha,
-                Reserva.fecha_reserva == fecha,
-                Reserva.hora_fin > h.hora_inicio,
-                Reserva.hora_inicio < h.hora_fin,
-            ).first()
-            if reservas_ov:
+            # buscar reservas y partidos que solapen (consulta acotada por índice)
+            if hay_solapamiento(Reserva, id_cancha, fecha, h.hora_inicio, h.hora_fin):
                 hd['disponible_para_fecha'] = False
                 hd['motivo_no_disponible'] = 'RESERVA_EXISTENTE'
                 result.append(hd)
                 continue
 
-            partidos_ov = Partido.query.filter(
-                Partido.id_cancha == id_cancha,
-                Partido.fecha_partido == fecha,
-                Partido.hora_fin > h.hora_inicio,
-                Partido.hora_inicio < h.hora_fin,
-            ).first()
-            if partidos_ov:
+            if hay_solapamiento(Partido, id_cancha, fecha, h.hora_inicio, h.hora_fin):
                 hd['disponible_para_fecha'] = False
                 hd['motivo_no_disponible'] = 'PARTIDO_EXISTENTE'
                 result.append(hd)
@@ -122,6 +155,67 @@ def get_horarios_cancha(id_cancha):
     return jsonify(result)
 
 
+@bp.route('/<int:id_cancha>/disponibilidad', methods=['GET'])
+def get_disponibilidad_cancha(id_cancha):
+    """Grilla de franjas reservables de una cancha para una fecha.
+
+    Query params: fecha=YYYY-MM-DD (obligatorio).
+    Cada franja incluye hora_inicio, hora_fin, disponible y, si está bloqueada, un motivo.
+    """
+    cancha = Cancha.query.get_or_404(id_cancha)
+    try:
+        fecha = datetime.strptime(request.args.get('fecha'), '%Y-%m-%d').date()
+    except Exception:
+        return jsonify({'error': 'fecha es obligatoria, use YYYY-MM-DD'}), 400
+    if not cancha.activa:
+        return jsonify({'error': 'Cancha no existe o no está activa'}), 400
+
+    return jsonify(grilla_disponibilidad(cancha, fecha))
+
+
+@bp.route('/<int:id_cancha>/eventos', methods=['GET'])
+def eventos_cancha(id_cancha):
+    """Flujo SSE con los cambios de ocupación de la cancha en una fecha (ver eventos.py).
+
+    Query params: fecha=YYYY-MM-DD (obligatorio).
+    Eventos: ocupado, liberado, confirmado (data: JSON del turno) y resync.
+    Al reconectar con Last-Event-ID se reenvían los eventos posteriores.
+    """
+    try:
+        fecha = datetime.strptime(request.args.get('fecha'), '%Y-%m-%d').date()
+    except Exception:
+        return jsonify({'error': 'fecha es obligatoria, use YYYY-MM-DD'}), 400
+    Cancha.query.get_or_404(id_cancha)
+
+    broker = eventos.broker()
+    sub = broker.suscribir(id_cancha, fecha)
+    if sub is None:
+        resp = jsonify({'error': 'Demasiadas conexiones de eventos, reintente más tarde'})
+        resp.headers['Retry-After'] = '30'
+        return resp, 503
+
+    previos = []
+    ultimo_id = request.headers.get('Last-Event-ID', '')
+    if ultimo_id.isdigit():
+        previos = eventos.anteriores(id_cancha, fecha, int(ultimo_id))
+    db.session.remove()   # no retener una conexión del pool mientras dura el flujo
+
+    cfg = current_app.config
+    resp = Response(
+        eventos.flujo(
+            broker, sub,
+            latido=cfg.get('EVENTOS_LATIDO', eventos.LATIDO_SEGUNDOS),
+            duracion_max=cfg.get('EVENTOS_DURACION_MAX', eventos.DURACION_MAX_SEGUNDOS),
+            previos=previos,
+        ),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+    # si la conexión se cierra antes de empezar a leer, el generador nunca corre su finally
+    resp.call_on_close(lambda: broker.desuscribir(sub))
+    return resp
+
+
 @bp.route('/', methods=['POST'])
 def create_cancha():
     data = request.get_json() or {}
@@ -151,8 +245,10 @@ def update_cancha(id_cancha):
     for field in ('nombre', 'tipo_deporte', 'superficie', 'precio_hora', 'iluminacion', 'activa'):
         if field in data:
             setattr(cancha, field, data.get(field))
-    # permitir actualizar id_deporte
+    # permitir actualizar id_deporte (el resumen de uso de la cancha pasa al deporte nuevo)
     if 'id_deporte' in data:
+        if data.get('id_deporte') != cancha.id_deporte:
+            resumen.cambiar_deporte(id_cancha, data.get('id_deporte'))
         cancha.id_deporte = data.get('id_deporte')
 
     db.session.commit()
@@ -169,26 +265,16 @@ def delete_cancha(id_cancha):
         db.session.commit()
         return jsonify({'message': 'Cancha desactivada'})
 
-    try:
-        # eliminar servicios/pagos asociados a reservas de esta cancha
-        reservas = Reserva.query.filter_by(id_cancha=id_cancha).all()
-        for r in reservas:
-            ReservaServicio.query.filter_by(id_reserva=r.id_reserva).delete()
-            Pago.query.filter_by(id_reserva=r.id_reserva).delete()
-
-        # eliminar reservas
-        Reserva.query.filter_by(id_cancha=id_cancha).delete()
+    # ?lotes=true: desactiva ahora y borra el historial por lotes en segundo plano
+    if request.args.get('lotes', 'false').lower() == 'true':
+        tarea = iniciar_en_segundo_plano('cancha', id_cancha)
+        return jsonify({'message': 'Cancha desactivada; borrado en curso', 'id_tarea': tarea.id_tarea}), 202
 
-        # eliminar partidos en la cancha
-        Partido.query.filter_by(id_cancha=id_cancha).delete()
-
-        # eliminar horarios disponibles
-        HorarioDisponible.query.filter_by(id_cancha=id_cancha).delete()
-
-        # eliminar la cancha
-        db.session.delete(cancha)
+    try:
+        # reservas (con servicios y pagos), partidos, horarios, bloqueos y resumen, con DELETE por conjunto
+        n = borrar_cancha(id_cancha)
         db.session.commit()
-        return jsonify({'message': 'Cancha eliminada definitivamente'})
+        return jsonify({'message': 'Cancha eliminada definitivamente', 'reservas_eliminadas': n})
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Error al eliminar cancha', 'details': str(e)}), 500
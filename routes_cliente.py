@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
-from models import Cliente, Reserva, ReservaServicio, Pago
+from models import Cliente
 from app import db
+from paginacion import leer_parametros, seleccionar, respuesta
+from borrado import borrar_cliente, iniciar_en_segundo_plano
 
 bp = Blueprint('clientes', __name__)
 
@@ -17,15 +19,31 @@ def cliente_to_dict(c: Cliente):
     }
 
 
+CAMPOS_CLIENTE = {
+    'id_cliente': Cliente.id_cliente,
+    'dni': Cliente.dni,
+    'nombre': Cliente.nombre,
+    'apellido': Cliente.apellido,
+    'telefono': Cliente.telefono,
+    'email': Cliente.email,
+    'activo': Cliente.activo,
+}
+
+
 @bp.route('/', methods=['GET'])
 def get_clientes():
+    """Listar clientes. Admite paginación keyset (limit, after) y fields= (ver paginacion.py)."""
+    try:
+        params = leer_parametros(request.args, CAMPOS_CLIENTE)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     # Por defecto devolvemos solo clientes activos. Pasar ?all=true para incluir inactivos.
     include_all = request.args.get('all', 'false').lower() == 'true'
-    if include_all:
-        clientes = Cliente.query.order_by(Cliente.id_cliente).all()
-    else:
-        clientes = Cliente.query.filter_by(activo=True).order_by(Cliente.id_cliente).all()
-    return jsonify([cliente_to_dict(c) for c in clientes])
+    q = Cliente.query
+    if not include_all:
+        q = q.filter_by(activo=True)
+    items, next_cursor = seleccionar(q, CAMPOS_CLIENTE, {}, 'id_cliente', params)
+    return respuesta(items, next_cursor, params)
 
 
 @bp.route('/<int:id_cliente>', methods=['GET'])
@@ -99,21 +117,16 @@ def delete_cliente(id_cliente):
         db.session.commit()
         return jsonify({'message': 'Cliente desactivado'})
 
-    # Hard delete dentro de transacción: eliminar dependencias y finalmente el cliente
-    try:
-        reservas = Reserva.query.filter_by(id_cliente=id_cliente).all()
-        for r in reservas:
-            # eliminar servicios y pagos vinculados a la reserva
-            ReservaServicio.query.filter_by(id_reserva=r.id_reserva).delete()
-            Pago.query.filter_by(id_reserva=r.id_reserva).delete()
-
-        # eliminar reservas del cliente
-        Reserva.query.filter_by(id_cliente=id_cliente).delete()
+    # ?lotes=true: desactiva ahora y borra el historial por lotes en segundo plano
+    if request.args.get('lotes', 'false').lower() == 'true':
+        tarea = iniciar_en_segundo_plano('cliente', id_cliente)
+        return jsonify({'message': 'Cliente desactivado; borrado en curso', 'id_tarea': tarea.id_tarea}), 202
 
-        # eliminar cliente
-        db.session.delete(cliente)
+    # Hard delete dentro de transacción: reservas (con servicios y pagos) y cliente, con DELETE por conjunto
+    try:
+        n = borrar_cliente(id_cliente)
         db.session.commit()
-        return jsonify({'message': 'Cliente eliminado definitivamente'})
+        return jsonify({'message': 'Cliente eliminado definitivamente', 'reservas_eliminadas': n})
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Error al eliminar cliente', 'details': str(e)}), 500
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from app import db
 from models import Deporte, ServicioAdicional
+import catalogo
+from cache_http import condicional
 
 bp = Blueprint('deportes', __name__)
 
@@ -36,6 +38,7 @@ def deporte_to_dict(d: Deporte):
 
 
 @bp.route('/', methods=['GET'])
+@condicional('deportes', 'servicios_adicionales')
 def list_deportes():
     deps = Deporte.query.order_by(Deporte.nombre).all()
     return jsonify([deporte_to_dict(d) for d in deps])
@@ -70,6 +73,7 @@ def create_deporte():
         created.append(svc)
     if created:
         db.session.commit()
+    catalogo.invalidar(catalogo.DEPORTES, catalogo.SERVICIOS)
     return jsonify(deporte_to_dict(d)), 201
 
 
@@ -95,6 +99,7 @@ def update_deporte(id_deporte):
     db.session.commit()
     if created:
         db.session.commit()
+    catalogo.invalidar(catalogo.DEPORTES, catalogo.SERVICIOS)
     return jsonify(deporte_to_dict(d))
 
 
@@ -104,6 +109,7 @@ def delete_deporte(id_deporte):
     try:
         db.session.delete(d)
         db.session.commit()
+        catalogo.invalidar(catalogo.DEPORTES, catalogo.SERVICIOS)
         return jsonify({'message': 'Deporte eliminado'})
     except Exception as e:
         db.session.rollback()
@@ -132,5 +138,6 @@ def add_servicio(id_deporte):
     svc = ServicioAdicional(nombre=nombre, precio_adicional=precio, id_deporte=id_deporte, activo=bool(data.get('activo', True)))
     db.session.add(svc)
     db.session.commit()
+    catalogo.invalidar(catalogo.SERVICIOS)
     return jsonify({'id_servicio': svc.id_servicio, 'nombre': svc.nombre, 'precio_adicional': str(svc.precio_adicional), 'activo': bool(svc.activo)}), 201
 
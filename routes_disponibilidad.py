@@ -0,0 +1,63 @@
+from flask import Blueprint, request, jsonify
+from datetime import datetime
+from disponibilidad import matriz_disponibilidad
+from indice_ocupacion import indice
+
+bp = Blueprint('disponibilidad', __name__)
+
+# Límite de días por consulta para acotar el tamaño de la respuesta
+MAX_DIAS = 62
+
+
+def parse_date(s):
+    try:
+        return datetime.strptime(s, '%Y-%m-%d').date()
+    except Exception:
+        return None
+
+
+@bp.route('/disponibilidad', methods=['GET'])
+def get_disponibilidad():
+    """Matriz cancha × día × franja de todas las canchas activas.
+
+    Query params: desde, hasta (YYYY-MM-DD, obligatorios), id_deporte (opcional).
+    Ver disponibilidad.matriz_disponibilidad para el formato de la respuesta.
+    """
+    desde = parse_date(request.args.get('desde'))
+    hasta = parse_date(request.args.get('hasta'))
+    if not desde or not hasta:
+        return jsonify({'error': 'desde y hasta son obligatorios. Use YYYY-MM-DD.'}), 400
+    if hasta < desde:
+        return jsonify({'error': 'hasta debe ser igual o posterior a desde'}), 400
+    if (hasta - desde).days + 1 > MAX_DIAS:
+        return jsonify({'error': f'El rango no puede superar {MAX_DIAS} días'}), 400
+
+    id_deporte = request.args.get('id_deporte')
+    if id_deporte:
+        try:
+            id_deporte = int(id_deporte)
+        except Exception:
+            return jsonify({'error': 'id_deporte inválido'}), 400
+    else:
+        id_deporte = None
+
+    return jsonify(matriz_disponibilidad(desde, hasta, id_deporte))
+
+
+@bp.route('/disponibilidad/indice', methods=['GET'])
+def get_indice_ocupacion():
+    """Estadísticas del índice de ocupación en memoria y diferencias con la base.
+
+    Verifica las canchas cargadas en este proceso (ver indice_ocupacion.verificar);
+    'consistente' es False si alguna difiere de lo guardado en la base.
+    """
+    ind = indice()
+    diferencias = ind.verificar()
+    return jsonify({
+        **ind.estadisticas(),
+        'consistente': not diferencias,
+        'diferencias': {
+            str(i): {k: [[m, s, e] for m, s, e in v] for k, v in d.items()}
+            for i, d in diferencias.items()
+        },
+    })
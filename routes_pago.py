@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
 from app import db
-from models import Reserva, MetodoPago, Pago, EstadoReserva
+from models import Reserva, Pago, EstadoReserva
 from decimal import Decimal
+from resumen import registrar_pago
+import catalogo
+from cache_http import condicional
+from eventos import publicar_turno
 
 bp = Blueprint('pagos', __name__)
 
@@ -24,33 +28,42 @@ def pagar_reserva(id_reserva):
     if monto != precio_total:
         return jsonify({'error': 'El monto no coincide con el precio_total de la reserva'}), 400
 
-    metodo = MetodoPago.query.get(id_metodo)
+    metodo = catalogo.metodo(id_metodo)
     if not metodo:
         return jsonify({'error': 'Método de pago no encontrado'}), 400
 
     # Crear registro de pago
     pago = Pago(id_reserva=id_reserva, id_metodo=id_metodo, monto=monto, estado='Completado')
     db.session.add(pago)
+    registrar_pago(reserva, monto)
 
     # Cambiar estado de la reserva a 'Confirmada'
-    estado_confirmada = EstadoReserva.query.filter_by(nombre='Confirmada').first()
+    estado_confirmada = catalogo.estado('Confirmada')
+    estado_creado = False
     if not estado_confirmada:
         # si no existe el estado, crear uno
         estado_confirmada = EstadoReserva(nombre='Confirmada')
         db.session.add(estado_confirmada)
         db.session.flush()
+        estado_creado = True
 
     reserva.id_estado = estado_confirmada.id_estado
+    publicar_turno('confirmado', reserva.id_cancha, reserva.fecha_reserva, reserva.hora_inicio, reserva.hora_fin,
+                   'reserva', id_reserva)
 
     db.session.commit()
+    if estado_creado:
+        catalogo.invalidar(catalogo.ESTADOS)
 
     return jsonify({'id_pago': pago.id_pago, 'id_reserva': id_reserva, 'monto': str(pago.monto)}), 201
 
 
+# sin ABM de métodos por la API: se cachea como el catálogo en memoria
 @bp.route('/api/metodos', methods=['GET'])
+@condicional('metodos_pago', cache_control=f'public, max-age={catalogo.TTL_SEGUNDOS}')
 def list_metodos():
     """Retorna los métodos de pago disponibles."""
-    items = MetodoPago.query.all()
+    items = catalogo.metodos().values()
     return jsonify([{
         'id_metodo': m.id_metodo,
         'nombre': m.nombre
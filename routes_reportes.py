@@ -1,11 +1,19 @@
 from flask import Blueprint, request, jsonify
 from app import db
-from models import Reserva, Cliente, Cancha
+from models import Reserva, Cliente, Cancha, EstadoReserva, UsoDiario
 from datetime import datetime, date
 from sqlalchemy import func
+from paginacion import leer_parametros, campos_pedidos, seleccionar, construir_consulta
+from exportacion import leer_formato, exportar
+from archivo import reservas_para
+from cache_http import condicional
 
 bp = Blueprint('reportes', __name__)
 
+# los reportes incluyen datos de clientes: sólo caché del navegador, siempre revalidando
+CACHE_REPORTES = 'private, no-cache'
+TABLAS_RESERVAS = ('reservas', 'reservas_archivo', 'clientes', 'canchas', 'estado_reserva')
+
 
 def parse_date(s):
     try:
@@ -14,8 +22,56 @@ def parse_date(s):
         return None
 
 
+# Los campos se arman sobre la entidad de reservas a consultar: Reserva o, si el
+# rango incluye fechas archivadas, activas + archivo (ver archivo.reservas_para).
+def campos_reserva_cliente(R):
+    return {
+        'id_reserva': R.id_reserva,
+        'id_cancha': R.id_cancha,
+        'cancha_nombre': Cancha.nombre,
+        'fecha_reserva': R.fecha_reserva,
+        'hora_inicio': R.hora_inicio,
+        'hora_fin': R.hora_fin,
+        'precio_total': R.precio_total,
+        'estado': EstadoReserva.nombre,
+        'usa_iluminacion': R.usa_iluminacion,
+    }
+
+
+def campos_reserva_cancha(R):
+    return {
+        'id_reserva': R.id_reserva,
+        'id_cliente': R.id_cliente,
+        'fecha_reserva': R.fecha_reserva,
+        'hora_inicio': R.hora_inicio,
+        'hora_fin': R.hora_fin,
+        'precio_total': R.precio_total,
+        'estado': EstadoReserva.nombre,
+    }
+
+
+CAMPOS_RESERVA_CLIENTE = campos_reserva_cliente(Reserva)
+CAMPOS_RESERVA_CANCHA = campos_reserva_cancha(Reserva)
+
+
+def _cliente_desde_fila(f):
+    return f"{f.cli_nombre} {f.cli_apellido}" if f.cli_nombre is not None else None
+
+
+COMPUESTOS_RESERVA_CANCHA = {
+    'cliente': ([Cliente.nombre.label('cli_nombre'), Cliente.apellido.label('cli_apellido')], _cliente_desde_fila),
+}
+
+ORDEN_CAMPOS_RESERVA_CANCHA = ['id_reserva', 'id_cliente', 'cliente', 'fecha_reserva', 'hora_inicio', 'hora_fin', 'precio_total', 'estado']
+
+
 @bp.route('/reportes/reservas_por_cliente', methods=['GET'])
+@condicional(*TABLAS_RESERVAS, cache_control=CACHE_REPORTES)
 def reservas_por_cliente():
+    """Reservas de un cliente. Admite limit/after/fields (ver paginacion.py); al paginar se ordena por id_reserva.
+
+    format=ndjson|csv devuelve las filas en streaming en lugar de un único JSON.
+    """
     id_cliente = request.args.get('id_cliente')
     if not id_cliente:
         return jsonify({'error':'id_cliente es obligatorio'}), 400
@@ -23,31 +79,48 @@ def reservas_por_cliente():
         id_cliente = int(id_cliente)
     except Exception:
         return jsonify({'error':'id_cliente inválido'}), 400
+    try:
+        params = leer_parametros(request.args, CAMPOS_RESERVA_CLIENTE)
+        formato = leer_formato(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     cliente = Cliente.query.get(id_cliente)
     if not cliente:
         return jsonify({'error':'Cliente no encontrado'}), 404
 
-    reservas = Reserva.query.filter_by(id_cliente=id_cliente).order_by(Reserva.fecha_reserva.desc(), Reserva.hora_inicio).all()
-    result = []
-    for r in reservas:
-        result.append({
-            'id_reserva': r.id_reserva,
-            'id_cancha': r.id_cancha,
-            'cancha_nombre': r.cancha.nombre if r.cancha else None,
-            'fecha_reserva': r.fecha_reserva.isoformat() if r.fecha_reserva else None,
-            'hora_inicio': r.hora_inicio.strftime('%H:%M') if r.hora_inicio else None,
-            'hora_fin': r.hora_fin.strftime('%H:%M') if r.hora_fin else None,
-            'precio_total': str(r.precio_total) if r.precio_total is not None else None,
-            'estado': r.estado.nombre if r.estado else None,
-            'usa_iluminacion': bool(r.usa_iluminacion),
-        })
-
-    return jsonify({'cliente': f"{cliente.nombre} {cliente.apellido}", 'reservas': result})
+    # sin rango de fechas: incluye las reservas archivadas si las hay
+    R = reservas_para()
+    campos = campos_reserva_cliente(R)
+    nombres = campos_pedidos(params, campos)
+    query = db.session.query(R).filter(R.id_cliente == id_cliente)
+    if 'cancha_nombre' in nombres:
+        query = query.outerjoin(Cancha, Cancha.id_cancha == R.id_cancha)
+    if 'estado' in nombres:
+        query = query.outerjoin(EstadoReserva, EstadoReserva.id_estado == R.id_estado)
+
+    orden = (R.fecha_reserva.desc(), R.hora_inicio)
+    if formato != 'json':
+        q, nombres = construir_consulta(query, campos, {}, 'id_reserva', params, orden=orden)
+        if params['limit']:
+            q = q.limit(params['limit'])
+        return exportar(q, nombres, {}, formato, f'reservas_cliente_{id_cliente}')
+
+    result, next_cursor = seleccionar(query, campos, {}, 'id_reserva', params, orden=orden)
+
+    out = {'cliente': f"{cliente.nombre} {cliente.apellido}", 'reservas': result}
+    if params['paginado']:
+        out['next_cursor'] = next_cursor
+    return jsonify(out)
 
 
 @bp.route('/reportes/reservas_por_cancha', methods=['GET'])
+@condicional(*TABLAS_RESERVAS, cache_control=CACHE_REPORTES)
 def reservas_por_cancha():
+    """Reservas de una cancha entre fechas. Admite limit/after/fields (ver paginacion.py); al paginar se ordena por id_reserva.
+
+    format=ndjson|csv devuelve las filas en streaming en lugar de un único JSON.
+    """
     id_cancha = request.args.get('id_cancha')
     desde = request.args.get('desde')
     hasta = request.args.get('hasta')
@@ -58,49 +131,66 @@ def reservas_por_cancha():
         id_cancha = int(id_cancha)
     except Exception:
         return jsonify({'error':'id_cancha inválido'}), 400
+    try:
+        params = leer_parametros(request.args, ORDEN_CAMPOS_RESERVA_CANCHA)
+        formato = leer_formato(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not params['fields']:
+        params['fields'] = ORDEN_CAMPOS_RESERVA_CANCHA
 
     date_desde = parse_date(desde) if desde else None
     date_hasta = parse_date(hasta) if hasta else None
     if (desde and not date_desde) or (hasta and not date_hasta):
         return jsonify({'error':'Formato de fecha inválido. Use YYYY-MM-DD.'}), 400
 
-    query = Reserva.query.filter_by(id_cancha=id_cancha)
-    if date_desde:
-        query = query.filter(Reserva.fecha_reserva >= date_desde)
-    if date_hasta:
-        query = query.filter(Reserva.fecha_reserva <= date_hasta)
-
-    reservas = query.order_by(Reserva.fecha_reserva, Reserva.hora_inicio).all()
-
     cancha = Cancha.query.get(id_cancha)
     if not cancha:
         return jsonify({'error':'Cancha no encontrada'}), 404
 
-    result = []
-    for r in reservas:
-        result.append({
-            'id_reserva': r.id_reserva,
-            'id_cliente': r.id_cliente,
-            'cliente': f"{r.cliente.nombre} {r.cliente.apellido}" if r.cliente else None,
-            'fecha_reserva': r.fecha_reserva.isoformat() if r.fecha_reserva else None,
-            'hora_inicio': r.hora_inicio.strftime('%H:%M') if r.hora_inicio else None,
-            'hora_fin': r.hora_fin.strftime('%H:%M') if r.hora_fin else None,
-            'precio_total': str(r.precio_total) if r.precio_total is not None else None,
-            'estado': r.estado.nombre if r.estado else None,
-        })
+    # el archivo se une sólo si el rango empieza antes de la última fecha archivada
+    R = reservas_para(date_desde)
+    campos = campos_reserva_cancha(R)
+    query = db.session.query(R).filter(R.id_cancha == id_cancha)
+    if date_desde:
+        query = query.filter(R.fecha_reserva >= date_desde)
+    if date_hasta:
+        query = query.filter(R.fecha_reserva <= date_hasta)
+    if 'cliente' in params['fields']:
+        query = query.outerjoin(Cliente, Cliente.id_cliente == R.id_cliente)
+    if 'estado' in params['fields']:
+        query = query.outerjoin(EstadoReserva, EstadoReserva.id_estado == R.id_estado)
+
+    orden = (R.fecha_reserva, R.hora_inicio)
+    if formato != 'json':
+        q, nombres = construir_consulta(query, campos, COMPUESTOS_RESERVA_CANCHA, 'id_reserva', params, orden=orden)
+        if params['limit']:
+            q = q.limit(params['limit'])
+        return exportar(q, nombres, COMPUESTOS_RESERVA_CANCHA, formato, f'reservas_cancha_{id_cancha}')
 
-    return jsonify({'cancha': cancha.nombre, 'desde': desde, 'hasta': hasta, 'reservas': result})
+    result, next_cursor = seleccionar(
+        query, campos, COMPUESTOS_RESERVA_CANCHA, 'id_reserva', params, orden=orden,
+    )
+
+    out = {'cancha': cancha.nombre, 'desde': desde, 'hasta': hasta, 'reservas': result}
+    if params['paginado']:
+        out['next_cursor'] = next_cursor
+    return jsonify(out)
 
 
 @bp.route('/reportes/ranking_canchas', methods=['GET'])
+@condicional('uso_diario', 'canchas', cache_control=CACHE_REPORTES)
 def ranking_canchas():
-    """Devuelve las canchas ordenadas por número de reservas (desc)."""
-    # Usamos join para obtener el nombre de la cancha y el conteo
+    """Devuelve las canchas ordenadas por número de reservas (desc).
+
+    Lee del resumen diario (uso_diario) en lugar de agrupar toda la tabla de reservas.
+    """
+    total = func.sum(UsoDiario.reservas_count)
     rows = db.session.query(
         Cancha.id_cancha,
         Cancha.nombre,
-        func.count(Reserva.id_reserva).label('reservas_count')
-    ).join(Reserva, Reserva.id_cancha == Cancha.id_cancha).group_by(Cancha.id_cancha).order_by(func.count(Reserva.id_reserva).desc()).all()
+        total.label('reservas_count')
+    ).join(UsoDiario, UsoDiario.id_cancha == Cancha.id_cancha).group_by(Cancha.id_cancha, Cancha.nombre).having(total > 0).order_by(total.desc()).all()
 
     result = []
     for id_cancha, nombre, cnt in rows:
@@ -110,16 +200,26 @@ def ranking_canchas():
 
 
 @bp.route('/reportes/uso_mensual', methods=['GET'])
+@condicional('uso_diario', cache_control=CACHE_REPORTES)
 def uso_mensual():
     """Devuelve el conteo de reservas agrupado por mes (YYYY-MM).
 
     Parámetros opcionales:
     - year: si se proporciona, filtra las reservas de ese año.
+
+    Incluye además minutos reservados, ingresos (pagos) e ingresos por iluminación.
+    Lee del resumen diario (uso_diario), que ya guarda el mes de cada fila.
     """
     year = request.args.get('year')
 
-    month_label = func.strftime('%Y-%m', Reserva.fecha_reserva)
-    query = db.session.query(month_label.label('month'), func.count(Reserva.id_reserva).label('count'))
+    total = func.sum(UsoDiario.reservas_count)
+    query = db.session.query(
+        UsoDiario.mes.label('month'),
+        total.label('count'),
+        func.sum(UsoDiario.minutos_reservados).label('minutos'),
+        func.sum(UsoDiario.ingresos).label('ingresos'),
+        func.sum(UsoDiario.ingresos_iluminacion).label('ingresos_iluminacion'),
+    )
 
     if year:
         try:
@@ -129,10 +229,16 @@ def uso_mensual():
         # filtrar entre el 1 de enero y 31 de diciembre del año
         start = date(y, 1, 1)
         end = date(y, 12, 31)
-        query = query.filter(Reserva.fecha_reserva >= start, Reserva.fecha_reserva <= end)
+        query = query.filter(UsoDiario.fecha >= start, UsoDiario.fecha <= end)
 
-    query = query.group_by('month').order_by('month')
+    query = query.group_by(UsoDiario.mes).having(total > 0).order_by(UsoDiario.mes)
     rows = query.all()
 
-    result = [{'month': r[0], 'count': int(r[1])} for r in rows]
+    result = [{
+        'month': r.month,
+        'count': int(r.count),
+        'minutos': int(r.minutos or 0),
+        'ingresos': str(r.ingresos or 0),
+        'ingresos_iluminacion': str(r.ingresos_iluminacion or 0),
+    } for r in rows]
     return jsonify({'uso_mensual': result})
@@ -4,19 +4,45 @@ from models import (
     Reserva,
     Cliente,
     Cancha,
-    HorarioDisponible,
-    EstadoReserva,
-    ServicioAdicional,
     ReservaServicio,
-    Partido,
     Pago,
     MetodoPago,
 )
-from datetime import datetime, date as _date, timedelta
+from datetime import datetime
+from sqlalchemy import select, insert
+from paginacion import leer_parametros, campos_pedidos, seleccionar, respuesta
+from resumen import registrar_reserva, registrar_reservas, quitar_reserva
+from disponibilidad import ocupacion_turno, ocupacion_lectura, fmt_min
+import reglas
+from reglas import ReglasCancha, minutos_intervalo
+import catalogo
+import reservas_lote
+from bloqueos import bloquear, bloquear_turno, fechas_ocupadas
 from decimal import Decimal
+from eventos import publicar_turno, publicar_turnos
 
 bp = Blueprint('reservas', __name__)
 
+# Mensaje y código de respuesta del alta por cada motivo de reglas.py
+ERRORES_TURNO = {
+    reglas.HORA_INVALIDA: ('Las horas deben tener minutos 00 o 30 (ej. 07:00, 07:30).', 400),
+    reglas.FUERA_DE_RANGO: ('Horario fuera de rango. Las reservas sólo pueden realizarse entre 10:00 y 01:00 (incluye pasada de medianoche).', 400),
+    reglas.INICIO_TARDIO: ('La hora de inicio no puede ser posterior a las 23:00.', 400),
+    reglas.HORARIO_NO_DISPONIBLE: ('HORARIO_DISPONIBLE: La cancha no tiene un horario disponible que cubra el intervalo solicitado', 409),
+    reglas.RESERVA_EXISTENTE: ('RESERVAS: Ya existe una reserva en ese horario para la cancha seleccionada', 409),
+    reglas.PARTIDO_EXISTENTE: ('PARTIDOS: Ya existe un partido en ese horario para la cancha seleccionada', 409),
+}
+
+# Motivo informado por /check (respuesta 200 con available=False)
+MOTIVOS_CHECK = {
+    reglas.HORA_INVALIDA: 'HORAS_DEBEN_TENER_00_O_30',
+    reglas.FUERA_DE_RANGO: 'HORARIO_FUERA_RANGO_10_01',
+    reglas.INICIO_TARDIO: 'INICIO_POSTERIOR_A_23_00',
+    reglas.HORARIO_NO_DISPONIBLE: 'HORARIO_DISPONIBLE: La cancha no tiene un horario que cubra el intervalo solicitado',
+    reglas.RESERVA_EXISTENTE: 'RESERVAS: Ya existe una reserva en ese horario para la cancha seleccionada',
+    reglas.PARTIDO_EXISTENTE: 'PARTIDOS: Ya existe un partido en ese horario para la cancha seleccionada',
+}
+
 
 def time_from_str(s: str):
     return datetime.strptime(s, '%H:%M').time()
@@ -26,6 +52,11 @@ def date_from_str(s: str):
     return datetime.strptime(s, '%Y-%m-%d').date()
 
 
+def _error_duracion(cancha, duracion_minutos, inicio):
+    return (f'La reserva para {cancha.tipo_deporte or "este deporte"} debe durar {duracion_minutos} minutos. '
+            f'Hora esperada de fin: {fmt_min(inicio + duracion_minutos)}')
+
+
 @bp.route('/', methods=['POST'])
 def create_reserva():
     data = request.get_json() or {}
@@ -38,28 +69,17 @@ def create_reserva():
     except Exception:
         return jsonify({'error': 'Campos inválidos o formato incorrecto. fecha: YYYY-MM-DD, horas: HH:MM'}), 400
 
-    # Permitimos reservas que crucen medianoche. El intervalo válido es desde
-    # fecha_reserva 10:00 (inclusive) hasta fecha_reserva+1 01:00 (inclusive).
-    # Además la duración requerida depende del deporte de la cancha.
-    # Permitimos slots cada 30 minutos (00 o 30). No forzamos minutos == 00.
-    if hora_inicio.minute not in (0, 30) or hora_fin.minute not in (0, 30):
-        return jsonify({'error': 'Las horas deben tener minutos 00 o 30 (ej. 07:00, 07:30).'}), 400
-
-    dt_start = datetime.combine(fecha_reserva, hora_inicio)
-    dt_end = datetime.combine(fecha_reserva, hora_fin)
-    # si hora_fin es menor o igual a hora_inicio, asumir que terminó al día siguiente
-    if dt_end <= dt_start:
-        dt_end = dt_end + timedelta(days=1)
-
-    # Rango global permitido: [fecha_reserva 10:00, fecha_reserva+1 01:00]
-    window_start = datetime.combine(fecha_reserva, datetime.strptime('10:00', '%H:%M').time())
-    window_end = datetime.combine(fecha_reserva + timedelta(days=1), datetime.strptime('01:00', '%H:%M').time())
-    if dt_start < window_start or dt_end > window_end:
-        return jsonify({'error': 'Horario fuera de rango. Las reservas sólo pueden realizarse entre 10:00 y 01:00 (incluye pasada de medianoche).'}), 400
-
-    # Además limitar hora de inicio máxima a 23:00 (no permitimos iniciar después de las 23:00)
-    if dt_start.time() > datetime.strptime('23:00', '%H:%M').time():
-        return jsonify({'error': 'La hora de inicio no puede ser posterior a las 23:00.'}), 400
+    # Permitimos reservas que crucen medianoche, en franjas de 30 minutos, entre
+    # fecha_reserva 10:00 y fecha_reserva+1 01:00, iniciando a más tardar a las 23:00.
+    # El resto de las reglas (duración, horarios, ocupación) depende de la cancha.
+    motivo = reglas.validar_horas(hora_inicio, hora_fin)
+    if motivo:
+        return jsonify({'error': ERRORES_TURNO[motivo][0]}), ERRORES_TURNO[motivo][1]
+
+    # Tomar el bloqueo de la cancha para los días del turno antes de cualquier otra
+    # consulta: así la verificación de solapamientos y el INSERT son atómicos
+    # frente a otros pedidos concurrentes sobre el mismo turno.
+    bloquear_turno(id_cancha, fecha_reserva, hora_inicio, hora_fin)
 
     # Verificar existencia de cliente y cancha
     cliente = Cliente.query.get(id_cliente)
@@ -70,94 +90,26 @@ def create_reserva():
     if not cancha or not cancha.activa:
         return jsonify({'error': 'Cancha no existe o no está activa'}), 400
 
-    # Determinar duración esperada por deporte: preferir catálogo `Deporte` si la cancha lo referencia
-    if getattr(cancha, 'deporte', None):
-        try:
-            duracion_minutos = int(cancha.deporte.duracion_minutos or 60)
-        except Exception:
-            duracion_minutos = 60
-    else:
-        # Fallback a mapeo por texto para compatibilidad
-        deporte = (cancha.tipo_deporte or '').strip().lower()
-        DURACIONES_MIN = {
-            'padel': 60,
-            'pádel': 60,
-            'tenis': 120,
-            'futbol': 90,
-            'fútbol': 90,
-            'basket': 60,
-            'basquet': 60,
-            'baloncesto': 60,
-        }
-        duracion_minutos = DURACIONES_MIN.get(deporte, 60)
-
-    # Validar que la duración solicitada coincida con la duración esperada para el deporte
-    expected_end = dt_start + timedelta(minutes=duracion_minutos)
-    if expected_end != dt_end:
-        return jsonify({'error': f'La reserva para {cancha.tipo_deporte or "este deporte"} debe durar {duracion_minutos} minutos. Hora esperada de fin: {expected_end.time().strftime("%H:%M")}' }), 400
+    # Reglas de la cancha (duración del deporte y horarios), compiladas una vez
+    reglas_cancha = ReglasCancha.de_cancha(cancha)
+    s, e = minutos_intervalo(fecha_reserva, fecha_reserva, hora_inicio, hora_fin)
+    if e - s != reglas_cancha.duracion:
+        return jsonify({'error': _error_duracion(cancha, reglas_cancha.duracion, s)}), 400
 
     # Validar que exista un estado por defecto (Pendiente) para asignar
-    estado_default = EstadoReserva.query.filter_by(nombre='Pendiente').first() or EstadoReserva.query.first()
+    estado_default = catalogo.estado_por_defecto()
     if not estado_default:
         return jsonify({'error': 'No hay estados de reserva definidos. Cree al menos uno (ej: Pendiente)'}), 400
 
-    # Si hay horarios definidos para la cancha, validar que el horario solicitado esté contenido
-    horarios = HorarioDisponible.query.filter_by(id_cancha=id_cancha).all()
-    if horarios:
-        # Determinar nombre del día en español para comparar con dia_semana si así se usa
-        weekday_es = ['Lunes','Martes','Miércoles','Jueves','Viernes','Sábado','Domingo'][fecha_reserva.weekday()]
-        ok = False
-        for h in horarios:
-            if h.dia_semana and h.dia_semana.lower() != weekday_es.lower():
-                continue
-            # si el horario cubre el intervalo solicitado
-            if (h.hora_inicio <= hora_inicio) and (h.hora_fin >= hora_fin) and h.disponible:
-                ok = True
-                break
-        if not ok:
-            return jsonify({'error': 'HORARIO_DISPONIBLE: La cancha no tiene un horario disponible que cubra el intervalo solicitado'}), 409
-
-    # Verificar solapamientos con otras reservas en la misma cancha y fecha
-    # Verificar solapamientos con otras reservas: para soportar cruces de medianoche normalizamos intervalos
-    candidate_dates = [fecha_reserva, fecha_reserva - timedelta(days=1)]
-    existing_reservas = Reserva.query.filter(
-        Reserva.id_cancha == id_cancha,
-        Reserva.fecha_reserva.in_(candidate_dates)
-    ).all()
-
-    def to_datetime_interval(res):
-        s = datetime.combine(res.fecha_reserva, res.hora_inicio)
-        e = datetime.combine(res.fecha_reserva, res.hora_fin)
-        if e <= s:
-            e = e + timedelta(days=1)
-        return s, e
-
-    for ex in existing_reservas:
-        s_ex, e_ex = to_datetime_interval(ex)
-        if dt_start < e_ex and s_ex < dt_end:
-            return jsonify({'error': 'RESERVAS: Ya existe una reserva en ese horario para la cancha seleccionada'}), 409
-
-    # Verificar solapamientos con PARTIDOS en la misma cancha y fecha
-    # Verificar solapamientos con PARTIDOS (incluir partido del día anterior que cruza medianoche)
-    existing_partidos = Partido.query.filter(
-        Partido.id_cancha == id_cancha,
-        Partido.fecha_partido.in_(candidate_dates)
-    ).all()
-    def to_datetime_interval_part(p):
-        s = datetime.combine(p.fecha_partido, p.hora_inicio)
-        e = datetime.combine(p.fecha_partido, p.hora_fin)
-        if e <= s:
-            e = e + timedelta(days=1)
-        return s, e
-
-    for p in existing_partidos:
-        s_p, e_p = to_datetime_interval_part(p)
-        if dt_start < e_p and s_p < dt_end:
-            return jsonify({'error': 'PARTIDOS: Ya existe un partido en ese horario para la cancha seleccionada'}), 409
+    # Horarios disponibles de la cancha y solapamientos con reservas y partidos
+    # (sólo los turnos que se solapan, con una consulta acotada; contempla cruces de medianoche)
+    motivo = reglas_cancha.evaluar(fecha_reserva, s, e, ocupacion_turno(id_cancha, fecha_reserva, hora_inicio, hora_fin))
+    if motivo:
+        return jsonify({'error': ERRORES_TURNO[motivo][0]}), ERRORES_TURNO[motivo][1]
 
     # Calcular precio: precio_hora * duración + servicios + iluminación si aplica
     # duración en horas (decimal)
-    duration_hours = Decimal((dt_end - dt_start).total_seconds() / 3600)
+    duration_hours = Decimal(e - s) / Decimal(60)
     precio_base = Decimal(cancha.precio_hora or Decimal('0'))
     total = (precio_base * duration_hours)
 
@@ -180,6 +132,7 @@ def create_reserva():
         hora_fin=hora_fin,
         precio_total=total.quantize(Decimal('0.01')),
         usa_iluminacion=usa_iluminacion,
+        monto_iluminacion=iluminacion_cost.quantize(Decimal('0.01')),
     )
     db.session.add(reserva)
     db.session.flush()  # obtener id_reserva sin commit todavía
@@ -189,7 +142,7 @@ def create_reserva():
     for s in servicios:
         sid = s.get('id_servicio') if isinstance(s, dict) else s
         cantidad = int(s.get('cantidad', 1)) if isinstance(s, dict) else 1
-        svc = ServicioAdicional.query.get(sid)
+        svc = catalogo.servicio(sid)
         if not svc or not svc.activo:
             db.session.rollback()
             return jsonify({'error': f'Servicio adicional inválido: {sid}'}), 400
@@ -200,16 +153,158 @@ def create_reserva():
 
     reserva.precio_total = total.quantize(Decimal('0.01'))
 
+    # Actualizar el resumen diario de uso en la misma transacción
+    registrar_reserva(reserva, cancha)
+    # Evento para los flujos SSE, en la misma transacción (ver eventos.py)
+    publicar_turno('ocupado', reserva.id_cancha, reserva.fecha_reserva, reserva.hora_inicio, reserva.hora_fin,
+                   'reserva', reserva.id_reserva)
+
     # Commit final
     db.session.commit()
 
     return jsonify({'id_reserva': reserva.id_reserva, 'precio_total': str(reserva.precio_total)}), 201
 
 
+
+@bp.route('/bulk', methods=['POST'])
+def create_reservas_bulk():
+    """Alta de varias reservas de un cliente en una cancha (lista o recurrencia). Ver reservas_lote.py.
+
+    - modo 'todo_o_nada' (por defecto): si alguna ocurrencia tiene conflicto no se crea ninguna (409).
+    - modo 'parcial': se crean las válidas y se informan los conflictos.
+    """
+    data = request.get_json() or {}
+    try:
+        id_cliente = int(data.get('id_cliente'))
+        id_cancha = int(data.get('id_cancha'))
+    except Exception:
+        return jsonify({'error': 'id_cliente e id_cancha son obligatorios'}), 400
+    modo = data.get('modo') or 'todo_o_nada'
+    if modo not in reservas_lote.MODOS:
+        return jsonify({'error': f"modo debe ser uno de: {', '.join(reservas_lote.MODOS)}"}), 400
+    try:
+        ocurrencias = reservas_lote.expandir_ocurrencias(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Bloqueo de todos los días que toca el lote, antes de cualquier consulta (ver bloqueos.py)
+    fechas_lote = set()
+    for f, hi, hf in ocurrencias:
+        fechas_lote.update(fechas_ocupadas(f, hi, hf))
+    bloquear(id_cancha, fechas_lote)
+
+    cliente = Cliente.query.get(id_cliente)
+    if not cliente or not cliente.activo:
+        return jsonify({'error': 'Cliente no existe o no está activo'}), 400
+    cancha = Cancha.query.get(id_cancha)
+    if not cancha or not cancha.activa:
+        return jsonify({'error': 'Cancha no existe o no está activa'}), 400
+    estado_default = catalogo.estado_por_defecto()
+    if not estado_default:
+        return jsonify({'error': 'No hay estados de reserva definidos. Cree al menos uno (ej: Pendiente)'}), 400
+
+    servicios = []
+    for s in data.get('servicios_adicionales') or []:
+        sid = s.get('id_servicio') if isinstance(s, dict) else s
+        cantidad = int(s.get('cantidad', 1)) if isinstance(s, dict) else 1
+        svc = catalogo.servicio(sid)
+        if not svc or not svc.activo:
+            return jsonify({'error': f'Servicio adicional inválido: {sid}'}), 400
+        servicios.append((svc, cantidad))
+
+    resultados = reservas_lote.evaluar(cancha, ReglasCancha.de_cancha(cancha), ocurrencias)
+    validas = [r for r in resultados if r['motivo'] is None]
+    conflictos = [
+        {'fecha_reserva': r['fecha_reserva'].isoformat(), 'hora_inicio': r['hora_inicio'].strftime('%H:%M'),
+         'hora_fin': r['hora_fin'].strftime('%H:%M'), 'motivo': r['motivo']}
+        for r in resultados if r['motivo'] is not None
+    ]
+
+    if not validas or (conflictos and modo == 'todo_o_nada'):
+        db.session.rollback()
+        return jsonify({'creadas': [], 'conflictos': conflictos, 'modo': modo}), 409
+
+    usa_iluminacion = bool(data.get('usa_iluminacion', False))
+    filas = [{
+        'id_cliente': id_cliente,
+        'id_cancha': id_cancha,
+        'id_estado': estado_default.id_estado,
+        'fecha_reserva': r['fecha_reserva'],
+        'hora_inicio': r['hora_inicio'],
+        'hora_fin': r['hora_fin'],
+        'precio_total': reservas_lote.precio(cancha, r['minutos'], usa_iluminacion, servicios),
+        'usa_iluminacion': usa_iluminacion,
+        'monto_iluminacion': reservas_lote.iluminacion(cancha, r['minutos'], usa_iluminacion),
+    } for r in validas]
+    db.session.execute(insert(Reserva), filas)  # executemany
+    # Con el bloqueo tomado y los turnos verificados libres, cada (fecha, hora_inicio)
+    # de la cancha corresponde a una reserva recién insertada.
+    ids_por_turno = {
+        (f.fecha_reserva, f.hora_inicio): f.id_reserva
+        for f in db.session.execute(
+            select(Reserva.id_reserva, Reserva.fecha_reserva, Reserva.hora_inicio).where(
+                Reserva.id_cancha == id_cancha,
+                Reserva.fecha_reserva.in_({f['fecha_reserva'] for f in filas}),
+            )
+        )
+    }
+    ids = [ids_por_turno[(f['fecha_reserva'], f['hora_inicio'])] for f in filas]
+    if servicios:
+        db.session.execute(insert(ReservaServicio), [
+            {'id_reserva': id_reserva, 'id_servicio': svc.id_servicio, 'cantidad': cantidad}
+            for id_reserva in ids for svc, cantidad in servicios
+        ])
+    registrar_reservas([Reserva(**f) for f in filas], cancha)
+    publicar_turnos('ocupado', [
+        (id_cancha, f['fecha_reserva'], f['hora_inicio'], f['hora_fin'], id_reserva) for id_reserva, f in zip(ids, filas)
+    ], 'reserva')
+    db.session.commit()
+
+    creadas = [
+        {'id_reserva': id_reserva, 'fecha_reserva': f['fecha_reserva'].isoformat(),
+         'hora_inicio': f['hora_inicio'].strftime('%H:%M'), 'hora_fin': f['hora_fin'].strftime('%H:%M'),
+         'precio_total': str(f['precio_total'])}
+        for id_reserva, f in zip(ids, filas)
+    ]
+    return jsonify({'creadas': creadas, 'conflictos': conflictos, 'modo': modo}), 201
+
+CAMPOS_RESERVA = {
+    'id_reserva': Reserva.id_reserva,
+    'id_cliente': Reserva.id_cliente,
+    'cliente_nombre': Cliente.nombre,
+    'cliente_apellido': Cliente.apellido,
+    'id_cancha': Reserva.id_cancha,
+    'fecha_reserva': Reserva.fecha_reserva,
+    'hora_inicio': Reserva.hora_inicio,
+    'hora_fin': Reserva.hora_fin,
+    'precio_total': Reserva.precio_total,
+    'usa_iluminacion': Reserva.usa_iluminacion,
+}
+
+
+def _pago_desde_fila(f):
+    if f.pago_id_pago is None:
+        return None
+    return {'id_pago': f.pago_id_pago, 'id_metodo': f.pago_id_metodo, 'metodo_nombre': f.pago_metodo_nombre, 'monto': str(f.pago_monto)}
+
+
+COMPUESTOS_RESERVA = {
+    'pago': (
+        [Pago.id_pago.label('pago_id_pago'), Pago.id_metodo.label('pago_id_metodo'),
+         MetodoPago.nombre.label('pago_metodo_nombre'), Pago.monto.label('pago_monto')],
+        _pago_desde_fila,
+    ),
+}
+
+
 @bp.route('/', methods=['GET'])
 def list_reservas():
-    """Listar reservas. Query params opcionales: id_cancha, fecha_reserva=YYYY-MM-DD"""
+    """Listar reservas. Query params opcionales: id_cancha, fecha_reserva=YYYY-MM-DD
+
+    Admite paginación keyset (limit, after) y fields= (ver paginacion.py).
+    """
     try:
+        params = leer_parametros(request.args, list(CAMPOS_RESERVA) + list(COMPUESTOS_RESERVA))
         id_cancha = request.args.get('id_cancha')
         fecha_str = request.args.get('fecha_reserva')
         q = Reserva.query
@@ -218,35 +313,33 @@ def list_reservas():
         if fecha_str:
             fecha = date_from_str(fecha_str)
             q = q.filter(Reserva.fecha_reserva == fecha)
+    except ValueError as e:
+        return jsonify({'error': str(e) or 'Parámetros inválidos'}), 400
     except Exception:
         return jsonify({'error': 'Parámetros inválidos'}), 400
 
-    reservas = q.all()
-    out = []
-    for r in reservas:
-        # incluir información de pago si existe (último pago registrado)
-        # obtener último pago registrado para esta reserva (si existe)
-        last_pago = None
-        pagos_res = Pago.query.filter_by(id_reserva=r.id_reserva).order_by(Pago.fecha_pago).all()
-        if pagos_res and len(pagos_res) > 0:
-            p = pagos_res[-1]
-            metodo = MetodoPago.query.get(p.id_metodo)
-            last_pago = {'id_pago': p.id_pago, 'id_metodo': p.id_metodo, 'metodo_nombre': metodo.nombre if metodo else None, 'monto': str(p.monto)}
-
-        out.append({
-            'id_reserva': r.id_reserva,
-            'id_cliente': r.id_cliente,
-            'cliente_nombre': getattr(r.cliente, 'nombre', None),
-            'cliente_apellido': getattr(r.cliente, 'apellido', None),
-            'id_cancha': r.id_cancha,
-            'fecha_reserva': r.fecha_reserva.isoformat(),
-            'hora_inicio': r.hora_inicio.strftime('%H:%M'),
-            'hora_fin': r.hora_fin.strftime('%H:%M'),
-            'precio_total': str(r.precio_total),
-            'usa_iluminacion': bool(r.usa_iluminacion),
-            'pago': last_pago,
-        })
-    return jsonify(out)
+    # Una sola consulta: cliente por JOIN y último pago (por fecha_pago, desempatando
+    # por id_pago) mediante subconsulta correlacionada, junto con su método.
+    # Las joins se agregan sólo si se pidieron esos campos.
+    nombres = campos_pedidos(params, list(CAMPOS_RESERVA) + list(COMPUESTOS_RESERVA))
+    if 'cliente_nombre' in nombres or 'cliente_apellido' in nombres:
+        q = q.outerjoin(Cliente, Cliente.id_cliente == Reserva.id_cliente)
+    if 'pago' in nombres:
+        ultimo_pago_id = (
+            select(Pago.id_pago)
+            .where(Pago.id_reserva == Reserva.id_reserva)
+            .order_by(Pago.fecha_pago.desc(), Pago.id_pago.desc())
+            .limit(1)
+            .correlate(Reserva)
+            .scalar_subquery()
+        )
+        q = (
+            q.outerjoin(Pago, Pago.id_pago == ultimo_pago_id)
+            .outerjoin(MetodoPago, MetodoPago.id_metodo == Pago.id_metodo)
+        )
+
+    items, next_cursor = seleccionar(q, CAMPOS_RESERVA, COMPUESTOS_RESERVA, 'id_reserva', params)
+    return respuesta(items, next_cursor, params)
 
 
 @bp.route('/<int:id_reserva>', methods=['DELETE'])
@@ -255,7 +348,10 @@ def delete_reserva(id_reserva):
     if not r:
         return jsonify({'error': 'Reserva no encontrada'}), 404
     try:
+        turno = (r.id_cancha, r.fecha_reserva, r.hora_inicio, r.hora_fin)
+        quitar_reserva(r)
         db.session.delete(r)
+        publicar_turno('liberado', *turno, 'reserva', id_reserva)
         db.session.commit()
         return jsonify({'ok': True}), 200
     except Exception as e:
@@ -309,92 +405,22 @@ def check_disponibilidad():
     except Exception:
         return jsonify({'error': 'Parámetros inválidos. id_cancha int, fecha: YYYY-MM-DD, horas: HH:MM'}), 400
 
-    # Validar minutos en 00 o 30 y permitir cruce a día siguiente hasta 01:00
-    if hora_inicio.minute not in (0, 30) or hora_fin.minute not in (0, 30):
-        return jsonify({'available': False, 'reason': 'HORAS_DEBEN_TENER_00_O_30'}), 200
-
-    dt_start = datetime.combine(fecha_reserva, hora_inicio)
-    dt_end = datetime.combine(fecha_reserva, hora_fin)
-    if dt_end <= dt_start:
-        dt_end = dt_end + timedelta(days=1)
-
-    window_start = datetime.combine(fecha_reserva, datetime.strptime('10:00', '%H:%M').time())
-    window_end = datetime.combine(fecha_reserva + timedelta(days=1), datetime.strptime('01:00', '%H:%M').time())
-    if dt_start < window_start or dt_end > window_end:
-        return jsonify({'available': False, 'reason': 'HORARIO_FUERA_RANGO_10_01'}), 200
+    motivo = reglas.validar_horas(hora_inicio, hora_fin)
+    if motivo:
+        return jsonify({'available': False, 'reason': MOTIVOS_CHECK[motivo]}), 200
 
     cancha = Cancha.query.get(id_cancha)
     if not cancha or not cancha.activa:
         return jsonify({'available': False, 'reason': 'cancha_no_existente_o_inactiva'}), 200
 
-    # Duraciones por deporte
-    # determinar duración esperada por deporte
-    if getattr(cancha, 'deporte', None):
-        try:
-            duracion_minutos = int(cancha.deporte.duracion_minutos or 60)
-        except Exception:
-            duracion_minutos = 60
-    else:
-        deporte = (cancha.tipo_deporte or '').strip().lower()
-        DURACIONES_MIN = {
-            'padel': 60,
-            'pádel': 60,
-            'tenis': 120,
-            'futbol': 90,
-            'fútbol': 90,
-            'basket': 60,
-            'basquet': 60,
-            'baloncesto': 60,
-        }
-        duracion_minutos = DURACIONES_MIN.get(deporte, 60)
-    expected_end = dt_start + timedelta(minutes=duracion_minutos)
-    if expected_end != dt_end:
-        return jsonify({'available': False, 'reason': f'DURACION_ESPERADA_{duracion_minutos}_MIN'}), 200
-
-    # Si hay horarios definidos para la cancha, validar que el horario solicitado esté contenido
-    horarios = HorarioDisponible.query.filter_by(id_cancha=id_cancha).all()
-    if horarios:
-        weekday_es = ['Lunes','Martes','Miércoles','Jueves','Viernes','Sábado','Domingo'][fecha_reserva.weekday()]
-        ok = False
-        for h in horarios:
-            if h.dia_semana and h.dia_semana.lower() != weekday_es.lower():
-                continue
-            if (h.hora_inicio <= hora_inicio) and (h.hora_fin >= hora_fin) and h.disponible:
-                ok = True
-                break
-        if not ok:
-            return jsonify({'available': False, 'reason': 'HORARIO_DISPONIBLE: La cancha no tiene un horario que cubra el intervalo solicitado'}), 200
-
-    # Verificar solapamientos con otras reservas y partidos (considerar día anterior para cruces de medianoche)
-    candidate_dates = [fecha_reserva, fecha_reserva - timedelta(days=1)]
-    existing_reservas = Reserva.query.filter(
-        Reserva.id_cancha == id_cancha,
-        Reserva.fecha_reserva.in_(candidate_dates)
-    ).all()
-    def to_dt_interval_res(res):
-        s = datetime.combine(res.fecha_reserva, res.hora_inicio)
-        e = datetime.combine(res.fecha_reserva, res.hora_fin)
-        if e <= s:
-            e = e + timedelta(days=1)
-        return s, e
-    for ex in existing_reservas:
-        s_ex, e_ex = to_dt_interval_res(ex)
-        if dt_start < e_ex and s_ex < dt_end:
-            return jsonify({'available': False, 'reason': 'RESERVAS: Ya existe una reserva en ese horario para la cancha seleccionada'}), 200
-
-    existing_partidos = Partido.query.filter(
-        Partido.id_cancha == id_cancha,
-        Partido.fecha_partido.in_(candidate_dates)
-    ).all()
-    def to_dt_interval_part(p):
-        s = datetime.combine(p.fecha_partido, p.hora_inicio)
-        e = datetime.combine(p.fecha_partido, p.hora_fin)
-        if e <= s:
-            e = e + timedelta(days=1)
-        return s, e
-    for p in existing_partidos:
-        s_p, e_p = to_dt_interval_part(p)
-        if dt_start < e_p and s_p < dt_end:
-            return jsonify({'available': False, 'reason': 'PARTIDOS: Ya existe un partido en ese horario para la cancha seleccionada'}), 200
+    # Mismas reglas que el alta: duración del deporte, horarios y solapamientos
+    # (de la ocupación en memoria; contempla los cruces de medianoche)
+    reglas_cancha = ReglasCancha.de_cancha(cancha)
+    s, e = minutos_intervalo(fecha_reserva, fecha_reserva, hora_inicio, hora_fin)
+    motivo = reglas_cancha.evaluar(fecha_reserva, s, e, ocupacion_lectura(id_cancha, fecha_reserva))
+    if motivo == reglas.DURACION_INVALIDA:
+        return jsonify({'available': False, 'reason': f'DURACION_ESPERADA_{reglas_cancha.duracion}_MIN'}), 200
+    if motivo:
+        return jsonify({'available': False, 'reason': MOTIVOS_CHECK[motivo]}), 200
 
     return jsonify({'available': True}), 200
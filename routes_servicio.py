@@ -1,13 +1,15 @@
 from flask import Blueprint, jsonify, request
 from app import db
-from models import ServicioAdicional
+import catalogo
+from cache_http import condicional
 
 bp = Blueprint('servicios', __name__)
 
 
 @bp.route('/servicios', methods=['GET'])
+@condicional('servicios_adicionales')
 def list_servicios():
-    items = ServicioAdicional.query.filter_by(activo=True).all()
+    items = [s for s in catalogo.servicios().values() if s.activo]
     return jsonify([{
         'id_servicio': s.id_servicio,
         'nombre': s.nombre,
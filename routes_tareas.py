@@ -0,0 +1,13 @@
+from flask import Blueprint, jsonify
+from borrado import obtener, tarea_dict
+
+bp = Blueprint('tareas', __name__)
+
+
+@bp.route('/tareas/<int:id_tarea>', methods=['GET'])
+def get_tarea(id_tarea):
+    """Estado de una tarea en segundo plano (ej. borrado por lotes); si quedó abandonada, se retoma."""
+    tarea = obtener(id_tarea)
+    if not tarea:
+        return jsonify({'error': 'Tarea no encontrada'}), 404
+    return jsonify(tarea_dict(tarea))
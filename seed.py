@@ -1,21 +1,131 @@
 """Script para poblar la base de datos con datos de prueba.
 
-Inserta:
+Sin parámetros inserta el catálogo y unos pocos datos de ejemplo:
 - 3 clientes
 - 2 canchas (fútbol y tenis)
+- 3 deportes (fútbol, tenis, pádel)
 - 2 estados de reserva ('Pendiente', 'Confirmada')
-- 2 servicios adicionales ('Pelota', 'Chalecos')
+- servicios adicionales (globales y por deporte) y métodos de pago
+
+Con --clientes/--canchas/--dias/--ocupacion genera además un conjunto de datos
+sintético del tamaño pedido (ver generar()): clientes, canchas nuevas con un
+período de reservas sin solapamientos (más demanda a la tarde y los fines de
+semana), pagos, servicios, un campeonato con partidos los domingos y el
+resumen uso_diario de esas canchas. Se inserta con sentencias Core por lotes
+en una sola transacción, con los PRAGMA de SQLite relajados durante la carga:
+un millón de reservas lleva segundos.
 
 Ejecutar::
     python seed.py
+    python seed.py --clientes 100000 --canchas 40 --dias 365 --ocupacion 0.7 [--semilla 2025]
 """
+import argparse
+import functools
+import random
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, time as dtime
+from decimal import Decimal
+
+from sqlalchemy import insert, select, func
+
 from app import create_app, db
-from models import Cliente, Cancha, EstadoReserva, ServicioAdicional, MetodoPago, Deporte
-from datetime import date
+from models import (
+    Cliente, Cancha, EstadoReserva, ServicioAdicional, MetodoPago, Deporte,
+    Reserva, Pago, ReservaServicio, Campeonato, Equipo, Partido, UsoDiario, ReservaArchivada,
+)
+from reglas import VENTANA_INICIO_MIN, VENTANA_FIN_MIN, ULTIMO_INICIO_MIN
+import posiciones
+
+SEMILLA = 2025
+OCUPACION = 0.6
+LOTE = 50_000              # reservas por sentencia (acota la memoria)
+PASADO = 0.9               # fracción del período anterior a hoy
+EQUIPOS = 10
+
+# deporte -> (precio_hora, precio_iluminacion, proporción de canchas)
+CANCHAS_POR_DEPORTE = {
+    'Fútbol': (200, 40, 0.3),
+    'Tenis': (120, 20, 0.3),
+    'Pádel': (100, 20, 0.4),
+}
+HORA_LUCES = 19 * 60       # desde esta hora se usa iluminación (si la cancha tiene)
+P_SERVICIO = 0.2           # reservas con un servicio adicional
+P_FRECUENTE = 0.8          # reservas hechas por el 20% de clientes frecuentes
+P_PENDIENTE_PASADA = 0.05  # reservas pasadas que quedaron sin pagar
+P_SENA_FUTURA = 0.3        # reservas futuras ya pagas
+HORAS_PAGO_ANTES = (1, 2, 24, 48)
+
+# Durante la carga: sin fsync y con una caché de páginas grande (se restauran al terminar)
+PRAGMAS_CARGA = {'synchronous': 0, 'cache_size': -262144, 'temp_store': 2}
+
+
+def catalogo(mostrar=True):
+    """Deportes, estados de reserva, servicios adicionales y métodos de pago (si faltan). No hace commit."""
+    aviso = print if mostrar else (lambda *a: None)
+
+    if Deporte.query.count() == 0:
+        db.session.add_all([
+            Deporte(nombre='Fútbol', duracion_minutos=90),
+            Deporte(nombre='Tenis', duracion_minutos=120),
+            Deporte(nombre='Pádel', duracion_minutos=60),
+        ])
+        db.session.flush()
+        aviso('Se añadieron deportes por defecto')
+
+    if EstadoReserva.query.count() == 0:
+        estados = [
+            EstadoReserva(nombre='Pendiente'),
+            EstadoReserva(nombre='Confirmada'),
+        ]
+        db.session.add_all(estados)
+        aviso("Añadidos 2 estados de reserva")
+    else:
+        aviso('Estados de reserva ya existentes, se omite inserción')
+
+    if ServicioAdicional.query.count() == 0:
+        # Crear servicios generales y por deporte
+        futbol = Deporte.query.filter_by(nombre='Fútbol').first()
+        tenis = Deporte.query.filter_by(nombre='Tenis').first()
+        padel = Deporte.query.filter_by(nombre='Pádel').first()
+
+        servicios = [
+            # Servicios globales
+            ServicioAdicional(nombre='Pelota', precio_adicional=50, id_deporte=None),
+            ServicioAdicional(nombre='Chalecos', precio_adicional=30, id_deporte=None),
+            # Tenis
+            ServicioAdicional(nombre='Pelotas (set x3)', precio_adicional=150, id_deporte=(tenis.id_deporte if tenis else None)),
+            ServicioAdicional(nombre='Máquina de pelotas (por hora)', precio_adicional=800, id_deporte=(tenis.id_deporte if tenis else None)),
+            ServicioAdicional(nombre='Entrenador privado (por hora)', precio_adicional=1000, id_deporte=(tenis.id_deporte if tenis else None)),
+            # Pádel
+            ServicioAdicional(nombre='Paleta (alquiler)', precio_adicional=200, id_deporte=(padel.id_deporte if padel else None)),
+            ServicioAdicional(nombre='Pelotas (set x3)', precio_adicional=150, id_deporte=(padel.id_deporte if padel else None)),
+            ServicioAdicional(nombre='Entrenador privado (por hora)', precio_adicional=900, id_deporte=(padel.id_deporte if padel else None)),
+            # Fútbol
+            ServicioAdicional(nombre='Balón (alquiler)', precio_adicional=300, id_deporte=(futbol.id_deporte if futbol else None)),
+            ServicioAdicional(nombre='Árbitro (por partido)', precio_adicional=1200, id_deporte=(futbol.id_deporte if futbol else None)),
+            ServicioAdicional(nombre='Iluminación (por hora)', precio_adicional=400, id_deporte=(futbol.id_deporte if futbol else None)),
+        ]
+        db.session.add_all(servicios)
+        aviso('Añadidos servicios adicionales por deporte y globales')
+    else:
+        aviso('Servicios adicionales ya existentes, se omite inserción')
+
+    if MetodoPago.query.count() == 0:
+        metodos = [
+            MetodoPago(nombre='Efectivo'),
+            MetodoPago(nombre='Tarjeta'),
+        ]
+        db.session.add_all(metodos)
+        aviso('Añadidos métodos de pago')
+    else:
+        aviso('Métodos de pago ya existentes, se omite inserción')
+    db.session.flush()
 
 
 def seed():
-    app = create_app()
+    # sin métricas: la carga masiva no es un pedido y no interesa como SQL lenta
+    app = create_app({'METRICAS': False})
 
     with app.app_context():
         # Evitar insertar duplicados comprobando existencia mínima
@@ -30,13 +140,11 @@ def seed():
         else:
             print('Clientes ya existentes, se omite inserción')
 
+        catalogo()
+
         if Cancha.query.count() == 0:
-            # Crear deportes por defecto
-            futbol = Deporte(nombre='Fútbol', duracion_minutos=90)
-            tenis = Deporte(nombre='Tenis', duracion_minutos=120)
-            padel = Deporte(nombre='Pádel', duracion_minutos=60)
-            db.session.add_all([futbol, tenis, padel])
-            db.session.flush()
+            futbol = Deporte.query.filter_by(nombre='Fútbol').first()
+            tenis = Deporte.query.filter_by(nombre='Tenis').first()
 
             canchas = [
                 Cancha(nombre='Cancha Central', tipo_deporte='Fútbol', id_deporte=futbol.id_deporte, superficie='Césped', precio_hora=200, iluminacion=True),
@@ -47,68 +155,374 @@ def seed():
         else:
             print('Canchas ya existentes, se omite inserción')
 
-        # Asegurarse de que existan deportes aunque ya haya canchas (caso de DB parcial)
-        if Deporte.query.count() == 0:
-            futbol = Deporte(nombre='Fútbol', duracion_minutos=90)
-            tenis = Deporte(nombre='Tenis', duracion_minutos=120)
-            padel = Deporte(nombre='Pádel', duracion_minutos=60)
-            db.session.add_all([futbol, tenis, padel])
-            print('Se añadieron deportes por defecto')
-
-        if EstadoReserva.query.count() == 0:
-            estados = [
-                EstadoReserva(nombre='Pendiente'),
-                EstadoReserva(nombre='Confirmada'),
-            ]
-            db.session.add_all(estados)
-            print("Añadidos 2 estados de reserva")
-        else:
-            print('Estados de reserva ya existentes, se omite inserción')
+        # Commit final
+        db.session.commit()
 
-        if ServicioAdicional.query.count() == 0:
-            # Crear servicios generales y por deporte
-            # Asegurar que los deportes referenciados existen y obtener sus ids
-            futbol = Deporte.query.filter_by(nombre='Fútbol').first()
-            tenis = Deporte.query.filter_by(nombre='Tenis').first()
-            padel = Deporte.query.filter_by(nombre='Pádel').first()
-
-            servicios = [
-                # Servicios globales
-                ServicioAdicional(nombre='Pelota', precio_adicional=50, id_deporte=None),
-                ServicioAdicional(nombre='Chalecos', precio_adicional=30, id_deporte=None),
-                # Tenis
-                ServicioAdicional(nombre='Pelotas (set x3)', precio_adicional=150, id_deporte=(tenis.id_deporte if tenis else None)),
-                ServicioAdicional(nombre='Máquina de pelotas (por hora)', precio_adicional=800, id_deporte=(tenis.id_deporte if tenis else None)),
-                ServicioAdicional(nombre='Entrenador privado (por hora)', precio_adicional=1000, id_deporte=(tenis.id_deporte if tenis else None)),
-                # Pádel
-                ServicioAdicional(nombre='Paleta (alquiler)', precio_adicional=200, id_deporte=(padel.id_deporte if padel else None)),
-                ServicioAdicional(nombre='Pelotas (set x3)', precio_adicional=150, id_deporte=(padel.id_deporte if padel else None)),
-                ServicioAdicional(nombre='Entrenador privado (por hora)', precio_adicional=900, id_deporte=(padel.id_deporte if padel else None)),
-                # Fútbol
-                ServicioAdicional(nombre='Balón (alquiler)', precio_adicional=300, id_deporte=(futbol.id_deporte if futbol else None)),
-                ServicioAdicional(nombre='Árbitro (por partido)', precio_adicional=1200, id_deporte=(futbol.id_deporte if futbol else None)),
-                ServicioAdicional(nombre='Iluminación (por hora)', precio_adicional=400, id_deporte=(futbol.id_deporte if futbol else None)),
-            ]
-            db.session.add_all(servicios)
-            print('Añadidos servicios adicionales por deporte y globales')
+        print('Seed finalizado')
+    return app
+
+
+def peso_turno(fecha, minuto):
+    """Demanda relativa de un turno: pico de 18 a 22 h; los fines de semana también de día."""
+    if 18 * 60 <= minuto < 22 * 60:
+        return 1.0
+    if fecha.weekday() >= 5:
+        return 0.8
+    if 12 * 60 <= minuto < 14 * 60 or minuto >= 22 * 60:
+        return 0.6
+    return 0.3
+
+
+def _a_hora(m):
+    return dtime(m // 60 % 24, m % 60)
+
+
+def turnos(duracion):
+    """Turnos consecutivos de `duracion` minutos dentro de la ventana: [(inicio, hora_inicio, hora_fin)]."""
+    out = []
+    s = VENTANA_INICIO_MIN
+    while s <= ULTIMO_INICIO_MIN and s + duracion <= VENTANA_FIN_MIN:
+        out.append((s, _a_hora(s), _a_hora(s + duracion)))
+        s += duracion
+    return out
+
+
+def probabilidades(duracion, ocupacion, lunes):
+    """Probabilidad de reserva por día de la semana y turno, proporcional a peso_turno().
+
+    El factor se ajusta (bisección) para que el promedio sea `ocupacion` aunque
+    los turnos de más demanda se saturen en 1.
+    """
+    lista = turnos(duracion)
+    pesos = [peso_turno(lunes + timedelta(days=d), s) for d in range(7) for s, _, _ in lista]
+    bajo, alto = 0.0, 1.0 / min(pesos)
+    for _ in range(40):
+        factor = (bajo + alto) / 2
+        if sum(min(1.0, factor * p) for p in pesos) / len(pesos) < ocupacion:
+            bajo = factor
         else:
-            print('Servicios adicionales ya existentes, se omite inserción')
+            alto = factor
+    n = len(lista)
+    return lista, [[min(1.0, alto * p) for p in pesos[d * n:(d + 1) * n]] for d in range(7)]
 
-        if MetodoPago.query.count() == 0:
-            metodos = [
-                MetodoPago(nombre='Efectivo'),
-                MetodoPago(nombre='Tarjeta'),
-            ]
-            db.session.add_all(metodos)
-            print('Añadidos métodos de pago')
+
+class _PragmasCarga:
+    """Aplica PRAGMAS_CARGA a la conexión (sólo SQLite) y restaura los valores previos."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.previos = {}
+
+    def __enter__(self):
+        if self.conn.dialect.name == 'sqlite':
+            for nombre, valor in PRAGMAS_CARGA.items():
+                self.previos[nombre] = self.conn.exec_driver_sql(f'PRAGMA {nombre}').scalar()
+                self.conn.exec_driver_sql(f'PRAGMA {nombre} = {valor}')
+            self.conn.commit()
+        return self.conn
+
+    def __exit__(self, tipo, *exc):
+        # la carga es una sola transacción: se confirma entera o no queda nada
+        if tipo is None:
+            self.conn.commit()
         else:
-            print('Métodos de pago ya existentes, se omite inserción')
+            self.conn.rollback()
+        for nombre, valor in self.previos.items():
+            self.conn.exec_driver_sql(f'PRAGMA {nombre} = {valor}')
+        self.conn.commit()
 
-        # Commit final
-        db.session.commit()
 
-        print('Seed finalizado')
+def _insertar_ids(conn, modelo, filas, columna):
+    """INSERT que devuelve los ids generados en el orden de `filas` (para pocas filas:
+    con SQLite el RETURNING ordenado se ejecuta de a una fila)."""
+    if not filas:
+        return []
+    stmt = insert(modelo).returning(columna, sort_by_parameter_order=True)
+    return conn.execute(stmt, filas).scalars().all()
+
+
+class _Insercion:
+    """INSERT masivo por executemany del driver, sin procesar los parámetros fila por fila.
+
+    SQLAlchemy compila la sentencia para el motor y da el conversor de tipo de
+    cada columna; las filas son tuplas en el orden de `columnas` con los valores
+    ya pasados por convertir(), que recuerda cada valor distinto (fechas, horas
+    y precios se repiten).
+    """
+
+    def __init__(self, conn, modelo, columnas):
+        tabla = modelo.__table__
+        compilado = insert(tabla).compile(dialect=conn.dialect, column_keys=list(columnas))
+        self.conn = conn
+        self.sql = str(compilado)
+        self.columnas = list(columnas)
+        self.orden = [self.columnas.index(c) for c in compilado.positiontup] if conn.dialect.positional else None
+        self._conversores = {}
+        for c in self.columnas:
+            proc = tabla.c[c].type.dialect_impl(conn.dialect).bind_processor(conn.dialect)
+            self._conversores[c] = functools.lru_cache(maxsize=None)(proc) if proc else None
+
+    def convertir(self, columna, valor):
+        conv = self._conversores[columna]
+        return valor if conv is None or valor is None else conv(valor)
+
+    def __call__(self, filas):
+        if not filas:
+            return 0
+        if self.orden is None:
+            filas = [dict(zip(self.columnas, f)) for f in filas]
+        elif self.orden != list(range(len(self.columnas))):
+            filas = [tuple(f[i] for i in self.orden) for f in filas]
+        self.conn.exec_driver_sql(self.sql, filas)
+        return len(filas)
+
+
+class _SinIndices:
+    """Quita los índices secundarios de las tablas durante la carga y los vuelve a crear
+    al final: ordenar una vez es más rápido que mantener el índice fila por fila."""
+
+    def __init__(self, conn, *modelos):
+        self.conn = conn
+        self.indices = [ix for m in modelos for ix in m.__table__.indexes if not ix.unique]
+
+    def __enter__(self):
+        for ix in self.indices:
+            ix.drop(self.conn, checkfirst=True)
+
+    def __exit__(self, tipo, *exc):
+        if tipo is None:
+            for ix in self.indices:
+                ix.create(self.conn, checkfirst=True)
+
+
+def _proximo_id_reserva(conn):
+    """Primer id_reserva libre, contando el archivo y los ids ya usados (AUTOINCREMENT).
+
+    Las reservas generadas llevan el id explícito para poder insertar sus pagos
+    y servicios sin leerlas de vuelta.
+    """
+    ultimo = max(
+        conn.execute(select(func.max(Reserva.id_reserva))).scalar() or 0,
+        conn.execute(select(func.max(ReservaArchivada.id_reserva))).scalar() or 0,
+    )
+    if conn.dialect.name == 'sqlite':
+        usado = conn.exec_driver_sql("SELECT seq FROM sqlite_sequence WHERE name = 'reservas'").scalar()
+        ultimo = max(ultimo, usado or 0)
+    return ultimo + 1
+
+
+def generar(n_clientes, n_canchas, n_dias, ocupacion=OCUPACION, hoy=None, semilla=SEMILLA, lote=LOTE):
+    """Genera el conjunto de datos sintético sobre el catálogo existente. Hace commit.
+
+    Crea n_clientes clientes y n_canchas canchas nuevas (el 30% de fútbol, 30% de
+    tenis, 40% de pádel) y las reserva durante n_dias días, el 90% antes de hoy.
+    Cada cancha se recorre en turnos consecutivos de la duración de su deporte,
+    por lo que las reservas generadas no se solapan entre sí y, al ser canchas
+    nuevas, tampoco con las existentes. Cada turno se reserva con probabilidad
+    proporcional a peso_turno() y con promedio `ocupacion`.
+
+    Las reservas pasadas quedan confirmadas y pagas (salvo P_PENDIENTE_PASADA),
+    las futuras pendientes (salvo P_SENA_FUTURA, pagas). Los domingos a las 10 h
+    la primera cancha de fútbol es para los partidos de un campeonato. El
+    resumen uso_diario de las canchas nuevas y la tabla de posiciones se cargan
+    al final. Devuelve un dict con las cantidades y el tiempo.
+    """
+    if not 0 < ocupacion <= 1:
+        raise ValueError('ocupacion debe estar entre 0 y 1')
+    t0 = time.perf_counter()
+    rnd = random.Random(semilla)
+    hoy = hoy or date.today()
+    desde = hoy - timedelta(days=int(n_dias * PASADO))
+    lunes = desde - timedelta(days=desde.weekday())
+
+    catalogo(mostrar=False)
+    db.session.commit()
+    deportes = {d.nombre: d for d in Deporte.query.all()}
+    estados = {e.nombre: e.id_estado for e in EstadoReserva.query.all()}
+    pendiente = estados.get('Pendiente') or min(estados.values())
+    confirmada = estados.get('Confirmada') or pendiente
+    metodos = [m.id_metodo for m in MetodoPago.query.order_by(MetodoPago.id_metodo)]
+    servicios = defaultdict(list)   # id_deporte (None = global) -> [(id_servicio, centavos)]
+    for s in ServicioAdicional.query.filter_by(activo=True):
+        servicios[s.id_deporte].append((s.id_servicio, int(Decimal(s.precio_adicional) * 100)))
+    n_cancha_previas = db.session.scalar(select(func.count()).select_from(Cancha))
+    ultimo_cliente = db.session.scalar(select(func.max(Cliente.id_cliente))) or 0
+    base_dni = 40_000_000 + ultimo_cliente
+    db.session.close()
+
+    with db.engine.connect() as conn, _PragmasCarga(conn), _SinIndices(conn, Reserva, Pago, ReservaServicio):
+        # clientes: el 20% concentra la mayoría de las reservas
+        insertar_clientes = _Insercion(conn, Cliente, ['dni', 'nombre', 'apellido', 'telefono', 'email', 'activo'])
+        activo = insertar_clientes.convertir('activo', True)
+        for i in range(0, n_clientes, lote):
+            insertar_clientes([
+                (str(base_dni + k), f'Cliente{k}', f'Apellido{k % 997}', f'11-{base_dni + k:08d}',
+                 f'cliente{base_dni + k}@example.com', activo)
+                for k in range(i, min(i + lote, n_clientes))
+            ])
+        ids_clientes = conn.execute(
+            select(Cliente.id_cliente).where(Cliente.id_cliente > ultimo_cliente).order_by(Cliente.id_cliente)
+        ).scalars().all()
+        rnd.shuffle(ids_clientes)
+        frecuentes = ids_clientes[:max(1, len(ids_clientes) // 5)]
+
+        # canchas nuevas, repartidas entre deportes según CANCHAS_POR_DEPORTE
+        nombres = [n for n in CANCHAS_POR_DEPORTE if n in deportes]
+        repartidas = []
+        for i in range(n_canchas):
+            # el deporte con menos canchas respecto de su proporción
+            repartidas.append(min(nombres, key=lambda n: repartidas.count(n) / CANCHAS_POR_DEPORTE[n][2]))
+        filas_canchas = []
+        for i, nombre in enumerate(repartidas):
+            precio, precio_luz, _ = CANCHAS_POR_DEPORTE[nombre]
+            filas_canchas.append({
+                'nombre': f'Cancha {n_cancha_previas + i + 1}', 'tipo_deporte': nombre,
+                'id_deporte': deportes[nombre].id_deporte, 'superficie': rnd.choice(('Césped', 'Cemento', 'Sintético')),
+                'precio_hora': precio, 'precio_iluminacion': precio_luz, 'iluminacion': rnd.random() < 0.8, 'activa': True,
+            })
+        ids_canchas = _insertar_ids(conn, Cancha, filas_canchas, Cancha.id_cancha)
+
+        # campeonato con partidos los domingos en la primera cancha de fútbol
+        liga = None
+        if 'Fútbol' in repartidas:
+            liga = repartidas.index('Fútbol')
+            id_campeonato = conn.execute(insert(Campeonato).returning(Campeonato.id_campeonato), {
+                'nombre': f'Liga {desde.year}', 'fecha_inicio': desde,
+                'fecha_fin': desde + timedelta(days=n_dias - 1), 'estado': 'En curso',
+            }).scalar_one()
+            ids_equipos = _insertar_ids(conn, Equipo, [
+                {'id_campeonato': id_campeonato, 'nombre': f'Equipo {k + 1}'} for k in range(EQUIPOS)
+            ], Equipo.id_equipo)
+
+        uso = {}          # (fecha, id_cancha) -> [reservas, minutos, ingresos, iluminación (centavos), deporte]
+        reservas, pagos, extras, partidos = [], [], [], []
+        totales = {'reservas': 0, 'pagos': 0, 'servicios': 0, 'turnos': 0}
+
+        proximo_id = _proximo_id_reserva(conn)
+        insertar_reservas = _Insercion(conn, Reserva, [
+            'id_reserva', 'id_cliente', 'id_cancha', 'id_estado', 'fecha_reserva', 'hora_inicio', 'hora_fin',
+            'precio_total', 'usa_iluminacion', 'monto_iluminacion',
+        ])
+        insertar_pagos = _Insercion(conn, Pago, ['id_reserva', 'id_metodo', 'monto', 'fecha_pago', 'estado'])
+        insertar_servicios = _Insercion(conn, ReservaServicio, ['id_reserva', 'id_servicio', 'cantidad'])
+        a_sql = insertar_reservas.convertir
+        pagado_sql = {}   # (fecha, inicio, horas antes) -> fecha_pago convertida
+        luces_sql = {v: a_sql('usa_iluminacion', v) for v in (False, True)}
+
+        def volcar():
+            totales['reservas'] += insertar_reservas(reservas)
+            totales['pagos'] += insertar_pagos(pagos)
+            totales['servicios'] += insertar_servicios(extras)
+            for lista in (reservas, pagos, extras):
+                lista.clear()
+
+        for c, (id_cancha, fila_cancha) in enumerate(zip(ids_canchas, filas_canchas)):
+            deporte = deportes[fila_cancha['tipo_deporte']]
+            duracion = int(deporte.duracion_minutos or 60)   # como reglas.duracion_cancha
+            lista, prob = probabilidades(duracion, ocupacion, lunes)
+            horas_sql = [(a_sql('hora_inicio', hi), a_sql('hora_fin', hf)) for _, hi, hf in lista]
+            opciones = servicios[deporte.id_deporte] + servicios[None]
+            precios = {}
+            for d in range(n_dias):
+                fecha = desde + timedelta(days=d)
+                fecha_sql = a_sql('fecha_reserva', fecha)
+                pasada = fecha < hoy
+                dia = prob[fecha.weekday()]
+                for k, (s, hi, hf) in enumerate(lista):
+                    totales['turnos'] += 1
+                    if c == liga and fecha.weekday() == 6 and k < 2:
+                        local, visitante = rnd.sample(ids_equipos, 2)
+                        partidos.append({
+                            'id_campeonato': id_campeonato, 'id_cancha': id_cancha,
+                            'equipo_local': local, 'equipo_visitante': visitante,
+                            'fecha_partido': fecha, 'hora_inicio': hi, 'hora_fin': hf,
+                            'goles_local': rnd.randint(0, 4) if pasada else None,
+                            'goles_visitante': rnd.randint(0, 4) if pasada else None,
+                            'jugado': pasada,
+                        })
+                        continue
+                    if rnd.random() >= dia[k]:
+                        continue
+                    luces = bool(fila_cancha['iluminacion']) and s + duracion > HORA_LUCES
+                    servicio = opciones[int(rnd.random() * len(opciones))] if opciones and rnd.random() < P_SERVICIO else None
+                    clave = (luces, servicio)
+                    if clave not in precios:
+                        base = fila_cancha['precio_hora'] * 100 * duracion // 60
+                        luz = fila_cancha['precio_iluminacion'] * 100 * duracion // 60 if luces else 0
+                        centavos = base + luz + (servicio[1] if servicio else 0)
+                        precios[clave] = (a_sql('precio_total', Decimal(centavos) / 100), centavos, luz,
+                                          a_sql('monto_iluminacion', Decimal(luz) / 100))
+                    precio_sql, centavos, luz, luz_sql = precios[clave]
+                    pagada = (rnd.random() >= P_PENDIENTE_PASADA) if pasada else (rnd.random() < P_SENA_FUTURA)
+                    cliente = frecuentes if rnd.random() < P_FRECUENTE else ids_clientes
+                    reservas.append((
+                        proximo_id, cliente[int(rnd.random() * len(cliente))], id_cancha,
+                        confirmada if pagada else pendiente, fecha_sql, *horas_sql[k], precio_sql, luces_sql[luces], luz_sql,
+                    ))
+                    if pagada:
+                        antes = HORAS_PAGO_ANTES[int(rnd.random() * len(HORAS_PAGO_ANTES))]
+                        fecha_pago = pagado_sql.get((fecha, s, antes))
+                        if fecha_pago is None:
+                            fecha_pago = pagado_sql[(fecha, s, antes)] = insertar_pagos.convertir(
+                                'fecha_pago', datetime.combine(fecha, hi) - timedelta(hours=antes))
+                        pagos.append((proximo_id, metodos[int(rnd.random() * len(metodos))], precio_sql, fecha_pago, 'Completado'))
+                    if servicio:
+                        extras.append((proximo_id, servicio[0], 1))
+                    proximo_id += 1
+                    a = uso.get((fecha, id_cancha))
+                    if a is None:
+                        a = uso[(fecha, id_cancha)] = [0, 0, 0, 0, deporte.id_deporte]
+                    a[0] += 1
+                    a[1] += duracion
+                    a[2] += centavos if pagada else 0
+                    a[3] += luz
+                    if len(reservas) >= lote:
+                        volcar()
+        volcar()
+
+        if conn.dialect.name == 'postgresql':
+            # los ids explícitos no avanzan la secuencia
+            conn.exec_driver_sql(
+                "SELECT setval(pg_get_serial_sequence('reservas', 'id_reserva'), (SELECT max(id_reserva) FROM reservas))"
+            )
+        if partidos:
+            conn.execute(insert(Partido), partidos)
+        conn.execute(insert(UsoDiario), [
+            {'fecha': fecha, 'mes': fecha.strftime('%Y-%m'), 'id_cancha': id_cancha, 'id_deporte': a[4],
+             'reservas_count': a[0], 'minutos_reservados': a[1],
+             'ingresos': Decimal(a[2]) / 100, 'ingresos_iluminacion': Decimal(a[3]) / 100}
+            for (fecha, id_cancha), a in uso.items()
+        ])
+
+    if liga is not None:
+        posiciones.reconstruir(id_campeonato)
+    libres = totales.pop('turnos') - len(partidos)
+    return {
+        'clientes': len(ids_clientes), 'canchas': len(ids_canchas), **totales, 'partidos': len(partidos),
+        'ocupacion': round(totales['reservas'] / libres, 3) if libres else 0.0,
+        'desde': desde, 'hasta': desde + timedelta(days=n_dias - 1), 'hoy': hoy,
+        'segundos': round(time.perf_counter() - t0, 2),
+    }
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Poblar la base con datos de ejemplo o sintéticos')
+    p.add_argument('--clientes', type=int, default=0, help='clientes a generar (0 = sólo datos de ejemplo)')
+    p.add_argument('--canchas', type=int, default=0, help='canchas nuevas a reservar')
+    p.add_argument('--dias', type=int, default=365, help='días de reservas (el 90%% antes de hoy)')
+    p.add_argument('--ocupacion', type=float, default=OCUPACION, help='fracción promedio de turnos reservados')
+    p.add_argument('--semilla', type=int, default=SEMILLA)
+    args = p.parse_args(argv)
+
+    app = seed()
+    if not (args.clientes or args.canchas):
+        return
+    with app.app_context():
+        r = generar(max(args.clientes, 1), args.canchas, args.dias, args.ocupacion, semilla=args.semilla)
+    print(f"Generados {r['clientes']} clientes, {r['canchas']} canchas, {r['reservas']} reservas "
+          f"({r['desde']} a {r['hasta']}, ocupación {r['ocupacion']:.0%}), {r['pagos']} pagos, "
+          f"{r['servicios']} servicios, {r['partidos']} partidos en {r['segundos']} s")
 
 
 if __name__ == '__main__':
-    seed()
+    main()
@@ -111,20 +111,8 @@ async function fetchJson(url){
   }
 }
 
-// Helper utilities at module scope (used by slot rendering)
+// Helper utilities at module scope
 function pad(n){ return String(n).padStart(2,'0'); }
-function timeStrToMin(t){ const p = String(t).split(':').map(x=>parseInt(x,10)); return (p[0]||0)*60 + (p[1]||0); }
-function fmtMin(m){ let mm = m % 1440; return pad(Math.floor(mm/60)) + ':' + pad(mm%60); }
-function intervalsOverlap(aS,aE,bS,bE){
-  for(const offA of [0,1440]){
-    const as = aS + offA, ae = aE + offA;
-    for(const offB of [0,1440]){
-      const bs = bS + offB, be = bE + offB;
-      if(as < be && bs < ae) return true;
-    }
-  }
-  return false;
-}
 
 async function loadSelects(){
   const clientes = await fetchJson(API_CLIENTES) || [];
@@ -506,10 +494,31 @@ if(document.getElementById('btn-reset')){
 // Inicializar selects al cargar la página
 loadSelects();
 
+// --- Actualizaciones en vivo (SSE): otro recepcionista tomó o liberó un turno ---
+let eventosSource = null;
+let eventosClave = null;
+let refrescoPendiente = null;
+
+function suscribirEventos(idCancha, fecha){
+  const clave = (idCancha && fecha) ? `${idCancha}|${fecha}` : null;
+  if(clave === eventosClave) return;
+  if(eventosSource){ eventosSource.close(); eventosSource = null; }
+  eventosClave = clave;
+  if(!clave || !window.EventSource) return;
+  eventosSource = new EventSource(`${API_CANCHAS}/${idCancha}/eventos?fecha=${fecha}`);
+  // varios cambios seguidos (ej. alta por lote) se agrupan en una sola recarga
+  const refrescar = () => {
+    clearTimeout(refrescoPendiente);
+    refrescoPendiente = setTimeout(onCanchaFechaChange, 200);
+  };
+  ['ocupado', 'liberado', 'confirmado', 'resync'].forEach(t => eventosSource.addEventListener(t, refrescar));
+}
+
 // --- Nuevas funciones para mostrar reservas y slots ---
 async function onCanchaFechaChange(){
   const idCancha = document.getElementById('select-cancha').value;
   const fecha = document.getElementById('fecha').value;
+  suscribirEventos(idCancha, fecha);
   const listDiv = document.getElementById('reservas-list');
   const slotsDiv = document.getElementById('slots-list');
   const slotsContainer = document.getElementById('slots-container');
@@ -596,61 +605,32 @@ async function onCanchaFechaChange(){
     });
   }
 
-  // obtener reservas existentes (ya realizado arriba) y generar franjas horarias
-  // Generamos franjas por hora (60 minutos) desde 08:00 hasta 22:00 (terminan a las 23:00)
-  // Nota: simplificamos y no dependemos de un endpoint de 'horarios' en el servidor
-  const horarios = []; // no usamos horarios del servidor; generamos la franja por defecto
-  const SLOT_START_MIN = 8 * 60; // 08:00
-  const SLOT_END_LIMIT = 23 * 60; // 23:00 (hora límite de finalización)
-
-  // helper (moved to module scope)
-
-  // preparar reservas existentes en minutos
-  const reservasIntervals = (reservas || []).map(r => {
-    let rs = timeStrToMin(r.hora_inicio);
-    let re = timeStrToMin(r.hora_fin);
-    if(re <= rs) re += 1440; // cruza medianoche
-    return {start: rs, end: re};
-  });
+  // obtener la grilla de franjas desde el servidor (una sola petición por cancha+fecha)
+  const grilla = await fetchJson(`${API_CANCHAS}/${idCancha}/disponibilidad?fecha=${fecha}`);
+
   // show slots container
   if(slotsDiv) slotsDiv.style.display = 'flex';
   if(slotsContainer) slotsContainer.style.display = 'flex';
   const slotsMsg = document.getElementById('slots-msg');
   if(slotsMsg) slotsMsg.style.display = 'none';
 
-  // Simpler slot strategy: create 1-hour slots every 60 minutes from 08:00 up to 22:00 (so they end by 23:00)
-  const SLOT_DURATION = 60; // fixed duration in minutes for slots
-  const STEP = 60; // one hour steps as requested
-  const maxStartGlobal = SLOT_END_LIMIT - SLOT_DURATION; // latest allowed start so it finishes by 23:00
-
-  if(horarios.length === 0){
-    // si no hay horarios definidos, mostrar la franja completa 08:00-23:00 en pasos de 1h
-    for(let m = SLOT_START_MIN; m <= maxStartGlobal; m += STEP){
-      addSlotMinutes(m, reservasIntervals, slotsDiv, idCancha, SLOT_DURATION);
-    }
-  } else {
-    for(const h of horarios){
-      if(h.disponible_para_fecha === false) continue;
-      const startMin = timeStrToMin(h.hora_inicio);
-      let endMin = timeStrToMin(h.hora_fin);
-      if(endMin <= startMin) endMin += 1440; // cruza medianoche
-      // intersect horario with 08:00 - 23:00 window
-      const windowStart = Math.max(SLOT_START_MIN, startMin);
-      const windowEnd = Math.min(SLOT_END_LIMIT, endMin);
-      const lastStart = windowEnd - SLOT_DURATION;
-      for(let m = windowStart; m <= lastStart; m += STEP){
-        if(m <= maxStartGlobal) addSlotMinutes(m, reservasIntervals, slotsDiv, idCancha, SLOT_DURATION);
-      }
-    }
+  if(!grilla || !grilla.slots){
+    if(slotsDiv) slotsDiv.innerHTML = '<div class="text-muted small">No se pudo obtener la disponibilidad</div>';
+    return;
   }
+  grilla.slots.forEach(slot => addSlot(slot, slotsDiv));
 }
 
-function addSlotMinutes(startMin, reservasIntervals, slotsDiv, idCancha, slotDuration = 60){
-  // slotDuration default 60 minutes (fixed hourly slots)
-  const dur = parseInt(slotDuration, 10) || 60;
-  const slotStart = startMin;
-  const slotEnd = slotStart + dur;
-  const slotLabel = `${fmtMin(slotStart)} - ${fmtMin(slotEnd)}`;
+// Textos para los motivos de bloqueo devueltos por /api/canchas/<id>/disponibilidad
+const MOTIVOS_SLOT = {
+  'RESERVA_EXISTENTE': 'Ocupado',
+  'PARTIDO_EXISTENTE': 'Partido',
+  'HORARIO_NO_DISPONIBLE': 'Sin horario',
+  'FUERA_DE_RANGO': 'No seleccionable',
+};
+
+function addSlot(slot, slotsDiv){
+  const slotLabel = `${slot.hora_inicio} - ${slot.hora_fin}`;
 
   // contenedor del slot (botón + badge)
   const wrapper = document.createElement('div');
@@ -667,28 +647,19 @@ function addSlotMinutes(startMin, reservasIntervals, slotsDiv, idCancha, slotDur
   badge.className = 'badge align-self-start';
   badge.style.marginLeft = '6px';
 
-  // determinar si está ocupado
-  const ocupado = reservasIntervals.some(r => intervalsOverlap(slotStart, slotEnd, r.start, r.end));
-  const maxSelectable = 23 * 60; // 23:00 end limit
-  if(ocupado){
-    slotEl.className += ' btn-outline-danger disabled';
-    badge.className += ' bg-danger';
-    badge.textContent = 'Ocupado';
-  } else if(slotEnd > maxSelectable){
-    // slot que finalizaría después de las 23:00 — no seleccionable
-    slotEl.className += ' btn-outline-secondary disabled';
-    badge.className += ' bg-secondary';
-    badge.textContent = 'No seleccionable';
+  if(!slot.disponible){
+    const ocupado = slot.motivo === 'RESERVA_EXISTENTE' || slot.motivo === 'PARTIDO_EXISTENTE';
+    slotEl.className += ocupado ? ' btn-outline-danger disabled' : ' btn-outline-secondary disabled';
+    badge.className += ocupado ? ' bg-danger' : ' bg-secondary';
+    badge.textContent = MOTIVOS_SLOT[slot.motivo] || 'No disponible';
   } else {
     slotEl.className += ' btn-outline-success';
     badge.className += ' bg-success';
     badge.textContent = 'Disponible';
     slotEl.addEventListener('click', ()=>{
-      // rellenar inputs ocultos (hora de inicio y fin). Si el start es >=1440, restar 1440 para el input del mismo día
-      const displayStart = slotStart % 1440;
-      const displayEnd = slotEnd % 1440;
-      const hIni = fmtMin(displayStart);
-      const hFin = fmtMin(displayEnd);
+      // rellenar inputs ocultos (hora de inicio y fin)
+      const hIni = slot.hora_inicio;
+      const hFin = slot.hora_fin;
       const horaIniInput = document.getElementById('hora_inicio');
       const horaFinInput = document.getElementById('hora_fin');
       if(horaIniInput) horaIniInput.value = hIni;
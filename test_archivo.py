@@ -0,0 +1,143 @@
+from datetime import date
+from app import db
+from models import Reserva, Pago, ReservaServicio, ReservaArchivada, PagoArchivado, ReservaServicioArchivada, ServicioAdicional
+from resumen import calcular
+from test_reservas import contar_sentencias
+from test_resumen import snapshot
+import archivo
+
+
+def reservar(client, datos, fecha, h, servicios=None):
+    r = client.post('/api/reservas/', json={
+        'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'], 'fecha_reserva': fecha,
+        'hora_inicio': f'{h}:00', 'hora_fin': f'{h + 1}:00', 'servicios_adicionales': servicios or [],
+    })
+    assert r.status_code == 201
+    body = r.get_json()
+    assert client.post(f"/api/reservas/{body['id_reserva']}/pagar", json={'id_metodo': 1, 'monto': body['precio_total']}).status_code == 201
+    return body['id_reserva']
+
+
+def cargar(app, client, datos):
+    with app.app_context():
+        svc = ServicioAdicional(nombre='Paleta', precio_adicional=10, id_deporte=datos['id_deporte'])
+        db.session.add(svc)
+        db.session.commit()
+        id_servicio = svc.id_servicio
+    viejas = [reservar(client, datos, f'2024-0{m}-10', 10, [{'id_servicio': id_servicio, 'cantidad': 1}]) for m in (1, 2, 3)]
+    nuevas = [reservar(client, datos, '2025-11-10', h) for h in (10, 11)]
+    return viejas, nuevas
+
+
+def total_recalculado():
+    acumulado = calcular()
+    for k, a in calcular(reservas=ReservaArchivada, pagos=PagoArchivado).items():
+        acumulado[k] = [x + y for x, y in zip(acumulado[k], a)]
+    return {k: tuple(a) for k, a in acumulado.items()}
+
+
+def test_archivar_mueve_reservas_pagos_y_servicios(app, client, datos):
+    viejas, nuevas = cargar(app, client, datos)
+    with app.app_context():
+        antes = snapshot()
+        assert archivo.archivar(date(2025, 1, 1), tam_lote=2) == 3
+        assert sorted(db.session.scalars(db.select(Reserva.id_reserva))) == nuevas
+        assert sorted(db.session.scalars(db.select(ReservaArchivada.id_reserva))) == viejas
+        assert Pago.query.count() == 2 and PagoArchivado.query.count() == 3
+        assert ReservaServicio.query.count() == 0 and ReservaServicioArchivada.query.count() == 3
+        assert archivo.limite() == date(2024, 3, 10)
+        # el resumen no cambia y sigue coincidiendo con activas + archivo
+        assert snapshot() == antes == total_recalculado()
+        # volver a archivar no mueve nada
+        assert archivo.archivar(date(2025, 1, 1)) == 0
+
+
+def test_reportes_unen_el_archivo_solo_si_hace_falta(app, client, datos):
+    viejas, nuevas = cargar(app, client, datos)
+    with app.app_context():
+        archivo.archivar(date(2025, 1, 1))
+
+    url = f"/api/reportes/reservas_por_cancha?id_cancha={datos['id_cancha']}"
+    todas = client.get(url).get_json()['reservas']
+    assert [r['id_reserva'] for r in todas] == viejas + nuevas
+    assert todas[0]['cliente'] == 'Ana Gomez' and todas[0]['fecha_reserva'] == '2024-01-10'
+
+    assert [r['id_reserva'] for r in client.get(url + '&desde=2024-02-01&hasta=2024-12-31').get_json()['reservas']] == viejas[1:]
+
+    with contar_sentencias(app) as contador:
+        recientes = client.get(url + '&desde=2025-01-01').get_json()['reservas']
+    assert [r['id_reserva'] for r in recientes] == nuevas
+    assert not any('UNION' in s for s in contador['sentencias'])
+
+    # paginación por cursor a través de activas y archivo
+    vistos, after = [], None
+    while True:
+        q = f"/api/reportes/reservas_por_cliente?id_cliente={datos['id_cliente']}&limit=2" + (f'&after={after}' if after else '')
+        body = client.get(q).get_json()
+        vistos += [r['id_reserva'] for r in body['reservas']]
+        after = body['next_cursor']
+        if after is None:
+            break
+    assert vistos == viejas + nuevas
+
+
+def test_borrar_cliente_borra_tambien_el_archivo(app, client, datos):
+    cargar(app, client, datos)
+    with app.app_context():
+        archivo.archivar(date(2025, 1, 1))
+    r = client.delete(f"/api/clientes/{datos['id_cliente']}")
+    assert r.status_code == 200
+    assert r.get_json()['reservas_eliminadas'] == 5
+    with app.app_context():
+        assert ReservaArchivada.query.count() == 0
+        assert PagoArchivado.query.count() == 0
+        assert ReservaServicioArchivada.query.count() == 0
+        assert snapshot() == {}
+
+
+def test_archivar_dos_veces_no_reutiliza_ids_de_pagos_ni_servicios(app, client, datos):
+    # sin AUTOINCREMENT, SQLite reutiliza los ids liberados al archivar y el segundo archivo choca
+    with app.app_context():
+        svc = ServicioAdicional(nombre='Paleta', precio_adicional=10, id_deporte=datos['id_deporte'])
+        db.session.add(svc)
+        db.session.commit()
+        extra = [{'id_servicio': svc.id_servicio, 'cantidad': 1}]
+    primera = reservar(client, datos, '2024-01-10', 10, extra)
+    with app.app_context():
+        assert archivo.archivar(date(2025, 1, 1)) == 1
+    segunda = reservar(client, datos, '2024-02-10', 10, extra)
+    with app.app_context():
+        assert archivo.archivar(date(2025, 1, 1)) == 1
+        assert sorted(db.session.scalars(db.select(ReservaArchivada.id_reserva))) == [primera, segunda]
+        assert len(set(db.session.scalars(db.select(PagoArchivado.id_pago)))) == 2
+        assert len(set(db.session.scalars(db.select(ReservaServicioArchivada.id_reserva_servicio)))) == 2
+
+
+def test_migracion_agrega_autoincrement_y_fija_la_secuencia(app, client, datos):
+    import pytest
+    from sqlalchemy import text
+    from sqlalchemy.schema import CreateTable
+    import db_add_autoincrement_archivo as migracion
+
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            pytest.skip('migración sólo para SQLite')
+    reservar(client, datos, '2024-01-10', 10)
+    with app.app_context():
+        archivo.archivar(date(2025, 1, 1))
+        # base anterior: pagos sin AUTOINCREMENT (ya vacía, el id 1 está en el archivo)
+        ddl = str(CreateTable(Pago.__table__).compile(dialect=db.engine.dialect)).replace(' AUTOINCREMENT', '')
+        db.session.execute(text('DROP TABLE pagos'))
+        db.session.execute(text(ddl))
+        db.session.execute(text("DELETE FROM sqlite_sequence WHERE name = 'pagos'"))
+        db.session.commit()
+
+        reconstruidas, secuencias = migracion.migrar()
+        assert reconstruidas == ['pagos']
+        assert secuencias['pagos'] == 1
+        assert migracion.migrar()[0] == []   # idempotente
+
+    reservar(client, datos, '2024-02-10', 10)
+    with app.app_context():
+        assert db.session.scalars(db.select(Pago.id_pago)).all() == [2]
+        assert archivo.archivar(date(2025, 1, 1)) == 1
@@ -0,0 +1,75 @@
+import threading
+import pytest
+import app as app_modulo
+from app import create_app, db, ErrorDeArranque
+import db_crear_esquema
+
+
+def _url(tmp_path, nombre='arranque.db'):
+    return f"sqlite:///{tmp_path / nombre}"
+
+
+def test_blueprint_que_no_importa_detiene_el_arranque(monkeypatch, tmp_path):
+    monkeypatch.setattr(app_modulo, 'BLUEPRINTS', app_modulo.BLUEPRINTS + [('routes_inexistente', '/api')])
+    with pytest.raises(ErrorDeArranque, match='routes_inexistente'):
+        create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': _url(tmp_path)})
+
+
+def test_sin_crear_tablas_exige_esquema_migrado(tmp_path):
+    config = {'TESTING': True, 'SQLALCHEMY_DATABASE_URI': _url(tmp_path), 'CREAR_TABLAS': False}
+    with pytest.raises(ErrorDeArranque, match='reservas'):
+        create_app(config)
+
+    previa = create_app(dict(config, VERIFICAR_ESQUEMA=False))
+    with previa.app_context():
+        tablas, indices = db_crear_esquema.crear_esquema()
+        assert 'reservas' in tablas and indices == []   # create_all ya crea los índices de tablas nuevas
+        assert db_crear_esquema.crear_esquema() == ([], [])
+        db.engine.dispose()
+
+    app = create_app(config)
+    assert app.test_client().get('/api/deportes/').status_code == 200
+    with app.app_context():
+        db.engine.dispose()
+
+
+def test_blueprints_diferidos_se_registran_en_el_primer_pedido(tmp_path):
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': _url(tmp_path), 'BLUEPRINTS_DIFERIDOS': True})
+    assert app.extensions['arranque']['blueprints'] == {}
+    assert app.blueprints == {}
+
+    client = app.test_client()
+    respuestas = []
+    hilos = [threading.Thread(target=lambda: respuestas.append(client.get('/api/deportes/').status_code))
+             for _ in range(4)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    assert respuestas == [200] * 4
+    assert set(app.extensions['arranque']['blueprints']) == {m for m, _ in app_modulo.BLUEPRINTS}
+    assert app.extensions['arranque']['blueprints_ms'] > 0
+    assert not isinstance(app.wsgi_app, app_modulo._BlueprintsDiferidos)
+    with app.app_context():
+        db.engine.dispose()
+
+
+def test_blueprint_diferido_roto_falla_cada_pedido(monkeypatch, tmp_path):
+    monkeypatch.setattr(app_modulo, 'BLUEPRINTS', [('routes_inexistente', '/api')])
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': _url(tmp_path), 'BLUEPRINTS_DIFERIDOS': True})
+    client = app.test_client()
+    for _ in range(2):
+        with pytest.raises(ErrorDeArranque):
+            client.get('/')
+    with app.app_context():
+        db.engine.dispose()
+
+
+def test_tiempos_de_arranque_en_metrics(app, client):
+    arranque = app.extensions['arranque']
+    assert arranque['create_app_ms'] > 0 and arranque['importacion_ms'] > 0
+    assert set(arranque['blueprints']) == {m for m, _ in app_modulo.BLUEPRINTS}
+    texto = client.get('/metrics').get_data(as_text=True)
+    assert 'reservas_arranque{dato="create_app_ms"}' in texto
+    assert 'reservas_arranque{dato="esquema_ms"}' in texto
+    assert 'routes_' not in texto
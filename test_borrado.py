@@ -0,0 +1,152 @@
+from datetime import date, datetime, time
+import pytest
+from app import create_app, db
+from models import TareaBorrado, Cliente, Reserva, Pago, Partido, Campeonato, Equipo, PosicionEquipo, UsoDiario
+from test_reservas import contar_sentencias
+from test_resumen import snapshot, recalculado
+import borrado
+import posiciones
+
+
+def crear_cliente(app, dni):
+    with app.app_context():
+        c = Cliente(dni=dni, nombre='Cliente', apellido=dni)
+        db.session.add(c)
+        db.session.commit()
+        return c.id_cliente
+
+
+def reservas_semanales(client, datos, id_cliente, hora, hasta, pagar=True):
+    r = client.post('/api/reservas/bulk', json={
+        'id_cliente': id_cliente, 'id_cancha': datos['id_cancha'],
+        'hora_inicio': f'{hora}:00', 'hora_fin': f'{hora + 1}:00',
+        'recurrencia': {'frecuencia': 'semanal', 'desde': '2025-01-06', 'hasta': hasta},
+    })
+    assert r.status_code == 201
+    creadas = r.get_json()['creadas']
+    if pagar:
+        for c in creadas:
+            assert client.post(f"/api/reservas/{c['id_reserva']}/pagar", json={'id_metodo': 1, 'monto': c['precio_total']}).status_code == 201
+    return creadas
+
+
+def test_borrar_cliente_usa_cantidad_fija_de_sentencias(app, client, datos):
+    pocas = crear_cliente(app, '2')
+    muchas = crear_cliente(app, '3')
+    reservas_semanales(client, datos, pocas, 10, '2025-01-13')
+    reservas_semanales(client, datos, muchas, 12, '2025-12-29')
+
+    conteos = []
+    for id_cliente in (pocas, muchas):
+        with contar_sentencias(app) as contador:
+            r = client.delete(f'/api/clientes/{id_cliente}')
+        assert r.status_code == 200
+        conteos.append(contador['n'])
+    assert conteos[0] == conteos[1]
+    assert r.get_json()['reservas_eliminadas'] == 52
+
+    with app.app_context():
+        assert Reserva.query.count() == 0
+        assert Pago.query.count() == 0
+        assert snapshot() == recalculado()
+
+
+def test_borrar_cancha_recalcula_posiciones(app, client, datos):
+    reservas_semanales(client, datos, datos['id_cliente'], 10, '2025-03-31')
+    with app.app_context():
+        camp = Campeonato(nombre='Apertura')
+        db.session.add(camp)
+        db.session.flush()
+        a, b = Equipo(nombre='A', id_campeonato=camp.id_campeonato), Equipo(nombre='B', id_campeonato=camp.id_campeonato)
+        db.session.add_all([a, b])
+        db.session.flush()
+        partido = Partido(id_campeonato=camp.id_campeonato, id_cancha=datos['id_cancha'], equipo_local=a.id_equipo,
+                          equipo_visitante=b.id_equipo, fecha_partido=date(2025, 11, 10), hora_inicio=time(18),
+                          hora_fin=time(19), jugado=False)
+        db.session.add(partido)
+        db.session.commit()
+        id_camp, id_partido = camp.id_campeonato, partido.id_partido
+    client.put(f'/api/partidos/{id_partido}/resultado', json={'goles_local': 2, 'goles_visitante': 0})
+
+    r = client.delete(f"/api/canchas/{datos['id_cancha']}")
+    assert r.status_code == 200
+    assert r.get_json()['reservas_eliminadas'] == 13
+
+    with app.app_context():
+        assert Partido.query.count() == 0
+        assert UsoDiario.query.count() == 0
+        assert PosicionEquipo.query.filter_by(id_campeonato=id_camp).count() == 0
+        assert posiciones.calcular(id_camp) == {}
+    assert all(f['puntos'] == 0 for f in client.get(f'/api/campeonatos/{id_camp}/tabla').get_json()['tabla'])
+
+
+def test_borrado_por_lotes_en_segundo_plano(app, client, datos):
+    app.config.update(BORRADO_TAM_LOTE=10, BORRADO_PAUSA=0)
+    otro = crear_cliente(app, '2')
+    reservas_semanales(client, datos, datos['id_cliente'], 10, '2025-12-29')
+    reservas_semanales(client, datos, otro, 14, '2025-02-24', pagar=False)
+
+    r = client.delete(f"/api/clientes/{datos['id_cliente']}?lotes=true")
+    assert r.status_code == 202
+    id_tarea = r.get_json()['id_tarea']
+    with app.app_context():
+        assert borrado.esperar(id_tarea, 10) == 'terminada'
+
+    tarea = client.get(f'/api/tareas/{id_tarea}').get_json()
+    assert (tarea['estado'], tarea['reservas_borradas'], tarea['error']) == ('terminada', 52, None)
+    assert client.get(f"/api/clientes/{datos['id_cliente']}").status_code == 404
+    assert client.get('/api/tareas/999').status_code == 404
+    with app.app_context():
+        assert Reserva.query.count() == 8
+        assert Pago.query.count() == 0
+        assert snapshot() == recalculado()
+
+
+def test_tarea_abandonada_se_retoma_desde_otro_proceso(app, client, datos, monkeypatch):
+    app.config.update(BORRADO_TAM_LOTE=10, BORRADO_PAUSA=0)
+    reservas_semanales(client, datos, datos['id_cliente'], 10, '2025-12-29')
+    # el proceso que la inicia muere antes de correrla: queda registrada y el cliente desactivado
+    with monkeypatch.context() as m:
+        m.setattr(borrado, '_lanzar', lambda id_tarea, dueno: None)
+        id_tarea = client.delete(f"/api/clientes/{datos['id_cliente']}?lotes=true").get_json()['id_tarea']
+
+    # otro worker (otra app sobre la misma base) ve la misma tarea; con el latido vigente no la toma
+    otra = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': app.config['SQLALCHEMY_DATABASE_URI']})
+    try:
+        otro_cliente = otra.test_client()
+        assert otro_cliente.get(f'/api/tareas/{id_tarea}').get_json()['estado'] == 'pendiente'
+        # un nuevo DELETE del mismo cliente devuelve la tarea existente en lugar de crear otra
+        r = otro_cliente.delete(f"/api/clientes/{datos['id_cliente']}?lotes=true")
+        assert (r.status_code, r.get_json()['id_tarea']) == (202, id_tarea)
+
+        otra.config.update(BORRADO_VENCIMIENTO=0, BORRADO_TAM_LOTE=10, BORRADO_PAUSA=0)
+        otro_cliente.get(f'/api/tareas/{id_tarea}')
+        with otra.app_context():
+            assert borrado.esperar(id_tarea, 10) == 'terminada'
+            assert borrado.reanudar(id_tarea) is None   # terminada: nadie más la toma
+            assert TareaBorrado.query.count() == 1
+    finally:
+        with otra.app_context():
+            db.engine.dispose()
+
+    tarea = client.get(f'/api/tareas/{id_tarea}').get_json()
+    assert (tarea['estado'], tarea['reservas_borradas']) == ('terminada', 52)
+    with app.app_context():
+        assert Reserva.query.count() == 0
+        assert snapshot() == recalculado()
+
+
+def test_tarea_retomada_por_otro_detiene_al_anterior(app, client, datos):
+    reservas_semanales(client, datos, datos['id_cliente'], 10, '2025-01-20')
+    with app.app_context():
+        ahora = datetime.now()
+        tarea = TareaBorrado(tipo='cliente', id_objetivo=datos['id_cliente'], estado='en_curso',
+                             inicio=ahora, latido=ahora, dueno='nuevo')
+        db.session.add(tarea)
+        db.session.commit()
+        # quien ya no es dueño no puede registrar avance: su lote se deshace
+        borrado.borrar_reservas(Reserva.id_cliente == datos['id_cliente'])
+        with pytest.raises(borrado.TareaTomada):
+            borrado._avanzar(tarea.id_tarea, 'anterior', 3)
+        db.session.rollback()
+        assert Reserva.query.count() == 3
@@ -0,0 +1,57 @@
+from test_reservas import contar_sentencias
+
+URLS = ['/api/canchas/', '/api/deportes/', '/api/servicios', '/api/metodos', '/api/reportes/uso_mensual']
+
+
+def test_304_sin_consultar_la_base(app, client, datos):
+    etags = {}
+    with contar_sentencias(app) as completas:
+        for url in URLS:
+            r = client.get(url)
+            assert r.status_code == 200 and r.headers['ETag']
+            etags[url] = r.headers['ETag']
+    with contar_sentencias(app) as condicionales:
+        for url in URLS:
+            r = client.get(url, headers={'If-None-Match': etags[url]})
+            assert r.status_code == 304
+            assert r.headers['ETag'] == etags[url]
+            assert r.data == b''
+    assert completas['n'] >= len(URLS)
+    assert condicionales['n'] == 0
+
+
+def test_escritura_cambia_el_etag_solo_de_lo_afectado(app, client, datos):
+    canchas = client.get('/api/canchas/').headers['ETag']
+    metodos = client.get('/api/metodos').headers['ETag']
+
+    r = client.put(f"/api/canchas/{datos['id_cancha']}", json={'nombre': 'Central'})
+    assert r.status_code == 200
+    r = client.get('/api/canchas/', headers={'If-None-Match': canchas})
+    assert r.status_code == 200
+    assert r.get_json()[0]['nombre'] == 'Central'
+    assert r.headers['ETag'] != canchas
+    assert client.get('/api/metodos', headers={'If-None-Match': metodos}).status_code == 304
+
+
+def test_rollback_y_altas_por_lote(app, client, datos):
+    uso = client.get('/api/reportes/uso_mensual').headers['ETag']
+    # un alta inválida no confirma nada: el ETag no cambia
+    r = client.post('/api/reservas/', json={'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha']})
+    assert r.status_code == 400
+    assert client.get('/api/reportes/uso_mensual', headers={'If-None-Match': uso}).status_code == 304
+    # el alta por lote escribe con executemany (sin objetos ORM) y también invalida
+    r = client.post('/api/reservas/bulk', json={
+        'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'], 'hora_inicio': '18:00', 'hora_fin': '19:00',
+        'recurrencia': {'frecuencia': 'semanal', 'desde': '2025-11-04', 'hasta': '2025-11-18'},
+    })
+    assert r.status_code == 201
+    r = client.get('/api/reportes/uso_mensual', headers={'If-None-Match': uso})
+    assert r.status_code == 200
+    assert r.get_json()['uso_mensual'][0]['count'] == 3
+
+
+def test_cache_control_por_endpoint(client, datos):
+    assert client.get('/api/canchas/').headers['Cache-Control'] == 'no-cache'
+    assert client.get('/api/metodos').headers['Cache-Control'] == 'public, max-age=300'
+    assert client.get('/api/reportes/ranking_canchas').headers['Cache-Control'] == 'private, no-cache'
+    assert 'ETag' not in client.get('/api/reportes/reservas_por_cliente').headers  # 400: sin caché
@@ -0,0 +1,94 @@
+from app import db
+from catalogo import CacheCatalogos
+from models import Cancha
+from test_reservas import contar_sentencias
+
+TABLAS_CATALOGO = ('deportes', 'estado_reserva', 'metodos_pago', 'servicios_adicionales')
+
+
+def reservar(client, datos, hora_inicio, hora_fin, **extra):
+    return client.post('/api/reservas/', json={
+        'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+        'fecha_reserva': '2025-11-10', 'hora_inicio': hora_inicio, 'hora_fin': hora_fin, **extra,
+    })
+
+
+def consultas_a_catalogos(sentencias):
+    return [s for s in sentencias if s.lstrip().upper().startswith('SELECT') and any(t in s for t in TABLAS_CATALOGO)]
+
+
+def test_reserva_y_pago_sin_consultas_a_catalogos_con_cache_caliente(app, client, datos):
+    r = reservar(client, datos, '10:00', '11:00')
+    client.post(f"/api/reservas/{r.get_json()['id_reserva']}/pagar", json={'id_metodo': 1, 'monto': r.get_json()['precio_total']})
+
+    with contar_sentencias(app) as c:
+        r = reservar(client, datos, '12:00', '13:00')
+        assert r.status_code == 201
+        p = client.post(f"/api/reservas/{r.get_json()['id_reserva']}/pagar", json={'id_metodo': 1, 'monto': r.get_json()['precio_total']})
+        assert p.status_code == 201
+    assert consultas_a_catalogos(c['sentencias']) == []
+
+    with app.app_context():
+        import catalogo
+        stats = catalogo.estadisticas()
+    assert stats['aciertos'] > 0 and stats['fallos'] == 3  # deportes, estados, metodos
+
+
+def test_cambios_en_deportes_y_servicios_invalidan_la_cache(app, client, datos):
+    assert reservar(client, datos, '10:00', '11:00').status_code == 201
+
+    client.put(f"/api/deportes/{datos['id_deporte']}", json={'duracion_minutos': 90})
+    assert reservar(client, datos, '12:00', '13:00').status_code == 400
+    assert reservar(client, datos, '12:00', '13:30').status_code == 201
+
+    svc = client.post(f"/api/deportes/{datos['id_deporte']}/servicios", json={'nombre': 'Paletas', 'precio_adicional': '15'}).get_json()
+    r = reservar(client, datos, '15:00', '16:30', servicios_adicionales=[{'id_servicio': svc['id_servicio'], 'cantidad': 2}])
+    assert r.status_code == 201
+    assert r.get_json()['precio_total'] == '180.00'
+
+
+def test_deporte_de_la_cancha_se_resuelve_sin_cargar_la_relacion(app, datos):
+    from disponibilidad import duracion_cancha
+    with app.app_context():
+        cancha = db.session.get(Cancha, datos['id_cancha'])
+        assert duracion_cancha(cancha) == 60
+        assert 'deporte' not in cancha.__dict__
+
+
+def test_deporte_creado_en_otro_worker_recarga_el_catalogo(app, client, datos):
+    from models import Deporte
+    assert reservar(client, datos, '10:00', '11:00').status_code == 201   # catálogo en caché
+
+    # alta directa en la base, sin invalidar la caché de este proceso
+    with app.app_context():
+        tenis = Deporte(nombre='Tenis', duracion_minutos=90)
+        db.session.add(tenis)
+        db.session.flush()
+        db.session.get(Cancha, datos['id_cancha']).id_deporte = tenis.id_deporte
+        db.session.commit()
+
+    assert reservar(client, datos, '12:00', '13:00').status_code == 400
+    assert reservar(client, datos, '12:00', '13:30').status_code == 201
+
+
+def test_cache_ttl_y_version():
+    cache = CacheCatalogos(ttl=60)
+    cargas = []
+
+    def cargar(valor):
+        def _f():
+            cargas.append(valor)
+            return valor
+        return _f
+
+    assert cache.obtener('a', cargar(1)) == 1
+    assert cache.obtener('a', cargar(2)) == 1
+    cache.obtener('b', cargar(3))
+    cache.invalidar('a')
+    assert cache.obtener('a', cargar(4)) == 4
+    assert cache.obtener('b', cargar(5)) == 3
+    assert cache.estadisticas() == {'aciertos': 2, 'fallos': 3, 'invalidaciones': 1, 'entradas': 2}
+
+    vencida = CacheCatalogos(ttl=0)
+    vencida.obtener('a', cargar(6))
+    assert vencida.obtener('a', cargar(7)) == 7
@@ -0,0 +1,121 @@
+import threading
+from datetime import date, time
+from sqlalchemy.exc import IntegrityError
+from app import db
+from models import Reserva, Partido, Campeonato, Equipo, BloqueoCanchaFecha, PosicionEquipo
+import bloqueos
+import posiciones
+
+HILOS = 200
+
+
+def en_paralelo(app, n, pedido):
+    """Lanza n pedidos a la vez (cada uno con su propio test client) y devuelve los status."""
+    barrera = threading.Barrier(n)
+    status = [None] * n
+
+    def correr(i):
+        c = app.test_client()
+        barrera.wait()
+        status[i] = pedido(c, i).status_code
+
+    hilos = [threading.Thread(target=correr, args=(i,)) for i in range(n)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return status
+
+
+def test_reservas_concurrentes_sobre_el_mismo_turno(app, datos):
+    cuerpo = {
+        'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+        'fecha_reserva': '2025-11-10', 'hora_inicio': '18:00', 'hora_fin': '19:00',
+    }
+    status = en_paralelo(app, HILOS, lambda c, i: c.post('/api/reservas/', json=cuerpo))
+
+    assert status.count(201) == 1
+    assert status.count(409) == HILOS - 1
+    with app.app_context():
+        assert Reserva.query.count() == 1
+
+
+def test_reserva_y_partido_concurrentes_sobre_el_mismo_turno(app, datos):
+    with app.app_context():
+        camp = Campeonato(nombre='Apertura')
+        db.session.add(camp)
+        db.session.flush()
+        e1 = Equipo(nombre='A', id_campeonato=camp.id_campeonato)
+        e2 = Equipo(nombre='B', id_campeonato=camp.id_campeonato)
+        db.session.add_all([e1, e2])
+        db.session.commit()
+        ids = (camp.id_campeonato, e1.id_equipo, e2.id_equipo)
+
+    def pedido(c, i):
+        if i % 2:
+            return c.post('/api/reservas/', json={
+                'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+                'fecha_reserva': '2025-11-10', 'hora_inicio': '23:00', 'hora_fin': '00:00',
+            })
+        # se solapa con la reserva de 23:00 a 00:00
+        return c.post('/api/partidos', json={
+            'id_campeonato': ids[0], 'id_cancha': datos['id_cancha'],
+            'equipo_local': ids[1], 'equipo_visitante': ids[2],
+            'fecha_partido': '2025-11-10', 'hora_inicio': '23:30', 'hora_fin': '23:59',
+        })
+
+    status = en_paralelo(app, 40, pedido)
+    # cada pedido, reserva (impares) o partido (pares), gana el turno o recibe 409
+    assert all(s in (201, 409) for s in status[0::2])
+    assert all(s in (201, 409) for s in status[1::2])
+    assert status.count(201) == 1
+    with app.app_context():
+        assert Reserva.query.count() + Partido.query.count() == 1
+
+
+def test_resultados_concurrentes_del_mismo_partido(app, datos):
+    with app.app_context():
+        camp = Campeonato(nombre='Apertura')
+        db.session.add(camp)
+        db.session.flush()
+        e1 = Equipo(nombre='A', id_campeonato=camp.id_campeonato)
+        e2 = Equipo(nombre='B', id_campeonato=camp.id_campeonato)
+        db.session.add_all([e1, e2])
+        db.session.flush()
+        partido = Partido(id_campeonato=camp.id_campeonato, id_cancha=datos['id_cancha'],
+                          equipo_local=e1.id_equipo, equipo_visitante=e2.id_equipo,
+                          fecha_partido=date(2025, 11, 10), hora_inicio=time(18), hora_fin=time(19), jugado=False)
+        db.session.add(partido)
+        db.session.commit()
+        id_camp, id_partido = camp.id_campeonato, partido.id_partido
+
+    # cada carga descuenta el resultado anterior: sin bloquear el partido dos
+    # cargas leen el mismo y la tabla termina con más (o menos) de un partido jugado
+    status = en_paralelo(app, 40, lambda c, i: c.put(
+        f'/api/partidos/{id_partido}/resultado', json={'goles_local': i % 5, 'goles_visitante': i % 3}))
+
+    assert status == [200] * 40
+    with app.app_context():
+        filas = {(p.id_campeonato, p.id_equipo): [getattr(p, c) for c in posiciones.CAMPOS]
+                 for p in PosicionEquipo.query.all()}
+        assert filas == dict(posiciones.calcular(id_camp))
+        assert sorted(f[0] for f in filas.values()) == [1, 1]
+
+
+def test_reintento_de_bloqueo_conserva_los_de_otras_canchas(app, datos, monkeypatch):
+    # el INSERT de la fila de bloqueo de la segunda cancha choca con otro pedido una vez:
+    # el reintento tiene que volver a tomar también los de la primera (el rollback los soltó)
+    tomar = bloqueos._tomar
+    fallas = [2]
+
+    def tomar_con_choque(id_cancha, fechas):
+        if id_cancha in fallas:
+            fallas.remove(id_cancha)
+            raise IntegrityError('INSERT', {}, Exception('clave duplicada'))
+        return tomar(id_cancha, fechas)
+
+    monkeypatch.setattr(bloqueos, '_tomar', tomar_con_choque)
+    with app.app_context():
+        bloqueos.bloquear_varias({1: [date(2025, 11, 10)], 2: [date(2025, 11, 10), date(2025, 11, 11)]})
+        db.session.commit()
+        assert sorted((b.id_cancha, b.fecha.day) for b in BloqueoCanchaFecha.query) == [(1, 10), (2, 10), (2, 11)]
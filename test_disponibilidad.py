@@ -0,0 +1,153 @@
+from datetime import date, time
+from app import db
+from models import Reserva
+
+
+def reservar(client, datos, fecha, hora_inicio, hora_fin):
+    return client.post('/api/reservas/', json={
+        'id_cliente': datos['id_cliente'],
+        'id_cancha': datos['id_cancha'],
+        'fecha_reserva': fecha,
+        'hora_inicio': hora_inicio,
+        'hora_fin': hora_fin,
+    })
+
+
+def slots_por_inicio(client, datos, fecha):
+    r = client.get(f"/api/canchas/{datos['id_cancha']}/disponibilidad?fecha={fecha}")
+    assert r.status_code == 200
+    return {s['hora_inicio']: s for s in r.get_json()['slots']}
+
+
+def test_grilla_marca_reservas_y_franjas_libres(client, datos):
+    assert reservar(client, datos, '2025-11-10', '18:00', '19:00').status_code == 201
+
+    slots = slots_por_inicio(client, datos, '2025-11-10')
+    assert slots['10:00']['disponible'] is True
+    assert slots['17:00']['disponible'] is True
+    assert slots['17:30']['motivo'] == 'RESERVA_EXISTENTE'
+    assert slots['18:30']['motivo'] == 'RESERVA_EXISTENTE'
+    assert slots['19:00']['disponible'] is True
+    assert slots['23:00']['hora_fin'] == '00:00'
+
+
+def test_grilla_considera_reserva_del_dia_anterior_que_cruza_medianoche(app, client, datos):
+    # Turno cargado directamente (fuera de la ventana estándar) que termina
+    # a las 10:30 del día siguiente.
+    with app.app_context():
+        db.session.add(Reserva(
+            id_cliente=datos['id_cliente'], id_cancha=datos['id_cancha'], id_estado=1,
+            fecha_reserva=date(2025, 11, 9), hora_inicio=time(23, 0), hora_fin=time(10, 30),
+        ))
+        db.session.commit()
+
+    slots = slots_por_inicio(client, datos, '2025-11-10')
+    assert slots['10:00']['motivo'] == 'RESERVA_EXISTENTE'
+    assert slots['10:30']['disponible'] is True
+
+
+def test_grilla_coincide_con_check(client, datos):
+    reservar(client, datos, '2025-11-10', '12:00', '13:00')
+    slots = slots_por_inicio(client, datos, '2025-11-10')
+    for inicio, slot in slots.items():
+        r = client.get(f"/api/reservas/check?id_cancha={datos['id_cancha']}&fecha_reserva=2025-11-10&hora_inicio={inicio}&hora_fin={slot['hora_fin']}")
+        assert r.get_json()['available'] == slot['disponible'], inicio
+
+
+def test_grilla_requiere_fecha(client, datos):
+    r = client.get(f"/api/canchas/{datos['id_cancha']}/disponibilidad")
+    assert r.status_code == 400
+
+
+def test_matriz_coincide_con_grilla_por_cancha(client, datos):
+    reservar(client, datos, '2025-11-10', '18:00', '19:00')
+    reservar(client, datos, '2025-11-11', '23:00', '00:00')
+
+    r = client.get('/api/disponibilidad?desde=2025-11-10&hasta=2025-11-12')
+    assert r.status_code == 200
+    matriz = r.get_json()
+    assert matriz['fechas'] == ['2025-11-10', '2025-11-11', '2025-11-12']
+    cancha = next(c for c in matriz['canchas'] if c['id_cancha'] == datos['id_cancha'])
+
+    for idx, fecha in enumerate(matriz['fechas']):
+        slots = list(slots_por_inicio(client, datos, fecha).values())
+        esperado = ''.join('1' if s['disponible'] else '0' for s in slots)
+        assert cancha['inicios'][idx] == esperado, fecha
+
+    ocupacion = dict(zip(matriz['franjas'], cancha['ocupacion'][0]))
+    assert ocupacion['18:00'] == '1' and ocupacion['18:30'] == '1'
+    assert ocupacion['17:30'] == '0' and ocupacion['19:00'] == '0'
+
+
+def test_matriz_valida_rango(client, datos):
+    assert client.get('/api/disponibilidad?desde=2025-11-10').status_code == 400
+    assert client.get('/api/disponibilidad?desde=2025-11-10&hasta=2025-11-01').status_code == 400
+    assert client.get('/api/disponibilidad?desde=2025-01-01&hasta=2025-12-31').status_code == 400
+
+
+def test_filtro_solapamiento_coincide_con_intervalos_en_python(app, datos):
+    import random
+    from datetime import datetime, timedelta
+    from disponibilidad import hay_solapamiento
+
+    def intervalo(f, hi, hf):
+        s = datetime.combine(f, hi)
+        e = datetime.combine(f, hf)
+        return s, (e if e > s else e + timedelta(days=1))
+
+    rnd = random.Random(7)
+    base = date(2025, 11, 10)
+    existentes = []
+    with app.app_context():
+        for _ in range(12):
+            f = base + timedelta(days=rnd.randint(-1, 1))
+            hi = time(rnd.randrange(24), rnd.choice((0, 30)))
+            hf = time(rnd.randrange(24), rnd.choice((0, 30)))
+            existentes.append(intervalo(f, hi, hf))
+            db.session.add(Reserva(id_cliente=datos['id_cliente'], id_cancha=datos['id_cancha'], id_estado=1,
+                                   fecha_reserva=f, hora_inicio=hi, hora_fin=hf))
+        db.session.commit()
+
+        for _ in range(300):
+            hi = time(rnd.randrange(24), rnd.choice((0, 30)))
+            hf = time(rnd.randrange(24), rnd.choice((0, 30)))
+            s, e = intervalo(base, hi, hf)
+            esperado = any(s < e_ex and s_ex < e for s_ex, e_ex in existentes)
+            assert hay_solapamiento(Reserva, datos['id_cancha'], base, hi, hf) == esperado, (hi, hf)
+
+
+def test_ocupacion_turno_coincide_con_la_del_dia(app, datos):
+    import random
+    from datetime import timedelta
+    from models import Partido, Campeonato, Equipo
+    from disponibilidad import ocupacion, ocupacion_turno, minutos_intervalo
+
+    rnd = random.Random(11)
+    base = date(2025, 11, 10)
+    with app.app_context():
+        camp = Campeonato(nombre='Apertura')
+        db.session.add(camp)
+        db.session.flush()
+        equipos = [Equipo(nombre=n, id_campeonato=camp.id_campeonato) for n in ('A', 'B')]
+        db.session.add_all(equipos)
+        db.session.flush()
+        for i in range(16):
+            f = base + timedelta(days=rnd.randint(-1, 1))
+            hi = time(rnd.randrange(24), rnd.choice((0, 30)))
+            hf = time(rnd.randrange(24), rnd.choice((0, 30)))
+            if i % 4:
+                db.session.add(Reserva(id_cliente=datos['id_cliente'], id_cancha=datos['id_cancha'], id_estado=1,
+                                       fecha_reserva=f, hora_inicio=hi, hora_fin=hf))
+            else:
+                db.session.add(Partido(id_campeonato=camp.id_campeonato, id_cancha=datos['id_cancha'],
+                                       equipo_local=equipos[0].id_equipo, equipo_visitante=equipos[1].id_equipo,
+                                       fecha_partido=f, hora_inicio=hi, hora_fin=hf))
+        db.session.commit()
+
+        dia = ocupacion(datos['id_cancha'], base)
+        for _ in range(200):
+            hi = time(rnd.randrange(24), rnd.choice((0, 30)))
+            hf = time(rnd.randrange(24), rnd.choice((0, 30)))
+            s, e = minutos_intervalo(base, base, hi, hf)
+            turno = ocupacion_turno(datos['id_cancha'], base, hi, hf)
+            assert turno.conflicto(s, e) == dia.conflicto(s, e), (hi, hf)
@@ -0,0 +1,145 @@
+import json
+from datetime import date
+import pytest
+from app import create_app, db
+from eventos import Broker, flujo, purgar
+from models import EventoOcupacion
+
+RAPIDO = {'EVENTOS_LATIDO': 0.05, 'EVENTOS_DURACION_MAX': 2, 'EVENTOS_INTERVALO': 0.02}
+
+
+@pytest.fixture
+def rapido(app):
+    app.config.update(RAPIDO)
+    return app
+
+
+def abrir(client, id_cancha, fecha, **headers):
+    r = client.get(f'/api/canchas/{id_cancha}/eventos?fecha={fecha}', buffered=False, headers=headers)
+    assert r.status_code == 200
+    assert r.mimetype == 'text/event-stream'
+    it = iter(r.response)
+    assert next(it).startswith(b'retry:')
+    return r, it
+
+
+def siguiente_evento(it):
+    for chunk in it:
+        texto = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if texto.startswith('id:'):
+            lineas = dict(l.split(': ', 1) for l in texto.strip().split('\n'))
+            return lineas['event'], json.loads(lineas['data'])
+    raise AssertionError('el flujo terminó sin eventos')
+
+
+def reservar(client, datos, fecha, hi, hf):
+    r = client.post('/api/reservas/', json={
+        'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+        'fecha_reserva': fecha, 'hora_inicio': hi, 'hora_fin': hf,
+    })
+    assert r.status_code == 201
+    return r.get_json()
+
+
+def test_alta_pago_y_baja_se_publican(rapido, client, datos):
+    r, it = abrir(client, datos['id_cancha'], '2025-11-10')
+    reserva = reservar(client, datos, '2025-11-10', '18:00', '19:00')
+    assert siguiente_evento(it) == ('ocupado', {
+        'tipo': 'ocupado', 'id_cancha': datos['id_cancha'], 'fecha': '2025-11-10',
+        'hora_inicio': '18:00', 'hora_fin': '19:00', 'origen': 'reserva', 'id': reserva['id_reserva'],
+    })
+
+    # otra fecha: no llega a esta suscripción
+    reservar(client, datos, '2025-11-11', '18:00', '19:00')
+    client.post(f"/api/reservas/{reserva['id_reserva']}/pagar", json={'id_metodo': 1, 'monto': reserva['precio_total']})
+    assert siguiente_evento(it)[0] == 'confirmado'
+
+    client.delete(f"/api/reservas/{reserva['id_reserva']}")
+    tipo, data = siguiente_evento(it)
+    assert (tipo, data['hora_inicio']) == ('liberado', '18:00')
+    r.close()
+
+
+def test_turno_que_cruza_medianoche_avisa_al_dia_siguiente(rapido, client, datos):
+    r, it = abrir(client, datos['id_cancha'], '2025-11-11')
+    reservar(client, datos, '2025-11-10', '23:00', '00:00')
+    tipo, data = siguiente_evento(it)
+    assert (tipo, data['fecha'], data['hora_inicio']) == ('ocupado', '2025-11-10', '23:00')
+    r.close()
+
+
+def test_limite_de_conexiones(rapido, client, datos):
+    rapido.config['EVENTOS_MAX_SUSCRIPTORES'] = 2
+    abiertas = [abrir(client, datos['id_cancha'], '2025-11-10')[0] for _ in range(2)]
+    r = client.get(f"/api/canchas/{datos['id_cancha']}/eventos?fecha=2025-11-10")
+    assert r.status_code == 503
+    assert r.headers['Retry-After']
+    # al cerrar una conexión se libera el lugar
+    abiertas[0].close()
+    r, _ = abrir(client, datos['id_cancha'], '2025-11-10')
+    r.close()
+    abiertas[1].close()
+    with rapido.app_context():
+        from eventos import broker
+        assert broker().estadisticas()['suscriptores'] == 0
+
+
+def test_parametros_invalidos(client, datos):
+    assert client.get(f"/api/canchas/{datos['id_cancha']}/eventos").status_code == 400
+    assert client.get('/api/canchas/999/eventos?fecha=2025-11-10').status_code == 404
+
+
+def test_cola_desbordada_pide_resync():
+    b = Broker(max_suscriptores=10, tam_cola=3)
+    sub = b.suscribir(1, date(2025, 11, 10))
+    for i in range(5):
+        b.publicar(1, date(2025, 11, 10), 'ocupado', {'i': i})
+    g = flujo(b, sub, latido=0.01, duracion_max=1)
+    next(g)  # retry
+    assert next(g).startswith('event: resync')
+    assert '"i": 4' in next(g)   # lo posterior al desborde sí se entrega
+    g.close()
+    assert b.estadisticas()['suscriptores'] == 0
+
+
+def test_eventos_de_otro_proceso_llegan_por_la_tabla(rapido, client, datos):
+    # otra app (otro worker) sobre la misma base: comparten sólo la tabla de eventos
+    otra = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': rapido.config['SQLALCHEMY_DATABASE_URI'], **RAPIDO})
+    try:
+        r, it = abrir(otra.test_client(), datos['id_cancha'], '2025-11-10')
+        reserva = reservar(client, datos, '2025-11-10', '18:00', '19:00')
+        tipo, data = siguiente_evento(it)
+        assert (tipo, data['id']) == ('ocupado', reserva['id_reserva'])
+        r.close()
+    finally:
+        otra.extensions['eventos'].detener()
+        with otra.app_context():
+            db.engine.dispose()
+
+
+def test_reconexion_reenvia_lo_posterior_a_last_event_id(rapido, client, datos):
+    reservar(client, datos, '2025-11-10', '18:00', '19:00')
+    # un alta rechazada no deja evento
+    r = client.post('/api/reservas/', json={
+        'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+        'fecha_reserva': '2025-11-10', 'hora_inicio': '18:00', 'hora_fin': '19:00',
+    })
+    assert r.status_code == 409
+    with rapido.app_context():
+        ids = [e.id_evento for e in EventoOcupacion.query.order_by(EventoOcupacion.id_evento)]
+    assert len(ids) == 1
+
+    reservar(client, datos, '2025-11-10', '20:00', '21:00')
+    r, it = abrir(client, datos['id_cancha'], '2025-11-10', **{'Last-Event-ID': str(ids[0])})
+    tipo, data = siguiente_evento(it)
+    assert (tipo, data['hora_inicio']) == ('ocupado', '20:00')
+    r.close()
+
+
+def test_purgar_conserva_los_ultimos(app, client, datos):
+    for h in range(10, 16):
+        reservar(client, datos, '2025-11-10', f'{h}:00', f'{h + 1}:00')
+    with app.app_context():
+        purgar(retencion=2)
+        db.session.commit()
+        assert [e.id_evento for e in EventoOcupacion.query.order_by(EventoOcupacion.id_evento)] == [5, 6]
@@ -0,0 +1,86 @@
+from collections import Counter
+from datetime import date, time
+from itertools import combinations
+from app import db
+from models import Campeonato, Cancha, Equipo, Partido, Reserva
+from fixture import round_robin
+from disponibilidad import minutos_intervalo
+
+
+def test_round_robin_todos_contra_todos():
+    for n in (2, 5, 8):
+        rondas = round_robin(range(n))
+        assert len(rondas) == (n - 1 if n % 2 == 0 else n)
+        cruces = Counter(frozenset(p) for r in rondas for p in r)
+        assert set(cruces) == {frozenset(c) for c in combinations(range(n), 2)}
+        assert set(cruces.values()) == {1}
+        for r in rondas:
+            equipos = [e for p in r for e in p]
+            assert len(equipos) == len(set(equipos))
+
+    ida_vuelta = round_robin(range(4), ida_y_vuelta=True)
+    partidos = Counter(p for r in ida_vuelta for p in r)
+    assert len(partidos) == 12 and set(partidos.values()) == {1}
+
+
+def crear_campeonato(app, datos, n_equipos, n_canchas_extra=1):
+    with app.app_context():
+        camp = Campeonato(nombre='Apertura', fecha_inicio=date(2025, 11, 10))
+        db.session.add(camp)
+        db.session.flush()
+        db.session.add_all([Equipo(nombre=f'Equipo {i}', id_campeonato=camp.id_campeonato) for i in range(n_equipos)])
+        db.session.add_all([
+            Cancha(nombre=f'Cancha {i + 2}', id_deporte=datos['id_deporte'], precio_hora=100, activa=True)
+            for i in range(n_canchas_extra)
+        ])
+        db.session.commit()
+        return camp.id_campeonato
+
+
+def test_fixture_respeta_ocupacion_y_un_partido_por_dia(app, client, datos):
+    id_camp = crear_campeonato(app, datos, 6)
+    # turno ya tomado en la cancha 1 el primer día
+    client.post('/api/reservas/', json={
+        'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+        'fecha_reserva': '2025-11-10', 'hora_inicio': '10:00', 'hora_fin': '11:00',
+    })
+
+    r = client.post(f'/api/campeonatos/{id_camp}/fixture', json={'ida_y_vuelta': True, 'hora_desde': '10:00', 'hora_hasta': '12:00'})
+    assert r.status_code == 201, r.get_json()
+    body = r.get_json()
+    assert body['partidos_creados'] == 30 and body['rondas'] == 10
+
+    with app.app_context():
+        partidos = Partido.query.filter_by(id_campeonato=id_camp).all()
+        reservas = Reserva.query.all()
+        assert len(partidos) == 30
+        por_equipo_dia = Counter((e, p.fecha_partido) for p in partidos for e in (p.equipo_local, p.equipo_visitante))
+        assert set(por_equipo_dia.values()) == {1}
+        assert all(time(10) <= p.hora_inicio and p.hora_fin <= time(12) for p in partidos)
+
+        turnos = [(p.id_cancha, p.fecha_partido, p.hora_inicio, p.hora_fin) for p in partidos]
+        turnos += [(x.id_cancha, x.fecha_reserva, x.hora_inicio, x.hora_fin) for x in reservas]
+        for a, b in combinations(turnos, 2):
+            if a[0] == b[0] and a[1] == b[1]:
+                sa, ea = minutos_intervalo(a[1], a[1], a[2], a[3])
+                sb, eb = minutos_intervalo(b[1], b[1], b[2], b[3])
+                assert not (sa < eb and sb < ea), (a, b)
+
+    # no se puede generar dos veces
+    assert client.post(f'/api/campeonatos/{id_camp}/fixture', json={}).status_code == 409
+
+
+def test_fixture_sin_turnos_suficientes(app, client, datos):
+    id_camp = crear_campeonato(app, datos, 8, n_canchas_extra=0)
+    r = client.post(f'/api/campeonatos/{id_camp}/fixture', json={'fecha_fin': '2025-11-12', 'hora_desde': '10:00', 'hora_hasta': '11:00'})
+    assert r.status_code == 409
+    assert r.get_json()['programables'] == 3
+    with app.app_context():
+        assert Partido.query.count() == 0
+
+
+def test_fixture_64_equipos_10_canchas(app, client, datos):
+    id_camp = crear_campeonato(app, datos, 64, n_canchas_extra=9)
+    r = client.post(f'/api/campeonatos/{id_camp}/fixture', json={'ida_y_vuelta': True})
+    assert r.status_code == 201
+    assert r.get_json()['partidos_creados'] == 64 * 63
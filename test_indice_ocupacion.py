@@ -0,0 +1,153 @@
+import random
+from datetime import date, time, timedelta
+from sqlalchemy import insert
+from app import db, create_app
+from models import Reserva, Campeonato, Equipo
+from disponibilidad import ocupacion
+from indice_ocupacion import indice
+from test_reservas import contar_sentencias
+
+FECHA = date(2025, 11, 10)
+HORAS = [time(h, m) for h in range(24) for m in (0, 30)]
+
+
+def reservar(client, datos, fecha, hi, hf):
+    return client.post('/api/reservas/', json={
+        'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+        'fecha_reserva': fecha.isoformat(), 'hora_inicio': hi, 'hora_fin': hf,
+    })
+
+
+def comparar_con_la_base(app, id_cancha, rnd, n=60):
+    with app.app_context():
+        for fecha in (FECHA - timedelta(days=1), FECHA, FECHA + timedelta(days=1)):
+            en_memoria = indice().ocupacion(id_cancha, fecha)
+            en_base = ocupacion(id_cancha, fecha)
+            for _ in range(n):
+                s = rnd.randrange(0, 1440, 30)
+                e = s + rnd.randrange(30, 1441, 30)
+                assert en_memoria.conflicto(s, e) == en_base.conflicto(s, e), (fecha, s, e)
+
+
+def test_indice_sigue_altas_bajas_y_lotes(app, client, datos):
+    rnd = random.Random(20)
+    id_cancha = datos['id_cancha']
+    with app.app_context():
+        camp = Campeonato(nombre='C')
+        db.session.add(camp)
+        db.session.flush()
+        eq = [Equipo(nombre=n, id_campeonato=camp.id_campeonato) for n in ('A', 'B')]
+        db.session.add_all(eq)
+        db.session.commit()
+        equipos = [e.id_equipo for e in eq]
+        id_camp = camp.id_campeonato
+    comparar_con_la_base(app, id_cancha, rnd)  # carga la cancha
+
+    creadas = []
+    for _ in range(40):
+        op = rnd.random()
+        fecha = FECHA + timedelta(days=rnd.randint(-1, 1))
+        if op < 0.45:
+            inicio = rnd.randrange(600, 1381, 30)
+            r = reservar(client, datos, fecha, f'{inicio // 60:02d}:{inicio % 60:02d}',
+                         f'{(inicio + 60) // 60 % 24:02d}:{inicio % 60:02d}')
+            if r.status_code == 201:
+                creadas.append(r.get_json()['id_reserva'])
+        elif op < 0.65 and creadas:
+            assert client.delete(f'/api/reservas/{creadas.pop(rnd.randrange(len(creadas)))}').status_code == 200
+        elif op < 0.8:
+            r = client.post('/api/partidos', json={
+                'id_campeonato': id_camp, 'id_cancha': id_cancha, 'equipo_local': equipos[0],
+                'equipo_visitante': equipos[1], 'fecha_partido': fecha.isoformat(),
+                'hora_inicio': '08:00', 'hora_fin': f'0{rnd.randint(8, 9)}:30',
+            })
+            assert r.status_code in (201, 409)
+        else:
+            # alta por lote (executemany), sin pasar por las rutas
+            with app.app_context():
+                hi = rnd.choice(HORAS)
+                db.session.execute(insert(Reserva), [{
+                    'id_cliente': datos['id_cliente'], 'id_cancha': id_cancha, 'id_estado': 1,
+                    'fecha_reserva': fecha, 'hora_inicio': hi, 'hora_fin': rnd.choice(HORAS), 'precio_total': 0,
+                }])
+                db.session.commit()
+        comparar_con_la_base(app, id_cancha, rnd, n=20)
+
+    r = client.get('/api/disponibilidad/indice')
+    assert r.get_json()['consistente'] is True
+    assert r.get_json()['cargas'] == 1  # nunca hizo falta recargar
+
+
+def test_rollback_no_modifica_el_indice(app, datos):
+    with app.app_context():
+        ind = indice()
+        ind.cancha(datos['id_cancha'], FECHA)
+        db.session.add(Reserva(id_cliente=datos['id_cliente'], id_cancha=datos['id_cancha'], id_estado=1,
+                               fecha_reserva=FECHA, hora_inicio=time(12, 0), hora_fin=time(13, 0)))
+        db.session.flush()
+        db.session.rollback()
+        assert ind.ocupacion(datos['id_cancha'], FECHA).conflicto(720, 780) is None
+        assert ind.verificar() == {}
+
+
+def test_check_y_grilla_no_consultan_la_ocupacion(app, client, datos):
+    assert reservar(client, datos, FECHA, '12:00', '13:00').status_code == 201
+    client.get(f"/api/canchas/{datos['id_cancha']}/disponibilidad?fecha={FECHA}")  # carga la cancha
+
+    with contar_sentencias(app) as c:
+        r = client.get(f"/api/reservas/check?id_cancha={datos['id_cancha']}&fecha_reserva={FECHA}&hora_inicio=12:30&hora_fin=13:30")
+        g = client.get(f"/api/canchas/{datos['id_cancha']}/disponibilidad?fecha={FECHA}")
+    assert r.get_json()['reason'].startswith('RESERVAS:')
+    assert g.status_code == 200
+    assert not any('UNION' in s.upper() for s in c['sentencias'])
+
+
+def test_escritura_externa_se_detecta_y_vence(app, datos):
+    # otra app sobre la misma base simula otro proceso; su escritura no avisa al índice
+    with app.app_context():
+        ind = indice()
+        ind.cancha(datos['id_cancha'], FECHA)
+    otra = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': app.config['SQLALCHEMY_DATABASE_URI']})
+    with otra.app_context():
+        db.session.add(Reserva(id_cliente=datos['id_cliente'], id_cancha=datos['id_cancha'], id_estado=1,
+                               fecha_reserva=FECHA, hora_inicio=time(18, 0), hora_fin=time(19, 0)))
+        db.session.commit()
+        db.engine.dispose()
+
+    with app.app_context():
+        diferencias = ind.verificar()
+        assert diferencias[datos['id_cancha']]['faltan'] == [('RESERVA_EXISTENTE', *ind_minutos(FECHA, 18 * 60, 19 * 60))]
+        ind.ttl = 0  # vencida: se recarga en la próxima consulta
+        assert ind.ocupacion(datos['id_cancha'], FECHA).conflicto(18 * 60, 19 * 60) == 'RESERVA_EXISTENTE'
+        assert ind.verificar() == {}
+
+
+def ind_minutos(fecha, s, e):
+    base = (fecha - date.min).days * 1440
+    return base + s, base + e
+
+
+def test_carga_solo_la_ventana_de_fechas_y_desaloja_vencidas(app, datos):
+    lejana = FECHA + timedelta(days=60)
+    with app.app_context():
+        db.session.add_all([
+            Reserva(id_cliente=datos['id_cliente'], id_cancha=datos['id_cancha'], id_estado=1,
+                    fecha_reserva=f, hora_inicio=time(12, 0), hora_fin=time(13, 0))
+            for f in (FECHA - timedelta(days=30), FECHA, lejana)
+        ])
+        db.session.commit()
+
+        ind = indice()
+        contenido = ind.cancha(datos['id_cancha'], FECHA).contenido()
+        assert contenido['RESERVA_EXISTENTE'] == [ind_minutos(FECHA, 720, 780)]
+
+        # otra fecha fuera de la ventana recarga alrededor de ella y descarta los días viejos
+        assert ind.ocupacion(datos['id_cancha'], lejana).conflicto(720, 780) == 'RESERVA_EXISTENTE'
+        assert ind.cancha(datos['id_cancha'], lejana).contenido()['RESERVA_EXISTENTE'] == [ind_minutos(lejana, 720, 780)]
+        assert ind.estadisticas()['cargas'] == 2
+        assert ind.verificar() == {}
+
+        # una cancha vencida se desaloja al cargar otra
+        ind.ttl = 0
+        ind.cancha(datos['id_cancha'] + 1, FECHA)
+        assert (ind.estadisticas()['canchas'], ind.estadisticas()['desalojos']) == (1, 1)
@@ -0,0 +1,45 @@
+import logging
+from app import create_app, db
+from metricas import metricas
+
+
+def test_server_timing_y_metricas_por_ruta(app, client, datos):
+    for id_cliente in (datos['id_cliente'], datos['id_cliente'], 999):
+        r = client.get(f'/api/clientes/{id_cliente}')
+    timing = r.headers['Server-Timing']
+    assert timing.startswith('app;dur=') and 'sql;dur=' in timing and 'sentencias"' in timing
+
+    with app.app_context():
+        serie = metricas().resumen()[('GET', '/api/clientes/<int:id_cliente>')]
+    assert serie['cantidad'] == 3
+    assert serie['sql_sentencias'] >= 3
+    assert 0 < serie['p50'] <= serie['p95'] <= serie['p99']
+
+    texto = client.get('/metrics').get_data(as_text=True)
+    assert '# TYPE reservas_http_duracion_segundos histogram' in texto
+    assert 'reservas_http_duracion_segundos_count{metodo="GET",ruta="/api/clientes/<int:id_cliente>"} 3' in texto
+    assert 'reservas_http_peticiones_total{metodo="GET",ruta="/api/clientes/<int:id_cliente>",estado="404"} 1' in texto
+    assert 'reservas_http_duracion_reciente_segundos{metodo="GET",ruta="/api/clientes/<int:id_cliente>",quantile="0.99"}' in texto
+
+
+def test_sql_lenta_se_registra_con_parametros(tmp_path, caplog):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'lenta.db'}",
+        'METRICAS_SQL_LENTA_MS': 0,
+    })
+    with caplog.at_level(logging.WARNING, logger='reservas.sql'):
+        app.test_client().get('/api/clientes/12345678')
+    assert any('GET /api/clientes/<int:id_cliente>' in m and '12345678' in m for m in caplog.messages)
+    assert 'reservas_sql_lentas_total 0' not in app.test_client().get('/metrics').get_data(as_text=True)
+    with app.app_context():
+        db.engine.dispose()
+
+
+def test_metricas_desactivadas(tmp_path):
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'x.db'}", 'METRICAS': False})
+    client = app.test_client()
+    assert 'Server-Timing' not in client.get('/').headers
+    assert client.get('/metrics').status_code == 404
+    with app.app_context():
+        db.engine.dispose()
@@ -0,0 +1,44 @@
+import pytest
+from app import create_app, db
+import motor_sqlite
+
+
+def test_perfil_produccion_aplica_pragmas_y_pool(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'prod.db'}",
+        'SQLITE_PERFIL': 'produccion',
+    })
+    with app.app_context():
+        with db.engine.connect() as conn:
+            pragmas = motor_sqlite.pragmas_actuales(conn)
+        assert pragmas['journal_mode'] == 'wal'
+        assert pragmas['synchronous'] == 1  # NORMAL
+        assert pragmas['busy_timeout'] == 10000
+        assert pragmas['mmap_size'] == 268435456
+        assert db.engine.pool.size() == 10
+        db.engine.dispose()
+
+
+def test_perfil_por_defecto_no_cambia_el_journal(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'def.db'}"})
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert motor_sqlite.pragmas_actuales(conn)['journal_mode'] == 'delete'
+        db.engine.dispose()
+
+
+def test_perfil_desde_variable_de_entorno(tmp_path, monkeypatch):
+    monkeypatch.setenv(motor_sqlite.VARIABLE_ENTORNO, 'inexistente')
+    with pytest.raises(ValueError):
+        create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'x.db'}"})
+
+
+def test_url_de_base_desde_variable_de_entorno(tmp_path, monkeypatch):
+    from app import url_base_de_datos
+    monkeypatch.delenv('RESERVAS_DATABASE_URL', raising=False)
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    assert url_base_de_datos(tmp_path / 'r.db') == f"sqlite:///{tmp_path / 'r.db'}"
+    monkeypatch.setenv('DATABASE_URL', 'postgres://u:p@db/reservas')
+    assert url_base_de_datos('x') == 'postgresql://u:p@db/reservas'
+    monkeypatch.setenv('RESERVAS_DATABASE_URL', 'postgresql+psycopg://u:p@otro/reservas')
+    assert url_base_de_datos('x') == 'postgresql+psycopg://u:p@otro/reservas'
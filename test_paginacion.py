@@ -0,0 +1,73 @@
+from sqlalchemy import event
+from app import db
+from models import Cliente
+
+
+def crear_clientes(app, n):
+    with app.app_context():
+        db.session.add_all([Cliente(dni=f'dni{i}', nombre=f'N{i}', apellido=f'A{i}') for i in range(n)])
+        db.session.commit()
+
+
+def test_sin_parametros_mantiene_lista(client, datos):
+    r = client.get('/api/clientes/')
+    assert isinstance(r.get_json(), list)
+    assert set(r.get_json()[0]) == {'id_cliente', 'dni', 'nombre', 'apellido', 'telefono', 'email', 'activo'}
+
+
+def test_keyset_recorre_todas_las_paginas(app, client, datos):
+    crear_clientes(app, 6)  # + el cliente de 'datos' = 7
+    vistos = []
+    after = None
+    paginas = 0
+    while True:
+        url = '/api/clientes/?limit=3' + (f'&after={after}' if after else '')
+        body = client.get(url).get_json()
+        vistos.extend(c['id_cliente'] for c in body['items'])
+        paginas += 1
+        after = body['next_cursor']
+        if after is None:
+            break
+    assert paginas == 3
+    assert vistos == sorted(vistos) and len(vistos) == len(set(vistos)) == 7
+
+
+def test_fields_proyecta_columnas_en_el_select(app, client, datos):
+    sentencias = []
+    with app.app_context():
+        engine = db.engine
+    oyente = lambda conn, cur, stmt, params, ctx, many: sentencias.append(stmt)
+    event.listen(engine, 'before_cursor_execute', oyente)
+    try:
+        r = client.get('/api/clientes/?fields=nombre&limit=10')
+    finally:
+        event.remove(engine, 'before_cursor_execute', oyente)
+    assert r.get_json()['items'] == [{'nombre': 'Ana'}]
+    assert len(sentencias) == 1
+    assert 'dni' not in sentencias[0] and 'email' not in sentencias[0]
+
+
+def test_fields_invalido(client, datos):
+    assert client.get('/api/clientes/?fields=password').status_code == 400
+    assert client.get('/api/clientes/?limit=0').status_code == 400
+
+
+def test_reservas_y_canchas_paginadas(client, datos):
+    for h in (10, 11, 12):
+        client.post('/api/reservas/', json={
+            'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+            'fecha_reserva': '2025-11-10', 'hora_inicio': f'{h}:00', 'hora_fin': f'{h + 1}:00',
+        })
+    body = client.get('/api/reservas/?limit=2&fields=id_reserva,hora_inicio,pago').get_json()
+    assert [r['hora_inicio'] for r in body['items']] == ['10:00', '11:00']
+    assert body['items'][0]['pago'] is None
+    body = client.get(f"/api/reservas/?limit=2&after={body['next_cursor']}").get_json()
+    assert [r['hora_inicio'] for r in body['items']] == ['12:00']
+    assert body['next_cursor'] is None
+
+    canchas = client.get('/api/canchas/?fields=nombre,deporte').get_json()
+    assert canchas == [{'nombre': 'Cancha 1', 'deporte': {'id_deporte': datos['id_deporte'], 'nombre': 'Pádel', 'duracion_minutos': 60}}]
+
+    reporte = client.get(f"/api/reportes/reservas_por_cancha?id_cancha={datos['id_cancha']}&limit=1").get_json()
+    assert len(reporte['reservas']) == 1 and reporte['next_cursor'] is not None
+    assert reporte['reservas'][0]['cliente'] == 'Ana Gomez'
@@ -0,0 +1,72 @@
+from datetime import date, time
+from app import db
+from models import Campeonato, Equipo, Partido
+import posiciones
+
+
+def crear_partidos(app, datos):
+    """Campeonato con 3 equipos (A, B, C) y los 3 cruces sin jugar."""
+    with app.app_context():
+        camp = Campeonato(nombre='Apertura')
+        db.session.add(camp)
+        db.session.flush()
+        equipos = [Equipo(nombre=n, id_campeonato=camp.id_campeonato) for n in ('A', 'B', 'C')]
+        db.session.add_all(equipos)
+        db.session.flush()
+        a, b, c = [e.id_equipo for e in equipos]
+        partidos = [
+            Partido(id_campeonato=camp.id_campeonato, id_cancha=datos['id_cancha'], equipo_local=l, equipo_visitante=v,
+                    fecha_partido=date(2025, 11, 10 + i), hora_inicio=time(18), hora_fin=time(19), jugado=False)
+            for i, (l, v) in enumerate(((a, b), (b, c), (c, a)))
+        ]
+        db.session.add_all(partidos)
+        db.session.commit()
+        return camp.id_campeonato, [p.id_partido for p in partidos]
+
+
+def resultado(client, id_partido, gl, gv):
+    return client.put(f'/api/partidos/{id_partido}/resultado', json={'goles_local': gl, 'goles_visitante': gv})
+
+
+def tabla(client, id_camp):
+    r = client.get(f'/api/campeonatos/{id_camp}/tabla')
+    assert r.status_code == 200
+    return {f['nombre']: f for f in r.get_json()['tabla']}
+
+
+def test_tabla_se_actualiza_con_cada_resultado(app, client, datos):
+    id_camp, (ab, bc, ca) = crear_partidos(app, datos)
+    assert all(f['puntos'] == 0 and f['jugados'] == 0 for f in tabla(client, id_camp).values())
+
+    resultado(client, ab, 2, 1)
+    resultado(client, bc, 0, 0)
+    t = tabla(client, id_camp)
+    assert (t['A']['puntos'], t['A']['ganados'], t['A']['diferencia']) == (3, 1, 1)
+    assert (t['B']['jugados'], t['B']['puntos'], t['B']['goles_favor'], t['B']['goles_contra']) == (2, 1, 1, 2)
+    assert (t['C']['empatados'], t['C']['puntos']) == (1, 1)
+    assert t['A']['posicion'] == 1
+
+
+def test_corregir_un_resultado_descuenta_el_anterior(app, client, datos):
+    id_camp, (ab, bc, ca) = crear_partidos(app, datos)
+    resultado(client, ab, 2, 1)
+    resultado(client, ca, 3, 3)
+    resultado(client, ab, 0, 4)   # corrección: ahora gana B
+
+    t = tabla(client, id_camp)
+    assert (t['A']['jugados'], t['A']['perdidos'], t['A']['puntos'], t['A']['goles_favor'], t['A']['goles_contra']) == (2, 1, 1, 3, 7)
+    assert (t['B']['jugados'], t['B']['ganados'], t['B']['puntos']) == (1, 1, 3)
+    assert t['B']['posicion'] == 1
+
+    with app.app_context():
+        incremental = {(f.id_campeonato, f.id_equipo): [getattr(f, c) for c in posiciones.CAMPOS]
+                       for f in posiciones.PosicionEquipo.query.all() if f.jugados}
+        assert incremental == dict(posiciones.calcular(id_camp))
+        posiciones.reconstruir(id_camp)
+    assert tabla(client, id_camp) == t
+
+
+def test_resultado_invalido(app, client, datos):
+    _, (ab, _, _) = crear_partidos(app, datos)
+    assert resultado(client, ab, 'x', 1).status_code == 400
+    assert resultado(client, ab, -1, 1).status_code == 400
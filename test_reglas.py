@@ -0,0 +1,117 @@
+import random
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+from app import db
+from models import Reserva, Partido, Campeonato, Equipo
+import reglas
+from reglas import ReglasCancha, validar_horas, minutos_intervalo
+from disponibilidad import hay_solapamiento, ocupacion
+
+DIAS = reglas.DIAS_SEMANA_ES
+HORAS = [time(h, m) for h in range(24) for m in (0, 30)]
+
+
+def validar_horas_anterior(hi, hf, fecha=date(2025, 11, 10)):
+    """Validación de horas tal como estaba escrita en el alta de reservas."""
+    if hi.minute not in (0, 30) or hf.minute not in (0, 30):
+        return reglas.HORA_INVALIDA
+    dt_start = datetime.combine(fecha, hi)
+    dt_end = datetime.combine(fecha, hf)
+    if dt_end <= dt_start:
+        dt_end += timedelta(days=1)
+    if dt_start < datetime.combine(fecha, time(10, 0)) or dt_end > datetime.combine(fecha + timedelta(days=1), time(1, 0)):
+        return reglas.FUERA_DE_RANGO
+    if dt_start.time() > time(23, 0):
+        return reglas.INICIO_TARDIO
+    return None
+
+
+def en_horario_anterior(horarios, fecha, hi, hf):
+    """Recorrido de horarios tal como estaba escrito en el alta de reservas y partidos."""
+    if not horarios:
+        return True
+    weekday_es = DIAS[fecha.weekday()]
+    for h in horarios:
+        if h.dia_semana and h.dia_semana.lower() != weekday_es.lower():
+            continue
+        if h.hora_inicio <= hi and h.hora_fin >= hf and h.disponible:
+            return True
+    return False
+
+
+def test_validar_horas_coincide_con_la_validacion_anterior():
+    horas = HORAS + [time(10, 15), time(23, 45), time(0, 1)]
+    for hi in horas:
+        for hf in horas:
+            assert validar_horas(hi, hf) == validar_horas_anterior(hi, hf), (hi, hf)
+
+
+def test_horarios_compilados_coinciden_con_el_recorrido_anterior():
+    rnd = random.Random(19)
+    for _ in range(300):
+        horarios = [
+            SimpleNamespace(
+                dia_semana=rnd.choice([None, ''] + DIAS + [d.upper() for d in DIAS]),
+                hora_inicio=rnd.choice(HORAS),
+                hora_fin=rnd.choice(HORAS),
+                disponible=rnd.random() < 0.8,
+            )
+            for _ in range(rnd.randint(0, 6))
+        ]
+        compiladas = ReglasCancha(60, horarios)
+        for _ in range(40):
+            fecha = date(2025, 11, 10) + timedelta(days=rnd.randint(0, 6))
+            hi, hf = rnd.choice(HORAS), rnd.choice(HORAS)
+            s, e = minutos_intervalo(fecha, fecha, hi, hf)
+            assert compiladas.en_horario(fecha, s, e) == en_horario_anterior(horarios, fecha, hi, hf), (horarios, fecha, hi, hf)
+
+
+def test_ocupacion_coincide_con_las_consultas_de_solapamiento(app, datos):
+    rnd = random.Random(2025)
+    base = date(2025, 11, 10)
+    id_cancha = datos['id_cancha']
+    with app.app_context():
+        camp = Campeonato(nombre='C')
+        db.session.add(camp)
+        db.session.flush()
+        eq = [Equipo(nombre=n, id_campeonato=camp.id_campeonato) for n in ('A', 'B')]
+        db.session.add_all(eq)
+        db.session.flush()
+        for _ in range(60):
+            fecha = base + timedelta(days=rnd.randint(-1, 3))
+            hi, hf = rnd.choice(HORAS), rnd.choice(HORAS)
+            if rnd.random() < 0.6:
+                db.session.add(Reserva(id_cliente=datos['id_cliente'], id_cancha=id_cancha, id_estado=1,
+                                       fecha_reserva=fecha, hora_inicio=hi, hora_fin=hf, precio_total=0))
+            else:
+                db.session.add(Partido(id_campeonato=camp.id_campeonato, id_cancha=id_cancha,
+                                       equipo_local=eq[0].id_equipo, equipo_visitante=eq[1].id_equipo,
+                                       fecha_partido=fecha, hora_inicio=hi, hora_fin=hf, jugado=False))
+        db.session.commit()
+
+        for fecha in [base + timedelta(days=d) for d in range(3)]:
+            ocupados = ocupacion(id_cancha, fecha)
+            for _ in range(150):
+                hi, hf = rnd.choice(HORAS), rnd.choice(HORAS)
+                esperado = None
+                if hay_solapamiento(Reserva, id_cancha, fecha, hi, hf):
+                    esperado = reglas.RESERVA_EXISTENTE
+                elif hay_solapamiento(Partido, id_cancha, fecha, hi, hf):
+                    esperado = reglas.PARTIDO_EXISTENTE
+                s, e = minutos_intervalo(fecha, fecha, hi, hf)
+                assert ocupados.conflicto(s, e) == esperado, (fecha, hi, hf)
+
+
+def test_check_y_alta_aplican_las_mismas_reglas(client, datos):
+    base = {'id_cancha': datos['id_cancha'], 'fecha_reserva': '2025-11-10'}
+    casos = [('23:30', '00:30'), ('09:30', '10:30'), ('10:15', '11:15'), ('10:00', '11:30'), ('12:00', '13:00')]
+    for hi, hf in casos:
+        check = client.get('/api/reservas/check', query_string={**base, 'hora_inicio': hi, 'hora_fin': hf}).get_json()
+        alta = client.post('/api/reservas/', json={**base, 'id_cliente': datos['id_cliente'], 'hora_inicio': hi, 'hora_fin': hf})
+        assert check['available'] == (alta.status_code == 201), (hi, hf, check, alta.get_json())
+
+    # el turno recién creado ya no está disponible, con el mismo motivo en ambos
+    check = client.get('/api/reservas/check', query_string={**base, 'hora_inicio': '12:00', 'hora_fin': '13:00'}).get_json()
+    assert check['reason'].startswith('RESERVAS:')
+    alta = client.post('/api/reservas/', json={**base, 'id_cliente': datos['id_cliente'], 'hora_inicio': '12:00', 'hora_fin': '13:00'})
+    assert alta.status_code == 409 and alta.get_json()['error'] == check['reason']
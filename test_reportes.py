@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+
+
+def crear_reservas(client, datos, horas):
+    for h in horas:
+        r = client.post('/api/reservas/', json={
+            'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+            'fecha_reserva': '2025-11-10', 'hora_inicio': f'{h}:00', 'hora_fin': f'{h + 1}:00',
+        })
+        assert r.status_code == 201
+
+
+def test_reservas_por_cancha_ndjson(client, datos):
+    crear_reservas(client, datos, (10, 11, 12))
+    r = client.get(f"/api/reportes/reservas_por_cancha?id_cancha={datos['id_cancha']}&format=ndjson")
+    assert r.status_code == 200
+    assert r.is_streamed
+    assert r.mimetype == 'application/x-ndjson'
+    filas = [json.loads(l) for l in r.get_data(as_text=True).splitlines()]
+    assert [f['hora_inicio'] for f in filas] == ['10:00', '11:00', '12:00']
+    assert filas[0]['cliente'] == 'Ana Gomez'
+    assert filas[0]['estado'] == 'Pendiente'
+
+
+def test_reservas_por_cliente_csv_con_fields(client, datos):
+    crear_reservas(client, datos, (10, 11))
+    r = client.get(f"/api/reportes/reservas_por_cliente?id_cliente={datos['id_cliente']}&format=csv&fields=id_reserva,cancha_nombre,hora_inicio")
+    assert r.status_code == 200
+    assert r.mimetype == 'text/csv'
+    filas = list(csv.reader(io.StringIO(r.get_data(as_text=True))))
+    assert filas[0] == ['id_reserva', 'cancha_nombre', 'hora_inicio']
+    assert len(filas) == 3
+    assert filas[1][1] == 'Cancha 1'
+
+
+def test_formato_invalido(client, datos):
+    r = client.get(f"/api/reportes/reservas_por_cancha?id_cancha={datos['id_cancha']}&format=xml")
+    assert r.status_code == 400
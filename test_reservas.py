@@ -0,0 +1,69 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import db
+
+
+@contextmanager
+def contar_sentencias(app):
+    """Cuenta (y guarda) las sentencias SQL ejecutadas por el engine de la app."""
+    contador = {'n': 0, 'sentencias': []}
+
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        contador['n'] += 1
+        contador['sentencias'].append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _antes)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, 'before_cursor_execute', _antes)
+
+
+def crear_y_pagar(client, datos, hora_inicio, hora_fin, pagar=True):
+    r = client.post('/api/reservas/', json={
+        'id_cliente': datos['id_cliente'],
+        'id_cancha': datos['id_cancha'],
+        'fecha_reserva': '2025-11-10',
+        'hora_inicio': hora_inicio,
+        'hora_fin': hora_fin,
+    })
+    assert r.status_code == 201
+    body = r.get_json()
+    if pagar:
+        p = client.post(f"/api/reservas/{body['id_reserva']}/pagar", json={'id_metodo': 1, 'monto': body['precio_total']})
+        assert p.status_code == 201
+    return body['id_reserva']
+
+
+def listar(client, app):
+    with contar_sentencias(app) as c:
+        r = client.get('/api/reservas/?fecha_reserva=2025-11-10')
+    assert r.status_code == 200
+    return r.get_json(), c['n']
+
+
+def test_list_reservas_incluye_cliente_y_ultimo_pago(app, client, datos):
+    pagada = crear_y_pagar(client, datos, '10:00', '11:00')
+    pendiente = crear_y_pagar(client, datos, '12:00', '13:00', pagar=False)
+
+    reservas, _ = listar(client, app)
+    por_id = {r['id_reserva']: r for r in reservas}
+    assert por_id[pagada]['cliente_nombre'] == 'Ana'
+    assert por_id[pagada]['pago']['metodo_nombre'] == 'Efectivo'
+    assert por_id[pagada]['pago']['monto'] == '100.00'
+    assert por_id[pendiente]['pago'] is None
+
+
+def test_list_reservas_cantidad_de_sentencias_constante(app, client, datos):
+    crear_y_pagar(client, datos, '10:00', '11:00')
+    reservas, con_una = listar(client, app)
+    assert len(reservas) == 1
+
+    for h in range(11, 20):
+        crear_y_pagar(client, datos, f'{h}:00', f'{h + 1}:00')
+    reservas, con_diez = listar(client, app)
+    assert len(reservas) == 10
+
+    assert con_una == con_diez == 1
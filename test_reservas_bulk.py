@@ -0,0 +1,100 @@
+from datetime import date, time
+from app import db
+from models import Reserva, UsoDiario, Campeonato, Deporte, Equipo, Partido
+from test_reservas import contar_sentencias
+
+
+def bulk(client, datos, **cuerpo):
+    base = {'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'], 'hora_inicio': '18:00', 'hora_fin': '19:00'}
+    return client.post('/api/reservas/bulk', json={**base, **cuerpo})
+
+
+def semanal(desde, hasta):
+    return {'frecuencia': 'semanal', 'desde': desde, 'hasta': hasta}
+
+
+def test_recurrencia_semanal_crea_todas_las_ocurrencias(app, client, datos):
+    r = bulk(client, datos, recurrencia=semanal('2025-11-04', '2025-12-02'), usa_iluminacion=True)
+    assert r.status_code == 201
+    body = r.get_json()
+    assert [c['fecha_reserva'] for c in body['creadas']] == ['2025-11-04', '2025-11-11', '2025-11-18', '2025-11-25', '2025-12-02']
+    assert body['creadas'][0]['precio_total'] == '120.00'
+    assert body['conflictos'] == []
+
+    with app.app_context():
+        assert Reserva.query.count() == 5
+        assert db.session.query(db.func.sum(UsoDiario.reservas_count)).scalar() == 5
+
+
+def test_todo_o_nada_no_crea_nada_si_hay_conflictos(app, client, datos):
+    client.post('/api/reservas/', json={
+        'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+        'fecha_reserva': '2025-11-18', 'hora_inicio': '18:30', 'hora_fin': '19:30',
+    })
+    r = bulk(client, datos, recurrencia=semanal('2025-11-04', '2025-12-02'))
+    assert r.status_code == 409
+    assert r.get_json()['conflictos'] == [
+        {'fecha_reserva': '2025-11-18', 'hora_inicio': '18:00', 'hora_fin': '19:00', 'motivo': 'RESERVA_EXISTENTE'},
+    ]
+    with app.app_context():
+        assert Reserva.query.count() == 1
+
+
+def test_parcial_crea_las_validas_e_informa_conflictos(app, client, datos):
+    client.post('/api/reservas/', json={
+        'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+        'fecha_reserva': '2025-11-18', 'hora_inicio': '18:30', 'hora_fin': '19:30',
+    })
+    r = bulk(client, datos, modo='parcial', ocurrencias=[
+        {'fecha_reserva': '2025-11-17'},
+        {'fecha_reserva': '2025-11-17', 'hora_inicio': '18:30', 'hora_fin': '19:30'},
+        {'fecha_reserva': '2025-11-18'},
+        {'fecha_reserva': '2025-11-19', 'hora_inicio': '09:00', 'hora_fin': '10:00'},
+        {'fecha_reserva': '2025-11-20', 'hora_inicio': '18:00', 'hora_fin': '19:30'},
+        {'fecha_reserva': '2025-11-21', 'hora_inicio': '23:00', 'hora_fin': '00:00'},
+    ])
+    assert r.status_code == 201
+    body = r.get_json()
+    assert [(c['fecha_reserva'], c['hora_inicio']) for c in body['creadas']] == [('2025-11-17', '18:00'), ('2025-11-21', '23:00')]
+    assert [c['motivo'] for c in body['conflictos']] == ['DUPLICADA_EN_LOTE', 'RESERVA_EXISTENTE', 'FUERA_DE_RANGO', 'DURACION_INVALIDA']
+
+
+def test_ocurrencia_que_cruza_medianoche_choca_con_partido_del_dia_siguiente(app, client, datos):
+    with app.app_context():
+        db.session.get(Deporte, datos['id_deporte']).duracion_minutos = 90   # turno 23:00-00:30
+        camp = Campeonato(nombre='Nocturno')
+        db.session.add(camp)
+        db.session.flush()
+        a, b = Equipo(nombre='A', id_campeonato=camp.id_campeonato), Equipo(nombre='B', id_campeonato=camp.id_campeonato)
+        db.session.add_all([a, b])
+        db.session.flush()
+        db.session.add(Partido(id_campeonato=camp.id_campeonato, id_cancha=datos['id_cancha'], equipo_local=a.id_equipo,
+                               equipo_visitante=b.id_equipo, fecha_partido=date(2025, 11, 22), hora_inicio=time(0),
+                               hora_fin=time(1), jugado=False))
+        db.session.commit()
+
+    check = client.get(f"/api/reservas/check?id_cancha={datos['id_cancha']}&fecha_reserva=2025-11-21"
+                       "&hora_inicio=23:00&hora_fin=00:30").get_json()
+    assert check['available'] is False
+    r = bulk(client, datos, hora_inicio='23:00', hora_fin='00:30', ocurrencias=[{'fecha_reserva': '2025-11-21'}])
+    assert r.status_code == 409
+    assert [c['motivo'] for c in r.get_json()['conflictos']] == ['PARTIDO_EXISTENTE']
+    with app.app_context():
+        assert Reserva.query.count() == 0
+
+
+def test_validacion_del_pedido(client, datos):
+    assert bulk(client, datos).status_code == 400
+    assert bulk(client, datos, recurrencia={'frecuencia': 'mensual', 'desde': '2025-11-04', 'hasta': '2025-12-02'}).status_code == 400
+    assert bulk(client, datos, recurrencia=semanal('2025-01-01', '2030-01-01')).status_code == 400
+    assert bulk(client, datos, recurrencia=semanal('2025-11-04', '2025-12-02'), modo='otro').status_code == 400
+
+
+def test_cantidad_de_sentencias_no_crece_con_el_lote(app, client, datos):
+    def sentencias(desde, hasta):
+        with contar_sentencias(app) as c:
+            assert bulk(client, datos, recurrencia=semanal(desde, hasta)).status_code == 201
+        return c['n']
+
+    sentencias('2025-01-07', '2025-01-14')  # calienta la caché de catálogos
+    assert sentencias('2025-02-04', '2025-02-11') == sentencias('2025-03-04', '2025-06-24')
@@ -0,0 +1,100 @@
+from decimal import Decimal
+from app import db
+from models import UsoDiario, Cancha, Deporte
+from resumen import calcular
+
+
+def snapshot():
+    return {
+        (u.fecha, u.id_cancha, u.id_deporte): (u.reservas_count, u.minutos_reservados, u.ingresos, u.ingresos_iluminacion)
+        for u in UsoDiario.query.all()
+        if u.reservas_count or u.ingresos
+    }
+
+
+def recalculado():
+    return {k: (a[0], a[1], a[2], a[3]) for k, a in calcular().items()}
+
+
+def reservar(client, datos, fecha, h, iluminacion=False):
+    r = client.post('/api/reservas/', json={
+        'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'], 'fecha_reserva': fecha,
+        'hora_inicio': f'{h}:00', 'hora_fin': f'{h + 1}:00', 'usa_iluminacion': iluminacion,
+    })
+    assert r.status_code == 201
+    return r.get_json()
+
+
+def test_resumen_incremental_coincide_con_recalculo(app, client, datos):
+    a = reservar(client, datos, '2025-10-30', 10, iluminacion=True)
+    b = reservar(client, datos, '2025-11-10', 11)
+    reservar(client, datos, '2025-11-10', 12)
+    assert client.post(f"/api/reservas/{a['id_reserva']}/pagar", json={'id_metodo': 1, 'monto': a['precio_total']}).status_code == 201
+    assert client.post(f"/api/reservas/{b['id_reserva']}/pagar", json={'id_metodo': 1, 'monto': b['precio_total']}).status_code == 201
+    assert client.delete(f"/api/reservas/{b['id_reserva']}").status_code == 200
+
+    with app.app_context():
+        assert snapshot() == recalculado()
+
+    uso = client.get('/api/reportes/uso_mensual?year=2025').get_json()['uso_mensual']
+    assert [(m['month'], m['count']) for m in uso] == [('2025-10', 1), ('2025-11', 1)]
+    assert uso[0]['ingresos'] == '120.00'
+    assert uso[0]['ingresos_iluminacion'] == '20.00'
+    assert uso[1]['minutos'] == 60
+
+    ranking = client.get('/api/reportes/ranking_canchas').get_json()['ranking']
+    assert ranking == [{'id_cancha': datos['id_cancha'], 'nombre': 'Cancha 1', 'reservas_count': 2}]
+
+
+def test_borrar_cliente_descuenta_resumen(app, client, datos):
+    reservar(client, datos, '2025-11-10', 10)
+    assert client.delete(f"/api/clientes/{datos['id_cliente']}").status_code == 200
+    with app.app_context():
+        assert snapshot() == {}
+    assert client.get('/api/reportes/ranking_canchas').get_json()['ranking'] == []
+
+
+def test_borrar_reserva_descuenta_la_iluminacion_cobrada(app, client, datos):
+    r = reservar(client, datos, '2025-11-10', 20, iluminacion=True)
+    with app.app_context():
+        db.session.get(Cancha, datos['id_cancha']).precio_iluminacion = 50
+        db.session.commit()
+    assert client.delete(f"/api/reservas/{r['id_reserva']}").status_code == 200
+    with app.app_context():
+        fila = UsoDiario.query.one()
+        assert (fila.reservas_count, fila.ingresos_iluminacion) == (0, Decimal('0'))
+
+
+def test_cancha_sin_deporte_acumula_en_una_sola_fila(app, client, datos):
+    with app.app_context():
+        db.session.get(Cancha, datos['id_cancha']).id_deporte = None
+        db.session.commit()
+    reservar(client, datos, '2025-11-10', 10)
+    reservar(client, datos, '2025-11-10', 11, iluminacion=True)
+    with app.app_context():
+        filas = UsoDiario.query.all()
+        assert [(f.id_deporte, f.reservas_count, f.minutos_reservados, f.ingresos_iluminacion) for f in filas] == [
+            (None, 2, 120, Decimal('20.00')),
+        ]
+        assert snapshot() == recalculado()
+
+
+def test_cambiar_el_deporte_de_la_cancha_mueve_su_resumen(app, client, datos):
+    a = reservar(client, datos, '2025-11-10', 10, iluminacion=True)
+    b = reservar(client, datos, '2025-11-10', 11)
+    with app.app_context():
+        tenis = Deporte(nombre='Tenis', duracion_minutos=60)
+        db.session.add(tenis)
+        db.session.commit()
+        id_tenis = tenis.id_deporte
+    assert client.put(f"/api/canchas/{datos['id_cancha']}", json={'id_deporte': id_tenis}).status_code == 200
+
+    # pagar y borrar reservas anteriores al cambio ajusta la fila del deporte nuevo
+    assert client.post(f"/api/reservas/{b['id_reserva']}/pagar", json={'id_metodo': 1, 'monto': b['precio_total']}).status_code == 201
+    assert client.delete(f"/api/reservas/{a['id_reserva']}").status_code == 200
+    with app.app_context():
+        filas = UsoDiario.query.all()
+        assert [(f.id_deporte, f.reservas_count, f.minutos_reservados, f.ingresos, f.ingresos_iluminacion) for f in filas] == [
+            (id_tenis, 1, 60, Decimal('100.00'), Decimal('0.00')),
+        ]
+        assert snapshot() == recalculado()
@@ -0,0 +1,38 @@
+from collections import defaultdict
+from datetime import date
+from app import db
+from models import Reserva, Partido, Pago, ReservaServicio
+from reglas import minutos_intervalo
+import seed
+from test_resumen import snapshot, recalculado
+
+
+def test_generar_sin_solapamientos_y_con_resumen_consistente(app, client):
+    with app.app_context():
+        sync_previo = db.session.connection().exec_driver_sql('PRAGMA synchronous').scalar()
+        db.session.close()
+        r = seed.generar(300, 6, 40, ocupacion=0.7, hoy=date(2025, 3, 1))
+        assert r['clientes'] == 300 and r['canchas'] == 6
+        assert r['reservas'] == Reserva.query.count() > 0
+        assert r['pagos'] == Pago.query.count() > 0
+        assert r['servicios'] == ReservaServicio.query.count() > 0
+        assert r['partidos'] == Partido.query.count() > 0
+        assert abs(r['ocupacion'] - 0.7) < 0.1
+
+        # ningún turno pisa a otro de la misma cancha (reservas ni partidos, contando la medianoche)
+        turnos = defaultdict(list)
+        for m, fecha in ((Reserva, Reserva.fecha_reserva), (Partido, Partido.fecha_partido)):
+            for id_cancha, f, hi, hf in db.session.query(m.id_cancha, fecha, m.hora_inicio, m.hora_fin):
+                turnos[id_cancha].append(minutos_intervalo(date(2025, 1, 1), f, hi, hf))
+        for lista in turnos.values():
+            lista.sort()
+            assert all(a[1] <= b[0] for a, b in zip(lista, lista[1:]))
+
+        assert snapshot() == recalculado()
+        assert db.session.connection().exec_driver_sql('PRAGMA synchronous').scalar() == sync_previo
+
+        jugados = Partido.query.filter_by(jugado=True).count()
+
+    # la liga generada tiene su tabla de posiciones
+    tabla = client.get('/api/campeonatos/1/tabla').get_json()['tabla']
+    assert jugados > 0 and sum(f['jugados'] for f in tabla) == 2 * jugados
@@ -0,0 +1,175 @@
+import http.client
+import importlib
+import importlib.util
+import os
+import runpy
+import signal
+import socket
+import subprocess
+import sys
+import time
+import pytest
+from app import create_app, db
+import db_crear_esquema
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def wsgi(monkeypatch, tmp_path):
+    """Importa wsgi.py (que crea la app al importarse) contra una base temporal ya migrada."""
+    url = f"sqlite:///{tmp_path / 'wsgi.db'}"
+    previa = create_app({'SQLALCHEMY_DATABASE_URI': url, 'CREAR_TABLAS': False, 'VERIFICAR_ESQUEMA': False})
+    with previa.app_context():
+        db_crear_esquema.crear_esquema()
+        db.engine.dispose()
+    monkeypatch.setenv('RESERVAS_DATABASE_URL', url)
+    monkeypatch.setenv('RESERVAS_SQLITE_PERFIL', 'produccion')
+    monkeypatch.delenv('RESERVAS_CREAR_TABLAS', raising=False)
+    sys.modules.pop('wsgi', None)
+    import wsgi
+    yield wsgi
+    with wsgi.app.app_context():
+        db.engine.dispose()
+    sys.modules.pop('wsgi', None)
+    os.environ.pop('RESERVAS_CREAR_TABLAS', None)   # lo fijó wsgi.py
+
+
+def test_despues_de_fork_descarta_pool_y_estado_heredado(wsgi):
+    app = wsgi.app
+    client = app.test_client()
+    assert app.config['SQLITE_PERFIL'] == 'produccion'
+    assert app.config['CREAR_TABLAS'] is False
+    etag = client.get('/api/canchas/').headers['ETag']
+    with app.app_context():
+        pool = db.engine.pool
+    assert 'cache_http' in app.extensions
+
+    wsgi.despues_de_fork(app)
+    assert not any(nombre in app.extensions for nombre in wsgi.ESTADO_POR_PROCESO)
+    with app.app_context():
+        assert db.engine.pool is not pool
+        assert wsgi.metricas.metricas().resumen() == {}
+    # otra época de ETag: un ETag del proceso padre no vale en el worker
+    r = client.get('/api/canchas/', headers={'If-None-Match': etag})
+    assert r.status_code == 200 and r.headers['ETag'] != etag
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requiere fork')
+def test_worker_forkeado_usa_conexiones_propias(wsgi):
+    app = wsgi.app
+    client = app.test_client()
+    assert client.get('/api/canchas/').status_code == 200   # el padre deja una conexión en el pool
+    pid = os.fork()
+    if pid == 0:
+        try:
+            wsgi.despues_de_fork(app)
+            ok = app.test_client().post('/api/deportes/', json={'nombre': 'Tenis', 'duracion_minutos': 120}).status_code == 201
+        finally:
+            os._exit(0 if ok else 1)
+    _, estado = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(estado) == 0
+    nombres = [d['nombre'] for d in client.get('/api/deportes/').get_json()]
+    assert 'Tenis' in nombres
+
+
+def _sin_entorno(monkeypatch, nombre):
+    # la configuración fija la variable con setdefault: que el test la deje como estaba
+    monkeypatch.setenv(nombre, '')
+    monkeypatch.delenv(nombre)
+
+
+def test_configuracion_gunicorn(monkeypatch):
+    monkeypatch.setenv('RESERVAS_WORKERS', '3')
+    monkeypatch.setenv('RESERVAS_THREADS', '8')
+    monkeypatch.delenv('RESERVAS_PRELOAD', raising=False)
+    _sin_entorno(monkeypatch, 'RESERVAS_EVENTOS_MAX_SUSCRIPTORES')
+    conf = runpy.run_path(os.path.join(DIRECTORIO, 'gunicorn.conf.py'))
+    assert (conf['workers'], conf['threads'], conf['worker_class']) == (3, 8, 'gthread')
+    assert conf['preload_app'] is False
+    assert conf['keepalive'] > 0 and conf['graceful_timeout'] > 0
+    assert callable(conf['post_fork'])
+    # los flujos SSE nunca toman más de un cuarto de los hilos de un worker de la API
+    assert os.environ['RESERVAS_EVENTOS_MAX_SUSCRIPTORES'] == '2'
+
+
+def test_configuracion_pool_de_eventos(monkeypatch):
+    monkeypatch.setenv('RESERVAS_EVENTOS_CONEXIONES', '500')
+    _sin_entorno(monkeypatch, 'RESERVAS_EVENTOS_MAX_SUSCRIPTORES')
+    conf = runpy.run_path(os.path.join(DIRECTORIO, 'gunicorn_eventos.conf.py'))
+    assert (conf['worker_class'], conf['worker_connections']) == ('gevent', 500)
+    assert os.environ['RESERVAS_EVENTOS_MAX_SUSCRIPTORES'] == '450'
+
+
+def test_wsgi_aplica_el_limite_de_flujos_del_pool(monkeypatch, wsgi):
+    monkeypatch.setenv('RESERVAS_EVENTOS_MAX_SUSCRIPTORES', '1')
+    recargado = importlib.reload(wsgi)
+    try:
+        assert recargado.app.config['EVENTOS_MAX_SUSCRIPTORES'] == 1
+    finally:
+        with recargado.app.app_context():
+            db.engine.dispose()
+
+
+def test_wsgi_no_arranca_sin_esquema(monkeypatch, tmp_path):
+    from app import ErrorDeArranque
+    monkeypatch.setenv('RESERVAS_DATABASE_URL', f"sqlite:///{tmp_path / 'vacia.db'}")
+    monkeypatch.delenv('RESERVAS_CREAR_TABLAS', raising=False)
+    sys.modules.pop('wsgi', None)
+    try:
+        with pytest.raises(ErrorDeArranque, match='db_crear_esquema'):
+            import wsgi  # noqa: F401
+    finally:
+        sys.modules.pop('wsgi', None)
+        os.environ.pop('RESERVAS_CREAR_TABLAS', None)
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.skipif(importlib.util.find_spec('gunicorn') is None or importlib.util.find_spec('gevent') is None,
+                    reason='requiere gunicorn y gevent')
+def test_pool_de_eventos_atiende_muchos_oyentes_con_un_worker(app, client, datos, tmp_path):
+    # el app de conftest ya creó el esquema y los datos; el pool gevent sirve la misma base
+    puerto, oyentes = _puerto_libre(), 40
+    entorno = dict(os.environ, RESERVAS_DATABASE_URL=app.config['SQLALCHEMY_DATABASE_URI'],
+                   RESERVAS_EVENTOS_BIND=f'127.0.0.1:{puerto}', RESERVAS_EVENTOS_WORKERS='1',
+                   RESERVAS_LOG_LEVEL='warning')
+    servidor = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_eventos.conf.py', 'wsgi:app'],
+                                cwd=DIRECTORIO, env=entorno)
+    conexiones = []
+    try:
+        fin = time.time() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', puerto), timeout=1).close()
+                break
+            except OSError:
+                assert servidor.poll() is None and time.time() < fin, 'el pool de eventos no arrancó'
+                time.sleep(0.1)
+        for _ in range(oyentes):
+            c = http.client.HTTPConnection('127.0.0.1', puerto, timeout=10)
+            c.request('GET', f"/api/canchas/{datos['id_cancha']}/eventos?fecha=2025-11-10")
+            r = c.getresponse()
+            assert r.status == 200 and r.readline().startswith(b'retry:')
+            conexiones.append((c, r))
+
+        # alta hecha en este proceso (otro "worker"): llega a todos por la tabla de eventos
+        alta = client.post('/api/reservas/', json={
+            'id_cliente': datos['id_cliente'], 'id_cancha': datos['id_cancha'],
+            'fecha_reserva': '2025-11-10', 'hora_inicio': '18:00', 'hora_fin': '19:00',
+        })
+        assert alta.status_code == 201
+        for _, r in conexiones:
+            linea = r.readline()
+            while not linea.startswith(b'event:'):
+                linea = r.readline()
+            assert linea == b'event: ocupado\n'
+    finally:
+        for c, _ in conexiones:
+            c.close()
+        servidor.send_signal(signal.SIGINT)   # apagado rápido: no esperar a los flujos abiertos
+        servidor.wait(timeout=30)
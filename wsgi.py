@@ -0,0 +1,52 @@
+"""Punto de entrada WSGI para producción.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+La app se crea con el perfil 'produccion' del motor SQLite (WAL,
+busy_timeout, pool; ver motor_sqlite.py) salvo que RESERVAS_SQLITE_PERFIL
+diga otra cosa: con varios workers escribiendo el mismo archivo es el único
+perfil razonable. Tampoco crea tablas al arrancar: el esquema se crea una vez
+con `python db_crear_esquema.py` y la app sólo verifica que esté completo
+(si falta, no arranca). El resto de la configuración (base, workers, hilos) va por
+variables de entorno; ver gunicorn.conf.py.
+
+`python app.py` sigue siendo el servidor de desarrollo (un proceso, con el
+depurador activo): no usarlo en producción.
+"""
+import os
+
+os.environ.setdefault('RESERVAS_SQLITE_PERFIL', 'produccion')
+# El esquema lo crea el despliegue (python db_crear_esquema.py), no cada worker
+os.environ.setdefault('RESERVAS_CREAR_TABLAS', '0')
+
+from app import create_app, db  # noqa: E402
+import metricas  # noqa: E402
+
+# Estado en memoria que es de cada proceso (cachés, índice de ocupación,
+# oyentes SSE). Se crea solo en el primer uso.
+ESTADO_POR_PROCESO = ('cache_http', 'catalogo', 'indice_ocupacion', 'eventos')
+
+
+def despues_de_fork(app):
+    """Deja a un worker recién creado sin nada compartido con el proceso padre.
+
+    Con preload_app la app se crea en el master de gunicorn y cada worker la
+    hereda por fork, junto con las conexiones abiertas del pool: dos procesos
+    usando la misma conexión SQLite (o el mismo socket de PostgreSQL) corrompen
+    el protocolo. dispose(close=False) descarta el pool heredado sin cerrar las
+    conexiones del padre, y el worker abre las suyas. También se descarta el
+    estado en memoria del padre (por ejemplo la época de los ETag, que debe ser
+    distinta en cada worker) y se empiezan métricas propias.
+    """
+    with app.app_context():
+        db.engine.dispose(close=False)
+    for nombre in ESTADO_POR_PROCESO:
+        app.extensions.pop(nombre, None)
+    if 'metricas' in app.extensions:
+        app.extensions['metricas'] = metricas.Metricas(app.extensions['metricas'].ventana)
+
+
+app = create_app()
+# Oyentes SSE por proceso: lo fija cada pool de gunicorn según sus hilos/conexiones
+if os.environ.get('RESERVAS_EVENTOS_MAX_SUSCRIPTORES'):
+    app.config['EVENTOS_MAX_SUSCRIPTORES'] = int(os.environ['RESERVAS_EVENTOS_MAX_SUSCRIPTORES'])